@@ -87,7 +87,7 @@ def audit_log_table() -> rx.Component:
                     rx.icon("refresh-cw", size=16),
                     rx.text("Actualiser"),
                 ),
-                on_click=State.load_audit_logs,
+                on_click=State.refresh_audit_logs,
                 size="2",
                 variant="surface",
                 color_scheme="gray",
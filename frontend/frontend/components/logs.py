@@ -70,7 +70,7 @@ def deploy_console() -> rx.Component:
                     rx.spacer(),
                     rx.hstack(
                         rx.cond(
-                            State.deploy_status == "running",
+                            (State.deploy_status == "running") | (State.deploy_status == "queued"),
                             rx.spinner(color=TERMINAL_GREEN, size="1"),
                             rx.cond(
                                 State.deploy_status == "success",
@@ -84,15 +84,19 @@ def deploy_console() -> rx.Component:
                         ),
                         rx.text(
                             rx.cond(
-                                State.deploy_status == "running",
-                                "Déploiement en cours...",
+                                State.deploy_status == "queued",
+                                State.deploy_queue_label,
                                 rx.cond(
-                                    State.deploy_status == "success",
-                                    "Terminé avec succès",
+                                    State.deploy_status == "running",
+                                    "Déploiement en cours...",
                                     rx.cond(
-                                        State.deploy_status == "pipeline_sent",
-                                        "Pipeline GitLab déclenché",
-                                        "Erreur",
+                                        State.deploy_status == "success",
+                                        "Terminé avec succès",
+                                        rx.cond(
+                                            State.deploy_status == "pipeline_sent",
+                                            "Pipeline GitLab déclenché",
+                                            "Erreur",
+                                        ),
                                     ),
                                 ),
                             ),
@@ -94,6 +94,79 @@ def audit_row(row: dict) -> rx.Component:
     )
 
 
+def rollup_row(row: dict) -> rx.Component:
+    """Ligne d'agrégat : libellé, nombre d'opérations, coût cumulé."""
+    return rx.hstack(
+        rx.text(row["label"], font_size="13px", weight="medium", color="var(--gray-12)", truncate=True),
+        rx.spacer(),
+        rx.text(row["count"], font_size="12px", color="var(--gray-10)"),
+        rx.text(
+            row["formatted_cost"],
+            font_family="'SF Mono', monospace",
+            font_size="13px",
+            weight="bold",
+            color="var(--gray-12)",
+            min_width="80px",
+            text_align="right",
+        ),
+        width="100%",
+        spacing="3",
+        align="center",
+    )
+
+
+def rollup_card(title: str, rows) -> rx.Component:
+    """Carte d'agrégats pour une dimension (utilisateur, action, statut)."""
+    return rx.vstack(
+        rx.text(title, weight="bold", size="2", color="var(--gray-11)"),
+        rx.foreach(rows, rollup_row),
+        spacing="2",
+        padding="16px",
+        background="var(--gray-2)",
+        border="1px solid var(--gray-4)",
+        border_radius="14px",
+        width="100%",
+        align="start",
+    )
+
+
+def finops_summary() -> rx.Component:
+    """Synthèse FinOps : coût et nombre d'opérations sur les derniers jours."""
+    return rx.vstack(
+        rx.hstack(
+            rx.text(
+                "Synthèse FinOps – ",
+                State.rollup_days,
+                " derniers jours",
+                weight="bold",
+                size="3",
+            ),
+            rx.spacer(),
+            rx.text(
+                State.rollup_total_count,
+                " opérations · ",
+                State.rollup_total_cost,
+                font_family="'SF Mono', monospace",
+                size="2",
+                color="var(--gray-11)",
+            ),
+            width="100%",
+            align="center",
+        ),
+        rx.grid(
+            rollup_card("Par utilisateur", State.rollup_by_user),
+            rollup_card("Par action", State.rollup_by_action),
+            rollup_card("Par statut", State.rollup_by_status),
+            columns=rx.breakpoints(initial="1", md="3"),
+            spacing="3",
+            width="100%",
+        ),
+        width="100%",
+        spacing="3",
+        margin_bottom="16px",
+    )
+
+
 def governance_dashboard() -> rx.Component:
     """Dashboard de gouvernance avec journal d'audit - Style Apple."""
     return rx.vstack(
@@ -138,7 +211,7 @@ def governance_dashboard() -> rx.Component:
                     spacing="2",
                     align="center",
                 ),
-                on_click=State.load_audit_logs,
+                on_click=[State.refresh_audit_logs, State.load_audit_rollups],
                 size="2",
                 variant="surface",
                 radius="large",
@@ -147,10 +220,48 @@ def governance_dashboard() -> rx.Component:
                     "transform": "scale(0.98)",
                 },
             ),
+            rx.button(
+                rx.hstack(
+                    rx.icon("download", size=14),
+                    rx.text("Exporter CSV", weight="medium"),
+                    spacing="2",
+                    align="center",
+                ),
+                on_click=State.export_audit_history("csv"),
+                loading=State.is_exporting,
+                size="2",
+                variant="surface",
+                radius="large",
+                cursor="pointer",
+            ),
+            rx.cond(
+                State.export_formats.contains("parquet"),
+                rx.button(
+                    rx.hstack(
+                        rx.icon("download", size=14),
+                        rx.text("Exporter Parquet", weight="medium"),
+                        spacing="2",
+                        align="center",
+                    ),
+                    on_click=State.export_audit_history("parquet"),
+                    loading=State.is_exporting,
+                    size="2",
+                    variant="surface",
+                    radius="large",
+                    cursor="pointer",
+                ),
+            ),
             width="100%",
+            align="center",
             margin_bottom="16px",
         ),
+        rx.cond(
+            State.export_status != "",
+            rx.text(State.export_status, size="2", color="var(--gray-11)", width="100%", text_align="right"),
+        ),
         # Le polling adaptatif est géré par State.start_audit_polling (background event)
+
+        finops_summary(),
         
         # Tableau d'audit avec style Apple
         rx.box(
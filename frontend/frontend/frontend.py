@@ -3,6 +3,7 @@ import reflex as rx
 
 from .state import State
 from .styles import GLOBAL_ANIMATIONS
+from .webhooks import webhook_api
 from .components.header import header
 from .components.topbar import user_topbar
 from .components.form import configuration_form
@@ -282,11 +283,13 @@ app = rx.App(
     stylesheets=[
         "https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap",
     ],
+    # Webhook GitLab (statuts de pipeline poussés au lieu d'être pollés)
+    api_transformer=webhook_api,
 )
 
 # Enregistrement de la page avec chargement initial des logs
 app.add_page(
     index,
     title="EcoArch",
-    on_load=[State.load_audit_logs, State.start_audit_polling],
+    on_load=[State.start_audit_polling, State.listen_pipeline_events, State.load_audit_rollups],
 )
\ No newline at end of file
@@ -12,6 +12,7 @@ Toute logique métier est déléguée aux services :
 import asyncio
 import logging
 import sys
+import time
 import uuid
 from pathlib import Path
 from typing import Any
@@ -30,7 +31,30 @@ try:
     from src.simulation import InfracostSimulator
     from src.recommendation import RecommendationEngine
     from src.services.auth_service import AuthService, AuthResult
-    from src.services.audit_service import AuditService
+    from src.services.audit_service import (
+        AuditService,
+        TRACKED_STATUSES as _AUDIT_TRACKED_STATUSES,
+    )
+    from src.services.pipeline_events import hub as pipeline_event_hub
+    from src.services.audit_poller import poller as audit_poller
+    from src.services.audit_rollups import dashboard_summary as audit_dashboard_summary
+    from src.services.audit_export import (
+        DOWNLOAD_PATH as _EXPORT_DOWNLOAD_PATH,
+        available_formats as _export_formats,
+        export_audit_logs,
+        new_export_path,
+    )
+    from src.services.deploy_queue import (
+        find_recent_deployment,
+        get_deploy_queue,
+        submit_deployment,
+    )
+    from src.services.deploy_guard import (
+        DeploymentBusyError,
+        deployment_lock,
+        request_fingerprint,
+    )
+    from src.services.job_traces import TraceStreamer
     from src.security import InputSanitizer
     from src.deployer import (
         trigger_deployment,
@@ -48,18 +72,48 @@ except ImportError:
         AuthResultStub as AuthResult,  # type: ignore[assignment]
         AuditServiceStub as AuditService,  # type: ignore[assignment]
         InputSanitizerStub as InputSanitizer,  # type: ignore[assignment]
+        DeploymentBusyErrorStub as DeploymentBusyError,  # type: ignore[assignment]
+        deployment_lock_stub as deployment_lock,  # type: ignore[assignment]
     )
 
     trigger_deployment = None
     trigger_destruction = None
     check_pipeline_status = None  # type: ignore[assignment]
     extract_pipeline_id = None  # type: ignore[assignment]
+    pipeline_event_hub = None  # type: ignore[assignment]
+    audit_poller = None  # type: ignore[assignment]
+    audit_dashboard_summary = None  # type: ignore[assignment]
+    export_audit_logs = None  # type: ignore[assignment]
+    _export_formats = None  # type: ignore[assignment]
+    new_export_path = None  # type: ignore[assignment]
+    _EXPORT_DOWNLOAD_PATH = ""
+    get_deploy_queue = None  # type: ignore[assignment]
+    submit_deployment = None  # type: ignore[assignment]
+    find_recent_deployment = None  # type: ignore[assignment]
+    request_fingerprint = None  # type: ignore[assignment]
+    TraceStreamer = None  # type: ignore[assignment]
+    _AUDIT_TRACKED_STATUSES = ("PENDING", "PIPELINE_SENT", "RUNNING")
 
 logger = logging.getLogger(__name__)
 
-# ── Audit polling (GreenOps – backoff exponentiel) ─────────────────
+# ── Audit polling : boucle partagée du processus (src.services.audit_poller) ──
 _AUDIT_POLL_INTERVAL_MIN_S = 10
-_AUDIT_POLL_INTERVAL_MAX_S = 120
+
+
+# Synthèse FinOps du journal d'audit (agrégats locaux, src.services.audit_rollups)
+_ROLLUP_DAYS = 30
+
+# Export de l'historique d'audit (répertoire privé, téléchargement unique par jeton)
+_EXPORT_PROGRESS_S = 0.5
+
+# Suivi d'un déclenchement en file (position, envoi effectif)
+_DEPLOY_JOB_POLL_S = 1.0
+
+# Traces des jobs GitLab dans la console (lecture incrémentale)
+_TRACE_POLL_MIN_S = 2.0
+_TRACE_POLL_MAX_S = 10.0
+_TRACE_MAX_DURATION_S = 3600
+_LOG_MAX_LINES = 100
 
 
 class State(rx.State):
@@ -415,6 +469,9 @@ class State(rx.State):
         if self.cost > Config.DEFAULT_BUDGET_LIMIT:
             return rx.toast.error("Budget dépassé!")
 
+        if self.is_deploying:
+            return
+
         target_id = self.deployment_id
         self.is_deploying = True
         self.deploy_status = "queued"
@@ -422,6 +479,13 @@ class State(rx.State):
         self.logs = [f"--- DEPLOY: {target_id} ---", "📨 Envoi vers GitLab CI/CD…"]
         yield
 
+        # ── Demande identique récente (double clic, rejeu) : on la suit ──
+        request_hash = self._request_hash(target_id, "apply")
+        if self._attach_existing_job(request_hash):
+            yield
+            yield State.watch_deploy_job
+            return
+
         audit_id = AuditService.create_log(
             user=self.current_user,
             action="DEPLOY",
@@ -431,7 +495,13 @@ class State(rx.State):
         )
         yield
 
-        # ── Tentative GitLab CI/CD ──
+        # ── GitLab CI/CD via la file durable (débit limité, retries) ──
+        if self._enqueue_pipeline(target_id, "apply", audit_id, request_hash):
+            yield
+            yield State.watch_deploy_job
+            return
+
+        # ── Tentative GitLab CI/CD directe (file indisponible) ──
         if trigger_deployment is not None and Config.GITLAB_TRIGGER_TOKEN:
             try:
                 result = trigger_deployment(
@@ -447,8 +517,8 @@ class State(rx.State):
                     self.logs.append("✅ Déploiement initié sur GitLab")
                     AuditService.update_log(audit_id, "PIPELINE_SENT", self.pipeline_url)
                     self.is_deploying = False
-                    self.load_audit_logs()
                     yield
+                    yield [State.refresh_audit_logs, State.stream_pipeline_trace]
                     return
                 else:
                     self.logs.append(f"⚠️ GitLab trigger échoué: {result.error}")
@@ -470,6 +540,114 @@ class State(rx.State):
             yield
             yield from self._deploy_demo(target_id, audit_id)
 
+    # ===== FILE DE DÉCLENCHEMENT GITLAB =====
+    deploy_job_id: int | None = None
+    deploy_queue_position: int = 0
+    _deploy_job_attempts: int = 0
+
+    def _request_hash(self, target_id: str, action: str) -> str | None:
+        """Empreinte (deployment_id, action, panier) de la demande courante."""
+        if request_fingerprint is None:
+            return None
+        return request_fingerprint(target_id, action, self.resource_list)
+
+    def _attach_existing_job(self, request_hash: str | None) -> bool:
+        """Suit le job d'une demande identique récente au lieu d'en créer un."""
+        if not request_hash or find_recent_deployment is None or not Config.GITLAB_TRIGGER_TOKEN:
+            return False
+        try:
+            job = find_recent_deployment(request_hash)
+        except Exception:
+            logger.warning("Recherche de demande identique impossible", exc_info=True)
+            return False
+        if job is None:
+            return False
+        self.deploy_job_id = job.id
+        self.deploy_queue_position = 0
+        self._deploy_job_attempts = job.attempts
+        self.logs.append(f"♻️ Demande identique déjà reçue (job #{job.id}) : suivi de celle-ci")
+        return True
+
+    def _enqueue_pipeline(
+        self,
+        target_id: str,
+        action: str,
+        audit_id: int | None,
+        request_hash: str | None = None,
+    ) -> bool:
+        """Met le déclenchement en file ; False si la file est indisponible."""
+        if submit_deployment is None or not Config.GITLAB_TRIGGER_TOKEN:
+            return False
+        try:
+            job = submit_deployment(
+                target_id, action, self.resource_list,
+                audit_id=audit_id, request_hash=request_hash,
+            )
+        except Exception:
+            logger.warning("Mise en file du déclenchement impossible", exc_info=True)
+            return False
+        if job is None:
+            return False
+        self.deploy_job_id = job.id
+        self.deploy_queue_position = 0
+        self._deploy_job_attempts = 0
+        self.logs.append("📥 Demande mise en file d'envoi GitLab")
+        return True
+
+    @rx.event(background=True)
+    async def watch_deploy_job(self) -> None:
+        """Suit le job en file jusqu'au déclenchement effectif du pipeline."""
+        queue = get_deploy_queue() if get_deploy_queue is not None else None
+        if queue is None:
+            return
+        while True:
+            async with self:
+                job_id = self.deploy_job_id
+            if job_id is None:
+                return
+            # Lectures SQLite bloquantes : hors de la boucle d'événements
+            job = await asyncio.to_thread(queue.get, job_id)
+            position = await asyncio.to_thread(queue.position, job_id)
+            async with self:
+                if job is None or self.deploy_job_id != job_id:
+                    return
+                if self._apply_deploy_job(job, position):
+                    if job.status == "sent":
+                        return [State.refresh_audit_logs, State.stream_pipeline_trace]
+                    return State.refresh_audit_logs
+            await asyncio.sleep(_DEPLOY_JOB_POLL_S)
+
+    def _apply_deploy_job(self, job: Any, position: int) -> bool:
+        """Reporte l'état du job dans la console ; True quand il est terminé."""
+        destroy = job.action == "destroy"
+        if job.status == "sent":
+            self.pipeline_url = job.pipeline_url or ""
+            self.deploy_status = "pipeline_sent"
+            if destroy:
+                self.logs.append(f"🔥 Pipeline destruction déclenché (ID: {job.pipeline_id})")
+            else:
+                self.logs.append(f"🚀 Pipeline GitLab déclenché (ID: {job.pipeline_id})")
+            self.logs.append(f"🔗 {self.pipeline_url}")
+            self.logs.append(
+                "✅ Destruction initiée sur GitLab" if destroy else "✅ Déploiement initié sur GitLab"
+            )
+        elif job.status == "failed":
+            self.deploy_status = "error"
+            self.logs.append(f"❌ Déclenchement GitLab abandonné: {job.error}")
+        else:
+            if job.status == "queued" and job.attempts > self._deploy_job_attempts and job.error:
+                self.logs.append(f"⚠️ Tentative {job.attempts} échouée ({job.error}), nouvel essai planifié")
+            self._deploy_job_attempts = job.attempts
+            if position and position != self.deploy_queue_position:
+                self.logs.append(f"⏳ Position dans la file : {position}")
+            self.deploy_queue_position = position
+            return False
+
+        self.deploy_job_id = None
+        self.deploy_queue_position = 0
+        self.is_deploying = False
+        return True
+
     def _deploy_sync(self, target_id: str):
         """Fallback : déploiement synchrone (ancien comportement)."""
         self.deploy_status = "running"
@@ -477,15 +655,20 @@ class State(rx.State):
 
         try:
             sim = InfracostSimulator(project_id=Config.GCP_PROJECT_ID)
-            for line in sim.deploy(self.resource_list, target_id):
-                self._append_log(line)
-                yield
+            with deployment_lock(target_id):
+                for line in sim.deploy(self.resource_list, target_id):
+                    self._append_log(line)
+                    yield
 
             self.deploy_status = "success"
             self.logs.append("✅ SUCCESS")
             yield
             AuditService.update_log(None, "SUCCESS")
 
+        except DeploymentBusyError as e:
+            self.deploy_status = "error"
+            self.logs.append(f"⛔ {e}")
+
         except Exception as e:
             self.deploy_status = "error"
             self.logs.append(f"❌ ERROR: {e}")
@@ -494,8 +677,7 @@ class State(rx.State):
 
         finally:
             self.is_deploying = False
-            self.load_audit_logs()
-            yield
+            yield State.refresh_audit_logs
 
     def _deploy_demo(self, target_id: str, audit_id: int | None):
         """Mode démo : prépare un script de logs non bloquant pour le déploiement."""
@@ -564,6 +746,13 @@ class State(rx.State):
         self.logs = [f"--- DESTROY: {target_id} ---", "📨 Envoi vers GitLab CI/CD…"]
         yield
 
+        # ── Demande identique récente (double clic, rejeu) : on la suit ──
+        request_hash = self._request_hash(target_id, "destroy")
+        if self._attach_existing_job(request_hash):
+            yield
+            yield State.watch_deploy_job
+            return
+
         audit_id = AuditService.create_log(
             user=self.current_user,
             action="DESTROY",
@@ -573,7 +762,13 @@ class State(rx.State):
         )
         yield
 
-        # ── Tentative GitLab CI/CD ──
+        # ── GitLab CI/CD via la file durable (débit limité, retries) ──
+        if self._enqueue_pipeline(target_id, "destroy", audit_id, request_hash):
+            yield
+            yield State.watch_deploy_job
+            return
+
+        # ── Tentative GitLab CI/CD directe (file indisponible) ──
         if trigger_destruction is not None and Config.GITLAB_TRIGGER_TOKEN:
             try:
                 result = trigger_destruction(
@@ -588,8 +783,8 @@ class State(rx.State):
                     self.logs.append("✅ Destruction initiée sur GitLab")
                     AuditService.update_log(audit_id, "PIPELINE_SENT", self.pipeline_url)
                     self.is_deploying = False
-                    self.load_audit_logs()
                     yield
+                    yield [State.refresh_audit_logs, State.stream_pipeline_trace]
                     return
                 else:
                     self.logs.append(f"⚠️ GitLab trigger échoué: {result.error}")
@@ -618,13 +813,18 @@ class State(rx.State):
 
         try:
             sim = InfracostSimulator(project_id=Config.GCP_PROJECT_ID)
-            for line in sim.destroy(self.resource_list, target_id):
-                self._append_log(line)
-                yield
+            with deployment_lock(target_id):
+                for line in sim.destroy(self.resource_list, target_id):
+                    self._append_log(line)
+                    yield
 
             self.deploy_status = "success"
             self.logs.append("✅ DESTROY SUCCESS")
 
+        except DeploymentBusyError as e:
+            self.deploy_status = "error"
+            self.logs.append(f"⛔ {e}")
+
         except Exception as e:
             self.deploy_status = "error"
             self.logs.append(f"❌ ERROR: {e}")
@@ -632,8 +832,7 @@ class State(rx.State):
 
         finally:
             self.is_deploying = False
-            self.load_audit_logs()
-            yield
+            yield State.refresh_audit_logs
 
     def _destroy_demo(self, target_id: str, audit_id: int | None):
         """Mode démo : prépare un script de logs non bloquant pour la destruction."""
@@ -679,9 +878,58 @@ class State(rx.State):
     def _append_log(self, line: str) -> None:
         """Ajoute une ligne au log avec limite de taille."""
         self.logs.append(line)
-        if len(self.logs) > 100:
+        if len(self.logs) > _LOG_MAX_LINES:
             self.logs.pop(0)
 
+    def _append_logs(self, lines: list[str]) -> None:
+        """Ajoute un lot de lignes en une seule mise à jour de l'état."""
+        self.logs = (self.logs + lines)[-_LOG_MAX_LINES:]
+
+    # ===== TRACES GITLAB =====
+    _trace_pipeline_id: int | None = None
+
+    @rx.event(background=True)
+    async def stream_pipeline_trace(self) -> None:
+        """Affiche en direct les traces des jobs du pipeline déclenché.
+
+        Chaque tour ne télécharge que les octets nouveaux (requêtes Range)
+        et pousse toutes les lignes reçues en un seul lot ; l'intervalle
+        s'allonge tant que rien de nouveau n'arrive.
+        """
+        if TraceStreamer is None or not Config.GITLAB_API_TOKEN:
+            return
+        async with self:
+            pipeline_url = self.pipeline_url
+            pipeline_id = extract_pipeline_id(pipeline_url)
+            if pipeline_id is None or self._trace_pipeline_id == pipeline_id:
+                return
+            self._trace_pipeline_id = pipeline_id
+            self._append_log("📜 Traces GitLab en direct…")
+
+        streamer = TraceStreamer(pipeline_id)
+        interval = _TRACE_POLL_MIN_S
+        deadline = time.monotonic() + _TRACE_MAX_DURATION_S
+        try:
+            while time.monotonic() < deadline:
+                lines = await streamer.poll()
+                async with self:
+                    if self.pipeline_url != pipeline_url or self.deploy_status == "idle":
+                        return
+                    if streamer.finished:
+                        lines.append("🏁 Fin des traces GitLab")
+                    if lines:
+                        self._append_logs(lines)
+                    if streamer.finished:
+                        return
+                interval = _TRACE_POLL_MIN_S if lines else min(interval * 2, _TRACE_POLL_MAX_S)
+                await asyncio.sleep(interval)
+        except Exception:
+            logger.warning("Pipeline trace stream stopped", exc_info=True)
+        finally:
+            async with self:
+                if self._trace_pipeline_id == pipeline_id:
+                    self._trace_pipeline_id = None
+
     @rx.event(background=True)
     async def run_demo_loop(self) -> None:
         """Boucle background qui déroule le script de démo étape par étape."""
@@ -696,11 +944,10 @@ class State(rx.State):
                     if self.demo_audit_id is not None:
                         AuditService.update_log(self.demo_audit_id, "SUCCESS")
                     self.is_deploying = False
-                    self.load_audit_logs()
                     self.demo_script = []
                     self.demo_index = 0
                     self.demo_audit_id = None
-                    return
+                    return State.refresh_audit_logs
 
                 step = self.demo_script[self.demo_index]
                 message = str(step.get("message", ""))
@@ -724,69 +971,206 @@ class State(rx.State):
 
     # ===== AUDIT LOGS =====
     audit_logs: list[dict] = []
-    audit_no_change_count: int = 0
     audit_poll_interval_s: int = _AUDIT_POLL_INTERVAL_MIN_S
+    _audit_snapshot_version: int = 0
     _audit_polling_active: bool = False
+    _pipeline_listener_active: bool = False
 
     @rx.event(background=True)
     async def start_audit_polling(self) -> None:
-        """Boucle background de polling adaptatif des audit logs."""
+        """Abonne la session au polling d'audit partagé du processus.
+
+        Une seule boucle par processus interroge Supabase et GitLab
+        (``src.services.audit_poller``) ; la session applique chaque
+        nouvel instantané. Avec le webhook GitLab actif, les changements
+        arrivent d'abord par ``listen_pipeline_events``.
+        """
+        if audit_poller is None:
+            return
         async with self:
             if self._audit_polling_active:
                 return
             self._audit_polling_active = True
 
+        queue = audit_poller.subscribe()
         try:
             while True:
+                snapshot = await queue.get()
                 async with self:
-                    self.load_audit_logs()
-                    interval = self.audit_poll_interval_s
-                await asyncio.sleep(interval)
+                    self._apply_audit_snapshot(snapshot)
         except Exception:
             logger.warning("Audit polling loop stopped", exc_info=True)
         finally:
+            audit_poller.unsubscribe(queue)
             async with self:
                 self._audit_polling_active = False
 
-    def load_audit_logs(self) -> None:
-        """Charge les logs d'audit depuis Supabase.
+    @rx.event(background=True)
+    async def listen_pipeline_events(self) -> None:
+        """Applique en direct les événements du webhook GitLab aux logs affichés."""
+        if pipeline_event_hub is None:
+            return
+        async with self:
+            if self._pipeline_listener_active:
+                return
+            self._pipeline_listener_active = True
+
+        queue = pipeline_event_hub.subscribe()
+        try:
+            while True:
+                event = await queue.get()
+                async with self:
+                    self._apply_pipeline_event(event.pipeline_id, event.status)
+        except Exception:
+            logger.warning("Pipeline event listener stopped", exc_info=True)
+        finally:
+            pipeline_event_hub.unsubscribe(queue)
+            async with self:
+                self._pipeline_listener_active = False
+
+    def _apply_pipeline_event(self, pipeline_id: int, status: str) -> bool:
+        """Met à jour les logs affichés du pipeline ; True si l'un a changé."""
+        changed = False
+        rows = []
+        for row in self.audit_logs:
+            if (
+                row.get("status") in _AUDIT_TRACKED_STATUSES
+                and row.get("status") != status
+                and extract_pipeline_id(row.get("pipeline_url", "")) == pipeline_id
+            ):
+                row = {**row, "status": status}
+                changed = True
+            rows.append(row)
+        if changed:
+            self.audit_logs = rows
+        return changed
+
+    @rx.event(background=True)
+    async def refresh_audit_logs(self) -> None:
+        """Rafraîchit l'instantané partagé (demandes simultanées fusionnées)."""
+        if audit_poller is None:
+            return
+        snapshot = await audit_poller.refresh()
+        async with self:
+            self._apply_audit_snapshot(snapshot)
+
+    def _apply_audit_snapshot(self, snapshot: Any) -> None:
+        """Affiche un instantané du poller ; rien à refaire s'il est déjà appliqué."""
+        if snapshot.interval_s != self.audit_poll_interval_s:
+            self.audit_poll_interval_s = snapshot.interval_s
+        if snapshot.version == self._audit_snapshot_version:
+            return
+        self._audit_snapshot_version = snapshot.version
+        # Les lignes inchangées gardent leur formatage précédent
+        previous = {row.get("id"): row for row in self.audit_logs}
+        formatted = []
+        for row in snapshot.rows:
+            prev = previous.get(row.get("id"))
+            if prev is None or any(prev.get(k) != v for k, v in row.items()):
+                prev = self._format_audit_row(row)
+            formatted.append(prev)
+        self.audit_logs = formatted
+
+    # ===== EXPORT DE L'HISTORIQUE D'AUDIT =====
+    is_exporting: bool = False
+    export_status: str = ""
+    # Parquet n'est proposé que si pyarrow est installé
+    export_formats: list[str] = list(_export_formats()) if _export_formats else []
 
-        Pour chaque entrée dont le statut est PENDING ou PIPELINE_SENT,
-        interroge l'API GitLab afin de récupérer le statut final du
-        pipeline (SUCCESS / FAILED / CANCELLED / RUNNING) et met à jour
-        Supabase en conséquence.
+    @rx.event(background=True)
+    async def export_audit_history(self, fmt: str = "csv"):
+        """Exporte tout ``audit_logs`` (pages keyset) puis lance le téléchargement.
+
+        L'export tourne dans un thread ; l'avancement est reporté dans
+        ``export_status`` toutes les ``_EXPORT_PROGRESS_S`` secondes. Le
+        fichier est écrit hors du répertoire d'upload (public) et remis une
+        seule fois par ``/exports/audit/{token}``, qui le supprime ensuite.
         """
+        if export_audit_logs is None:
+            return
+        async with self:
+            if fmt not in self.export_formats or self.is_exporting or not self._require_auth():
+                return
+            self.is_exporting = True
+            self.export_status = "Export en cours…"
+
+        # Répertoire privé : le fichier n'est servi qu'une fois, contre le jeton
+        token, path = new_export_path(fmt)
+        latest: dict[str, Any] = {}
+        task = asyncio.ensure_future(asyncio.to_thread(
+            export_audit_logs, path, fmt,
+            progress=lambda p: latest.update(rows=p.rows, percent=p.percent),
+        ))
+        while not task.done():
+            await asyncio.wait({task}, timeout=_EXPORT_PROGRESS_S)
+            if latest:
+                async with self:
+                    self.export_status = self._export_progress_label(latest)
+
         try:
-            # 1. Sync GitLab status
-            any_status_changed = AuditService.sync_pipeline_statuses(self.audit_logs)
-            
-            # 2. Backoff exponentiel GreenOps
-            if any_status_changed:
-                self.audit_no_change_count = 0
-                self.audit_poll_interval_s = _AUDIT_POLL_INTERVAL_MIN_S
-            else:
-                self.audit_no_change_count += 1
-                if self.audit_no_change_count >= 3:
-                    new_interval = min(
-                        self.audit_poll_interval_s * 2,
-                        _AUDIT_POLL_INTERVAL_MAX_S,
-                    )
-                    if new_interval != self.audit_poll_interval_s:
-                        logger.info(
-                            "Augmentation de l'intervalle de polling audit: %ss → %ss",
-                            self.audit_poll_interval_s,
-                            new_interval,
-                        )
-                    self.audit_poll_interval_s = new_interval
-                    self.audit_no_change_count = 0
-
-            # 3. Reload fresh logs
-            rows = AuditService.fetch_recent_logs(limit=50)
-            self.audit_logs = [
-                self._format_audit_row(row) for row in rows
-            ]
+            result = task.result()
+        except Exception as exc:
+            logger.warning("Export audit échoué", exc_info=True)
+            async with self:
+                self.is_exporting = False
+                self.export_status = f"❌ Export échoué : {exc}"
+            return
+        async with self:
+            self.is_exporting = False
+            self.export_status = f"✅ {result.rows} ligne(s) exportée(s)"
+        api_url = rx.config.get_config().api_url.rstrip("/")
+        return rx.download(url=api_url + _EXPORT_DOWNLOAD_PATH.format(token=token), filename=f"audit_logs.{fmt}")
+
+    @staticmethod
+    def _export_progress_label(latest: dict) -> str:
+        percent = latest.get("percent")
+        done = f" ({percent:.0f} %)" if percent is not None else ""
+        return f"Export en cours… {latest.get('rows', 0)} ligne(s){done}"
+
+    # ===== SYNTHÈSE FINOPS (agrégats d'audit) =====
+    rollup_days: int = _ROLLUP_DAYS
+    rollup_total_cost: str = "$0.00"
+    rollup_total_count: int = 0
+    # Variables d'état Reflex (copiées pour chaque session) : RUF012 ne s'applique pas
+    rollup_by_user: list[dict] = []  # noqa: RUF012
+    rollup_by_action: list[dict] = []  # noqa: RUF012
+    rollup_by_status: list[dict] = []  # noqa: RUF012
+
+    @rx.event(background=True)
+    async def load_audit_rollups(self) -> None:
+        """Met à jour les agrégats (logs modifiés seulement) puis la synthèse affichée."""
+        if audit_dashboard_summary is None:
+            return
+        async with self:
+            days = self.rollup_days
+        try:
+            summary = await asyncio.to_thread(audit_dashboard_summary, days)
         except Exception:
-            logger.warning("Échec chargement audit logs", exc_info=True)
+            logger.warning("Échec chargement synthèse FinOps", exc_info=True)
+            return
+        if summary is None:
+            return
+        async with self:
+            self._apply_rollup_summary(summary)
+
+    def _apply_rollup_summary(self, summary: dict) -> None:
+        self.rollup_total_cost = f"${summary['cost']:.2f}"
+        self.rollup_total_count = summary["count"]
+        self.rollup_by_user = self._format_rollup_rows(summary["by_user"], "user")
+        self.rollup_by_action = self._format_rollup_rows(summary["by_action"], "action")
+        self.rollup_by_status = self._format_rollup_rows(summary["by_status"], "status")
+
+    @staticmethod
+    def _format_rollup_rows(rows: list[dict], dimension: str) -> list[dict]:
+        """Lignes ``{label, count, formatted_cost}`` pour le tableau de bord."""
+        return [
+            {
+                "label": row.get(dimension) or "–",
+                "count": row.get("count", 0),
+                "formatted_cost": f"${row.get('cost', 0):.2f}",
+            }
+            for row in rows
+        ]
 
     @staticmethod
     def _format_audit_row(row: dict) -> dict:
@@ -807,6 +1191,13 @@ class State(rx.State):
         }
 
     # ===== COMPUTED PROPERTIES =====
+    @rx.var
+    def deploy_queue_label(self) -> str:
+        """Libellé de la console pendant l'attente dans la file GitLab."""
+        if self.deploy_queue_position > 0:
+            return f"En file d'attente (position {self.deploy_queue_position})"
+        return "Envoi vers GitLab..."
+
     @rx.var
     def chart_data(self) -> list[dict]:
         """Données pour le graphique de répartition des coûts.
@@ -0,0 +1,79 @@
+"""Endpoints HTTP hors Reflex, montés via ``rx.App(api_transformer=...)``.
+
+- ``POST /hooks/gitlab/pipeline`` : webhook « Pipeline events » de GitLab
+  (voir ``src.services.pipeline_events``) ;
+- ``GET /exports/audit/{token}`` : téléchargement unique d'un export
+  d'audit. Le jeton n'est remis qu'à une session authentifiée ; le
+  fichier est supprimé après l'envoi (voir ``src.services.audit_export``).
+"""
+import json
+import logging
+
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import FileResponse, JSONResponse, Response
+from starlette.routing import Route
+
+from src.config import Config
+from src.services.audit_export import DOWNLOAD_PATH, claim_export
+from src.services.pipeline_events import (
+    MAX_PAYLOAD_BYTES,
+    TOKEN_HEADER,
+    WEBHOOK_PATH,
+    handle_pipeline_event,
+    verify_token,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def gitlab_pipeline_webhook(request: Request) -> JSONResponse:
+    """Reçoit un événement de pipeline GitLab et l'applique."""
+    if not verify_token(request.headers.get(TOKEN_HEADER), Config.GITLAB_WEBHOOK_SECRET):
+        logger.warning("Webhook pipeline refusé : secret invalide ou non configuré")
+        return JSONResponse({"error": "invalid token"}, status_code=401)
+
+    try:
+        declared = int(request.headers.get("content-length") or 0)
+    except ValueError:
+        declared = 0
+    if declared > MAX_PAYLOAD_BYTES:
+        return JSONResponse({"error": "payload too large"}, status_code=413)
+
+    body = await request.body()
+    if len(body) > MAX_PAYLOAD_BYTES:
+        return JSONResponse({"error": "payload too large"}, status_code=413)
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return JSONResponse({"error": "invalid json"}, status_code=400)
+
+    # Écriture Supabase bloquante : hors de la boucle asyncio
+    event = await run_in_threadpool(handle_pipeline_event, payload)
+    if event is None:
+        return JSONResponse({"accepted": False}, status_code=200)
+    return JSONResponse({"accepted": True, **event.to_dict()}, status_code=202)
+
+
+async def audit_export_download(request: Request) -> Response:
+    """Envoie un export d'audit une seule fois, puis le supprime."""
+    claimed = claim_export(request.path_params["token"])
+    if claimed is None:
+        return JSONResponse({"error": "export not found"}, status_code=404)
+    path, fmt = claimed
+    return FileResponse(
+        path,
+        filename=f"audit_logs.{fmt}",
+        headers={"Cache-Control": "no-store"},
+        background=BackgroundTask(path.unlink, missing_ok=True),
+    )
+
+
+webhook_api = Starlette(
+    routes=[
+        Route(WEBHOOK_PATH, gitlab_pipeline_webhook, methods=["POST"]),
+        Route(DOWNLOAD_PATH, audit_export_download, methods=["GET"]),
+    ],
+)
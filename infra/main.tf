@@ -11,6 +11,11 @@ terraform {
 # TF_VAR_architecture_json est injecté par le pipeline GitLab
 # sous forme de JSON sérialisé.  On le décode ici pour créer
 # dynamiquement les ressources demandées par l'utilisateur.
+#
+# Format : {"scripts": {stack_id: script}, "resources": [...]}
+# Les VM ne référencent que leur software_stack : chaque script de
+# démarrage n'est transmis qu'une fois, quel que soit le nombre de VM.
+# L'ancien format (liste avec startup_script inline) reste accepté.
 
 locals {
   common_labels = {
@@ -21,7 +26,9 @@ locals {
   }
 
   # Décode le JSON du panier utilisateur
-  cart = jsondecode(var.architecture_json)
+  architecture = jsondecode(var.architecture_json)
+  cart         = try(local.architecture.resources, local.architecture)
+  scripts      = try(local.architecture.scripts, {})
 
   # Filtrage par type de ressource
   compute_items = [
@@ -62,7 +69,11 @@ resource "google_compute_instance" "vm" {
   }
 
   # ✅ Script de démarrage = logiciel pré-installé (Docker, Nginx, LAMP…)
-  metadata_startup_script = lookup(local.compute_items[count.index], "startup_script", "")
+  metadata_startup_script = lookup(
+    local.scripts,
+    lookup(local.compute_items[count.index], "software_stack", "none"),
+    lookup(local.compute_items[count.index], "startup_script", ""),
+  )
 
   labels = merge(local.common_labels, {
     deployment_id  = var.deployment_id
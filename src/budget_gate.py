@@ -4,12 +4,25 @@ Améliorations :
 - ARCH-4 : logging au lieu de print().
 - ARCH-5 : import corrigé (src.parser au lieu de parser).
 - ARCH-6 : Exception au lieu de sys.exit() pour testabilité.
+
+Usage CLI :
+    python src/budget_gate.py                              # infracost-report.json
+    python src/budget_gate.py --reports "reports/*.json" --output gate.json
 """
+import argparse
+import glob
+import json
 import logging
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
 
+from src.budget_policy import BudgetPolicy, RuleVerdict
 from src.parser import EcoArchParser
+from src.report_diff import iter_resource_changes, top_changes
+from src.report_snapshot import load_report
 
 logger = logging.getLogger(__name__)
 
@@ -19,25 +32,65 @@ REPORT_PATH = "infracost-report.json"
 
 
 class BudgetExceededError(Exception):
-    """Levée quand le coût dépasse le budget autorisé."""
+    """Levée quand le coût dépasse le budget autorisé.
+
+    ``verdicts`` porte le verdict de chaque règle de la politique de
+    budget (vide sans politique), qu'elle ait échoué ou non.
+    """
 
-    def __init__(self, cost: float, budget: float, currency: str = "USD"):
+    def __init__(
+        self,
+        cost: float,
+        budget: float,
+        currency: str = "USD",
+        verdicts: list[RuleVerdict] | None = None,
+    ):
         self.cost = cost
         self.budget = budget
         self.currency = currency
+        self.verdicts = verdicts or []
         super().__init__(
             f"Budget exceeded: {cost:.2f} {currency} > {budget:.2f} {currency}"
         )
 
 
+class PolicyViolationError(BudgetExceededError):
+    """Levée quand au moins une règle de la politique de budget échoue."""
+
+    def __init__(
+        self,
+        violations: list[RuleVerdict],
+        currency: str = "USD",
+        verdicts: list[RuleVerdict] | None = None,
+    ):
+        self.violations = violations
+        first = violations[0]
+        if first.cost_exceeded:
+            cost, budget = first.monthly_cost, first.max_monthly_cost
+        else:
+            cost, budget = first.delta, first.max_delta
+        super().__init__(cost, budget or 0.0, currency, verdicts or violations)
+        self.args = (
+            f"{len(violations)} budget rule(s) violated: "
+            + ", ".join(v.rule_id for v in violations),
+        )
+
+
 def check_budget(report_path: str = REPORT_PATH) -> dict:
     """Vérifie les coûts par rapport au budget.
 
+    Si ``ECOARCH_BUDGET_POLICY`` pointe vers un fichier de politique,
+    ses règles (projet, type, label, variation) sont évaluées en plus,
+    avant le budget global : leurs verdicts sont joints à l'exception
+    levée, y compris quand seul le budget global échoue.
+
     Returns:
         dict avec les clés: passed (bool), cost, budget, currency
+        (+ rules si une politique est configurée)
 
     Raises:
         BudgetExceededError: si le coût dépasse le budget.
+        PolicyViolationError: si une règle de la politique échoue.
     """
     budget_limit = float(os.getenv("ECOARCH_BUDGET_LIMIT", DEFAULT_BUDGET))
     project_name = os.getenv("CI_PROJECT_NAME", "unknown")
@@ -45,7 +98,7 @@ def check_budget(report_path: str = REPORT_PATH) -> dict:
     logger.info("--- EcoArch Budget Gate ---")
     logger.info("Project: %s", project_name)
 
-    parser = EcoArchParser(report_path)
+    parser = load_report(report_path)
     metrics = parser.extract_metrics()
     total_cost = metrics["total_monthly_cost"]
     currency = metrics["currency"]
@@ -60,22 +113,133 @@ def check_budget(report_path: str = REPORT_PATH) -> dict:
         "currency": currency,
     }
 
+    # Principales variations vs baseline (si le rapport main est fourni)
+    baseline_path = os.getenv("ECOARCH_BASELINE_REPORT", "")
+    if baseline_path and Path(baseline_path).exists():
+        baseline = EcoArchParser(baseline_path, streaming=True)
+        changes = top_changes(iter_resource_changes(parser, baseline), 5)
+        for change in changes:
+            logger.info(
+                "Δ %-7s %s: %+.2f %s", change.kind, change.address, change.delta, currency
+            )
+        result["top_changes"] = [c.to_dict() for c in changes]
+
+    verdicts: list[RuleVerdict] = []
+    policy_path = os.getenv("ECOARCH_BUDGET_POLICY", "")
+    if policy_path:
+        verdicts = BudgetPolicy.load(policy_path).evaluate(parser)
+        result["rules"] = [v.to_dict() for v in verdicts]
+    violations = [v for v in verdicts if not v.passed]
+    if verdicts:
+        logger.info("Policy: %d rule(s), %d violation(s)", len(verdicts), len(violations))
+    for verdict in violations:
+        logger.error("FAILED %s", verdict.describe(currency))
+
     if not result["passed"]:
         excess = total_cost - budget_limit
         logger.error("FAILED: Budget exceeded by %.2f %s", excess, currency)
-        raise BudgetExceededError(total_cost, budget_limit, currency)
+        raise BudgetExceededError(total_cost, budget_limit, currency, verdicts)
+    if violations:
+        result["passed"] = False
+        raise PolicyViolationError(violations, currency, verdicts)
 
     logger.info("PASSED: Within budget")
     return result
 
 
+# ── Monorepo : plusieurs rapports en parallèle ────────────────────
+
+
+def _gate_report(report_path: str) -> dict[str, Any]:
+    """Évalue un rapport ; ne lève jamais (exécuté dans un worker)."""
+    entry: dict[str, Any] = {"report": report_path}
+    try:
+        entry.update(check_budget(report_path))
+        entry["status"] = "passed"
+    except BudgetExceededError as e:
+        entry.update(
+            passed=False, status="failed", cost=e.cost, budget=e.budget,
+            currency=e.currency, error=str(e),
+        )
+        if e.verdicts:
+            entry["rules"] = [v.to_dict() for v in e.verdicts]
+    except Exception as e:  # noqa: BLE001 — un rapport illisible devient une entrée « error », les autres sont évalués
+        logger.error("%s: %s", report_path, e)
+        entry.update(passed=False, status="error", error=str(e))
+    return entry
+
+
+def expand_reports(patterns: list[str]) -> list[str]:
+    """Chemins des rapports (globs récursifs), dédupliqués et triés."""
+    found = {path for pattern in patterns for path in glob.glob(pattern, recursive=True)}
+    return sorted(found)
+
+
+def gate_reports(report_paths: list[str], workers: int | None = None) -> dict[str, Any]:
+    """Évalue plusieurs rapports dans un pool de processus.
+
+    Returns:
+        Synthèse : compteurs par statut, coût cumulé et détail par rapport
+        (dans l'ordre de ``report_paths``).
+    """
+    if len(report_paths) <= 1 or workers == 1:
+        results = [_gate_report(path) for path in report_paths]
+    else:
+        max_workers = min(workers or os.cpu_count() or 1, len(report_paths))
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_gate_report, report_paths))
+
+    counts = {status: 0 for status in ("passed", "failed", "error")}
+    for entry in results:
+        counts[entry["status"]] += 1
+    return {
+        "passed": counts["failed"] == 0 and counts["error"] == 0,
+        "counts": counts,
+        "total_cost": sum(entry.get("cost", 0.0) for entry in results),
+        "reports": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """CLI : un rapport (défaut) ou un lot via ``--reports``."""
+    cli = argparse.ArgumentParser(description="EcoArch Budget Gate")
+    cli.add_argument("--reports", nargs="+", metavar="GLOB",
+                     help="Rapports Infracost à évaluer (globs acceptés)")
+    cli.add_argument("--workers", type=int, default=None,
+                     help="Nombre de processus (défaut : nombre de CPU)")
+    cli.add_argument("--output", default=None,
+                     help="Fichier JSON de résultat (mode --reports)")
+    args = cli.parse_args(argv)
+
+    if not args.reports:
+        try:
+            check_budget()
+            return 0
+        except BudgetExceededError:
+            return 1
+        except Exception as e:
+            logger.error("Error: %s", e)
+            return 1
+
+    paths = expand_reports(args.reports)
+    if not paths:
+        logger.error("Aucun rapport ne correspond à %s", args.reports)
+        return 1
+
+    summary = gate_reports(paths, workers=args.workers)
+    counts = summary["counts"]
+    logger.info(
+        "--- Summary: %d report(s) — %d passed, %d failed, %d error(s) ---",
+        len(paths), counts["passed"], counts["failed"], counts["error"],
+    )
+    for entry in summary["reports"]:
+        if entry["status"] != "passed":
+            logger.error("%-6s %s: %s", entry["status"].upper(), entry["report"], entry.get("error", ""))
+    if args.output:
+        Path(args.output).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    return 0 if summary["passed"] else 1
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
-    try:
-        check_budget()
-        sys.exit(0)
-    except BudgetExceededError:
-        sys.exit(1)
-    except Exception as e:
-        logger.error("Error: %s", e)
-        sys.exit(1)
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""Politique de budgets multiples (projet, type de ressource, label, total).
+
+Le fichier de politique (JSON) décrit une liste de règles :
+
+    {
+      "rules": [
+        {"id": "global", "scope": "total", "max_monthly_cost": 500},
+        {"id": "mr-delta", "scope": "total", "max_delta": 50},
+        {"id": "web", "scope": "project", "match": "infra/web", "max_monthly_cost": 120},
+        {"id": "sql", "scope": "resource_type",
+         "match": "google_sql_database_instance", "max_delta": 20},
+        {"id": "team-data", "scope": "label", "match": "team=data", "max_monthly_cost": 300}
+      ]
+    }
+
+À la compilation, les règles sont indexées par dimension (dict valeur →
+règles), si bien que l'évaluation est une seule passe sur les ressources :
+chaque ressource ne coûte que quelques lookups de dict, quel que soit le
+nombre de règles. Les cumuls sont tenus par *clé* (partagés entre règles
+de même cible), puis chaque règle produit un ``RuleVerdict``.
+
+``delta`` correspond au ``diffMonthlyCost`` Infracost (rapports ``diff``).
+"""
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Literal
+
+from src.parser import EcoArchParser
+
+logger = logging.getLogger(__name__)
+
+Scope = Literal["total", "project", "resource_type", "label"]
+_SCOPES: tuple[str, ...] = ("total", "project", "resource_type", "label")
+
+
+@dataclass(frozen=True)
+class BudgetRule:
+    """Règle de budget : plafond de coût et/ou de variation sur une cible."""
+
+    id: str
+    scope: Scope
+    match: str = ""
+    max_monthly_cost: float | None = None
+    max_delta: float | None = None
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any], position: int) -> BudgetRule:
+        rule_id = str(raw.get("id") or f"rule-{position}")
+        scope = raw.get("scope", "total")
+        if scope not in _SCOPES:
+            raise ValueError(f"Règle '{rule_id}': scope inconnu {scope!r}")
+        match = str(raw.get("match") or "")
+        if scope != "total" and not match:
+            raise ValueError(f"Règle '{rule_id}': 'match' requis pour le scope {scope}")
+        if scope == "label" and "=" not in match:
+            raise ValueError(f"Règle '{rule_id}': label attendu au format 'clé=valeur'")
+        max_cost = raw.get("max_monthly_cost")
+        max_delta = raw.get("max_delta")
+        if max_cost is None and max_delta is None:
+            raise ValueError(f"Règle '{rule_id}': aucun plafond (max_monthly_cost / max_delta)")
+        return cls(
+            id=rule_id,
+            scope=scope,
+            match=match,
+            max_monthly_cost=None if max_cost is None else float(max_cost),
+            max_delta=None if max_delta is None else float(max_delta),
+        )
+
+    @property
+    def label(self) -> tuple[str, str]:
+        key, _, value = self.match.partition("=")
+        return key.strip(), value.strip()
+
+
+@dataclass(frozen=True)
+class RuleVerdict:
+    """Résultat de l'évaluation d'une règle."""
+
+    rule_id: str
+    scope: Scope
+    match: str
+    monthly_cost: float
+    delta: float
+    max_monthly_cost: float | None
+    max_delta: float | None
+    resources: int
+
+    @property
+    def cost_exceeded(self) -> bool:
+        return self.max_monthly_cost is not None and self.monthly_cost > self.max_monthly_cost
+
+    @property
+    def delta_exceeded(self) -> bool:
+        return self.max_delta is not None and self.delta > self.max_delta
+
+    @property
+    def passed(self) -> bool:
+        return not (self.cost_exceeded or self.delta_exceeded)
+
+    def describe(self, currency: str = "USD") -> str:
+        target = self.scope if self.scope == "total" else f"{self.scope} '{self.match}'"
+        parts = []
+        if self.cost_exceeded:
+            parts.append(f"coût {self.monthly_cost:.2f} > {self.max_monthly_cost:.2f} {currency}")
+        if self.delta_exceeded:
+            parts.append(f"variation {self.delta:+.2f} > {self.max_delta:.2f} {currency}")
+        status = ", ".join(parts) if parts else "OK"
+        return f"[{self.rule_id}] {target}: {status}"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "passed": self.passed}
+
+
+class _Acc:
+    """Cumul coût / delta / nombre de ressources pour une clé."""
+
+    __slots__ = ("cost", "count", "delta")
+
+    def __init__(self) -> None:
+        self.cost = 0.0
+        self.delta = 0.0
+        self.count = 0
+
+    def add(self, cost: float, delta: float) -> None:
+        self.cost += cost
+        self.delta += delta
+        self.count += 1
+
+
+class BudgetPolicy:
+    """Politique compilée : règles indexées par dimension."""
+
+    def __init__(self, rules: Iterable[BudgetRule]):
+        self.rules = list(rules)
+        self._projects: set[str] = set()
+        self._types: set[str] = set()
+        self._labels: dict[str, set[str]] = {}
+        for rule in self.rules:
+            if rule.scope == "project":
+                self._projects.add(rule.match)
+            elif rule.scope == "resource_type":
+                self._types.add(rule.match)
+            elif rule.scope == "label":
+                key, value = rule.label
+                self._labels.setdefault(key, set()).add(value)
+
+    # ── Chargement ────────────────────────────────────────────────
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> BudgetPolicy:
+        rules = raw.get("rules") or []
+        if not isinstance(rules, list):
+            raise ValueError("La politique doit contenir une liste 'rules'")  # noqa: TRY004
+        policy = cls(BudgetRule.from_dict(r, i) for i, r in enumerate(rules))
+        duplicated = len(policy.rules) - len({r.id for r in policy.rules})
+        if duplicated:
+            raise ValueError(f"{duplicated} identifiant(s) de règle dupliqué(s)")
+        return policy
+
+    @classmethod
+    def load(cls, path: str | Path) -> BudgetPolicy:
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    # ── Évaluation ────────────────────────────────────────────────
+
+    def evaluate(self, source: EcoArchParser | Iterable[dict[str, Any]]) -> list[RuleVerdict]:
+        """Évalue toutes les règles en une seule passe sur les ressources.
+
+        Pour un ``EcoArchParser``, le scope ``total`` utilise les totaux
+        du rapport (``extract_metrics``) plutôt que la somme des ressources.
+        """
+        rows = source.iter_resources() if isinstance(source, EcoArchParser) else source
+
+        total = _Acc()
+        by_project: dict[str, _Acc] = {}
+        by_type: dict[str, _Acc] = {}
+        by_label: dict[tuple[str, str], _Acc] = {}
+        projects, types, labels = self._projects, self._types, self._labels
+
+        for row in rows:
+            cost = float(row.get("monthly_cost", 0.0))
+            delta = float(row.get("delta", 0.0))
+            total.add(cost, delta)
+
+            project = row.get("project", "")
+            if project in projects:
+                by_project.setdefault(project, _Acc()).add(cost, delta)
+            rtype = row.get("type", "")
+            if rtype in types:
+                by_type.setdefault(rtype, _Acc()).add(cost, delta)
+            if labels:
+                for key, value in (row.get("labels") or {}).items():
+                    wanted = labels.get(key)
+                    if wanted and str(value) in wanted:
+                        by_label.setdefault((key, str(value)), _Acc()).add(cost, delta)
+
+        if isinstance(source, EcoArchParser):
+            metrics = source.extract_metrics()
+            total.cost = metrics["total_monthly_cost"]
+            total.delta = metrics["diff_monthly_cost"]
+
+        empty = _Acc()
+        verdicts = []
+        for rule in self.rules:
+            if rule.scope == "total":
+                acc = total
+            elif rule.scope == "project":
+                acc = by_project.get(rule.match, empty)
+            elif rule.scope == "resource_type":
+                acc = by_type.get(rule.match, empty)
+            else:
+                acc = by_label.get(rule.label, empty)
+            verdicts.append(RuleVerdict(
+                rule_id=rule.id,
+                scope=rule.scope,
+                match=rule.match,
+                monthly_cost=acc.cost,
+                delta=acc.delta,
+                max_monthly_cost=rule.max_monthly_cost,
+                max_delta=rule.max_delta,
+                resources=acc.count,
+            ))
+        return verdicts
+
+
+__all__ = ["BudgetPolicy", "BudgetRule", "RuleVerdict"]
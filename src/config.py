@@ -106,6 +106,10 @@ class Config:
         "GITLAB_PROJECT_ID", "GITLAB_PROJECT_ID", default="77811562"
     )
     GITLAB_REF = _get_env("GITLAB_REF", "main")
+    # Secret partagé du webhook "Pipeline events" (en-tête X-Gitlab-Token)
+    GITLAB_WEBHOOK_SECRET = _get_secret_or_env(
+        "GITLAB_WEBHOOK_SECRET", "GITLAB_WEBHOOK_SECRET"
+    )
     GITLAB_PIPELINE_BASE_URL = (
         f"https://gitlab.com/api/v4/projects/{GITLAB_PROJECT_ID}/trigger/pipeline"
     )
@@ -8,19 +8,34 @@ Secrets attendus (Secret Manager ou env) :
 - GITLAB_TRIGGER_TOKEN : token de déclenchement du pipeline
 - GITLAB_PROJECT_ID    : ID numérique du projet GitLab
 """
+import asyncio
+import base64
+import gzip
 import json
 import logging
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from datetime import UTC, datetime
 from typing import Any
 
 import requests
+from urllib3.exceptions import NewConnectionError
 
+from src import http_client
 from src.config import Config, GCPConfig
+from src.gitlab_client import get_async_client
+from src.http_client import CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
 # ── Constantes ────────────────────────────────────────────────────
 _TRIGGER_TIMEOUT = 15  # secondes
+# Recherche d'un trigger ambigu : pipelines récents examinés, marge d'horloge
+_LOOKUP_PIPELINES = 20
+_LOOKUP_MARGIN_S = 60.0
 
 
 @dataclass
@@ -31,43 +46,66 @@ class PipelineResult:
     pipeline_id: int | None = None
     pipeline_url: str | None = None
     error: str | None = None
+    # Échec transitoire (429, 5xx, réseau) : un nouvel essai peut réussir
+    retryable: bool = False
+    # La requête a pu être reçue (timeout de lecture, connexion coupée) :
+    # chercher le pipeline (``find_triggered_pipeline``) avant de relancer
+    maybe_sent: bool = False
 
 
-def _enrich_resources_for_terraform(
-    resources: list[dict[str, Any]],
-) -> list[dict[str, Any]]:
-    """Enrichit les ressources compute avec le contenu du startup_script.
+class PipelineLookupError(RuntimeError):
+    """Recherche d'un pipeline déclenché impossible (token absent, erreur GitLab)."""
+
+
+# Au-delà de cette taille, le panier part compressé (gzip + base64) dans
+# ECOARCH_ARCHITECTURE_GZ ; le job terraform_deploy le décompresse vers
+# TF_VAR_architecture_json (Terraform ne sait pas décompresser lui-même).
+_ARCHITECTURE_INLINE_MAX_CHARS = 8192
+
 
-    Le script est récupéré depuis GCPConfig.SOFTWARE_STACKS en fonction
-    du champ ``software_stack`` de chaque ressource.
-    Cela permet à Terraform d'utiliser ``metadata_startup_script``
-    pour installer Docker, Nginx, LAMP, etc. au boot de la VM.
+def _encode_architecture(resources: list[dict[str, Any]]) -> dict[str, Any]:
+    """Encode le panier pour Terraform : scripts dédupliqués par stack.
+
+    Les ressources compute ne portent que leur ``software_stack`` ; le
+    contenu des scripts de démarrage (``GCPConfig.SOFTWARE_STACKS``) est
+    transmis une seule fois par stack dans ``scripts``. La taille du
+    payload croît avec le nombre de stacks distinctes, pas de VM.
     """
-    enriched: list[dict[str, Any]] = []
+    scripts: dict[str, str] = {}
+    encoded: list[dict[str, Any]] = []
     for res in resources:
         res = dict(res)  # copie pour ne pas muter l'original
+        res.pop("startup_script", None)
         if res.get("type") == "compute":
-            stack_id = res.get("software_stack", "none")
-            res["startup_script"] = GCPConfig.get_startup_script(stack_id)
-        enriched.append(res)
-    return enriched
+            stack_id = res.setdefault("software_stack", "none")
+            if stack_id not in scripts:
+                script = GCPConfig.get_startup_script(stack_id)
+                if script:
+                    scripts[stack_id] = script
+        encoded.append(res)
+    return {"scripts": scripts, "resources": encoded}
+
+
+def _architecture_variables(resources: list[dict[str, Any]]) -> dict[str, str]:
+    """Variables de trigger transportant le panier (compressé si volumineux)."""
+    architecture_json = json.dumps(_encode_architecture(resources), separators=(",", ":"))
+    if len(architecture_json) <= _ARCHITECTURE_INLINE_MAX_CHARS:
+        return {"variables[TF_VAR_architecture_json]": architecture_json}
+    packed = base64.b64encode(gzip.compress(architecture_json.encode("utf-8"), mtime=0))
+    logger.info(
+        "Panier compressé pour le trigger: %d → %d caractères",
+        len(architecture_json), len(packed),
+    )
+    return {"variables[ECOARCH_ARCHITECTURE_GZ]": packed.decode("ascii")}
 
 
-def trigger_deployment(
+def _trigger_payload(
     resources: list[dict[str, Any]],
     deployment_id: str,
-    action: str = "apply",
-) -> PipelineResult:
-    """Déclenche un pipeline GitLab CI/CD via l'API Trigger.
-
-    Args:
-        resources: Liste de ressources du panier (sérialisée en JSON).
-        deployment_id: Identifiant unique du déploiement.
-        action: "apply" pour déployer, "destroy" pour détruire.
-
-    Returns:
-        PipelineResult avec l'URL du pipeline ou un message d'erreur.
-    """
+    action: str,
+    idempotency_key: str,
+) -> dict[str, str] | PipelineResult:
+    """Formulaire de l'API Trigger, ou l'échec si la configuration manque."""
     token = Config.GITLAB_TRIGGER_TOKEN
     project_id = Config.GITLAB_PROJECT_ID
 
@@ -81,22 +119,16 @@ def trigger_deployment(
         logger.error(msg)
         return PipelineResult(success=False, error=msg)
 
-    # Enrichir les ressources compute avec les startup_scripts
-    enriched = _enrich_resources_for_terraform(resources)
-
-    # Sérialiser le panier enrichi en JSON compact
-    architecture_json = json.dumps(enriched, separators=(",", ":"))
-
-    url = f"https://gitlab.com/api/v4/projects/{project_id}/trigger/pipeline"
-
     payload = {
         "token": token,
         "ref": Config.GITLAB_REF,
-        "variables[TF_VAR_architecture_json]": architecture_json,
+        **_architecture_variables(resources),
         "variables[TF_VAR_deployment_id]": deployment_id,
         "variables[ECOARCH_DEPLOYMENT_ID]": deployment_id,
         "variables[ECOARCH_ACTION]": action,
     }
+    if idempotency_key:
+        payload["variables[ECOARCH_IDEMPOTENCY_KEY]"] = idempotency_key
 
     logger.info(
         "Triggering GitLab pipeline: project=%s, ref=%s, action=%s, deployment=%s",
@@ -105,46 +137,81 @@ def trigger_deployment(
         action,
         deployment_id,
     )
+    return payload
 
-    try:
-        resp = requests.post(url, data=payload, timeout=_TRIGGER_TIMEOUT)
 
-        if resp.status_code == 201:
-            data = resp.json()
-            pipeline_id = data.get("id")
-            pipeline_url = data.get("web_url", "")
+def _trigger_result(resp: Any) -> PipelineResult:
+    """Interprète la réponse de l'API Trigger."""
+    if resp.status_code == 201:
+        data = resp.json()
+        pipeline_id = data.get("id")
+        pipeline_url = data.get("web_url", "")
 
-            # Construire l'URL si absente
-            if not pipeline_url:
-                pipeline_url = (
-                    f"{Config.GITLAB_PROJECT_URL}/-/pipelines/{pipeline_id}"
-                )
-
-            logger.info(
-                "Pipeline déclenché: id=%s, url=%s",
-                pipeline_id,
-                pipeline_url,
+        # Construire l'URL si absente
+        if not pipeline_url:
+            pipeline_url = (
+                f"{Config.GITLAB_PROJECT_URL}/-/pipelines/{pipeline_id}"
             )
 
-            return PipelineResult(
-                success=True,
-                pipeline_id=pipeline_id,
-                pipeline_url=pipeline_url,
-            )
-        else:
-            error_msg = f"GitLab API {resp.status_code}: {resp.text[:200]}"
-            logger.error("Échec déclenchement pipeline: %s", error_msg)
-            return PipelineResult(success=False, error=error_msg)
+        logger.info(
+            "Pipeline déclenché: id=%s, url=%s",
+            pipeline_id,
+            pipeline_url,
+        )
+
+        return PipelineResult(
+            success=True,
+            pipeline_id=pipeline_id,
+            pipeline_url=pipeline_url,
+        )
+
+    error_msg = f"GitLab API {resp.status_code}: {resp.text[:200]}"
+    logger.error("Échec déclenchement pipeline: %s", error_msg)
+    return PipelineResult(
+        success=False,
+        error=error_msg,
+        retryable=resp.status_code == 429 or resp.status_code >= 500,
+    )
 
-    except requests.Timeout:
-        msg = "Timeout lors de l'appel à l'API GitLab"
-        logger.error(msg)
-        return PipelineResult(success=False, error=msg)
 
-    except requests.ConnectionError as exc:
-        msg = f"Connexion impossible à GitLab: {exc}"
+def trigger_deployment(
+    resources: list[dict[str, Any]],
+    deployment_id: str,
+    action: str = "apply",
+    idempotency_key: str = "",
+) -> PipelineResult:
+    """Déclenche un pipeline GitLab CI/CD via l'API Trigger.
+
+    Args:
+        resources: Liste de ressources du panier (sérialisée en JSON).
+        deployment_id: Identifiant unique du déploiement.
+        action: "apply" pour déployer, "destroy" pour détruire.
+        idempotency_key: Clé de la demande, transmise au pipeline
+            (``ECOARCH_IDEMPOTENCY_KEY``) pour tracer les rejeux.
+
+    Returns:
+        PipelineResult avec l'URL du pipeline ou un message d'erreur.
+    """
+    payload = _trigger_payload(resources, deployment_id, action, idempotency_key)
+    if isinstance(payload, PipelineResult):
+        return payload
+
+    url = f"https://gitlab.com/api/v4/projects/{Config.GITLAB_PROJECT_ID}/trigger/pipeline"
+
+    try:
+        resp = http_client.post(url, data=payload, timeout=_TRIGGER_TIMEOUT)
+        return _trigger_result(resp)
+
+    except (requests.Timeout, requests.ConnectionError) as exc:
+        if _failed_before_sending(exc):
+            msg = f"Connexion impossible à GitLab: {exc}"
+            logger.error(msg)
+            return PipelineResult(success=False, error=msg, retryable=True)
+        # Le trigger a pu être reçu : le pipeline existe peut-être déjà
+        kind = "Timeout" if isinstance(exc, requests.Timeout) else "Connexion interrompue"
+        msg = f"{kind} lors de l'appel à l'API GitLab (pipeline peut-être créé): {exc}"
         logger.error(msg)
-        return PipelineResult(success=False, error=msg)
+        return PipelineResult(success=False, error=msg, retryable=True, maybe_sent=True)
 
     except Exception as exc:
         msg = f"Erreur inattendue lors du trigger: {exc}"
@@ -152,6 +219,68 @@ def trigger_deployment(
         return PipelineResult(success=False, error=msg)
 
 
+def _failed_before_sending(exc: Exception) -> bool:
+    """True si l'échec réseau précède l'envoi de la requête (rejeu sans risque).
+
+    Timeout de connexion, connexion refusée ou DNS (``NewConnectionError``),
+    circuit ouvert. Un timeout de lecture ou une connexion coupée en cours
+    d'échange laissent le trigger peut-être reçu par GitLab.
+    """
+    if isinstance(exc, (requests.ConnectTimeout, CircuitOpenError)):
+        return True
+    reason = exc.args[0] if exc.args else None
+    reason = getattr(reason, "reason", reason)  # MaxRetryError → cause
+    return isinstance(reason, NewConnectionError)
+
+
+def find_triggered_pipeline(idempotency_key: str, created_after: float) -> PipelineResult | None:
+    """Pipeline déclenché avec ``ECOARCH_IDEMPOTENCY_KEY`` = ``idempotency_key``.
+
+    Parcourt les pipelines ``source=trigger`` mis à jour depuis
+    ``created_after`` (epoch, marge de ``_LOOKUP_MARGIN_S``), du plus récent
+    au plus ancien, et lit leurs variables. Nécessite GITLAB_API_TOKEN
+    (scope ``read_api``).
+
+    Returns:
+        Le pipeline trouvé (``success=True``), ou None s'il n'existe pas.
+
+    Raises:
+        PipelineLookupError: recherche impossible ; l'existence du pipeline
+            reste inconnue.
+    """
+    api_token = Config.GITLAB_API_TOKEN
+    project_id = Config.GITLAB_PROJECT_ID
+    if not api_token or not project_id:
+        raise PipelineLookupError("GITLAB_API_TOKEN ou GITLAB_PROJECT_ID non configuré")
+
+    base = f"https://gitlab.com/api/v4/projects/{project_id}/pipelines"
+    headers = {"PRIVATE-TOKEN": api_token}
+    since = datetime.fromtimestamp(created_after - _LOOKUP_MARGIN_S, tz=UTC).isoformat()
+    params = {
+        "source": "trigger", "updated_after": since,
+        "order_by": "id", "sort": "desc", "per_page": _LOOKUP_PIPELINES,
+    }
+    try:
+        resp = http_client.get(base, headers=headers, params=params, timeout=10)
+        if resp.status_code != 200:
+            raise PipelineLookupError(f"GitLab API {resp.status_code} (liste pipelines)")
+        for pipeline in resp.json():
+            pid = pipeline.get("id")
+            var_resp = http_client.get(f"{base}/{pid}/variables", headers=headers, timeout=10)
+            if var_resp.status_code != 200:
+                raise PipelineLookupError(
+                    f"GitLab API {var_resp.status_code} (variables du pipeline {pid})"
+                )
+            variables = {v.get("key"): v.get("value") for v in var_resp.json()}
+            if variables.get("ECOARCH_IDEMPOTENCY_KEY") == idempotency_key:
+                logger.info("Pipeline %s déjà déclenché pour la clé %s", pid, idempotency_key)
+                url = pipeline.get("web_url") or f"{Config.GITLAB_PROJECT_URL}/-/pipelines/{pid}"
+                return PipelineResult(success=True, pipeline_id=pid, pipeline_url=url)
+    except (requests.RequestException, ValueError) as exc:
+        raise PipelineLookupError(str(exc)) from exc
+    return None
+
+
 def trigger_destruction(
     resources: list[dict[str, Any]],
     deployment_id: str,
@@ -176,6 +305,103 @@ _GITLAB_RUNNING_STATUSES = {
 }
 
 
+# Durée de vie du cache : courte pour les pipelines en cours, longue pour
+# les statuts finaux (un pipeline terminé ne change plus) et pour les
+# entrées négatives (au-delà du plus long intervalle de polling)
+_STATUS_TTL_RUNNING = 10.0
+_STATUS_TTL_FINAL = 3600.0
+_STATUS_TTL_UNKNOWN = 600.0
+_PIPELINES_PER_PAGE = 100
+_MAX_PIPELINE_PAGES = 5
+# Pipelines absents de la liste interrogés un par un, par appel (et en parallèle)
+_MAX_DIRECT_LOOKUPS = 8
+_UNKNOWN = ""  # entrée négative : pipeline introuvable / statut inconnu
+
+
+class PipelineStatusCache:
+    """Cache TTL pipeline_id → statut EcoArch, partagé par toutes les sessions.
+
+    Mémorise aussi la date de la dernière interrogation individuelle de
+    chaque pipeline non résolu, pour faire tourner ces interrogations.
+    """
+
+    def __init__(
+        self,
+        running_ttl: float = _STATUS_TTL_RUNNING,
+        final_ttl: float = _STATUS_TTL_FINAL,
+        unknown_ttl: float = _STATUS_TTL_UNKNOWN,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.running_ttl = running_ttl
+        self.final_ttl = final_ttl
+        self.unknown_ttl = unknown_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[int, tuple[str, float]] = {}
+        self._tried: dict[int, float] = {}
+
+    def get(self, pipeline_id: int) -> str | None:
+        """Statut en cache ; ``_UNKNOWN`` pour une entrée négative, None si absent."""
+        with self._lock:
+            entry = self._entries.get(pipeline_id)
+            if entry is None:
+                return None
+            if entry[1] <= self._clock():
+                del self._entries[pipeline_id]
+                return None
+            return entry[0]
+
+    def put(self, pipeline_id: int, status: str | None) -> None:
+        value = status or _UNKNOWN
+        if value == _UNKNOWN:
+            ttl = self.unknown_ttl
+        elif value in _GITLAB_STATUS_MAP.values():
+            ttl = self.final_ttl
+        else:
+            ttl = self.running_ttl
+        with self._lock:
+            self._entries[pipeline_id] = (value, self._clock() + ttl)
+            if value != _UNKNOWN:
+                self._tried.pop(pipeline_id, None)
+
+    def least_recently_tried(self, pipeline_ids: Iterable[int], limit: int) -> list[int]:
+        """Les ``limit`` pipelines interrogés le moins récemment (jamais d'abord).
+
+        Les pipelines retenus sont marqués comme interrogés maintenant : le
+        passage suivant commence par les autres.
+        """
+        with self._lock:
+            ordered = sorted(pipeline_ids, key=lambda pid: (self._tried.get(pid, float("-inf")), pid))
+            chosen = ordered[:limit]
+            now = self._clock()
+            for pid in chosen:
+                self._tried[pid] = now
+        return chosen
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tried.clear()
+
+
+_status_cache = PipelineStatusCache()
+
+
+def remember_pipeline_status(pipeline_id: int, status: str | None) -> None:
+    """Alimente le cache de statuts (ex. depuis un webhook GitLab)."""
+    _status_cache.put(int(pipeline_id), status)
+
+
+def map_gitlab_status(gitlab_status: str) -> str | None:
+    """Statut GitLab → statut EcoArch (None si inconnu)."""
+    if gitlab_status in _GITLAB_STATUS_MAP:
+        return _GITLAB_STATUS_MAP[gitlab_status]
+    if gitlab_status in _GITLAB_RUNNING_STATUSES:
+        return "RUNNING"
+    logger.info("Statut GitLab inconnu: %s", gitlab_status)
+    return None
+
+
 def check_pipeline_status(pipeline_id: int | str) -> str | None:
     """Interroge l'API GitLab pour récupérer le statut d'un pipeline.
 
@@ -190,33 +416,213 @@ def check_pipeline_status(pipeline_id: int | str) -> str | None:
     if not api_token or not project_id:
         return None
 
+    cached = _status_cache.get(int(pipeline_id))
+    if cached is not None:
+        return cached or None
+
     url = f"https://gitlab.com/api/v4/projects/{project_id}/pipelines/{pipeline_id}"
     headers = {"PRIVATE-TOKEN": api_token}
 
     try:
-        resp = requests.get(url, headers=headers, timeout=10)
-        if resp.status_code != 200:
-            logger.warning(
-                "GitLab API %s pour pipeline %s: %s",
-                resp.status_code, pipeline_id, resp.text[:200],
-            )
-            return None
+        resp = http_client.get(url, headers=headers, timeout=10)
+        return _pipeline_status_result(pipeline_id, resp)
 
-        gitlab_status = resp.json().get("status", "")
+    except Exception as exc:
+        logger.warning("Erreur polling pipeline %s: %s", pipeline_id, exc)
+        return None
 
-        if gitlab_status in _GITLAB_STATUS_MAP:
-            return _GITLAB_STATUS_MAP[gitlab_status]
-        if gitlab_status in _GITLAB_RUNNING_STATUSES:
-            return "RUNNING"
 
-        logger.info("Statut GitLab inconnu: %s", gitlab_status)
+async def check_pipeline_status_async(pipeline_id: int | str) -> str | None:
+    """Variante asynchrone de ``check_pipeline_status``."""
+    if not Config.GITLAB_API_TOKEN or not Config.GITLAB_PROJECT_ID:
         return None
 
-    except Exception as exc:
+    cached = _status_cache.get(int(pipeline_id))
+    if cached is not None:
+        return cached or None
+
+    try:
+        resp = await get_async_client().get_pipeline(int(pipeline_id))
+        return _pipeline_status_result(pipeline_id, resp)
+
+    except Exception as exc:  # noqa: BLE001 — polling best-effort : statut inconnu, relu au passage suivant
         logger.warning("Erreur polling pipeline %s: %s", pipeline_id, exc)
         return None
 
 
+def _pipeline_status_result(pipeline_id: int | str, resp: Any) -> str | None:
+    """Statut d'une réponse ``GET /pipelines/:id`` (mis en cache)."""
+    if resp.status_code != 200:
+        logger.warning(
+            "GitLab API %s pour pipeline %s: %s",
+            resp.status_code, pipeline_id, resp.text[:200],
+        )
+        return None
+
+    status = map_gitlab_status(resp.json().get("status", ""))
+    _status_cache.put(int(pipeline_id), status)
+    return status
+
+
+def _split_cached(pipeline_ids: Iterable[int]) -> tuple[dict[int, str], set[int]]:
+    """Sépare les statuts servis par le cache des pipelines à interroger."""
+    statuses: dict[int, str] = {}
+    missing: set[int] = set()
+    for pid in {int(p) for p in pipeline_ids}:
+        cached = _status_cache.get(pid)
+        if cached is None:
+            missing.add(pid)
+        elif cached:
+            statuses[pid] = cached
+    return statuses, missing
+
+
+def _list_params(updated_after: str | None) -> dict[str, Any]:
+    params: dict[str, Any] = {
+        "order_by": "updated_at",
+        "sort": "desc",
+        "per_page": _PIPELINES_PER_PAGE,
+    }
+    if updated_after:
+        params["updated_after"] = updated_after
+    return params
+
+
+def _absorb_pipeline_page(
+    pipelines: list[dict[str, Any]],
+    missing: set[int],
+    statuses: dict[int, str],
+) -> None:
+    """Met en cache tous les pipelines d'une page et résout les manquants."""
+    for pipeline in pipelines:
+        pid = pipeline.get("id")
+        if pid is None:
+            continue
+        status = map_gitlab_status(pipeline.get("status", ""))
+        _status_cache.put(pid, status)
+        if pid in missing:
+            missing.discard(pid)
+            if status:
+                statuses[pid] = status
+
+
+def _direct_lookups(missing: set[int]) -> list[int]:
+    """Pipelines à interroger individuellement lors de ce passage.
+
+    Au plus ``_MAX_DIRECT_LOOKUPS``, interrogés le moins récemment d'abord :
+    les autres passent aux passages suivants, même si les premiers restent
+    introuvables.
+    """
+    if len(missing) > _MAX_DIRECT_LOOKUPS:
+        logger.info(
+            "%d pipeline(s) hors liste : %d interrogé(s), les autres au prochain passage",
+            len(missing), _MAX_DIRECT_LOOKUPS,
+        )
+    return _status_cache.least_recently_tried(missing, _MAX_DIRECT_LOOKUPS)
+
+
+def _absorb_direct_results(
+    pipeline_ids: list[int],
+    results: Iterable[str | None],
+    statuses: dict[int, str],
+) -> None:
+    """Reporte les statuts obtenus un par un (entrée négative si inconnu)."""
+    for pid, status in zip(pipeline_ids, results):
+        if status:
+            statuses[pid] = status
+        else:
+            _status_cache.put(pid, None)
+
+
+def fetch_pipeline_statuses(
+    pipeline_ids: Iterable[int],
+    updated_after: str | None = None,
+) -> dict[int, str]:
+    """Résout le statut de plusieurs pipelines en quelques requêtes.
+
+    1. Les statuts encore valides sont servis par le cache TTL ;
+    2. les autres sont cherchés dans la liste des pipelines du projet
+       (``GET /pipelines?updated_after=…``, triée par mise à jour, paginée) ;
+       tous les pipelines vus alimentent le cache ;
+    3. les éventuels restants (hors fenêtre) sont interrogés un par un, en
+       parallèle et au plus ``_MAX_DIRECT_LOOKUPS`` par appel.
+
+    Args:
+        pipeline_ids: Pipelines suivis.
+        updated_after: Borne ISO 8601 de la liste (ex. création du plus
+            ancien audit en attente).
+
+    Returns:
+        pipeline_id → statut EcoArch (les pipelines sans statut sont omis).
+    """
+    api_token = Config.GITLAB_API_TOKEN
+    project_id = Config.GITLAB_PROJECT_ID
+    if not api_token or not project_id:
+        return {}
+
+    statuses, missing = _split_cached(pipeline_ids)
+    if not missing:
+        return statuses
+
+    url = f"https://gitlab.com/api/v4/projects/{project_id}/pipelines"
+    headers = {"PRIVATE-TOKEN": api_token}
+    params = _list_params(updated_after)
+
+    try:
+        for page in range(1, _MAX_PIPELINE_PAGES + 1):
+            resp = http_client.get(url, headers=headers, params={**params, "page": page}, timeout=10)
+            if resp.status_code != 200:
+                logger.warning("GitLab API %s (liste pipelines): %s", resp.status_code, resp.text[:200])
+                break
+            _absorb_pipeline_page(resp.json(), missing, statuses)
+            if not missing or not resp.headers.get("X-Next-Page"):
+                break
+    except Exception as exc:  # noqa: BLE001 — liste best-effort : les pipelines manquants passent en lecture directe
+        logger.warning("Erreur liste pipelines: %s", exc)
+
+    remaining = _direct_lookups(missing)
+    if remaining:
+        with ThreadPoolExecutor(max_workers=len(remaining), thread_name_prefix="pipeline-status") as pool:
+            _absorb_direct_results(remaining, pool.map(check_pipeline_status, remaining), statuses)
+    return statuses
+
+
+async def fetch_pipeline_statuses_async(
+    pipeline_ids: Iterable[int],
+    updated_after: str | None = None,
+) -> dict[int, str]:
+    """Variante asynchrone de ``fetch_pipeline_statuses`` (même cache).
+
+    Les pipelines hors de la liste sont interrogés en parallèle (même plafond
+    par appel).
+    """
+    if not Config.GITLAB_API_TOKEN or not Config.GITLAB_PROJECT_ID:
+        return {}
+
+    statuses, missing = _split_cached(pipeline_ids)
+    if not missing:
+        return statuses
+
+    client = get_async_client()
+    params = _list_params(updated_after)
+    try:
+        for page in range(1, _MAX_PIPELINE_PAGES + 1):
+            resp = await client.list_pipelines(**params, page=page)
+            if resp.status_code != 200:
+                logger.warning("GitLab API %s (liste pipelines): %s", resp.status_code, resp.text[:200])
+                break
+            _absorb_pipeline_page(resp.json(), missing, statuses)
+            if not missing or not resp.headers.get("X-Next-Page"):
+                break
+    except Exception as exc:  # noqa: BLE001 — liste best-effort : les pipelines manquants passent en lecture directe
+        logger.warning("Erreur liste pipelines: %s", exc)
+
+    remaining = _direct_lookups(missing)
+    results = await asyncio.gather(*(check_pipeline_status_async(pid) for pid in remaining))
+    _absorb_direct_results(remaining, results, statuses)
+    return statuses
+
+
 def extract_pipeline_id(pipeline_url: str) -> int | None:
     """Extrait le pipeline_id depuis une URL GitLab.
 
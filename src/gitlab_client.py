@@ -0,0 +1,152 @@
+"""Client GitLab asynchrone (httpx) pour la boucle d'événements Reflex.
+
+Les appels bloquants de ``src.deployer`` (``requests``) restent utilisés
+par les threads (worker de la file, CLI). Côté UI, les tâches background
+passent par ce client pour ne jamais bloquer la boucle asyncio ni garder
+le verrou d'état pendant un aller-retour réseau :
+
+- un ``httpx.AsyncClient`` par boucle d'événements (pool de connexions
+  keep-alive borné, timeouts connexion / lecture séparés) ;
+- règles de retry partagées avec ``src.http_client`` (``RetryState``) : backoff exponentiel +
+  jitter sur 429 / 5xx, ``Retry-After`` respecté, POST rejoué seulement
+  si GitLab n'a rien traité ;
+- circuit breaker par hôte partagé avec le client synchrone.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import weakref
+from collections.abc import Awaitable, Callable
+from typing import Any
+from urllib.parse import urlparse
+
+import httpx
+
+from src import http_client
+from src.config import Config
+from src.http_client import RetryState
+
+logger = logging.getLogger(__name__)
+
+GITLAB_API_URL = "https://gitlab.com/api/v4"
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+
+
+class AsyncGitLabClient:
+    """Accès asynchrone à l'API GitLab du projet configuré.
+
+    Args:
+        base_url: Racine de l'API v4.
+        timeout: Timeouts httpx (connexion, lecture…).
+        max_connections: Connexions simultanées max du pool.
+        max_retries: Nouvelles tentatives après le premier essai.
+        backoff: Délai de base du backoff exponentiel (secondes).
+        max_backoff: Plafond d'attente entre deux tentatives.
+        transport: Transport httpx (tests).
+    """
+
+    def __init__(
+        self,
+        base_url: str = GITLAB_API_URL,
+        timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+        max_connections: int = 10,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 10.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._sleep = sleep
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def _project_url(self, path: str) -> str:
+        return f"{self.base_url}/projects/{Config.GITLAB_PROJECT_ID}/{path.lstrip('/')}"
+
+    @staticmethod
+    def _auth_headers(extra: dict[str, str] | None = None) -> dict[str, str]:
+        return {"PRIVATE-TOKEN": Config.GITLAB_API_TOKEN, **(extra or {})}
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Envoie une requête ; lève les exceptions httpx ou ``CircuitOpenError``."""
+        method = method.upper()
+        host = urlparse(url).hostname or ""
+        breaker = http_client.get_client().breaker(host)
+        retry = RetryState(method, breaker, self.max_retries, self.backoff, self.max_backoff)
+
+        while True:
+            breaker.before_call(host)
+            try:
+                response = await self._client.request(method, url, **kwargs)
+            except httpx.TransportError as exc:
+                # Un POST n'est rejoué que si la connexion n'a jamais abouti
+                delay = retry.after_error(
+                    replayable=isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout))
+                )
+                if delay is None:
+                    raise
+                logger.warning("%s %s: %s – nouvel essai dans %.1fs", method, host, exc, delay)
+            except BaseException:
+                # Annulation de la tâche, erreur locale : l'appel d'essai est libéré
+                breaker.release_probe()
+                raise
+            else:
+                delay = retry.after_response(response.status_code, response.headers)
+                if delay is None:
+                    return response
+                logger.warning(
+                    "%s %s: HTTP %s – nouvel essai dans %.1fs",
+                    method, host, response.status_code, delay,
+                )
+            await self._sleep(delay)
+
+    # ── Endpoints ──────────────────────────────────────────────────
+
+    async def get_pipeline(self, pipeline_id: int) -> httpx.Response:
+        return await self.request("GET", self._project_url(f"pipelines/{pipeline_id}"), headers=self._auth_headers())
+
+    async def list_pipelines(self, **params: Any) -> httpx.Response:
+        return await self.request("GET", self._project_url("pipelines"), headers=self._auth_headers(), params=params)
+
+    async def pipeline_jobs(self, pipeline_id: int, per_page: int = 100) -> httpx.Response:
+        return await self.request(
+            "GET", self._project_url(f"pipelines/{pipeline_id}/jobs"),
+            headers=self._auth_headers(), params={"per_page": per_page},
+        )
+
+    async def job_trace(self, job_id: int, offset: int = 0) -> httpx.Response:
+        """Trace du job à partir de ``offset`` (``Range: bytes=<offset>-``)."""
+        return await self.request(
+            "GET", self._project_url(f"jobs/{job_id}/trace"),
+            headers=self._auth_headers({"Range": f"bytes={offset}-"}),
+        )
+
+
+# ── Client partagé (un par boucle d'événements) ──────────────────
+
+_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncGitLabClient] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_client() -> AsyncGitLabClient:
+    """Client de la boucle courante (un ``AsyncClient`` ne change pas de boucle)."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = AsyncGitLabClient()
+    return client
+
+
+__all__ = ["DEFAULT_TIMEOUT", "GITLAB_API_URL", "AsyncGitLabClient", "get_async_client"]
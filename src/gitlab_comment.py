@@ -4,20 +4,40 @@ Sécurité :
 - CRIT-5 : Validation whitelist de CI_SERVER_URL pour empêcher SSRF.
 - ARCH-4 : Utilisation de logging au lieu de print().
 - ARCH-5 : Import corrigé (src.parser au lieu de parser).
+
+Upsert : le commentaire porte un marqueur caché et le hash du rapport.
+Il est retrouvé (cache local du note id, sinon recherche paginée avec
+ETag) puis modifié en place, et seulement si le rapport a changé :
+0 ou 1 appel d'écriture par pipeline au lieu d'une nouvelle note.
 """
+import hashlib
+import json
 import logging
 import os
+import re
+from pathlib import Path
+from typing import Any
 from urllib.parse import urlparse
 
 import requests
 
+from src import http_client
 from src.parser import EcoArchParser
+from src.report_diff import ReportDiff
+from src.report_snapshot import load_report
 
 logger = logging.getLogger(__name__)
 
 REPORT_PATH = "infracost-report.json"
 TIMEOUT_SECONDS = 30
 
+# ── Upsert de la note ─────────────────────────────────────────────
+NOTE_MARKER = "<!-- ecoarch:cost-report -->"
+_HASH_RE = re.compile(r"<!-- ecoarch:hash=([0-9a-f]{64}) -->")
+NOTE_CACHE_PATH = Path(os.getenv("ECOARCH_NOTE_CACHE", ".ecoarch/mr_note.json"))
+_NOTES_PER_PAGE = 100
+_MAX_NOTE_PAGES = 20
+
 # ── CRIT-5 : Whitelist des serveurs GitLab autorisés ──────────────
 _ALLOWED_GITLAB_HOSTS = {
     "gitlab.com",
@@ -53,8 +73,113 @@ def _validate_server_url(url: str) -> bool:
         return False
 
 
+def _report_hash(report: str) -> str:
+    return hashlib.sha256(report.encode("utf-8")).hexdigest()
+
+
+def _render_note(report: str, digest: str) -> str:
+    return f"{NOTE_MARKER}\n<!-- ecoarch:hash={digest} -->\n{report}"
+
+
+def _load_note_cache(key: str) -> dict[str, Any]:
+    try:
+        return json.loads(NOTE_CACHE_PATH.read_text(encoding="utf-8")).get(key) or {}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def _save_note_cache(key: str, entry: dict[str, Any]) -> None:
+    try:
+        cache = json.loads(NOTE_CACHE_PATH.read_text(encoding="utf-8"))
+        if not isinstance(cache, dict):
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+    cache[key] = entry
+    try:
+        NOTE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        NOTE_CACHE_PATH.write_text(json.dumps(cache), encoding="utf-8")
+    except OSError as e:
+        logger.warning("Cache de note non écrit: %s", e)
+
+
+def _find_note(notes_url: str, headers: dict[str, str], etag: str | None) -> tuple[dict | None, str | None, bool]:
+    """Cherche la note EcoArch (plus récentes d'abord, pagination GitLab).
+
+    Returns:
+        (note ou None, ETag de la 1re page, True si 304 — liste inchangée).
+    """
+    first_etag = None
+    for page in range(1, _MAX_NOTE_PAGES + 1):
+        page_headers = dict(headers)
+        if page == 1 and etag:
+            page_headers["If-None-Match"] = etag
+        response = http_client.get(
+            notes_url,
+            headers=page_headers,
+            params={"sort": "desc", "order_by": "updated_at", "per_page": _NOTES_PER_PAGE, "page": page},
+            timeout=TIMEOUT_SECONDS,
+        )
+        if page == 1 and response.status_code == 304:
+            return None, etag, True
+        if response.status_code != 200:
+            logger.error("Erreur API (notes): %s - %s", response.status_code, response.text[:200])
+            return None, first_etag, False
+        if page == 1:
+            first_etag = response.headers.get("ETag")
+        for note in response.json():
+            if not note.get("system") and str(note.get("body", "")).startswith(NOTE_MARKER):
+                return note, first_etag, False
+        if not response.headers.get("X-Next-Page"):
+            break
+    return None, first_etag, False
+
+
+def _upsert_note(notes_url: str, headers: dict[str, str], report: str, cache_key: str) -> None:
+    """Crée ou modifie la note EcoArch, seulement si le rapport a changé."""
+    digest = _report_hash(report)
+    entry = _load_note_cache(cache_key)
+    if entry.get("hash") == digest and entry.get("note_id"):
+        logger.info("Rapport inchangé, note #%s conservée", entry["note_id"])
+        return
+
+    note_id = entry.get("note_id")
+    if note_id is None:
+        note, etag, unchanged = _find_note(notes_url, headers, entry.get("etag"))
+        entry["etag"] = etag
+        if note is not None:
+            note_id = note["id"]
+            match = _HASH_RE.search(str(note.get("body", "")))
+            if match and match.group(1) == digest:
+                _save_note_cache(cache_key, {**entry, "note_id": note_id, "hash": digest})
+                logger.info("Rapport inchangé, note #%s conservée", note_id)
+                return
+        elif unchanged:
+            logger.info("Liste des notes inchangée (304), aucune note EcoArch existante")
+
+    body = {"body": _render_note(report, digest)}
+    if note_id is not None:
+        response = http_client.put(f"{notes_url}/{note_id}", headers=headers, json=body, timeout=TIMEOUT_SECONDS)
+        if response.status_code == 200:
+            _save_note_cache(cache_key, {**entry, "note_id": note_id, "hash": digest})
+            logger.info("Commentaire #%s mis à jour sur la MR", note_id)
+            return
+        if response.status_code != 404:
+            logger.error("Erreur API: %s - %s", response.status_code, response.text[:200])
+            return
+        logger.info("Note #%s supprimée, création d'une nouvelle note", note_id)
+
+    response = http_client.post(notes_url, headers=headers, json=body, timeout=TIMEOUT_SECONDS)
+    if response.status_code == 201:
+        new_id = response.json().get("id")
+        _save_note_cache(cache_key, {"note_id": new_id, "hash": digest, "etag": None})
+        logger.info("Commentaire posté sur la MR (note #%s)", new_id)
+    else:
+        logger.error("Erreur API: %s - %s", response.status_code, response.text[:200])
+
+
 def post_gitlab_comment() -> None:
-    """Poste le rapport Infracost comme commentaire sur la MR GitLab."""
+    """Publie (ou met à jour) le rapport Infracost en commentaire de la MR GitLab."""
     mr_iid = os.getenv("CI_MERGE_REQUEST_IID")
 
     if not mr_iid:
@@ -74,26 +199,22 @@ def post_gitlab_comment() -> None:
         return
 
     # Génération du rapport
-    parser = EcoArchParser(REPORT_PATH)
-    report = parser.generate_markdown_report()
+    parser = load_report(REPORT_PATH)
+    report = parser.generate_markdown_report(breakdown=True)
+
+    # Détail par ressource vs baseline de la branche principale (optionnel)
+    baseline_path = os.getenv("ECOARCH_BASELINE_REPORT", "")
+    if baseline_path and Path(baseline_path).exists():
+        diff = ReportDiff.compute(parser, EcoArchParser(baseline_path, streaming=True))
+        currency = parser.extract_metrics()["currency"]
+        report += "\n\n" + diff.to_markdown(currency)
 
     # Construction de l'URL avec des composants validés
-    url = f"{server_url.rstrip('/')}/api/v4/projects/{project_id}/merge_requests/{mr_iid}/notes"
+    notes_url = f"{server_url.rstrip('/')}/api/v4/projects/{project_id}/merge_requests/{mr_iid}/notes"
     headers = {"PRIVATE-TOKEN": token}
 
     try:
-        response = requests.post(
-            url,
-            headers=headers,
-            json={"body": report},
-            timeout=TIMEOUT_SECONDS,
-        )
-
-        if response.status_code == 201:
-            logger.info("Commentaire posté sur la MR #%s", mr_iid)
-        else:
-            logger.error("Erreur API: %s - %s", response.status_code, response.text[:200])
-
+        _upsert_note(notes_url, headers, report, cache_key=f"{project_id}!{mr_iid}")
     except requests.RequestException as e:
         logger.error("Erreur réseau: %s", e)
 
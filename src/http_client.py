@@ -0,0 +1,276 @@
+"""Transport HTTP partagé : pool de connexions, retries et circuit breaker.
+
+Tous les appels sortants vers GitLab (trigger, statut pipeline, notes de
+MR) passent par ici au lieu de ``requests.post/get`` nus :
+
+- une ``requests.Session`` unique par processus (keep-alive : pas de
+  nouveau handshake TCP+TLS par appel), avec un pool borné par hôte ;
+- retry avec backoff exponentiel + jitter sur 429 / 5xx et erreurs de
+  connexion, en respectant l'en-tête ``Retry-After`` ;
+- un circuit breaker par hôte : après N échecs consécutifs, les appels
+  échouent immédiatement (``CircuitOpenError``) pendant ``reset_timeout``
+  au lieu d'attendre chacun leur timeout, puis un appel d'essai est tenté.
+
+Les méthodes non idempotentes (POST) ne sont rejouées que lorsque le
+serveur n'a assurément rien traité (429, 503, échec de connexion).
+"""
+from __future__ import annotations
+
+import email.utils
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable, Mapping
+from typing import Any
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_SAFE_RETRY_STATUSES = frozenset({429, 503})
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Appel refusé sans tentative : le circuit de l'hôte est ouvert."""
+
+    def __init__(self, host: str, retry_in: float):
+        self.host = host
+        self.retry_in = retry_in
+        super().__init__(f"Circuit ouvert pour {host} (nouvel essai dans {retry_in:.0f}s)")
+
+
+class CircuitBreaker:
+    """Circuit breaker d'un hôte (fermé → ouvert → semi-ouvert)."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def before_call(self, host: str) -> None:
+        """Lève ``CircuitOpenError`` si l'appel doit échouer immédiatement."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self._opened_at + self.reset_timeout - self._clock()
+            if remaining > 0 or self._probe_in_flight:
+                raise CircuitOpenError(host, max(remaining, 0.0))
+            # Semi-ouvert : un seul appel d'essai à la fois
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+
+    def release_probe(self) -> None:
+        """Libère l'appel d'essai sans verdict (erreur locale, annulation)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+
+def retry_after_seconds(headers: Mapping[str, str]) -> float | None:
+    """Délai demandé par ``Retry-After`` (secondes ou date HTTP)."""
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(when.timestamp() - time.time(), 0.0)
+
+
+class RetryState:
+    """Décisions de retry d'une requête, communes aux clients ``requests`` et ``httpx``.
+
+    Tient le compte des tentatives, informe le circuit breaker du résultat
+    de chacune et retourne le délai avant la suivante (None : abandon).
+    """
+
+    def __init__(self, method: str, breaker: CircuitBreaker,
+                 max_retries: int, backoff: float, max_backoff: float):
+        self.idempotent = method in _IDEMPOTENT_METHODS
+        self._retry_statuses = _RETRY_STATUSES if self.idempotent else _SAFE_RETRY_STATUSES
+        self._breaker = breaker
+        self._max_retries = max_retries
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self.attempt = 0
+
+    def _next_delay(self, retry_after: float | None) -> float:
+        if retry_after is not None:
+            delay = min(retry_after, self._max_backoff)
+        else:
+            base = min(self._backoff * (2 ** self.attempt), self._max_backoff)
+            delay = base * random.uniform(0.5, 1.0)
+        self.attempt += 1
+        return delay
+
+    def after_error(self, replayable: bool) -> float | None:
+        """Échec réseau ; ``replayable`` : la requête peut être renvoyée sans risque."""
+        self._breaker.record_failure()
+        if self.attempt >= self._max_retries or not (self.idempotent or replayable):
+            return None
+        return self._next_delay(None)
+
+    def after_response(self, status: int, headers: Mapping[str, str]) -> float | None:
+        """Réponse reçue ; None si elle doit être retournée telle quelle."""
+        if status >= 500:
+            self._breaker.record_failure()
+        else:
+            self._breaker.record_success()
+        if status not in self._retry_statuses or self.attempt >= self._max_retries:
+            return None
+        return self._next_delay(retry_after_seconds(headers))
+
+
+class HttpClient:
+    """Client HTTP poolé avec retries et circuit breaker par hôte.
+
+    Args:
+        max_retries: Nombre de nouvelles tentatives après le premier essai.
+        backoff: Délai de base du backoff exponentiel (secondes).
+        max_backoff: Plafond d'attente entre deux tentatives (Retry-After inclus).
+        pool_maxsize: Connexions simultanées max par hôte.
+        failure_threshold: Échecs consécutifs avant ouverture du circuit.
+        reset_timeout: Durée d'ouverture du circuit avant un appel d'essai.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 10.0,
+        pool_maxsize: int = 10,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._sleep = sleep
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_maxsize, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._breakers_lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self._breakers[host] = breaker
+            return breaker
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Envoie une requête ; mêmes arguments et exceptions que ``requests``."""
+        method = method.upper()
+        host = urlparse(url).hostname or ""
+        breaker = self.breaker(host)
+        retry = RetryState(method, breaker, self.max_retries, self.backoff, self.max_backoff)
+
+        while True:
+            breaker.before_call(host)
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                # Un POST n'est rejoué que si la connexion n'a jamais abouti
+                delay = retry.after_error(replayable=isinstance(exc, requests.ConnectTimeout))
+                if delay is None:
+                    raise
+                logger.warning("%s %s: %s – nouvel essai dans %.1fs", method, host, exc, delay)
+            except BaseException:
+                breaker.release_probe()
+                raise
+            else:
+                delay = retry.after_response(response.status_code, response.headers)
+                if delay is None:
+                    return response
+                response.close()
+                logger.warning(
+                    "%s %s: HTTP %s – nouvel essai dans %.1fs",
+                    method, host, response.status_code, delay,
+                )
+            self._sleep(delay)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("PUT", url, **kwargs)
+
+
+# ── Client partagé du processus ───────────────────────────────────
+
+_client: HttpClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """Client partagé (créé au premier appel)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    return get_client().get(url, **kwargs)
+
+
+def post(url: str, **kwargs: Any) -> requests.Response:
+    return get_client().post(url, **kwargs)
+
+
+def put(url: str, **kwargs: Any) -> requests.Response:
+    return get_client().put(url, **kwargs)
+
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "HttpClient",
+    "RetryState",
+    "get",
+    "get_client",
+    "post",
+    "put",
+    "retry_after_seconds",
+]
@@ -0,0 +1,241 @@
+"""Tokenizer JSON incrémental pour les gros rapports (Infracost, terraform plan).
+
+Lit le fichier par blocs et expose une navigation « à la demande » :
+on descend dans les objets/tableaux qui nous intéressent, on saute les
+autres token par token, et on ne décode en Python que les valeurs ciblées
+(via ``json.JSONDecoder.raw_decode``, donc à vitesse C).
+
+La mémoire reste bornée par la taille du bloc de lecture + la plus grosse
+valeur réellement décodée, quelle que soit la taille du fichier.
+
+Le flux est décodé en latin-1 : un caractère == un octet, ce qui donne des
+offsets absolus directement utilisables avec ``seek()``. Les caractères
+structurels JSON sont ASCII et les octets UTF-8 multi-octets sont tous
+≥ 0x80, donc la structure est préservée ; les chaînes non-ASCII sont
+re-décodées proprement en UTF-8 à la volée.
+"""
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Iterator
+from typing import Any, BinaryIO
+
+_DEFAULT_CHUNK_SIZE = 1 << 16
+
+_WS = re.compile(r"[ \t\n\r]*")
+_SCALAR = re.compile(r"[^ \t\n\r{}\[\]:,\"]+")
+_STRUCTURAL = frozenset("{}[]:,")
+
+_decoder = json.JSONDecoder()
+
+
+class JsonStreamError(ValueError):
+    """JSON malformé ou tronqué détecté pendant la lecture incrémentale."""
+
+
+class JsonTokenizer:
+    """Curseur incrémental sur un flux JSON binaire (UTF-8).
+
+    Args:
+        fp: Fichier ouvert en mode binaire.
+        chunk_size: Taille des blocs lus à chaque remplissage du buffer.
+    """
+
+    def __init__(self, fp: BinaryIO, chunk_size: int | None = None):
+        self._fp = fp
+        self._chunk_size = chunk_size or _DEFAULT_CHUNK_SIZE
+        self._buf = ""
+        self._pos = 0          # index dans _buf
+        self._base = 0         # offset absolu de _buf[0]
+        self._eof = False
+        self.last_span: tuple[int, int] = (0, 0)
+
+    # ── Buffer ────────────────────────────────────────────────────
+
+    @property
+    def offset(self) -> int:
+        """Offset absolu (octets) du prochain caractère non lu."""
+        return self._base + self._pos
+
+    def _fill(self, min_size: int = 0) -> bool:
+        """Ajoute un bloc au buffer en jetant la partie déjà consommée."""
+        if self._eof:
+            return False
+        chunk = self._fp.read(max(self._chunk_size, min_size))
+        if not chunk:
+            self._eof = True
+            return False
+        if self._pos:
+            self._base += self._pos
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        self._buf += chunk.decode("latin-1")
+        return True
+
+    def _skip_ws(self) -> None:
+        while True:
+            self._pos = _WS.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf) or not self._fill():
+                return
+
+    def peek(self) -> str:
+        """Retourne le prochain caractère significatif ('' en fin de flux)."""
+        self._skip_ws()
+        return self._buf[self._pos] if self._pos < len(self._buf) else ""
+
+    # ── Tokens ────────────────────────────────────────────────────
+
+    def expect(self, char: str) -> None:
+        """Consomme un caractère structurel attendu."""
+        found = self.peek()
+        if found != char:
+            raise JsonStreamError(
+                f"'{char}' attendu à l'offset {self.offset}, trouvé {found!r}"
+            )
+        self._pos += 1
+
+    def read_value(self) -> Any:
+        """Décode entièrement la valeur suivante (objet, tableau ou scalaire).
+
+        ``last_span`` reçoit ses offsets absolus ``(début, fin)``.
+        """
+        self._skip_ws()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as exc:
+                # Valeur coupée par la fin du buffer : on relit plus large
+                if self._fill(min_size=len(self._buf)):
+                    continue
+                raise JsonStreamError(f"JSON invalide à l'offset {self.offset}: {exc}") from exc
+            # Un nombre en fin de buffer peut être tronqué ("12" de "123")
+            if end == len(self._buf) and not self._eof and self._fill():
+                continue
+            break
+
+        start = self._pos
+        raw = self._buf[start:end]
+        if not raw.isascii():
+            value = json.loads(raw.encode("latin-1"))
+        self.last_span = (self._base + start, self._base + end)
+        self._pos = end
+        return value
+
+    def _next_atom(self) -> str:
+        """Consomme un token (structurel, chaîne ou scalaire) sans le décoder."""
+        char = self.peek()
+        if not char:
+            raise JsonStreamError("Fin de flux inattendue")
+        if char in _STRUCTURAL:
+            self._pos += 1
+            return char
+        if char == '"':
+            while True:
+                end = self._string_end(self._pos + 1)
+                if end is not None:
+                    self._pos = end
+                    return '"'
+                if not self._fill(min_size=len(self._buf)):
+                    raise JsonStreamError("Chaîne non terminée")
+        while True:
+            match = _SCALAR.match(self._buf, self._pos)
+            if match is None:
+                raise JsonStreamError(f"Token invalide à l'offset {self.offset}")
+            if match.end() < len(self._buf) or not self._fill():
+                self._pos = match.end()
+                return "s"
+
+    def _string_end(self, pos: int) -> int | None:
+        """Index juste après le guillemet fermant, ou None si hors buffer."""
+        buf = self._buf
+        while True:
+            quote = buf.find('"', pos)
+            if quote < 0:
+                return None
+            backslashes = 0
+            i = quote - 1
+            while buf[i] == "\\":
+                backslashes += 1
+                i -= 1
+            if backslashes % 2 == 0:
+                return quote + 1
+            pos = quote + 1
+
+    def skip_value(self) -> None:
+        """Saute la valeur suivante token par token (mémoire constante)."""
+        self._skip_ws()
+        start = self.offset
+        depth = 0
+        while True:
+            atom = self._next_atom()
+            if atom in "{[":
+                depth += 1
+            elif atom in "}]":
+                depth -= 1
+            elif atom in ":,":
+                if depth == 0:
+                    raise JsonStreamError(f"Valeur attendue à l'offset {start}")
+                continue
+            if depth == 0:
+                break
+        self.last_span = (start, self.offset)
+
+    # ── Navigation ────────────────────────────────────────────────
+
+    def iter_object(self) -> Iterator[str]:
+        """Itère sur les clés de l'objet suivant.
+
+        L'appelant DOIT consommer la valeur (``read_value`` / ``skip_value``
+        / itération imbriquée) avant de demander la clé suivante.
+        Un ``null`` à la place de l'objet est traité comme un objet vide.
+        """
+        if self.peek() == "n":
+            self.read_value()
+            return
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            if not isinstance(key, str):
+                raise JsonStreamError(f"Clé non-string à l'offset {self.last_span[0]}")
+            self.expect(":")
+            yield key
+            sep = self.peek()
+            self._pos += 1
+            if sep == "}":
+                return
+            if sep != ",":
+                raise JsonStreamError(f"',' ou '}}' attendu à l'offset {self.offset - 1}")
+
+    def iter_array(self) -> Iterator[int]:
+        """Itère sur les index du tableau suivant (même contrat que ``iter_object``)."""
+        if self.peek() == "n":
+            self.read_value()
+            return
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            sep = self.peek()
+            self._pos += 1
+            if sep == "]":
+                return
+            if sep != ",":
+                raise JsonStreamError(f"',' ou ']' attendu à l'offset {self.offset - 1}")
+
+    def read_scalar_or_skip(self) -> Any:
+        """Décode un scalaire ; saute objets et tableaux (retourne None)."""
+        if self.peek() in ("{", "["):
+            self.skip_value()
+            return None
+        return self.read_value()
+
+
+__all__ = ["JsonStreamError", "JsonTokenizer"]
@@ -1,21 +1,90 @@
-"""Parser pour les rapports Infracost JSON."""
+"""Parser pour les rapports Infracost JSON.
+
+Deux modes :
+- classique : ``json.load`` du rapport complet puis liste plate des ressources ;
+- streaming (``streaming=True``) : lecture incrémentale via ``JsonTokenizer``,
+  projets et ressources itérés paresseusement, mémoire ~constante quelle que
+  soit la taille du rapport (monorepos multi-projets de plusieurs centaines de Mo).
+"""
 import json
 import logging
 import os
+from collections.abc import Iterator
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
 from typing import Any
 
+from src.json_stream import JsonStreamError, JsonTokenizer
+from src.report_index import (
+    ComponentLine,
+    ReportIndex,
+    default_project_name,
+    explain_resource,
+)
+from src.resource_table import ResourceRows, ResourceTable, ResourceTableBuilder
+
 logger = logging.getLogger(__name__)
 
+# Champs scalaires racine conservés en mode streaming (extract_metrics)
+_ROOT_SCALAR_KEYS = ("currency", "totalMonthlyCost", "pastTotalMonthlyCost", "diffTotalMonthlyCost")
+
+# Ressources détaillées dans le bloc « Pourquoi ces coûts ? » (et dans le snapshot)
+_BREAKDOWN_TOP = 3
+
 
 class EcoArchParser:
     """Parse et analyse les rapports de coûts Infracost."""
     
-    def __init__(self, json_path: str):
+    def __init__(self, json_path: str, streaming: bool = False):
         self.json_path = Path(json_path)
-        self.data = self._load_data()
-        self.resources = self._flatten_resources()
+        self.streaming = streaming
+        self._stream_scanned = False
+        self._table: ResourceTable | None = None
+        self._index: ReportIndex | None = None
+        self._explanations: dict[tuple[str, str], list[ComponentLine]] = {}
+        self._labels: dict[int, dict] = {}
+        if streaming:
+            # Rien n'est chargé : seuls les scalaires racine seront
+            # mémorisés lors du premier passage de iter_resources().
+            self.data: dict = {}
+        else:
+            self.data = self._load_data()
+            self._table = self._flatten_resources()
     
+    @classmethod
+    def from_table(
+        cls,
+        json_path: str,
+        data: dict,
+        table: ResourceTable,
+        labels: dict[int, dict] | None = None,
+        explanations: dict[tuple[str, str], list[ComponentLine]] | None = None,
+    ) -> "EcoArchParser":
+        """Reconstruit un parser sans relire le JSON (cf. ``report_snapshot``).
+
+        Args:
+            json_path: Rapport d'origine (toujours utilisé pour ``index``).
+            data: Scalaires racine (``currency``, ``totalMonthlyCost``...).
+            table: Table colonnaire des ressources.
+            labels: Labels des ressources, par index de ligne.
+            explanations: Composants de coût déjà calculés, par (projet, adresse) :
+                ``explain`` n'a alors pas besoin de l'index du rapport.
+        """
+        parser = cls.__new__(cls)
+        parser.json_path = Path(json_path)
+        parser.streaming = False
+        parser._stream_scanned = True
+        parser._index = None
+        parser._explanations = {}
+        for (project, address), lines in (explanations or {}).items():
+            parser._explanations.setdefault((project, address), lines)
+            parser._explanations.setdefault(("", address), lines)
+        parser._table = table
+        parser._labels = dict(labels or {})
+        parser.data = dict(data)
+        return parser
+
     def _load_data(self) -> dict:
         """Charge le fichier JSON ou retourne un dict vide."""
         if not self.json_path.exists():
@@ -39,24 +108,178 @@ class EcoArchParser:
         except (ValueError, TypeError):
             return 0.0
     
-    def _flatten_resources(self) -> list[dict]:
-        """Extrait une liste plate des ressources depuis tous les projets."""
-        resources = []
-        
-        for project in self.data.get("projects") or []:
+    def _flatten_resources(self) -> ResourceTable:
+        """Remplit la table des ressources de tous les projets depuis ``self.data``.
+
+        Les colonnes sont alimentées directement (pas de dict par ligne) ;
+        seuls les labels non vides sont gardés à part, par index de ligne.
+        """
+        builder = ResourceTableBuilder()
+        for index, project in enumerate(self.data.get("projects") or []):
             breakdown = project.get("breakdown") or {}
+            project_name = str(project.get("name") or default_project_name(index))
             for res in breakdown.get("resources") or []:
-                resources.append({
-                    "name": res.get("name", "Unnamed"),
-                    "type": res.get("resourceType", "Unknown"),
-                    "monthly_cost": self._safe_float(res.get("monthlyCost")),
-                    "delta": self._safe_float(res.get("diffMonthlyCost")),
-                })
-        
-        return resources
-    
+                tags = res.get("tags")
+                if tags:
+                    self._labels[len(builder)] = dict(tags)
+                builder.append(
+                    self._resource_name(res),
+                    str(res.get("resourceType") or "Unknown"),
+                    project_name,
+                    self._safe_float(res.get("monthlyCost")),
+                    self._safe_float(res.get("diffMonthlyCost")),
+                )
+        return builder.build()
+
+    @property
+    def resources(self) -> ResourceRows | list[dict]:
+        """Ressources sous forme de dicts (vue paresseuse sur ``table``).
+
+        Vide en mode streaming : utiliser ``iter_resources``.
+        """
+        if self.streaming:
+            return []
+        return ResourceRows(self.table, self._labels)
+
+    @property
+    def labels(self) -> dict[int, dict]:
+        """Labels non vides des ressources, par index de ligne (mode classique)."""
+        return self._labels
+
+    @staticmethod
+    def _resource_name(res: dict) -> str:
+        """Adresse de la ressource, identique dans les deux modes (null → "Unnamed")."""
+        return str(res.get("name") or "Unnamed")
+
+    @classmethod
+    def _resource_row(cls, res: dict, project_name: str) -> dict:
+        """Normalise une ressource Infracost brute en ligne plate."""
+        return {
+            "name": cls._resource_name(res),
+            "type": str(res.get("resourceType") or "Unknown"),
+            "project": project_name or "",
+            "monthly_cost": cls._safe_float(res.get("monthlyCost")),
+            "delta": cls._safe_float(res.get("diffMonthlyCost")),
+            "labels": dict(res.get("tags") or {}),
+        }
+
+    # ── Mode streaming ────────────────────────────────────────────
+
+    def iter_resources(self) -> Iterator[dict]:
+        """Itère paresseusement sur les ressources de tous les projets.
+
+        En mode classique, parcourt la vue ``self.resources``. En mode
+        streaming, relit le fichier de façon incrémentale : seules les
+        ressources (une à la fois) et les scalaires racine sont décodés.
+        """
+        if not self.streaming:
+            yield from self.resources
+            return
+
+        if not self.json_path.exists():
+            logger.error("Fichier introuvable: %s", self.json_path)
+            self._stream_scanned = True
+            return
+
+        root: dict[str, Any] = {}
+        try:
+            with open(self.json_path, "rb") as fp:
+                tok = JsonTokenizer(fp)
+                for key in tok.iter_object():
+                    if key == "projects":
+                        yield from self._stream_projects(tok)
+                    elif key in _ROOT_SCALAR_KEYS:
+                        root[key] = tok.read_scalar_or_skip()
+                    else:
+                        tok.skip_value()
+        except JsonStreamError as e:
+            logger.error("JSON malformé: %s", e)
+        self.data = root
+        self._stream_scanned = True
+
+    def _stream_projects(self, tok: JsonTokenizer) -> Iterator[dict]:
+        """Parcourt ``projects[*].breakdown.resources[*]`` sans rien matérialiser."""
+        for index in tok.iter_array():
+            # Infracost écrit "name" avant "breakdown" ; sinon on nomme par index.
+            project_name = default_project_name(index)
+            for key in tok.iter_object():
+                if key == "name":
+                    name = tok.read_scalar_or_skip()
+                    if name:
+                        project_name = str(name)
+                elif key == "breakdown":
+                    for bkey in tok.iter_object():
+                        if bkey != "resources":
+                            tok.skip_value()
+                            continue
+                        for _ in tok.iter_array():
+                            res = tok.read_value()
+                            if isinstance(res, dict):
+                                yield self._resource_row(res, project_name)
+                else:
+                    tok.skip_value()
+
+    def iter_projects(self) -> Iterator[tuple[str, Iterator[dict]]]:
+        """Itère paresseusement sur (nom du projet, ressources du projet).
+
+        Même contrat que ``itertools.groupby`` : chaque itérateur de
+        ressources doit être consommé avant de passer au projet suivant.
+        Les projets sans ressource n'apparaissent pas.
+        """
+        yield from groupby(self.iter_resources(), key=itemgetter("project"))
+
+    @property
+    def table(self) -> ResourceTable:
+        """Table colonnaire des ressources (construite une seule fois).
+
+        En mode streaming, elle est alimentée directement par le flux :
+        les dicts intermédiaires ne sont jamais conservés.
+        """
+        if self._table is None:
+            self._table = ResourceTable.from_rows(self.iter_resources())
+        return self._table
+
+    @property
+    def index(self) -> ReportIndex:
+        """Index hiérarchique (offsets) pour le drill-down des coûts.
+
+        Construit une seule fois ; les subresources / costComponents ne sont
+        décodés qu'à la demande (``explain``), sans relire tout le rapport.
+        """
+        if self._index is None:
+            self._index = ReportIndex(self.json_path)
+        return self._index
+
+    def explain(self, address: str, project: str = "") -> list[ComponentLine]:
+        """Composants de coût d'une ressource (cf. ``ReportIndex.explain``).
+
+        En mode classique, le rapport est déjà en mémoire : la ressource y est
+        lue directement, sans construire l'index du fichier ; depuis un
+        snapshot, les ressources les plus chères y sont déjà expliquées.
+        """
+        cached = self._explanations.get((project, address))
+        if cached is not None:
+            return cached
+        if self.data.get("projects") is not None:
+            resource = self._find_resource(address, project)
+            return explain_resource(resource) if resource is not None else []
+        return self.index.explain(address, project)
+
+    def _find_resource(self, address: str, project: str = "") -> dict | None:
+        """Ressource brute (dict) de ``self.data`` par adresse et projet."""
+        for p_idx, proj in enumerate(self.data.get("projects") or []):
+            if project and str(proj.get("name") or default_project_name(p_idx)) != project:
+                continue
+            for res in (proj.get("breakdown") or {}).get("resources") or []:
+                if isinstance(res, dict) and self._resource_name(res) == address:
+                    return res
+        return None
+
     def extract_metrics(self) -> dict[str, Any]:
         """Extrait les métriques principales du rapport."""
+        if self.streaming and not self._stream_scanned:
+            for _ in self.iter_resources():
+                pass
         return {
             "total_monthly_cost": self._safe_float(self.data.get("totalMonthlyCost")),
             "diff_monthly_cost": self._safe_float(self.data.get("diffTotalMonthlyCost")),
@@ -64,42 +287,46 @@ class EcoArchParser:
         }
     
     def save_to_supabase(self) -> None:
-        """Enregistre les métriques dans Supabase (optionnel)."""
-        from supabase import create_client
-        
-        url = os.getenv("SUPABASE_URL")
-        key = os.getenv("SUPABASE_SERVICE_KEY")
-        
-        if not url or not key:
+        """Enregistre les métriques dans Supabase (optionnel, non bloquant).
+
+        L'envoi est délégué au ``CostHistoryWriter`` partagé : insert par
+        lots en arrière-plan, spool local si Supabase est indisponible.
+        """
+        from src.services.cost_history import get_cost_history_writer
+
+        writer = get_cost_history_writer()
+        if writer is None:
             logger.info("Supabase non configuré, sauvegarde ignorée.")
             return
         
-        try:
-            supabase = create_client(url, key)
-            metrics = self.extract_metrics()
-            budget = float(os.getenv("ECOARCH_BUDGET_LIMIT", 100.0))
-            cost = metrics["total_monthly_cost"]
-            
-            record = {
-                "project_id": os.getenv("CI_PROJECT_NAME", "ecoarch-local"),
-                "branch_name": os.getenv("CI_COMMIT_REF_NAME", "local"),
-                "commit_sha": os.getenv("CI_COMMIT_SHORT_SHA", "HEAD"),
-                "author": os.getenv("CI_COMMIT_AUTHOR", "Unknown"),
-                "total_monthly_cost": cost,
-                "diff_monthly_cost": metrics["diff_monthly_cost"],
-                "currency": metrics["currency"],
-                "budget_limit": budget,
-                "status": "PASSED" if cost <= budget else "FAILED",
-            }
-            
-            supabase.table("cost_history").insert(record).execute()
-            logger.info("Supabase: %s", record['status'])
-            
-        except Exception as e:
-            logger.error("Erreur Supabase: %s", e)
+        metrics = self.extract_metrics()
+        budget = float(os.getenv("ECOARCH_BUDGET_LIMIT", 100.0))
+        cost = metrics["total_monthly_cost"]
+        
+        record = {
+            "project_id": os.getenv("CI_PROJECT_NAME", "ecoarch-local"),
+            "branch_name": os.getenv("CI_COMMIT_REF_NAME", "local"),
+            "commit_sha": os.getenv("CI_COMMIT_SHORT_SHA", "HEAD"),
+            "author": os.getenv("CI_COMMIT_AUTHOR", "Unknown"),
+            "total_monthly_cost": cost,
+            "diff_monthly_cost": metrics["diff_monthly_cost"],
+            "currency": metrics["currency"],
+            "budget_limit": budget,
+            "status": "PASSED" if cost <= budget else "FAILED",
+        }
+        
+        writer.add(record)
+        logger.info("Supabase: %s (envoi en file)", record['status'])
     
-    def generate_markdown_report(self) -> str:
-        """Génère un rapport Markdown pour GitLab/GitHub."""
+    def generate_markdown_report(self, breakdown: bool = False) -> str:
+        """Génère un rapport Markdown pour GitLab/GitHub.
+
+        Args:
+            breakdown: Ajoute le bloc « Pourquoi ces coûts ? » (costComponents
+                des ressources les plus chères).
+        """
+        # La table d'abord : en streaming, sa passe alimente aussi les métriques
+        table = self.table
         metrics = self.extract_metrics()
         currency = metrics["currency"]
         total = metrics["total_monthly_cost"]
@@ -117,5 +344,59 @@ class EcoArchParser:
             lines.append(f"**Variation:** 🟢 `{diff:.2f} {currency}` (Économie)")
         else:
             lines.append(f"**Variation:** ➖ `0.00 {currency}` (Stable)")
+
+        # Répartition par type de ressource (top 5, agrégation colonnaire)
+        groups = table.group_by("type")[:5]
+        if groups:
+            lines += [
+                "",
+                "| Type de ressource | Ressources | Coût mensuel | Variation |",
+                "|---|---:|---:|---:|",
+            ]
+            lines += [
+                f"| `{g.key}` | {g.count} | {g.monthly_cost:.2f} {currency} | {g.delta:+.2f} {currency} |"
+                for g in groups
+            ]
+
+        if breakdown:
+            lines += self._markdown_breakdown(table, currency)
         
-        return "\n".join(lines)
\ No newline at end of file
+        return "\n".join(lines)
+
+    def _markdown_breakdown(self, table: ResourceTable, currency: str, n: int = _BREAKDOWN_TOP) -> list[str]:
+        """Bloc repliable : principaux costComponents des ressources les plus chères."""
+        top = table.top(n)
+        section: list[str] = []
+        for i in range(len(top)):
+            row = top.row(i)
+            components = self.explain(row["name"], row["project"])[:n]
+            if not components:
+                continue
+            section.append(f"- `{row['name']}` ({row['monthly_cost']:.2f} {currency})")
+            section += [
+                f"  - {c.name} : {c.monthly_quantity:g} {c.unit} × {c.price:g} "
+                f"= {c.monthly_cost:.2f} {currency}"
+                for c in components
+            ]
+        if not section:
+            return []
+        return ["", "<details><summary>Pourquoi ces coûts ?</summary>", "", *section, "", "</details>"]
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    from src.report_snapshot import load_report
+
+    logging.basicConfig(level=logging.INFO)
+    cli = argparse.ArgumentParser(description="Rapport Markdown d'un rapport Infracost")
+    cli.add_argument("report", nargs="?", default="infracost-report.json")
+    cli.add_argument("--save-history", action="store_true",
+                     help="Enregistre aussi les métriques dans cost_history (spool rejoué)")
+    args = cli.parse_args()
+
+    parser = load_report(args.report)
+    sys.stdout.write(parser.generate_markdown_report() + "\n")
+    if args.save_history:
+        parser.save_to_supabase()
@@ -0,0 +1,171 @@
+"""Pricing direct d'un ``terraform show -json`` (plan.json), sans Infracost.
+
+Le job ``terraform_plan`` produit déjà ``plan.json`` : on le lit en flux
+(``JsonTokenizer``, une ``resource_change`` décodée à la fois), on mappe
+les ressources GCP supportées sur le moteur de pricing fallback
+(``simulation.fallback_cost_components``) et on écrit un rapport au
+format Infracost, directement consommable par ``EcoArchParser``, le
+budget gate et le commentaire de MR. Aucun appel réseau.
+
+Ressources supportées : ``google_compute_instance``,
+``google_sql_database_instance``, ``google_storage_bucket``. Les autres
+types sont ignorés (comptés dans ``metadata.skipped``).
+
+Usage CLI :
+    python -m src.plan_pricing plan.json -o plan-report.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from src.json_stream import JsonStreamError, JsonTokenizer
+from src.simulation import fallback_cost_components
+
+logger = logging.getLogger(__name__)
+
+# Taille du disque de boot GCE quand le plan ne la fixe pas (image Debian)
+_DEFAULT_BOOT_DISK_GB = 10
+
+
+def _first(block: Any) -> dict[str, Any]:
+    """Premier élément d'un bloc imbriqué Terraform (liste d'objets)."""
+    if isinstance(block, list) and block and isinstance(block[0], dict):
+        return block[0]
+    return block if isinstance(block, dict) else {}
+
+
+def _compute(values: dict[str, Any]) -> dict[str, Any]:
+    params = _first(_first(values.get("boot_disk")).get("initialize_params"))
+    return {
+        "type": "compute",
+        "machine_type": values.get("machine_type") or "e2-medium",
+        "disk_size": params.get("size") or _DEFAULT_BOOT_DISK_GB,
+        "disk_type": params.get("type") or "pd-standard",
+    }
+
+
+def _sql(values: dict[str, Any]) -> dict[str, Any]:
+    return {"type": "sql", "db_tier": _first(values.get("settings")).get("tier") or "db-f1-micro"}
+
+
+def _storage(values: dict[str, Any]) -> dict[str, Any]:
+    return {"type": "storage", "storage_class": values.get("storage_class") or "STANDARD"}
+
+
+_MAPPERS: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
+    "google_compute_instance": _compute,
+    "google_sql_database_instance": _sql,
+    "google_storage_bucket": _storage,
+}
+
+
+def _price(resource_type: str, values: Any) -> tuple[float, list[dict[str, Any]]]:
+    """(coût mensuel, costComponents) d'un état ``before`` / ``after``."""
+    if not isinstance(values, dict):
+        return 0.0, []
+    components = fallback_cost_components(_MAPPERS[resource_type](values))
+    return sum(c["monthlyCost"] for c in components), components
+
+
+def _price_change(change: dict[str, Any]) -> tuple[dict[str, Any], float]:
+    """(ressource Infracost, coût avant changement) d'une ``resource_change``."""
+    resource_type = change["type"]
+    delta = change.get("change") or {}
+    past_cost, _ = _price(resource_type, delta.get("before"))
+    after = delta.get("after")
+    cost, components = _price(resource_type, after)
+    resource = {
+        "name": change.get("address", resource_type),
+        "resourceType": resource_type,
+        "monthlyCost": f"{cost:.4f}",
+        "diffMonthlyCost": f"{cost - past_cost:.4f}",
+        "costComponents": [
+            {**c, **{k: f"{c[k]:.4f}" for k in ("monthlyQuantity", "price", "monthlyCost")}}
+            for c in components
+        ],
+    }
+    if isinstance(after, dict) and isinstance(after.get("labels"), dict):
+        resource["tags"] = after["labels"]
+    return resource, past_cost
+
+
+def price_plan(plan_path: str | Path, project_name: str = "plan") -> dict[str, Any]:
+    """Lit un plan Terraform JSON en flux et retourne un rapport Infracost.
+
+    Raises:
+        JsonStreamError: si le plan est malformé.
+    """
+    resources: list[dict[str, Any]] = []
+    skipped = 0
+    total = past_total = 0.0
+
+    with open(plan_path, "rb") as fp:
+        tok = JsonTokenizer(fp)
+        for key in tok.iter_object():
+            if key != "resource_changes":
+                tok.skip_value()
+                continue
+            for _ in tok.iter_array():
+                change = tok.read_value()
+                if (
+                    not isinstance(change, dict)
+                    or change.get("type") not in _MAPPERS
+                    or change.get("mode", "managed") != "managed"
+                ):
+                    skipped += 1
+                    continue
+                resource, past_cost = _price_change(change)
+                past_total += past_cost
+                total += float(resource["monthlyCost"])
+                # Ressource détruite : ne compte que dans le delta
+                if (change.get("change") or {}).get("after") is not None:
+                    resources.append(resource)
+
+    logger.info(
+        "Plan %s : %d ressource(s) valorisée(s), %d ignorée(s), %.2f USD/mois",
+        plan_path, len(resources), skipped, total,
+    )
+    totals = {
+        "totalMonthlyCost": f"{total:.4f}",
+        "pastTotalMonthlyCost": f"{past_total:.4f}",
+        "diffTotalMonthlyCost": f"{total - past_total:.4f}",
+    }
+    return {
+        "version": "0.2",
+        "currency": "USD",
+        "projects": [{
+            "name": project_name,
+            "metadata": {"source": "terraform-plan", "skipped": skipped},
+            "breakdown": {"resources": resources, "totalMonthlyCost": totals["totalMonthlyCost"]},
+        }],
+        **totals,
+        "_source": "plan_pricing",
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """CLI : plan.json → rapport Infracost."""
+    cli = argparse.ArgumentParser(description="Pricing EcoArch d'un plan Terraform JSON")
+    cli.add_argument("plan", help="Sortie de 'terraform show -json'")
+    cli.add_argument("-o", "--output", default="plan-report.json", help="Rapport généré")
+    cli.add_argument("--project", default="plan", help="Nom de projet dans le rapport")
+    args = cli.parse_args(argv)
+
+    try:
+        report = price_plan(args.plan, project_name=args.project)
+    except (OSError, JsonStreamError) as e:
+        logger.error("Lecture du plan impossible: %s", e)
+        return 1
+    Path(args.output).write_text(json.dumps(report), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""Diff ressource par ressource entre deux rapports Infracost.
+
+Compare le rapport courant (MR) à la baseline de la branche principale
+par *hash join* sur l'adresse Terraform de la ressource (``name``),
+qualifiée par le projet :
+
+1. build : chaque rapport est lu en flux (compatible mode streaming) et
+   agrégé par (projet, adresse) dans un dict — une adresse répétée est
+   cumulée de la même façon des deux côtés ;
+2. probe : chaque agrégat courant est retiré de l'index de la baseline
+   → ``changed`` ou ``added`` ;
+3. ce qui reste dans l'index → ``removed``.
+
+Les changements sont émis au fil de l'eau (``iter_resource_changes``) ;
+le tri par impact n'est appliqué qu'à la demande (``ReportDiff``), avec
+un tas borné pour les top-N.
+
+Usage CLI (JSON lines sur stdout) :
+    python -m src.report_diff infracost-report.json baseline-report.json
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import sys
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass, field
+from typing import Any, Literal
+
+from src.parser import EcoArchParser
+from src.resource_table import ResourceTable
+
+logger = logging.getLogger(__name__)
+
+ChangeKind = Literal["added", "removed", "changed"]
+
+# En dessous d'un demi-centime, on considère le coût inchangé
+_DEFAULT_TOLERANCE = 0.005
+
+ReportSource = EcoArchParser | ResourceTable | Iterable[dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class ResourceChange:
+    """Variation de coût d'une ressource entre baseline et rapport courant."""
+
+    kind: ChangeKind
+    address: str
+    project: str
+    resource_type: str
+    baseline_cost: float
+    current_cost: float
+
+    @property
+    def delta(self) -> float:
+        return self.current_cost - self.baseline_cost
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "delta": round(self.delta, 4)}
+
+
+def _rows(source: ReportSource) -> Iterator[dict[str, Any]]:
+    if isinstance(source, EcoArchParser):
+        return source.iter_resources()
+    if isinstance(source, ResourceTable):
+        return source.iter_rows()
+    return iter(source)
+
+
+def _key(row: dict[str, Any], by_project: bool) -> tuple[str, str]:
+    return (str(row.get("project", "")) if by_project else "", str(row.get("name", "")))
+
+
+def _aggregate(source: ReportSource, by_project: bool) -> dict[tuple[str, str], list[Any]]:
+    """Coût cumulé par clé : ``[type, projet, coût]`` (adresses dupliquées sommées)."""
+    totals: dict[tuple[str, str], list[Any]] = {}
+    for row in _rows(source):
+        key = _key(row, by_project)
+        cost = float(row.get("monthly_cost", 0.0))
+        entry = totals.get(key)
+        if entry is None:
+            totals[key] = [str(row.get("type", "Unknown")), str(row.get("project", "")), cost]
+        else:
+            entry[2] += cost
+    return totals
+
+
+def iter_resource_changes(
+    current: ReportSource,
+    baseline: ReportSource,
+    by_project: bool = True,
+    tolerance: float = _DEFAULT_TOLERANCE,
+) -> Iterator[ResourceChange]:
+    """Émet en flux les ressources ajoutées, supprimées ou modifiées.
+
+    Args:
+        current: Rapport courant (parser, table ou lignes plates).
+        baseline: Rapport de référence (branche principale).
+        by_project: Qualifie l'adresse par le projet (monorepos).
+        tolerance: Écart minimal pour qu'une ressource soit « changed ».
+    """
+    # ── Build : agrégats de la baseline ──
+    index = _aggregate(baseline, by_project)
+
+    # ── Probe : agrégats du rapport courant ──
+    for key, (rtype, project, cost) in _aggregate(current, by_project).items():
+        entry = index.pop(key, None)
+        if entry is None:
+            yield ResourceChange("added", key[1], project, rtype, 0.0, cost)
+        elif abs(cost - entry[2]) > tolerance:
+            yield ResourceChange("changed", key[1], project, rtype, entry[2], cost)
+
+    # ── Reste de la baseline : ressources supprimées ──
+    for (_, address), (rtype, project, cost) in index.items():
+        yield ResourceChange("removed", address, project, rtype, cost, 0.0)
+
+
+def _impact(change: ResourceChange) -> float:
+    return abs(change.delta)
+
+
+def top_changes(changes: Iterable[ResourceChange], n: int) -> list[ResourceChange]:
+    """Les ``n`` changements au plus fort impact (tas borné, O(m log n))."""
+    return heapq.nlargest(n, changes, key=_impact)
+
+
+@dataclass
+class ReportDiff:
+    """Diff complet, trié par impact décroissant (|delta|)."""
+
+    changes: list[ResourceChange] = field(default_factory=list)
+
+    @classmethod
+    def compute(cls, current: ReportSource, baseline: ReportSource, **kwargs: Any) -> ReportDiff:
+        changes = list(iter_resource_changes(current, baseline, **kwargs))
+        changes.sort(key=_impact, reverse=True)
+        return cls(changes)
+
+    def by_kind(self, kind: ChangeKind) -> list[ResourceChange]:
+        return [c for c in self.changes if c.kind == kind]
+
+    @property
+    def net_delta(self) -> float:
+        return sum(c.delta for c in self.changes)
+
+    def to_markdown(self, currency: str = "USD", limit: int = 10) -> str:
+        """Section Markdown pour le commentaire de MR."""
+        if not self.changes:
+            return "### 🔍 Détail par ressource\n_Aucune ressource modifiée par rapport à la baseline._"
+
+        icons = {"added": "🆕", "removed": "🗑️", "changed": "✏️"}
+        counts = {k: len(self.by_kind(k)) for k in ("added", "removed", "changed")}
+        lines = [
+            "### 🔍 Détail par ressource",
+            (
+                f"{counts['added']} ajoutée(s), {counts['removed']} supprimée(s), "
+                f"{counts['changed']} modifiée(s) — net `{self.net_delta:+.2f} {currency}`"
+            ),
+            "",
+            "| | Ressource | Avant | Après | Δ |",
+            "|---|---|---:|---:|---:|",
+        ]
+        for c in self.changes[:limit]:
+            lines.append(
+                f"| {icons[c.kind]} | `{c.address}` | {c.baseline_cost:.2f} | "
+                f"{c.current_cost:.2f} | {c.delta:+.2f} |"
+            )
+        if len(self.changes) > limit:
+            lines.append(f"\n_… et {len(self.changes) - limit} autre(s)._")
+        return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """CLI : diff en JSON lines (ordre d'émission, sans tri)."""
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 2:
+        logger.error("Usage: python -m src.report_diff <current.json> <baseline.json>")
+        return 2
+    current = EcoArchParser(args[0], streaming=True)
+    baseline = EcoArchParser(args[1], streaming=True)
+    for change in iter_resource_changes(current, baseline):
+        sys.stdout.write(json.dumps(change.to_dict()) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""Index hiérarchique ressources → subresources → costComponents.
+
+``_flatten_resources`` ne garde que le coût total de chaque ressource ;
+pour expliquer *pourquoi* une ressource coûte ce prix, il faut descendre
+dans ``subresources`` et ``costComponents``. Plutôt que de garder le JSON
+brut en mémoire, on construit un index d'offsets (octets) dans le fichier
+source :
+
+- la passe d'indexation ne décode que ``name`` / ``resourceType`` /
+  ``monthlyCost`` de chaque ressource et mémorise son intervalle d'octets ;
+- un nœud n'est matérialisé (``seek`` + décodage de *ses seuls* champs
+  scalaires) qu'au premier accès ; ses enfants ne sont que des intervalles
+  tant qu'on ne les visite pas ;
+- tous les parcours sont itératifs (pile explicite) : aucune limite de
+  récursion, quelle que soit la profondeur des subresources.
+"""
+from __future__ import annotations
+
+import io
+import json
+import logging
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Literal
+
+from src.json_stream import JsonStreamError, JsonTokenizer
+
+logger = logging.getLogger(__name__)
+
+NodeKind = Literal["resource", "subresource", "cost_component"]
+
+_CHILD_KEYS: dict[str, NodeKind] = {
+    "subresources": "subresource",
+    "costComponents": "cost_component",
+}
+
+
+class CostNode:
+    """Nœud paresseux de l'arbre de coûts (ressource, subresource ou composant)."""
+
+    __slots__ = ("_attrs", "_children", "_index", "kind", "span")
+
+    def __init__(self, kind: NodeKind, span: tuple[int, int], index: ReportIndex):
+        self.kind = kind
+        self.span = span
+        self._index = index
+        self._attrs: dict[str, Any] | None = None
+        self._children: list[CostNode] | None = None
+
+    @property
+    def is_materialized(self) -> bool:
+        return self._attrs is not None
+
+    def _materialize(self) -> None:
+        if self._attrs is None:
+            self._attrs, self._children = self._index._decode_node(self.span)
+
+    @property
+    def attrs(self) -> dict[str, Any]:
+        """Champs propres du nœud (sans ses enfants), décodés à la demande."""
+        self._materialize()
+        return self._attrs  # type: ignore[return-value]
+
+    @property
+    def children(self) -> list[CostNode]:
+        """Enfants directs (subresources puis costComponents), non décodés."""
+        self._materialize()
+        return self._children  # type: ignore[return-value]
+
+    @property
+    def name(self) -> str:
+        return str(self.attrs.get("name") or "Unnamed")
+
+    @property
+    def monthly_cost(self) -> float:
+        try:
+            return float(self.attrs.get("monthlyCost") or 0.0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    def walk(self, max_depth: int | None = None) -> Iterator[tuple[int, CostNode]]:
+        """Parcours en profondeur itératif : (profondeur, nœud), racine incluse."""
+        stack: list[tuple[int, CostNode]] = [(0, self)]
+        while stack:
+            depth, node = stack.pop()
+            yield depth, node
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for child in reversed(node.children):
+                stack.append((depth + 1, child))
+
+
+@dataclass(frozen=True)
+class ComponentLine:
+    """Ligne d'explication : un costComponent et son chemin dans l'arbre."""
+
+    path: tuple[str, ...]
+    name: str
+    unit: str
+    monthly_quantity: float
+    price: float
+    monthly_cost: float
+
+
+def default_project_name(index: int) -> str:
+    """Nom d'un projet sans ``name`` (même convention dans tous les modes de lecture)."""
+    return f"project-{index}"
+
+
+def _as_float(value: Any) -> float:
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class ReportIndex:
+    """Index d'offsets des ressources d'un rapport Infracost.
+
+    Args:
+        json_path: Rapport sur disque.
+        raw: Rapport déjà en mémoire (octets JSON) ; ``json_path`` sert alors
+            seulement d'étiquette.
+    """
+
+    def __init__(self, json_path: str | Path, raw: bytes | None = None):
+        self.json_path = Path(json_path)
+        self._raw = raw
+        self.resources: list[CostNode] = []
+        self._by_address: dict[tuple[str, str], CostNode] = {}
+        self._build()
+
+    def _open(self) -> IO[bytes]:
+        return io.BytesIO(self._raw) if self._raw is not None else open(self.json_path, "rb")
+
+    # ── Construction (une passe streaming) ────────────────────────
+
+    def _build(self) -> None:
+        if self._raw is None and not self.json_path.exists():
+            logger.error("Fichier introuvable: %s", self.json_path)
+            return
+        try:
+            with self._open() as fp:
+                tok = JsonTokenizer(fp)
+                for key in tok.iter_object():
+                    if key != "projects":
+                        tok.skip_value()
+                        continue
+                    for p_idx in tok.iter_array():
+                        self._index_project(tok, default_project_name(p_idx))
+        except JsonStreamError as e:
+            logger.error("JSON malformé: %s", e)
+
+    def _index_project(self, tok: JsonTokenizer, project_name: str) -> None:
+        for key in tok.iter_object():
+            if key == "name":
+                name = tok.read_scalar_or_skip()
+                if name:
+                    project_name = str(name)
+            elif key == "breakdown":
+                for bkey in tok.iter_object():
+                    if bkey != "resources":
+                        tok.skip_value()
+                        continue
+                    for _ in tok.iter_array():
+                        self._index_resource(tok, project_name)
+            else:
+                tok.skip_value()
+
+    def _index_resource(self, tok: JsonTokenizer, project_name: str) -> None:
+        if tok.peek() != "{":
+            tok.skip_value()
+            return
+        start = tok.offset
+        attrs: dict[str, Any] = {}
+        for key in tok.iter_object():
+            if key in ("name", "resourceType", "monthlyCost"):
+                attrs[key] = tok.read_scalar_or_skip()
+            else:
+                tok.skip_value()
+        node = CostNode("resource", (start, tok.offset), self)
+        self.resources.append(node)
+        address = str(attrs.get("name") or "Unnamed")
+        self._by_address.setdefault((project_name, address), node)
+        self._by_address.setdefault(("", address), node)
+
+    # ── Matérialisation d'un nœud ─────────────────────────────────
+
+    def _decode_node(self, span: tuple[int, int]) -> tuple[dict[str, Any], list[CostNode]]:
+        """Décode les champs propres d'un nœud et repère ses enfants (offsets)."""
+        start, end = span
+        with self._open() as fp:
+            fp.seek(start)
+            raw = fp.read(end - start)
+
+        tok = JsonTokenizer(io.BytesIO(raw))
+        attrs: dict[str, Any] = {}
+        children: list[CostNode] = []
+        for key in tok.iter_object():
+            child_kind = _CHILD_KEYS.get(key)
+            if child_kind is None:
+                attrs[key] = tok.read_value()
+                continue
+            for _ in tok.iter_array():
+                tok.skip_value()
+                child_start, child_end = tok.last_span
+                children.append(CostNode(child_kind, (start + child_start, start + child_end), self))
+        # Ordre Infracost : subresources avant costComponents pour l'affichage
+        children.sort(key=lambda c: c.kind != "subresource")
+        return attrs, children
+
+    # ── Requêtes ──────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self.resources)
+
+    def find(self, address: str, project: str = "") -> CostNode | None:
+        """Ressource par adresse Terraform (optionnellement qualifiée par projet)."""
+        return self._by_address.get((project, address))
+
+    def explain(self, address: str, project: str = "") -> list[ComponentLine]:
+        """Tous les costComponents d'une ressource, triés par coût décroissant.
+
+        Ne décode que les nœuds de cette ressource (parcours itératif).
+        """
+        root = self.find(address, project)
+        if root is None:
+            return []
+
+        lines: list[ComponentLine] = []
+        stack: list[tuple[tuple[str, ...], CostNode]] = [((), root)]
+        while stack:
+            path, node = stack.pop()
+            if node.kind == "cost_component":
+                attrs = node.attrs
+                lines.append(ComponentLine(
+                    path=path,
+                    name=str(attrs.get("name", "")),
+                    unit=str(attrs.get("unit", "")),
+                    monthly_quantity=_as_float(attrs.get("monthlyQuantity")),
+                    price=_as_float(attrs.get("price")),
+                    monthly_cost=_as_float(attrs.get("monthlyCost")),
+                ))
+                continue
+            child_path = path + (node.name,)
+            for child in node.children:
+                stack.append((child_path, child))
+
+        lines.sort(key=lambda line: line.monthly_cost, reverse=True)
+        return lines
+
+
+def explain_resource(resource: dict[str, Any]) -> list[ComponentLine]:
+    """``ReportIndex.explain`` pour une ressource déjà décodée (dict).
+
+    Sert quand le rapport est déjà en mémoire (mode classique du parser) :
+    la ressource seule est réencodée et indexée, sans relire le fichier.
+    """
+    report = {"projects": [{"breakdown": {"resources": [resource]}}]}
+    index = ReportIndex("<mémoire>", raw=json.dumps(report).encode("utf-8"))
+    return index.explain(str(resource.get("name") or "Unnamed"))
+
+
+__all__ = ["ComponentLine", "CostNode", "ReportIndex", "default_project_name", "explain_resource"]
@@ -0,0 +1,192 @@
+"""Snapshot binaire d'un rapport Infracost déjà parsé (sidecar).
+
+En CI, ``parser.py``, ``gitlab_comment.py`` et ``budget_gate.py`` lisent
+le même ``infracost-report.json`` ; chaque relance du pipeline le relit
+encore. Le premier lecteur écrit à côté du rapport un sidecar
+``<rapport>.snap`` identifié par le SHA-256 du contenu ; les suivants le
+chargent tant que le rapport n'a pas changé.
+
+Format (little-endian, sans pickle) :
+
+    magic   8 o   b"ECOSNAP" + version
+    header  struct "<32sIQ" : sha256 du rapport, taille du bloc méta, n lignes
+    méta    JSON UTF-8 : scalaires racine, catégories types/projets, labels,
+            costComponents des ressources les plus chères
+    names   int64[n+1] offsets puis blob UTF-8 des adresses
+    colonnes int32 type_codes, int32 project_codes, float64 monthly_cost, float64 delta
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import struct
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src.parser import _BREAKDOWN_TOP, _ROOT_SCALAR_KEYS, EcoArchParser
+from src.report_index import ComponentLine
+from src.resource_table import ResourceTable
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_SUFFIX = ".snap"
+_MAGIC = b"ECOSNAP\x01"
+_HEADER = struct.Struct("<32sIQ")
+_HASH_CHUNK = 1 << 20
+
+
+def report_fingerprint(report_path: str | Path) -> bytes:
+    """SHA-256 du contenu du rapport (lecture par blocs)."""
+    digest = hashlib.sha256()
+    with open(report_path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def snapshot_path(report_path: str | Path) -> Path:
+    report_path = Path(report_path)
+    return report_path.with_name(report_path.name + SNAPSHOT_SUFFIX)
+
+
+# ── Écriture ──────────────────────────────────────────────────────
+
+
+def write_snapshot(parser: EcoArchParser, fingerprint: bytes, path: str | Path) -> None:
+    """Sérialise la table et les métriques du parser (écriture atomique).
+
+    Les costComponents des ressources les plus chères sont calculés ici,
+    pendant que le rapport est en mémoire : un lecteur du snapshot peut
+    produire le bloc « Pourquoi ces coûts ? » sans réindexer le JSON.
+    """
+    table = parser.table
+    labels = {str(i): value for i, value in parser.labels.items()}
+    top = table.top(_BREAKDOWN_TOP)
+    explanations = []
+    for i in range(len(top)):
+        row = top.row(i)
+        lines = parser.explain(row["name"], row["project"])
+        explanations.append([row["project"], row["name"], [asdict(line) for line in lines]])
+    meta = json.dumps({
+        "data": {k: parser.data[k] for k in _ROOT_SCALAR_KEYS if k in parser.data},
+        "types": table.types,
+        "projects": table.projects,
+        "labels": labels,
+        "explanations": explanations,
+    }, ensure_ascii=False).encode("utf-8")
+
+    encoded = [name.encode("utf-8") for name in table.names]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_MAGIC)
+            f.write(_HEADER.pack(fingerprint, len(meta), len(table)))
+            f.write(meta)
+            f.write(offsets.astype("<i8").tobytes())
+            f.write(b"".join(encoded))
+            f.write(table.type_codes.astype("<i4").tobytes())
+            f.write(table.project_codes.astype("<i4").tobytes())
+            f.write(table.monthly_cost.astype("<f8").tobytes())
+            f.write(table.delta.astype("<f8").tobytes())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+# ── Lecture ───────────────────────────────────────────────────────
+
+
+Snapshot = tuple[dict[str, Any], ResourceTable, dict[int, dict], dict[tuple[str, str], list[ComponentLine]]]
+
+
+def read_snapshot(path: str | Path, fingerprint: bytes) -> Snapshot | None:
+    """Charge un sidecar ; None s'il est absent, périmé ou corrompu.
+
+    Returns:
+        (scalaires racine, table, labels par ligne, costComponents par (projet, adresse)).
+    """
+    try:
+        raw = Path(path).read_bytes()
+    except FileNotFoundError:
+        return None
+    try:
+        if raw[:len(_MAGIC)] != _MAGIC:
+            return None
+        pos = len(_MAGIC)
+        digest, meta_len, n = _HEADER.unpack_from(raw, pos)
+        if digest != fingerprint:
+            return None
+        pos += _HEADER.size
+        meta = json.loads(raw[pos:pos + meta_len])
+        pos += meta_len
+
+        def column(dtype: str, count: int) -> np.ndarray:
+            nonlocal pos
+            arr = np.frombuffer(raw, dtype=dtype, count=count, offset=pos)
+            pos += arr.nbytes
+            return arr.astype(dtype[1:])
+
+        offsets = column("<i8", n + 1)
+        blob_start = pos
+        pos += int(offsets[-1])
+        blob = raw[blob_start:pos]
+        names = [blob[a:b].decode("utf-8") for a, b in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+        table = ResourceTable(
+            names=names,
+            type_codes=column("<i4", n),
+            types=meta["types"],
+            project_codes=column("<i4", n),
+            projects=meta["projects"],
+            monthly_cost=column("<f8", n),
+            delta=column("<f8", n),
+        )
+        if pos != len(raw):
+            raise ValueError("taille inattendue")
+        explanations = {
+            (project, address): [ComponentLine(**{**line, "path": tuple(line["path"])}) for line in lines]
+            for project, address, lines in meta.get("explanations", [])
+        }
+    except (struct.error, ValueError, KeyError, TypeError, UnicodeDecodeError) as e:
+        logger.warning("Snapshot %s illisible (%s), reconstruction", path, e)
+        return None
+    labels = {int(i): value for i, value in meta.get("labels", {}).items()}
+    return meta.get("data", {}), table, labels, explanations
+
+
+def load_report(report_path: str | Path) -> EcoArchParser:
+    """Parser du rapport, depuis le sidecar s'il correspond au contenu.
+
+    Sinon parse le JSON puis écrit le sidecar pour les lecteurs suivants.
+    """
+    report_path = Path(report_path)
+    if not report_path.exists():
+        return EcoArchParser(str(report_path))
+
+    fingerprint = report_fingerprint(report_path)
+    sidecar = snapshot_path(report_path)
+    snapshot = read_snapshot(sidecar, fingerprint)
+    if snapshot is not None:
+        data, table, labels, explanations = snapshot
+        logger.info("Snapshot %s chargé (%d ressources)", sidecar.name, len(table))
+        return EcoArchParser.from_table(str(report_path), data, table, labels, explanations)
+
+    parser = EcoArchParser(str(report_path))
+    if parser.data:
+        try:
+            write_snapshot(parser, fingerprint, sidecar)
+        except OSError as e:
+            logger.warning("Écriture du snapshot impossible: %s", e)
+    return parser
+
+
+__all__ = ["load_report", "read_snapshot", "report_fingerprint", "snapshot_path", "write_snapshot"]
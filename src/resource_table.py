@@ -0,0 +1,312 @@
+"""Table colonnaire des ressources d'un rapport Infracost.
+
+Stockage des ressources du parser à la place d'une liste de petits dicts
+(``EcoArchParser.resources`` n'en est qu'une vue, ``ResourceRows``) et base
+des consommateurs qui agrègent (rapport Markdown, graphiques, budget
+gate) : les coûts sont des tableaux NumPy ``float64`` et les
+colonnes répétitives (type, projet) sont encodées en catégories
+(``int32`` + dictionnaire de valeurs), ce qui rend les group-by, top-N et
+filtres vectoriels et divise l'empreinte mémoire.
+"""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from typing import Any, Literal
+
+import numpy as np
+
+GroupKey = Literal["type", "project", "name_prefix"]
+SortKey = Literal["monthly_cost", "delta", "abs_delta"]
+
+
+@dataclass(frozen=True)
+class GroupStat:
+    """Agrégat d'un groupe de ressources."""
+
+    key: str
+    count: int
+    monthly_cost: float
+    delta: float
+
+
+class _Categories:
+    """Encodeur de catégories (valeur → code int32 stable)."""
+
+    __slots__ = ("_codes", "values")
+
+    def __init__(self) -> None:
+        self.values: list[str] = []
+        self._codes: dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+
+def name_prefix(name: str, depth: int = 1) -> str:
+    """Préfixe d'adresse Terraform, sans les index ``[n]`` / ``["k"]``.
+
+    ``module.app.google_compute_instance.vm[0]`` → ``module`` (depth=1),
+    ``module.app`` (depth=2), ``module.app.google_compute_instance`` (depth=3).
+    """
+    bracket = name.find("[")
+    if bracket >= 0:
+        name = name[:bracket]
+    return ".".join(name.split(".")[:depth])
+
+
+class ResourceTableBuilder:
+    """Remplit les colonnes d'une ``ResourceTable`` ligne à ligne, sans dict intermédiaire."""
+
+    def __init__(self) -> None:
+        self._names: list[str] = []
+        self._types, self._projects = _Categories(), _Categories()
+        self._type_codes, self._project_codes = array("i"), array("i")
+        self._costs, self._deltas = array("d"), array("d")
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def append(self, name: str, resource_type: str, project: str, monthly_cost: float, delta: float) -> None:
+        self._names.append(name)
+        self._type_codes.append(self._types.code(resource_type))
+        self._project_codes.append(self._projects.code(project))
+        self._costs.append(monthly_cost)
+        self._deltas.append(delta)
+
+    def build(self) -> ResourceTable:
+        return ResourceTable(
+            names=self._names,
+            type_codes=np.frombuffer(self._type_codes, dtype=np.int32).copy(),
+            types=self._types.values,
+            project_codes=np.frombuffer(self._project_codes, dtype=np.int32).copy(),
+            projects=self._projects.values,
+            monthly_cost=np.frombuffer(self._costs, dtype=np.float64).copy(),
+            delta=np.frombuffer(self._deltas, dtype=np.float64).copy(),
+        )
+
+
+class ResourceTable:
+    """Colonnes name / type / project / monthly_cost / delta d'un rapport."""
+
+    def __init__(
+        self,
+        names: list[str],
+        type_codes: np.ndarray,
+        types: list[str],
+        project_codes: np.ndarray,
+        projects: list[str],
+        monthly_cost: np.ndarray,
+        delta: np.ndarray,
+    ):
+        self.names = names
+        self.type_codes = type_codes
+        self.types = types
+        self.project_codes = project_codes
+        self.projects = projects
+        self.monthly_cost = monthly_cost
+        self.delta = delta
+
+    # ── Construction ──────────────────────────────────────────────
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict[str, Any]]) -> ResourceTable:
+        """Construit la table en une passe sur des lignes plates du parser.
+
+        Accepte un itérateur (mode streaming) : aucune ligne n'est conservée.
+        """
+        builder = ResourceTableBuilder()
+        for row in rows:
+            builder.append(
+                str(row.get("name", "Unnamed")),
+                str(row.get("type", "Unknown")),
+                str(row.get("project", "")),
+                float(row.get("monthly_cost", 0.0)),
+                float(row.get("delta", 0.0)),
+            )
+        return builder.build()
+
+    # ── Accès ─────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def row(self, index: int) -> dict[str, Any]:
+        """Retourne la ligne ``index`` au format de ``_flatten_resources``."""
+        return {
+            "name": self.names[index],
+            "type": self.types[self.type_codes[index]],
+            "project": self.projects[self.project_codes[index]],
+            "monthly_cost": float(self.monthly_cost[index]),
+            "delta": float(self.delta[index]),
+        }
+
+    def iter_rows(self) -> Iterator[dict[str, Any]]:
+        """Itère sur les lignes reconstruites (dicts)."""
+        for i in range(len(self)):
+            yield self.row(i)
+
+    @property
+    def total_monthly_cost(self) -> float:
+        return float(self.monthly_cost.sum())
+
+    @property
+    def total_delta(self) -> float:
+        return float(self.delta.sum())
+
+    # ── Filtres ───────────────────────────────────────────────────
+
+    def take(self, indices: np.ndarray) -> ResourceTable:
+        """Sous-table des lignes ``indices`` (catégories partagées)."""
+        indices = np.asarray(indices, dtype=np.int64)
+        return ResourceTable(
+            names=[self.names[i] for i in indices.tolist()],
+            type_codes=self.type_codes[indices],
+            types=self.types,
+            project_codes=self.project_codes[indices],
+            projects=self.projects,
+            monthly_cost=self.monthly_cost[indices],
+            delta=self.delta[indices],
+        )
+
+    def mask(
+        self,
+        resource_type: str | None = None,
+        project: str | None = None,
+        name_prefix: str | None = None,
+        min_cost: float | None = None,
+        changed_only: bool = False,
+    ) -> np.ndarray:
+        """Masque booléen combinant les critères fournis (ET logique)."""
+        keep = np.ones(len(self), dtype=bool)
+        if resource_type is not None:
+            keep &= self.type_codes == self._code_of(self.types, resource_type)
+        if project is not None:
+            keep &= self.project_codes == self._code_of(self.projects, project)
+        if name_prefix is not None:
+            keep &= np.fromiter(
+                (n.startswith(name_prefix) for n in self.names), dtype=bool, count=len(self)
+            )
+        if min_cost is not None:
+            keep &= self.monthly_cost >= min_cost
+        if changed_only:
+            keep &= self.delta != 0.0
+        return keep
+
+    def filter(self, **criteria: Any) -> ResourceTable:
+        """Sous-table filtrée (mêmes critères que ``mask``)."""
+        return self.take(np.flatnonzero(self.mask(**criteria)))
+
+    @staticmethod
+    def _code_of(values: list[str], value: str) -> int:
+        try:
+            return values.index(value)
+        except ValueError:
+            return -1
+
+    # ── Agrégations ───────────────────────────────────────────────
+
+    def _group_codes(self, by: GroupKey, depth: int) -> tuple[np.ndarray, list[str]]:
+        if by == "type":
+            return self.type_codes, self.types
+        if by == "project":
+            return self.project_codes, self.projects
+        if by == "name_prefix":
+            cats = _Categories()
+            codes = np.fromiter(
+                (cats.code(name_prefix(n, depth)) for n in self.names),
+                dtype=np.int32,
+                count=len(self),
+            )
+            return codes, cats.values
+        raise ValueError(f"group_by non supporté: {by!r}")
+
+    def group_by(self, by: GroupKey, depth: int = 1) -> list[GroupStat]:
+        """Agrège count / coût / delta par type, projet ou préfixe de nom.
+
+        Returns:
+            Groupes triés par coût mensuel décroissant.
+        """
+        codes, labels = self._group_codes(by, depth)
+        n_groups = len(labels)
+        if n_groups == 0:
+            return []
+        counts = np.bincount(codes, minlength=n_groups)
+        costs = np.bincount(codes, weights=self.monthly_cost, minlength=n_groups)
+        deltas = np.bincount(codes, weights=self.delta, minlength=n_groups)
+        order = np.argsort(-costs, kind="stable")
+        return [
+            GroupStat(labels[g], int(counts[g]), float(costs[g]), float(deltas[g]))
+            for g in order.tolist()
+            if counts[g]
+        ]
+
+    def top(self, n: int, by: SortKey = "monthly_cost") -> ResourceTable:
+        """Les ``n`` ressources les plus coûteuses (ou au plus fort delta)."""
+        if by == "monthly_cost":
+            values = self.monthly_cost
+        elif by == "delta":
+            values = self.delta
+        elif by == "abs_delta":
+            values = np.abs(self.delta)
+        else:
+            raise ValueError(f"Tri non supporté: {by!r}")
+        if n <= 0 or len(self) == 0:
+            return self.take(np.array([], dtype=np.int64))
+        if n < len(self):
+            candidates = np.argpartition(-values, n - 1)[:n]
+        else:
+            candidates = np.arange(len(self))
+        order = candidates[np.argsort(-values[candidates], kind="stable")]
+        return self.take(order)
+
+
+class ResourceRows(Sequence):
+    """Vue « liste de dicts » d'une table, au format de ``_flatten_resources``.
+
+    Les lignes (avec leurs labels) ne sont construites qu'à l'accès.
+    """
+
+    __slots__ = ("_labels", "_table")
+
+    def __init__(self, table: ResourceTable, labels: dict[int, dict] | None = None):
+        self._table = table
+        self._labels = labels or {}
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def _row(self, index: int) -> dict[str, Any]:
+        return {**self._table.row(index), "labels": dict(self._labels.get(index, {}))}
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._row(index)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (ResourceRows, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"ResourceRows({len(self)} lignes)"
+
+
+__all__ = ["GroupStat", "ResourceRows", "ResourceTable", "ResourceTableBuilder", "name_prefix"]
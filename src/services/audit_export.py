@@ -0,0 +1,314 @@
+"""Export en flux de l'historique ``audit_logs`` (CSV ou Parquet).
+
+La table est parcourue par pages keyset (``AuditService.iter_log_pages``)
+et chaque page est écrite aussitôt : la mémoire reste bornée par la taille
+d'une page, quel que soit le nombre de lignes.
+
+- CSV : module ``csv`` de la bibliothèque standard ;
+- Parquet : ``pyarrow`` (optionnel, importé à la demande), un row group
+  par page ;
+- le fichier est écrit sous ``<nom>.part`` puis renommé : un export
+  interrompu ne laisse pas de fichier d'apparence complète ;
+- ``progress`` est appelé après chaque page (lignes écrites, total estimé).
+
+Les exports de l'interface sont écrits dans un répertoire privé
+(``ECOARCH_EXPORT_DIR``, jamais servi tel quel) sous un jeton aléatoire :
+``claim_export`` le remet une seule fois à l'endpoint de téléchargement,
+qui le supprime après l'envoi ; un export non téléchargé est purgé après
+``EXPORT_TTL_S``.
+
+Ligne de commande : ``python -m src.services.audit_export audit.csv``.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import importlib.util
+import logging
+import os
+import re
+import secrets
+import sys
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from src.config import Config
+from src.services.audit_service import AUDIT_COLUMNS, AuditService
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("csv", "parquet")
+DEFAULT_PAGE_SIZE = 1000
+
+DEFAULT_EXPORT_DIR = Path(".ecoarch") / "exports"
+DOWNLOAD_PATH = "/exports/audit/{token}"
+EXPORT_TTL_S = 600.0
+_TOKEN_RE = re.compile(r"[0-9a-f]{64}")
+
+
+class AuditExportError(RuntimeError):
+    """Export impossible (format inconnu, dépendance absente, Supabase non configuré)."""
+
+
+def available_formats() -> tuple[str, ...]:
+    """Formats utilisables ici : Parquet seulement si ``pyarrow`` est installé."""
+    return tuple(
+        fmt for fmt in EXPORT_FORMATS
+        if fmt != "parquet" or importlib.util.find_spec("pyarrow") is not None
+    )
+
+
+@dataclass(frozen=True)
+class ExportProgress:
+    """Avancement d'un export."""
+
+    rows: int
+    pages: int
+    last_id: int
+    total: int | None = None
+
+    @property
+    def percent(self) -> float | None:
+        if not self.total:
+            return None
+        return min(100.0, 100.0 * self.rows / self.total)
+
+
+@dataclass(frozen=True)
+class ExportResult:
+    """Fichier produit par ``export_audit_logs``."""
+
+    path: Path
+    format: str
+    rows: int
+    pages: int
+    bytes: int
+
+
+# ── Écrivains ─────────────────────────────────────────────────────
+
+
+class _CsvWriter:
+    def __init__(self, path: Path, columns: tuple[str, ...]):
+        self._file = path.open("w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=columns, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path: Path, columns: tuple[str, ...]):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise AuditExportError("Export Parquet : installer pyarrow (pip install pyarrow)") from exc
+        self._pa = pa
+        self._columns = columns
+        # Types fixés d'avance : une page sans valeur ne change pas le schéma
+        self._schema = pa.schema([(c, _ARROW_TYPES.get(c, "string")) for c in columns])
+        self._writer = pq.ParquetWriter(path, self._schema, compression="zstd")
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        data = {
+            c: [_arrow_value(row.get(c), self._schema.field(c).type) for row in rows]
+            for c in self._columns
+        }
+        self._writer.write_table(self._pa.table(data, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+_ARROW_TYPES = {"id": "int64", "total_cost": "float64"}
+
+
+def _arrow_value(value: Any, arrow_type: Any) -> Any:
+    if value is None:
+        return None
+    if str(arrow_type) == "int64":
+        return int(value)
+    if str(arrow_type) == "double":
+        return float(value)
+    return str(value)
+
+
+_WRITERS: dict[str, Callable[[Path, tuple[str, ...]], Any]] = {
+    "csv": _CsvWriter,
+    "parquet": _ParquetWriter,
+}
+
+
+def export_format(path: str | Path, fmt: str | None = None) -> str:
+    """Format demandé, ou déduit de l'extension du fichier."""
+    fmt = (fmt or Path(path).suffix.lstrip(".") or "csv").lower()
+    if fmt not in EXPORT_FORMATS:
+        raise AuditExportError(f"Format d'export inconnu: {fmt} ({', '.join(EXPORT_FORMATS)})")
+    return fmt
+
+
+# ── Export ────────────────────────────────────────────────────────
+
+
+def export_audit_logs(
+    path: str | Path,
+    fmt: str | None = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    columns: tuple[str, ...] = AUDIT_COLUMNS,
+    progress: Callable[[ExportProgress], None] | None = None,
+    pages: Iterable[list[dict[str, Any]]] | None = None,
+    total: int | None = None,
+) -> ExportResult:
+    """Écrit tout l'historique d'audit dans ``path``, page par page.
+
+    Args:
+        path: Fichier de sortie (remplacé à la fin de l'export).
+        fmt: ``csv`` ou ``parquet`` (défaut : extension de ``path``).
+        page_size: Lignes lues et écrites par page.
+        columns: Colonnes exportées (``id`` requis pour la pagination).
+        progress: Rappel après chaque page.
+        pages: Source des pages (défaut : ``AuditService.iter_log_pages``).
+        total: Nombre de lignes attendu (défaut : ``AuditService.count_logs``).
+
+    Raises:
+        AuditExportError: Format inconnu, dépendance absente ou Supabase non configuré.
+        Exception: Erreur de lecture Supabase (fichier partiel supprimé).
+    """
+    path = Path(path)
+    fmt = export_format(path, fmt)
+    if pages is None:
+        if not Config.get_supabase_client():
+            raise AuditExportError("Supabase non configuré : historique d'audit inaccessible")
+        pages = AuditService.iter_log_pages(page_size=page_size, columns=columns)
+        if total is None:
+            total = AuditService.count_logs()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".part")
+
+    writer = _WRITERS[fmt](partial, columns)
+    rows = count = last_id = 0
+    try:
+        for page in pages:
+            writer.write(page)
+            rows += len(page)
+            count += 1
+            last_id = int(page[-1].get("id") or last_id)
+            if progress is not None:
+                progress(ExportProgress(rows, count, last_id, total))
+    except BaseException:
+        writer.close()
+        partial.unlink(missing_ok=True)
+        raise
+    writer.close()
+    os.replace(partial, path)
+    logger.info("Export audit : %d ligne(s) → %s", rows, path)
+    return ExportResult(path, fmt, rows, count, path.stat().st_size)
+
+
+# ── Téléchargement depuis l'interface ────────────────────────────
+
+
+def export_dir() -> Path:
+    """Répertoire privé des exports en attente de téléchargement."""
+    return Path(os.getenv("ECOARCH_EXPORT_DIR") or DEFAULT_EXPORT_DIR)
+
+
+def new_export_path(fmt: str) -> tuple[str, Path]:
+    """Jeton de téléchargement et fichier où écrire l'export (purge les exports expirés)."""
+    fmt = export_format(f"export.{fmt}")
+    purge_exports()
+    token = secrets.token_hex(32)
+    return token, export_dir() / f"{token}.{fmt}"
+
+
+def claim_export(token: str) -> tuple[Path, str] | None:
+    """Réserve l'export du jeton pour un unique envoi ; None si inconnu, expiré ou déjà pris.
+
+    Le fichier est renommé (``.sending``) : une seconde requête avec le même
+    jeton ne le trouve plus. L'appelant supprime le fichier renvoyé.
+    """
+    if not _TOKEN_RE.fullmatch(token):
+        return None
+    for fmt in EXPORT_FORMATS:
+        path = export_dir() / f"{token}.{fmt}"
+        claimed = path.with_name(path.name + ".sending")
+        try:
+            if time.time() - path.stat().st_mtime > EXPORT_TTL_S:
+                path.unlink(missing_ok=True)
+                return None
+            os.rename(path, claimed)
+            os.utime(claimed)  # pas de purge pendant l'envoi
+        except FileNotFoundError:
+            continue
+        return claimed, fmt
+    return None
+
+
+def purge_exports(ttl: float = EXPORT_TTL_S) -> int:
+    """Supprime les exports (et fichiers partiels) plus anciens que ``ttl``."""
+    removed = 0
+    cutoff = time.time() - ttl
+    for path in export_dir().glob("*"):
+        try:
+            if path.is_file() and path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
+
+
+def main(argv: list[str] | None = None) -> int:
+    """CLI : exporte ``audit_logs`` vers un fichier CSV ou Parquet."""
+    cli = argparse.ArgumentParser(description="Export de l'historique d'audit")
+    cli.add_argument("output", help="Fichier de sortie (.csv ou .parquet)")
+    cli.add_argument("--format", choices=available_formats(), help="Défaut : extension du fichier")
+    cli.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    args = cli.parse_args(argv)
+
+    def report(p: ExportProgress) -> None:
+        done = f" ({p.percent:.0f} %)" if p.percent is not None else ""
+        logger.info("%d ligne(s) exportée(s)%s", p.rows, done)
+
+    try:
+        result = export_audit_logs(args.output, args.format, args.page_size, progress=report)
+    except AuditExportError as exc:
+        logger.error("%s", exc)
+        return 2
+    except Exception as exc:  # noqa: BLE001 — la CLI signale toute interruption par le code 1
+        logger.error("Export interrompu : %s", exc)
+        return 1
+    logger.info("%s : %d ligne(s), %d octet(s)", result.path, result.rows, result.bytes)
+    return 0
+
+
+__all__ = [
+    "DOWNLOAD_PATH",
+    "EXPORT_FORMATS",
+    "EXPORT_TTL_S",
+    "AuditExportError",
+    "ExportProgress",
+    "ExportResult",
+    "available_formats",
+    "claim_export",
+    "export_audit_logs",
+    "export_dir",
+    "export_format",
+    "main",
+    "new_export_path",
+    "purge_exports",
+]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
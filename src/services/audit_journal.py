@@ -0,0 +1,495 @@
+"""Journal local des écritures d'audit (write-behind, SQLite WAL).
+
+``AuditService.create_log`` / ``update_log`` n'attendent plus Supabase :
+l'écriture est journalisée dans une base SQLite locale et un thread
+d'arrière-plan la reporte dans ``audit_logs`` par lots. La latence d'un
+déploiement ne dépend plus de Supabase, et un log créé pendant une
+indisponibilité n'est plus perdu :
+
+- ``create`` retourne immédiatement un id local **négatif** (``-local_id``),
+  distinct des ids Supabase ; ``update`` accepte indifféremment l'un ou
+  l'autre, les modifications d'un log pas encore envoyé étant fusionnées
+  dans son insertion ;
+- le flush envoie un ``insert`` groupé pour les nouveaux logs (l'id distant
+  est associé à l'id local, dans l'ordre renvoyé par PostgREST) puis un
+  ``update … where id in (…)`` par couple (statut, pipeline_url) ;
+- plusieurs processus partagent le journal : les lignes à envoyer sont
+  réservées (propriétaire + échéance) dans une transaction ``BEGIN
+  IMMEDIATE``, un seul flush les envoie ; la réservation d'un processus
+  arrêté expire après ``claim_ttl`` ;
+- un lot d'insertions refusé est repris ligne par ligne : seule la ligne
+  rejetée est replanifiée ;
+- une ligne en échec est rejouée avec backoff exponentiel ; le journal
+  survit au processus (livraison au moins une fois) ;
+- une modification arrivée pendant un flush n'est pas perdue : chaque ligne
+  porte une version, une ligne modifiée entre-temps reste à envoyer.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_PATH = Path(".ecoarch") / "audit_journal.sqlite3"
+
+_FLUSH_BATCH_SIZE = 100
+# Réservation d'un lot par un flush ; au-delà, un autre processus le reprend
+_CLAIM_TTL_S = 120.0
+# Correspondance id local → id distant conservée pour les mises à jour tardives
+_RETENTION_S = 7 * 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_journal (
+    local_id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    remote_id       INTEGER,
+    payload         TEXT,
+    status          TEXT,
+    pipeline_url    TEXT,
+    version         INTEGER NOT NULL DEFAULT 1,
+    synced_version  INTEGER NOT NULL DEFAULT 0,
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    error           TEXT,
+    claimed_by      TEXT,
+    claimed_until   REAL NOT NULL DEFAULT 0,
+    created_at      REAL NOT NULL,
+    updated_at      REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS audit_journal_remote ON audit_journal (remote_id);
+CREATE INDEX IF NOT EXISTS audit_journal_dirty ON audit_journal (synced_version, version, local_id);
+"""
+
+
+@dataclass
+class JournalEntry:
+    """Écriture d'audit journalisée (``payload`` None : log déjà en base)."""
+
+    local_id: int
+    remote_id: int | None
+    payload: dict[str, Any] | None
+    status: str | None
+    pipeline_url: str | None
+    version: int
+
+    def insert_row(self) -> dict[str, Any]:
+        row = dict(self.payload or {})
+        if self.status:
+            row["status"] = self.status
+        if self.pipeline_url:
+            row["pipeline_url"] = self.pipeline_url
+        return row
+
+    def changes(self) -> dict[str, Any]:
+        data: dict[str, Any] = {}
+        if self.status:
+            data["status"] = self.status
+        if self.pipeline_url:
+            data["pipeline_url"] = self.pipeline_url
+        return data
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> JournalEntry:
+        return cls(
+            local_id=row["local_id"],
+            remote_id=row["remote_id"],
+            payload=json.loads(row["payload"]) if row["payload"] else None,
+            status=row["status"],
+            pipeline_url=row["pipeline_url"],
+            version=row["version"],
+        )
+
+
+class AuditJournal:
+    """Journal SQLite des créations / mises à jour d'audit à envoyer.
+
+    Args:
+        path: Base SQLite (créée au besoin).
+        backoff_seconds: Délai de base avant de rejouer un lot en échec.
+        max_backoff: Plafond de ce délai.
+        claim_ttl: Durée de réservation d'un lot en cours d'envoi.
+        clock: Horloge (secondes, epoch), injectable pour les tests.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        backoff_seconds: float = 2.0,
+        max_backoff: float = 300.0,
+        claim_ttl: float = _CLAIM_TTL_S,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path or os.getenv("ECOARCH_AUDIT_JOURNAL") or DEFAULT_JOURNAL_PATH)
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff = max_backoff
+        self.claim_ttl = claim_ttl
+        self._clock = clock
+        self._owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(audit_journal)")}
+        if "claimed_by" not in columns:  # journal créé avant la réservation des lots
+            conn.execute("ALTER TABLE audit_journal ADD COLUMN claimed_by TEXT")
+            conn.execute("ALTER TABLE audit_journal ADD COLUMN claimed_until REAL NOT NULL DEFAULT 0")
+
+    # ── Connexion (une par thread) ────────────────────────────────
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Transaction ``BEGIN IMMEDIATE`` (verrou d'écriture dès le début)."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # ── Écritures (appelant, sans réseau) ─────────────────────────
+
+    def create(self, row: dict[str, Any]) -> int:
+        """Journalise un nouveau log ; retourne son id local (négatif)."""
+        now = self._clock()
+        data = dict(row)
+        status, pipeline_url = data.pop("status", None), data.pop("pipeline_url", None)
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """INSERT INTO audit_journal (payload, status, pipeline_url, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (json.dumps(data, separators=(",", ":")), status, pipeline_url or None, now, now),
+            )
+        return -int(cursor.lastrowid)
+
+    def update(self, audit_id: int, status: str, pipeline_url: str = "") -> bool:
+        """Journalise un changement de statut ; False si l'id local est inconnu."""
+        now = self._clock()
+        with self._transaction() as conn:
+            if audit_id < 0:
+                row = conn.execute(
+                    "SELECT local_id FROM audit_journal WHERE local_id = ?", (-audit_id,)
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT local_id FROM audit_journal WHERE remote_id = ? ORDER BY local_id DESC LIMIT 1",
+                    (audit_id,),
+                ).fetchone()
+            if row is not None:
+                conn.execute(
+                    """UPDATE audit_journal
+                       SET status = ?, pipeline_url = COALESCE(?, pipeline_url),
+                           version = version + 1, updated_at = ?
+                       WHERE local_id = ?""",
+                    (status, pipeline_url or None, now, row["local_id"]),
+                )
+                return True
+            if audit_id < 0:
+                return False
+            conn.execute(
+                """INSERT INTO audit_journal (remote_id, status, pipeline_url, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (audit_id, status, pipeline_url or None, now, now),
+            )
+        return True
+
+    def resolve(self, audit_id: int) -> int | None:
+        """Id Supabase d'un log (None tant que sa création n'est pas envoyée)."""
+        if audit_id >= 0:
+            return audit_id
+        row = self._connect().execute(
+            "SELECT remote_id FROM audit_journal WHERE local_id = ?", (-audit_id,)
+        ).fetchone()
+        return row["remote_id"] if row else None
+
+    def pending_count(self) -> int:
+        (count,) = self._connect().execute(
+            "SELECT COUNT(*) FROM audit_journal WHERE synced_version < version"
+        ).fetchone()
+        return count
+
+    # ── Flush vers Supabase ───────────────────────────────────────
+
+    def _claim(self, inserts: bool, limit: int) -> list[JournalEntry]:
+        """Réserve les écritures dues non réservées (ou dont la réservation a expiré)."""
+        now = self._clock()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                f"""SELECT * FROM audit_journal
+                    WHERE synced_version < version AND next_attempt_at <= ? AND claimed_until <= ?
+                      AND remote_id IS {'NULL' if inserts else 'NOT NULL'}
+                    ORDER BY local_id LIMIT ?""",
+                (now, now, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE audit_journal SET claimed_by = ?, claimed_until = ? WHERE local_id = ?",
+                [(self._owner, now + self.claim_ttl, row["local_id"]) for row in rows],
+            )
+        return [JournalEntry.from_row(row) for row in rows]
+
+    def flush(self, sb: Any, batch_size: int = _FLUSH_BATCH_SIZE) -> int:
+        """Envoie les écritures dues ; retourne le nombre de lignes synchronisées."""
+        sent = 0
+        inserts = self._claim(inserts=True, limit=batch_size)
+        if inserts:
+            sent += self._flush_inserts(sb, inserts)
+        updates = self._claim(inserts=False, limit=batch_size)
+        if updates:
+            sent += self._flush_updates(sb, updates)
+        self.purge()
+        return sent
+
+    def _flush_inserts(self, sb: Any, entries: list[JournalEntry]) -> int:
+        """Un ``insert`` groupé ; s'il est refusé, reprise ligne par ligne."""
+        try:
+            res = sb.table("audit_logs").insert([e.insert_row() for e in entries]).execute()
+        except Exception as exc:
+            if len(entries) == 1:
+                logger.warning("Échec envoi de l'audit log journalisé #%s", entries[0].local_id, exc_info=True)
+                self._defer(entries, str(exc))
+                return 0
+            logger.warning(
+                "Échec envoi groupé de %d audit log(s) journalisé(s), reprise ligne par ligne",
+                len(entries), exc_info=True,
+            )
+            return sum(self._flush_inserts(sb, [entry]) for entry in entries)
+        remote_ids = [row["id"] for row in res.data or []]
+        if len(remote_ids) != len(entries):
+            # Lot peut-être écrit : pas de reprise ligne par ligne, qui le dupliquerait
+            error = f"{len(remote_ids)} id(s) reçus pour {len(entries)} log(s)"
+            logger.warning("Réponse d'insertion inattendue : %s", error)
+            self._defer(entries, error)
+            return 0
+        now = self._clock()
+        with self._transaction() as conn:
+            for entry, remote_id in zip(entries, remote_ids):
+                conn.execute(
+                    """UPDATE audit_journal
+                       SET remote_id = ?, synced_version = ?, attempts = 0, error = NULL,
+                           claimed_by = NULL, claimed_until = 0, updated_at = ?
+                       WHERE local_id = ?""",
+                    (remote_id, entry.version, now, entry.local_id),
+                )
+        return len(entries)
+
+    def _flush_updates(self, sb: Any, entries: list[JournalEntry]) -> int:
+        """Un ``update … where id in (…)`` par couple (statut, pipeline_url)."""
+        batches: dict[tuple[str | None, str | None], list[JournalEntry]] = {}
+        for entry in entries:
+            batches.setdefault((entry.status, entry.pipeline_url), []).append(entry)
+        sent = 0
+        for batch in batches.values():
+            try:
+                sb.table("audit_logs").update(batch[0].changes()).in_(
+                    "id", [e.remote_id for e in batch]
+                ).execute()
+            except Exception as exc:
+                if len(batch) > 1:
+                    logger.warning(
+                        "Échec mise à jour groupée de %d audit log(s) → %s, reprise ligne par ligne",
+                        len(batch), batch[0].status, exc_info=True,
+                    )
+                    sent += sum(self._flush_updates(sb, [entry]) for entry in batch)
+                    continue
+                logger.warning(
+                    "Échec mise à jour de l'audit log #%s → %s", batch[0].remote_id, batch[0].status, exc_info=True
+                )
+                self._defer(batch, str(exc))
+                continue
+            self._mark_synced(batch)
+            sent += len(batch)
+        return sent
+
+    def _mark_synced(self, entries: list[JournalEntry]) -> None:
+        now = self._clock()
+        with self._transaction() as conn:
+            conn.executemany(
+                """UPDATE audit_journal
+                   SET synced_version = ?, attempts = 0, error = NULL,
+                       claimed_by = NULL, claimed_until = 0, updated_at = ?
+                   WHERE local_id = ?""",
+                [(e.version, now, e.local_id) for e in entries],
+            )
+
+    def _defer(self, entries: list[JournalEntry], error: str) -> None:
+        """Replanifie un lot en échec (backoff exponentiel)."""
+        now = self._clock()
+        with self._transaction() as conn:
+            for entry in entries:
+                (attempts,) = conn.execute(
+                    "SELECT attempts FROM audit_journal WHERE local_id = ?", (entry.local_id,)
+                ).fetchone()
+                delay = min(self.backoff_seconds * 2 ** attempts, self.max_backoff)
+                conn.execute(
+                    """UPDATE audit_journal
+                       SET attempts = attempts + 1, next_attempt_at = ?, error = ?,
+                           claimed_by = NULL, claimed_until = 0
+                       WHERE local_id = ?""",
+                    (now + delay, error[:500], entry.local_id),
+                )
+
+    def next_due_in(self) -> float | None:
+        """Secondes avant la prochaine écriture due (None : rien à envoyer)."""
+        (next_due,) = self._connect().execute(
+            "SELECT MIN(MAX(next_attempt_at, claimed_until)) FROM audit_journal WHERE synced_version < version"
+        ).fetchone()
+        return None if next_due is None else max(next_due - self._clock(), 0.0)
+
+    def purge(self, retention: float = _RETENTION_S) -> int:
+        """Supprime les lignes synchronisées plus anciennes que ``retention``."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM audit_journal WHERE synced_version = version AND updated_at < ?",
+                (self._clock() - retention,),
+            )
+        return cursor.rowcount
+
+
+# ── Flush d'arrière-plan ──────────────────────────────────────────
+
+
+class AuditFlusher:
+    """Thread qui vide le journal vers Supabase.
+
+    Args:
+        journal: Journal à vider.
+        client: ``() -> client Supabase | None`` (``Config.get_supabase_client``).
+        idle_interval: Attente maximale entre deux flushs.
+    """
+
+    def __init__(
+        self,
+        journal: AuditJournal,
+        client: Callable[[], Any] | None = None,
+        idle_interval: float = 5.0,
+    ):
+        self.journal = journal
+        self.client = client
+        self.idle_interval = idle_interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="ecoarch-audit-journal", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def wake(self) -> None:
+        """Signale une écriture (évite d'attendre ``idle_interval``)."""
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                wait = self.run_once()
+            except Exception:
+                logger.warning("Erreur du flush du journal d'audit", exc_info=True)
+                wait = self.idle_interval
+            if wait > 0:
+                self._wake.wait(min(wait, self.idle_interval))
+                self._wake.clear()
+
+    def run_once(self) -> float:
+        """Un flush ; retourne l'attente conseillée (0 = continuer)."""
+        sb = (self.client or Config.get_supabase_client)()
+        if sb is None:
+            return self.idle_interval
+        if self.journal.flush(sb):
+            return 0.0
+        due_in = self.journal.next_due_in()
+        return self.idle_interval if due_in is None else due_in
+
+
+# ── Journal partagé du processus ──────────────────────────────────
+
+_journal: AuditJournal | None = None
+_flusher: AuditFlusher | None = None
+_journal_lock = threading.Lock()
+
+
+def get_audit_journal() -> AuditJournal | None:
+    """Journal partagé (flush démarré), ou None si la base est inutilisable."""
+    global _journal, _flusher
+    with _journal_lock:
+        if _journal is None:
+            try:
+                _journal = AuditJournal()
+            except (OSError, sqlite3.Error):
+                logger.warning("Journal d'audit indisponible", exc_info=True)
+                return None
+            _flusher = AuditFlusher(_journal)
+            _flusher.start()
+            atexit.register(_flusher.stop)
+        return _journal
+
+
+def journal_create(row: dict[str, Any]) -> int | None:
+    """Journalise un log et réveille le flush (None si journal indisponible)."""
+    journal = get_audit_journal()
+    if journal is None:
+        return None
+    try:
+        audit_id = journal.create(row)
+    except sqlite3.Error:
+        logger.warning("Échec journalisation audit log", exc_info=True)
+        return None
+    if _flusher is not None:
+        _flusher.wake()
+    return audit_id
+
+
+def journal_update(audit_id: int, status: str, pipeline_url: str = "") -> bool:
+    """Journalise une mise à jour et réveille le flush ; False si non journalisée."""
+    journal = get_audit_journal()
+    if journal is None:
+        return False
+    try:
+        recorded = journal.update(audit_id, status, pipeline_url)
+    except sqlite3.Error:
+        logger.warning("Échec journalisation audit #%s → %s", audit_id, status, exc_info=True)
+        return False
+    if recorded and _flusher is not None:
+        _flusher.wake()
+    return recorded
+
+
+__all__ = [
+    "AuditFlusher",
+    "AuditJournal",
+    "JournalEntry",
+    "get_audit_journal",
+    "journal_create",
+    "journal_update",
+]
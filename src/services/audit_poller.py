@@ -0,0 +1,194 @@
+"""Polling des logs d'audit partagé par toutes les sessions du processus.
+
+Une seule boucle par processus rafraîchit l'instantané des logs
+(``sync_pipeline_statuses_async`` + lecture incrémentale ``AuditLogView``)
+puis le diffuse aux sessions abonnées : la charge Supabase / GitLab ne
+dépend plus du nombre d'onglets ouverts.
+
+- la boucle démarre avec le premier abonné et s'arrête après le dernier ;
+- l'intervalle suit le backoff GreenOps (10 s → 120 s sans changement,
+  300 s minimum quand le webhook GitLab est configuré) ;
+- les rafraîchissements demandés en même temps (bouton, fin de
+  déploiement) partagent le même appel ;
+- chaque abonné ne garde que le dernier instantané non lu.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.config import Config
+from src.services.audit_service import AuditLogView, AuditService
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL_MIN_S = 10
+POLL_INTERVAL_MAX_S = 120
+# Webhook GitLab configuré : le polling ne sert plus qu'à la réconciliation
+RECONCILE_INTERVAL_S = 300
+_NO_CHANGE_POLLS_BEFORE_BACKOFF = 3
+_FETCH_LIMIT = 50
+
+Refresher = Callable[[list[dict[str, Any]]], Awaitable[tuple[bool, list[dict[str, Any]]]]]
+
+
+@dataclass(frozen=True)
+class AuditSnapshot:
+    """Logs d'audit bruts à un instant donné."""
+
+    rows: list[dict[str, Any]] = field(default_factory=list)
+    version: int = 0
+    interval_s: int = POLL_INTERVAL_MIN_S
+    fetched_at: float = 0.0
+
+
+_view = AuditLogView(limit=_FETCH_LIMIT)
+
+
+async def _default_refresh(rows: list[dict[str, Any]]) -> tuple[bool, list[dict[str, Any]]]:
+    """Met à jour les statuts GitLab en attente puis lit les logs modifiés."""
+    changed = await AuditService.sync_pipeline_statuses_async([dict(row) for row in rows])
+    fresh = await asyncio.to_thread(_view.refresh)
+    return changed, fresh
+
+
+def _webhook_enabled() -> bool:
+    return bool(getattr(Config, "GITLAB_WEBHOOK_SECRET", ""))
+
+
+class AuditPoller:
+    """Boucle de polling unique et diffusion de l'instantané aux sessions.
+
+    Args:
+        refresh: ``rows -> (statuts modifiés, nouvelles lignes)``.
+        min_interval: Intervalle après un changement (secondes).
+        max_interval: Plafond du backoff.
+        reconcile_interval: Intervalle minimal quand le webhook est actif.
+        webhook_enabled: Indique si le webhook GitLab est configuré.
+    """
+
+    def __init__(
+        self,
+        refresh: Refresher = _default_refresh,
+        min_interval: int = POLL_INTERVAL_MIN_S,
+        max_interval: int = POLL_INTERVAL_MAX_S,
+        reconcile_interval: int = RECONCILE_INTERVAL_S,
+        webhook_enabled: Callable[[], bool] = _webhook_enabled,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._refresh = refresh
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.reconcile_interval = reconcile_interval
+        self._webhook_enabled = webhook_enabled
+        self._clock = clock
+        self.snapshot = AuditSnapshot(interval_s=min_interval)
+        self._interval = min_interval
+        self._no_change = 0
+        self._subscribers: set[asyncio.Queue] = set()
+        self._inflight: asyncio.Future | None = None
+        self._task: asyncio.Task | None = None
+
+    # ── Abonnements ───────────────────────────────────────────────
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Nouvel abonné ; reçoit l'instantané courant puis chaque changement."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._subscribers.add(queue)
+        if self.snapshot.version:
+            queue.put_nowait(self.snapshot)
+        self._ensure_running()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def _publish(self, snapshot: AuditSnapshot) -> None:
+        for queue in list(self._subscribers):
+            if queue.full():
+                queue.get_nowait()  # seul le dernier instantané compte
+            queue.put_nowait(snapshot)
+
+    # ── Rafraîchissement ──────────────────────────────────────────
+
+    async def refresh(self) -> AuditSnapshot:
+        """Rafraîchit maintenant ; les appels concurrents partagent le même résultat."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._do_refresh())
+        return await asyncio.shield(self._inflight)
+
+    async def _do_refresh(self) -> AuditSnapshot:
+        try:
+            status_changed, rows = await self._refresh(self.snapshot.rows)
+        except Exception:
+            logger.warning("Échec rafraîchissement des logs d'audit", exc_info=True)
+            return self.snapshot
+        changed = status_changed or rows != self.snapshot.rows or not self.snapshot.version
+        self._update_interval(status_changed)
+        if changed:
+            self.snapshot = AuditSnapshot(rows, self.snapshot.version + 1, self.interval_s, self._clock())
+            self._publish(self.snapshot)
+        else:
+            self.snapshot = AuditSnapshot(
+                self.snapshot.rows, self.snapshot.version, self.interval_s, self._clock()
+            )
+        return self.snapshot
+
+    def _update_interval(self, status_changed: bool) -> None:
+        """Backoff exponentiel GreenOps."""
+        if status_changed:
+            self._no_change = 0
+            self._interval = self.min_interval
+            return
+        self._no_change += 1
+        if self._no_change >= _NO_CHANGE_POLLS_BEFORE_BACKOFF:
+            new_interval = min(self._interval * 2, self.max_interval)
+            if new_interval != self._interval:
+                logger.info(
+                    "Augmentation de l'intervalle de polling audit: %ss → %ss",
+                    self._interval,
+                    new_interval,
+                )
+            self._interval = new_interval
+            self._no_change = 0
+
+    @property
+    def interval_s(self) -> int:
+        if self._webhook_enabled():
+            return max(self._interval, self.reconcile_interval)
+        return self._interval
+
+    # ── Boucle ────────────────────────────────────────────────────
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        try:
+            while self._subscribers:
+                await self.refresh()
+                await asyncio.sleep(self.interval_s)
+        except Exception:
+            logger.warning("Audit poller stopped", exc_info=True)
+
+
+poller = AuditPoller()
+
+
+__all__ = [
+    "POLL_INTERVAL_MAX_S",
+    "POLL_INTERVAL_MIN_S",
+    "RECONCILE_INTERVAL_S",
+    "AuditPoller",
+    "AuditSnapshot",
+    "poller",
+]
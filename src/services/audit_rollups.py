@@ -0,0 +1,371 @@
+"""Agrégats FinOps des logs d'audit (coût et nombre par utilisateur, action, statut, jour).
+
+Les agrégats sont tenus à jour dans une base SQLite locale à partir des
+seules lignes créées ou modifiées depuis le dernier passage (lecture
+keyset ``AuditService.fetch_changed_logs``) : une requête d'agrégat lit
+quelques centaines de lignes pré-agrégées au lieu de tout l'historique.
+
+- ``rollup_members`` garde la contribution de chaque log (jour, user,
+  action, statut, coût) : un log qui change de statut est retiré de son
+  ancien agrégat avant d'être ajouté au nouveau ;
+- ``audit_rollups`` contient les sommes par (jour, user, action, statut) ;
+- le curseur (updated_at, id) est persisté avec les agrégats, dans la même
+  transaction ; la fenêtre relue sous le curseur (transactions validées
+  tardivement) ne change rien aux logs déjà intégrés à l'identique ;
+- une suppression dans ``audit_logs`` n'apparaît pas dans la lecture
+  keyset : ``reconcile()`` (appelé par ``refresh()`` toutes les
+  ``reconcile_interval`` secondes) compare les ids de ``rollup_members``
+  à ceux de Supabase, page par page, et retire les logs disparus.
+
+Nécessite la colonne ``updated_at`` d'``audit_logs`` (voir README).
+Rapport en ligne de commande :
+``python -m src.services.audit_rollups --since 2026-09-01 --by user``.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from src.services.audit_service import AuditCursor, AuditService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROLLUPS_PATH = Path(".ecoarch") / "audit_rollups.sqlite3"
+
+DIMENSIONS = ("day", "user", "action", "status")
+_ROLLUP_COLUMNS = ("id", "created_at", "updated_at", "user", "action", "status", "total_cost")
+_PAGE_SIZE = 500
+_MAX_PAGES = 10
+_RECONCILE_PAGE_SIZE = 5000
+_RECONCILE_INTERVAL_S = 3600.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_members (
+    id     INTEGER PRIMARY KEY,
+    day    TEXT NOT NULL,
+    user   TEXT NOT NULL,
+    action TEXT NOT NULL,
+    status TEXT NOT NULL,
+    cost   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS audit_rollups (
+    day    TEXT NOT NULL,
+    user   TEXT NOT NULL,
+    action TEXT NOT NULL,
+    status TEXT NOT NULL,
+    count  INTEGER NOT NULL,
+    cost   REAL NOT NULL,
+    PRIMARY KEY (day, user, action, status)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_cursor (
+    name       TEXT PRIMARY KEY,
+    updated_at TEXT NOT NULL,
+    id         INTEGER NOT NULL
+);
+"""
+
+ChangesFetcher = Callable[..., "list[dict[str, Any]] | None"]
+PagesIterator = Callable[..., Iterator[list[dict[str, Any]]]]
+
+
+def _member(row: dict[str, Any]) -> tuple[int, str, str, str, str, float]:
+    """Contribution d'un log : (id, jour, user, action, statut, coût)."""
+    try:
+        cost = float(row.get("total_cost") or 0.0)
+    except (TypeError, ValueError):
+        cost = 0.0
+    return (
+        int(row["id"]),
+        str(row.get("created_at") or "")[:10],
+        str(row.get("user") or ""),
+        str(row.get("action") or ""),
+        str(row.get("status") or ""),
+        cost,
+    )
+
+
+class AuditRollups:
+    """Agrégats incrémentaux des logs d'audit (SQLite, WAL).
+
+    Args:
+        path: Base SQLite (créée au besoin).
+        fetch_changes: ``(cursor, page_size=, max_pages=, columns=) -> lignes | None``.
+        iter_pages: ``(page_size=, columns=) -> pages`` de toute la table par id
+            croissant (``AuditService.iter_log_pages``, erreurs propagées).
+        reconcile_interval: Secondes entre deux réconciliations par ``refresh()``.
+        clock: Horloge (secondes), injectable pour les tests.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        fetch_changes: ChangesFetcher = AuditService.fetch_changed_logs,
+        iter_pages: PagesIterator = AuditService.iter_log_pages,
+        reconcile_interval: float = _RECONCILE_INTERVAL_S,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.path = Path(path or os.getenv("ECOARCH_AUDIT_ROLLUPS") or DEFAULT_ROLLUPS_PATH)
+        self._fetch_changes = fetch_changes
+        self._iter_pages = iter_pages
+        self.reconcile_interval = reconcile_interval
+        self._clock = clock
+        # Le premier refresh d'un processus relit déjà l'historique si besoin
+        self._reconciled_at = clock()
+        self._local = threading.local()
+        self._refresh_lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connect().executescript(_SCHEMA)
+
+    # ── Connexion (une par thread) ────────────────────────────────
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Transaction ``BEGIN IMMEDIATE`` (verrou d'écriture dès le début)."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # ── Mise à jour incrémentale ──────────────────────────────────
+
+    @property
+    def cursor(self) -> AuditCursor:
+        row = self._connect().execute(
+            "SELECT updated_at, id FROM rollup_cursor WHERE name = 'audit_logs'"
+        ).fetchone()
+        return AuditCursor(row["updated_at"], row["id"]) if row else AuditCursor()
+
+    def apply(self, rows: list[dict[str, Any]]) -> int:
+        """Intègre des logs nouveaux ou modifiés ; retourne le nombre appliqué."""
+        applied = 0
+        with self._transaction() as conn:
+            for row in rows:
+                if row.get("id") is None:
+                    continue
+                member = _member(row)
+                old = conn.execute(
+                    "SELECT day, user, action, status, cost FROM rollup_members WHERE id = ?",
+                    (member[0],),
+                ).fetchone()
+                if old is not None:
+                    if tuple(old) == member[1:]:
+                        continue
+                    self._add(conn, tuple(old)[:4], -1, -old["cost"])
+                conn.execute("INSERT OR REPLACE INTO rollup_members VALUES (?, ?, ?, ?, ?, ?)", member)
+                self._add(conn, member[1:5], 1, member[5])
+                applied += 1
+            if rows:
+                cursor = AuditCursor.after(rows, self.cursor)
+                conn.execute(
+                    "INSERT OR REPLACE INTO rollup_cursor (name, updated_at, id) VALUES ('audit_logs', ?, ?)",
+                    (cursor.updated_at, cursor.id),
+                )
+        return applied
+
+    @staticmethod
+    def _add(conn: sqlite3.Connection, key: tuple, count: int, cost: float) -> None:
+        conn.execute(
+            """INSERT INTO audit_rollups (day, user, action, status, count, cost)
+               VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT (day, user, action, status)
+               DO UPDATE SET count = count + excluded.count, cost = cost + excluded.cost""",
+            (*key, count, cost),
+        )
+        conn.execute(
+            "DELETE FROM audit_rollups WHERE day = ? AND user = ? AND action = ? AND status = ? AND count <= 0",
+            key,
+        )
+
+    def refresh(self) -> int | None:
+        """Lit les logs modifiés depuis le curseur ; None si Supabase est illisible.
+
+        Le premier appel parcourt tout l'historique, page par page. Un lot
+        complet qui ne fait pas avancer le curseur (uniquement des lignes
+        relues) arrête la boucle. Réconcilie ensuite les suppressions si
+        ``reconcile_interval`` est écoulé.
+        """
+        with self._refresh_lock:
+            applied = self._apply_changes()
+        if applied is not None and self._clock() - self._reconciled_at >= self.reconcile_interval:
+            self.reconcile()
+        return applied
+
+    def _apply_changes(self) -> int | None:
+        applied = 0
+        while True:
+            cursor = self.cursor
+            rows = self._fetch_changes(
+                cursor, page_size=_PAGE_SIZE, max_pages=_MAX_PAGES, columns=_ROLLUP_COLUMNS,
+            )
+            if rows is None:
+                return None
+            applied += self.apply(rows)
+            if len(rows) < _PAGE_SIZE * _MAX_PAGES or self.cursor == cursor:
+                return applied
+
+    def reconcile(self, page_size: int = _RECONCILE_PAGE_SIZE) -> int | None:
+        """Retire les logs supprimés d'``audit_logs`` ; retourne leur nombre (None si illisible).
+
+        Les ids sont lus par pages keyset : un log intégré dont l'id est
+        couvert par une page sans y figurer a été supprimé. Les ids au-delà
+        de la dernière page ne sont pas examinés (un log tout juste créé
+        peut y être intégré pendant le parcours) ; sans aucune page
+        (Supabase absent, table vide), rien n'est retiré.
+        """
+        with self._refresh_lock:
+            self._reconciled_at = self._clock()
+            removed, after_id = 0, 0
+            try:
+                for page in self._iter_pages(page_size=page_size, columns=("id",)):
+                    last_id = int(page[-1]["id"])
+                    removed += self._remove_missing(after_id, last_id, {int(row["id"]) for row in page})
+                    after_id = last_id
+            except Exception:
+                logger.warning("Échec réconciliation des agrégats d'audit", exc_info=True)
+                return None
+        if removed:
+            logger.info("%d log(s) supprimé(s) retiré(s) des agrégats d'audit", removed)
+        return removed
+
+    def _remove_missing(self, after_id: int, last_id: int, present: set[int]) -> int:
+        """Retire les membres d'id dans ``]after_id, last_id]`` absents de ``present``."""
+        with self._transaction() as conn:
+            gone = [
+                row for row in conn.execute(
+                    "SELECT * FROM rollup_members WHERE id > ? AND id <= ?", (after_id, last_id)
+                )
+                if row["id"] not in present
+            ]
+            for row in gone:
+                self._add(conn, (row["day"], row["user"], row["action"], row["status"]), -1, -row["cost"])
+            conn.executemany("DELETE FROM rollup_members WHERE id = ?", [(row["id"],) for row in gone])
+        return len(gone)
+
+    # ── Lecture ───────────────────────────────────────────────────
+
+    def summary(
+        self,
+        by: tuple[str, ...] = ("user",),
+        since: str | None = None,
+        until: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Coût et nombre de logs par ``by`` (jours ``YYYY-MM-DD`` inclus), coût décroissant."""
+        unknown = set(by) - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Dimension inconnue: {', '.join(sorted(unknown))}")
+        columns = ", ".join(by)
+        where, params = [], []
+        if since:
+            where.append("day >= ?")
+            params.append(since)
+        if until:
+            where.append("day <= ?")
+            params.append(until)
+        sql = f"SELECT {columns + ', ' if by else ''}SUM(count) AS count, SUM(cost) AS cost FROM audit_rollups"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if by:
+            sql += f" GROUP BY {columns}"
+        sql += " ORDER BY cost DESC" + "".join(f", {d}" for d in by)
+        return [
+            {**dict(row), "count": row["count"] or 0, "cost": round(row["cost"] or 0.0, 2)}
+            for row in self._connect().execute(sql, params)
+        ]
+
+
+# ── Agrégats partagés du processus ────────────────────────────────
+
+_rollups: AuditRollups | None = None
+_rollups_lock = threading.Lock()
+
+
+def get_audit_rollups() -> AuditRollups | None:
+    """Agrégats partagés, ou None si la base est inutilisable."""
+    global _rollups
+    with _rollups_lock:
+        if _rollups is None:
+            try:
+                _rollups = AuditRollups()
+            except (OSError, sqlite3.Error):
+                logger.warning("Agrégats d'audit indisponibles", exc_info=True)
+                return None
+        return _rollups
+
+
+def dashboard_summary(days: int = 30, today: date | None = None) -> dict[str, Any] | None:
+    """Synthèse des ``days`` derniers jours pour le tableau de bord (None si indisponible).
+
+    Met d'abord les agrégats à jour (lecture des seuls logs modifiés).
+    """
+    rollups = get_audit_rollups()
+    if rollups is None:
+        return None
+    if rollups.refresh() is None:
+        logger.info("Agrégats d'audit non rafraîchis (Supabase illisible)")
+    today = today or datetime.now(UTC).date()
+    since = (today - timedelta(days=days - 1)).isoformat()
+    (total,) = rollups.summary((), since=since)
+    return {
+        "since": since,
+        "count": total["count"],
+        "cost": total["cost"],
+        "by_user": rollups.summary(("user",), since=since),
+        "by_action": rollups.summary(("action",), since=since),
+        "by_status": rollups.summary(("status",), since=since),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """CLI : met à jour et réconcilie les agrégats puis affiche coût et nombre par dimension."""
+    cli = argparse.ArgumentParser(description="Synthèse FinOps des logs d'audit")
+    cli.add_argument("--by", default="user", help=f"Dimensions séparées par des virgules ({', '.join(DIMENSIONS)})")
+    cli.add_argument("--since", help="Premier jour inclus (YYYY-MM-DD)")
+    cli.add_argument("--until", help="Dernier jour inclus (YYYY-MM-DD)")
+    cli.add_argument("--offline", action="store_true", help="Sans lecture Supabase (agrégats locaux)")
+    args = cli.parse_args(argv)
+
+    rollups = AuditRollups()
+    if not args.offline and (rollups.refresh() is None or rollups.reconcile() is None):
+        logger.warning("Supabase illisible : agrégats locaux affichés")
+    by = tuple(d.strip() for d in args.by.split(",") if d.strip())
+    try:
+        rows = rollups.summary(by, since=args.since, until=args.until)
+    except ValueError as exc:
+        logger.error("%s", exc)
+        return 2
+    for row in rows:
+        label = " / ".join(str(row[d]) for d in by) or "total"
+        sys.stdout.write(f"{label}\t{row['count']}\t{row['cost']:.2f}\n")
+    return 0
+
+
+__all__ = ["DIMENSIONS", "AuditRollups", "dashboard_summary", "get_audit_rollups", "main"]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
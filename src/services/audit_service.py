@@ -3,14 +3,220 @@
 Centralise les interactions avec Supabase pour l'historique des actions (Audit Logs).
 Extrait la logique métier de frontend/state.py.
 """
+import asyncio
 import logging
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from typing import Any
 
 from src.config import Config
-from src.deployer import check_pipeline_status, extract_pipeline_id
+from src.deployer import (
+    extract_pipeline_id,
+    fetch_pipeline_statuses,
+    fetch_pipeline_statuses_async,
+)
+from src.services.audit_journal import journal_create, journal_update
 
 logger = logging.getLogger(__name__)
 
+# Statuts intermédiaires : le pipeline associé peut encore évoluer
+TRACKED_STATUSES = ("PENDING", "PIPELINE_SENT", "RUNNING")
+
+# Colonnes affichées / utilisées par l'UI (projection au lieu de ``*``)
+AUDIT_COLUMNS = (
+    "id", "created_at", "user", "action", "resources_summary",
+    "total_cost", "status", "pipeline_url",
+)
+# Lecture incrémentale : lignes créées ou modifiées après le curseur
+_INCREMENTAL_COLUMNS = (*AUDIT_COLUMNS, "updated_at")
+_CHANGES_PAGE_SIZE = 100
+_CHANGES_MAX_PAGES = 10
+# Relecture sous le curseur : ``updated_at = now()`` date le début de la
+# transaction, une ligne validée tardivement peut arriver sous le curseur
+_CURSOR_OVERLAP = timedelta(seconds=30)
+
+# Marge sous la création du plus ancien log suivi pour borner la liste
+# des pipelines (décalage d'horloge, pipeline créé juste avant l'audit)
+_UPDATED_AFTER_MARGIN = timedelta(minutes=10)
+
+
+def _updated_after(rows: list[dict[str, Any]]) -> str | None:
+    """Borne ``updated_after`` (ISO 8601) couvrant tous les logs suivis."""
+    oldest: datetime | None = None
+    for row in rows:
+        try:
+            created = datetime.fromisoformat(str(row.get("created_at") or ""))
+        except ValueError:
+            return None  # date inconnue : pas de borne plutôt qu'une borne fausse
+        if oldest is None or created < oldest:
+            oldest = created
+    if oldest is None:
+        return None
+    return (oldest - _UPDATED_AFTER_MARGIN).isoformat()
+
+
+def _tracked_rows(logs: list[dict[str, Any]]) -> list[tuple[dict[str, Any], int]]:
+    """Logs à statut intermédiaire, avec leur pipeline_id."""
+    tracked: list[tuple[dict[str, Any], int]] = []
+    for row in logs:
+        # On ne vérifie que les statuts intermédiaires
+        if row.get("status", "") not in TRACKED_STATUSES:
+            continue
+        p_id = extract_pipeline_id(row.get("pipeline_url", ""))
+        if p_id:
+            tracked.append((row, p_id))
+    return tracked
+
+
+def _write_statuses(
+    sb: Any,
+    tracked: list[tuple[dict[str, Any], int]],
+    statuses: dict[int, str],
+) -> bool:
+    """Enregistre les statuts qui ont changé ; True si au moins un a été écrit.
+
+    Une requête par statut cible (``update … where id in (…)``) au lieu
+    d'une par ligne ; si le lot échoue, ses lignes sont reprises une à une.
+    Les lignes en mémoire ne sont modifiées qu'une fois l'écriture faite :
+    celles dont l'écriture a échoué gardent leur ancien statut et seront
+    retentées au prochain passage.
+    """
+    batches: dict[str, list[dict[str, Any]]] = {}
+    for row, p_id in tracked:
+        new_status = statuses.get(p_id)
+        if new_status and new_status != row.get("status"):
+            batches.setdefault(new_status, []).append(row)
+    written = False
+    for new_status, rows in batches.items():
+        try:
+            sb.table("audit_logs").update({"status": new_status}).in_(
+                "id", [row["id"] for row in rows]
+            ).execute()
+        except Exception:
+            logger.warning(
+                "Échec sync groupée de %d log(s) → %s, reprise ligne par ligne",
+                len(rows), new_status, exc_info=True,
+            )
+            rows = _write_rows_one_by_one(sb, rows, new_status)
+        for row in rows:
+            row["status"] = new_status  # Update in-place for UI
+        written = written or bool(rows)
+    return written
+
+
+def _write_rows_one_by_one(sb: Any, rows: list[dict[str, Any]], status: str) -> list[dict[str, Any]]:
+    """Repli ligne par ligne ; retourne les lignes effectivement écrites."""
+    written = []
+    for row in rows:
+        try:
+            sb.table("audit_logs").update({"status": status}).eq("id", row["id"]).execute()
+            written.append(row)
+        except Exception:
+            logger.warning(
+                "Échec sync pipeline #%s → %s",
+                row.get("id"),
+                status,
+                exc_info=True,
+            )
+    return written
+
+
+@dataclass(frozen=True)
+class AuditCursor:
+    """Dernière position lue (updated_at, id) de la table audit_logs."""
+
+    updated_at: str = ""
+    id: int = 0
+
+    @classmethod
+    def after(cls, rows: list[dict[str, Any]], start: "AuditCursor | None" = None) -> "AuditCursor":
+        """Curseur positionné après la plus grande clé (updated_at, id) de ``rows``."""
+        best = start or cls()
+        for row in rows:
+            key = cls(str(row.get("updated_at") or ""), int(row.get("id") or 0))
+            if (key.updated_at, key.id) > (best.updated_at, best.id):
+                best = key
+        return best
+
+    def rewound(self, overlap: timedelta = _CURSOR_OVERLAP) -> str | None:
+        """``updated_at`` du curseur moins ``overlap`` (None si la date est illisible)."""
+        try:
+            return (datetime.fromisoformat(self.updated_at) - overlap).isoformat()
+        except ValueError:
+            return None
+
+
+class AuditLogView:
+    """Vue en mémoire des derniers logs, indexée par id et mise à jour par delta.
+
+    Le premier appel charge les ``limit`` derniers logs ; les suivants ne
+    lisent que les lignes modifiées depuis le curseur et les fusionnent.
+    Sans colonne ``updated_at`` côté Supabase, chaque appel recharge la
+    liste complète (projection seulement).
+
+    Args:
+        limit: Nombre de logs conservés (les plus récents par création).
+    """
+
+    def __init__(self, limit: int = 50):
+        self.limit = limit
+        self.cursor: AuditCursor | None = None
+        self.incremental = True
+        self._rows: dict[int, dict[str, Any]] = {}
+        self._ordered: list[dict[str, Any]] = []
+
+    @property
+    def rows(self) -> list[dict[str, Any]]:
+        """Logs du plus récent au plus ancien."""
+        return self._ordered
+
+    def refresh(self) -> list[dict[str, Any]]:
+        """Met la vue à jour ; retourne la même liste si rien n'a changé."""
+        if self.cursor is None or not self.incremental:
+            columns = _INCREMENTAL_COLUMNS if self.incremental else AUDIT_COLUMNS
+            rows = AuditService.fetch_recent_logs(limit=self.limit, columns=columns)
+            if self.incremental and any(not row.get("updated_at") for row in rows):
+                self.incremental = False  # colonne absente ou non renseignée
+            self._rows = {}
+            self.merge(rows, reset=True)
+            if self.incremental:
+                self.cursor = AuditCursor.after(rows)
+            return self._ordered
+
+        changes = AuditService.fetch_changed_logs(self.cursor)
+        if changes is None:
+            logger.info("Lecture incrémentale des audit logs désactivée (rechargement complet)")
+            self.incremental = False
+            return self.refresh()
+        self.merge(changes)
+        return self._ordered
+
+    def merge(self, rows: list[dict[str, Any]], reset: bool = False) -> bool:
+        """Fusionne des lignes par id ; True si la vue affichée a changé."""
+        changed = reset
+        for row in rows:
+            row_id = row.get("id")
+            if row_id is None:
+                continue
+            if self._rows.get(row_id) != row:
+                self._rows[row_id] = row
+                changed = True
+        if self.cursor is not None and rows and not reset:
+            self.cursor = AuditCursor.after(rows, self.cursor)
+        if changed:
+            ordered = sorted(
+                self._rows.values(),
+                key=lambda r: (str(r.get("created_at") or ""), r.get("id") or 0),
+                reverse=True,
+            )[: self.limit]
+            if ordered != self._ordered:
+                self._ordered = ordered
+            else:
+                changed = False
+            self._rows = {r["id"]: r for r in ordered}
+        return changed
+
 
 class AuditService:
     """Service d'audit (Singleton sans état ou méthodes statiques)."""
@@ -24,22 +230,32 @@ class AuditService:
         cost: float,
         pipeline_url: str = "",
     ) -> int | None:
-        """Crée une entrée dans la table audit_logs."""
+        """Crée une entrée dans la table audit_logs.
+
+        L'entrée est journalisée localement et envoyée en arrière-plan
+        (voir ``audit_journal``) : l'id retourné est alors un id local
+        négatif, accepté tel quel par ``update_log``. Sans journal
+        utilisable, l'insertion est faite directement.
+        """
         sb = Config.get_supabase_client()
         if not sb:
             return None
 
-        try:
-            row = {
-                "user": user,
-                "action": action,
-                "resources_summary": resources_summary,
-                "total_cost": cost,
-                "status": "PENDING",
-            }
-            if pipeline_url:
-                row["pipeline_url"] = pipeline_url
+        row = {
+            "user": user,
+            "action": action,
+            "resources_summary": resources_summary,
+            "total_cost": cost,
+            "status": "PENDING",
+        }
+        if pipeline_url:
+            row["pipeline_url"] = pipeline_url
 
+        audit_id = journal_create(row)
+        if audit_id is not None:
+            return audit_id
+
+        try:
             res = sb.table("audit_logs").insert(row).execute()
             return res.data[0]["id"] if res.data else None
         except Exception:
@@ -50,7 +266,7 @@ class AuditService:
 
     @staticmethod
     def update_log(audit_id: int | None, status: str, pipeline_url: str = "") -> None:
-        """Met à jour le statut d'un log existant."""
+        """Met à jour le statut d'un log existant (id Supabase ou id local journalisé)."""
         if not audit_id:
             return
 
@@ -58,6 +274,12 @@ class AuditService:
         if not sb:
             return
 
+        if journal_update(audit_id, status, pipeline_url):
+            return
+        if audit_id < 0:
+            logger.warning("Audit local #%s inconnu du journal, statut %s ignoré", -audit_id, status)
+            return
+
         try:
             update_data: dict[str, Any] = {"status": status}
             if pipeline_url:
@@ -70,8 +292,11 @@ class AuditService:
             )
 
     @staticmethod
-    def fetch_recent_logs(limit: int = 50) -> list[dict[str, Any]]:
-        """Récupère les derniers logs."""
+    def fetch_recent_logs(
+        limit: int = 50,
+        columns: tuple[str, ...] = AUDIT_COLUMNS,
+    ) -> list[dict[str, Any]]:
+        """Récupère les derniers logs (colonnes ``columns`` seulement)."""
         sb = Config.get_supabase_client()
         if not sb:
             return []
@@ -79,7 +304,7 @@ class AuditService:
         try:
             res = (
                 sb.table("audit_logs")
-                .select("*")
+                .select(",".join(columns))
                 .order("created_at", desc=True)
                 .limit(limit)
                 .execute()
@@ -89,46 +314,171 @@ class AuditService:
             logger.warning("Échec chargement audit logs", exc_info=True)
             return []
 
+    @staticmethod
+    def fetch_changed_logs(
+        cursor: "AuditCursor",
+        page_size: int = _CHANGES_PAGE_SIZE,
+        max_pages: int = _CHANGES_MAX_PAGES,
+        columns: tuple[str, ...] = _INCREMENTAL_COLUMNS,
+    ) -> list[dict[str, Any]] | None:
+        """Logs créés ou modifiés après ``cursor`` (pagination keyset).
+
+        Filtre ``(updated_at, id) > curseur`` trié sur ``(updated_at, id)``.
+        La première page repart de ``updated_at - _CURSOR_OVERLAP`` pour
+        rattraper les transactions validées après un poll mais datées
+        avant lui ; les lignes relues sont dédoublonnées par id (dernière
+        version gardée) et l'appelant les fusionne par id. Nécessite la
+        colonne ``updated_at`` (voir README) ; retourne None si la requête
+        échoue, l'appelant rechargeant alors la liste complète.
+        ``columns`` doit contenir ``id`` et ``updated_at``.
+        """
+        sb = Config.get_supabase_client()
+        if not sb:
+            return None
+
+        selected = ",".join(columns)
+        rows: dict[int, dict[str, Any]] = {}
+        since = cursor.rewound() if cursor.updated_at else None
+        try:
+            for _ in range(max_pages):
+                query = sb.table("audit_logs").select(selected)
+                if since is not None:
+                    query = query.gt("updated_at", since)
+                elif cursor.updated_at:
+                    ts = cursor.updated_at
+                    query = query.or_(
+                        f'updated_at.gt."{ts}",and(updated_at.eq."{ts}",id.gt.{cursor.id})'
+                    )
+                res = query.order("updated_at").order("id").limit(page_size).execute()
+                page = res.data or []
+                for row in page:
+                    rows.pop(row.get("id"), None)
+                    rows[row.get("id")] = row
+                if len(page) < page_size:
+                    break
+                cursor, since = AuditCursor.after(page), None
+            return list(rows.values())
+        except Exception:
+            logger.warning("Échec lecture incrémentale des audit logs", exc_info=True)
+            return None
+
+    @staticmethod
+    def iter_log_pages(
+        page_size: int = 1000,
+        columns: tuple[str, ...] = AUDIT_COLUMNS,
+        after_id: int = 0,
+    ) -> Iterator[list[dict[str, Any]]]:
+        """Parcourt toute la table par pages keyset ``id > dernier id`` (ordre des ids).
+
+        Chaque page coûte une requête indexée, quelle que soit sa position
+        (pas d'``OFFSET``). ``columns`` doit contenir ``id``. Contrairement
+        aux lectures de l'UI, une erreur Supabase est propagée : un export
+        partiel ne doit pas passer pour complet.
+
+        Le parcours ne s'arrête que sur une page vide : PostgREST plafonne
+        silencieusement ``limit`` (max-rows), une page plus courte que
+        ``page_size`` ne signifie donc pas que la table est épuisée.
+        """
+        sb = Config.get_supabase_client()
+        if not sb:
+            return
+        selected = ",".join(columns)
+        while True:
+            res = (
+                sb.table("audit_logs")
+                .select(selected)
+                .gt("id", after_id)
+                .order("id")
+                .limit(page_size)
+                .execute()
+            )
+            page = res.data or []
+            if not page:
+                return
+            yield page
+            after_id = page[-1]["id"]
+
+    @staticmethod
+    def count_logs() -> int | None:
+        """Nombre total de logs (None si inconnu)."""
+        sb = Config.get_supabase_client()
+        if not sb:
+            return None
+        try:
+            res = sb.table("audit_logs").select("id", count="exact").limit(1).execute()
+            return res.count
+        except Exception:
+            logger.warning("Échec comptage des audit logs", exc_info=True)
+            return None
+
+    @staticmethod
+    def apply_pipeline_status(pipeline_id: int, status: str) -> int:
+        """Reporte le statut d'un pipeline sur ses logs encore en cours.
+
+        Les logs déjà dans un état final ne sont pas modifiés (événements
+        webhook rejoués ou reçus dans le désordre).
+
+        Retourne le nombre de lignes mises à jour.
+        """
+        sb = Config.get_supabase_client()
+        if not sb:
+            return 0
+
+        try:
+            res = (
+                sb.table("audit_logs")
+                .update({"status": status})
+                .like("pipeline_url", f"%/pipelines/{int(pipeline_id)}")
+                .in_("status", list(TRACKED_STATUSES))
+                .execute()
+            )
+            return len(res.data or [])
+        except Exception:
+            logger.warning(
+                "Échec mise à jour audit du pipeline %s → %s", pipeline_id, status, exc_info=True
+            )
+            return 0
+
     @staticmethod
     def sync_pipeline_statuses(logs: list[dict[str, Any]]) -> bool:
         """Vérifie et met à jour le statut des pipelines GitLab en attente.
-        
+
+        Les statuts sont résolus en lot (liste paginée des pipelines du
+        projet + cache TTL partagé) plutôt qu'un appel API par log.
+
         Retourne True si au moins un statut a changé.
         """
-        if check_pipeline_status is None or extract_pipeline_id is None:
-            return False
-
         sb = Config.get_supabase_client()
         if not sb:
             return False
 
-        any_change = False
+        tracked = _tracked_rows(logs)
+        if not tracked:
+            return False
 
-        for row in logs:
-            status = row.get("status", "")
-            # On ne vérifie que les statuts intermédiaires
-            if status not in ("PENDING", "PIPELINE_SENT"):
-                continue
+        statuses = fetch_pipeline_statuses(
+            {p_id for _, p_id in tracked},
+            updated_after=_updated_after([row for row, _ in tracked]),
+        )
+        return _write_statuses(sb, tracked, statuses)
 
-            p_url = row.get("pipeline_url", "")
-            p_id = extract_pipeline_id(p_url)
-            if not p_id:
-                continue
+    @staticmethod
+    async def sync_pipeline_statuses_async(logs: list[dict[str, Any]]) -> bool:
+        """Variante asynchrone de ``sync_pipeline_statuses``.
 
-            new_status = check_pipeline_status(p_id)
-            if new_status and new_status != status:
-                any_change = True
-                try:
-                    sb.table("audit_logs").update({"status": new_status}).eq(
-                        "id", row["id"]
-                    ).execute()
-                    row["status"] = new_status  # Update in-place for UI
-                except Exception:
-                    logger.warning(
-                        "Échec sync pipeline #%s → %s",
-                        row.get("id"),
-                        new_status,
-                        exc_info=True,
-                    )
-        
-        return any_change
+        Les appels GitLab passent par le client httpx partagé ; les
+        écritures Supabase (client bloquant) sont faites dans un thread.
+        """
+        sb = Config.get_supabase_client()
+        if not sb:
+            return False
+
+        tracked = _tracked_rows(logs)
+        if not tracked:
+            return False
+
+        statuses = await fetch_pipeline_statuses_async(
+            {p_id for _, p_id in tracked},
+            updated_after=_updated_after([row for row, _ in tracked]),
+        )
+        return await asyncio.to_thread(_write_statuses, sb, tracked, statuses)
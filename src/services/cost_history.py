@@ -0,0 +1,273 @@
+"""Écriture asynchrone et fiable de l'historique des coûts (table cost_history).
+
+Les jobs CI ne doivent ni attendre Supabase ni perdre un enregistrement
+quand il est indisponible :
+
+- le client Supabase est celui du pool applicatif (``Config.get_supabase_client``) ;
+- les enregistrements sont mis en tampon puis insérés par lots depuis un
+  thread d'arrière-plan, avec retry et backoff exponentiel (jitter) ;
+- un lot qui échoue définitivement est ajouté à un *spool* local
+  (JSON lines, append-only) rejoué automatiquement au prochain succès ;
+- à la sortie du processus, on attend au plus ``exit_timeout`` secondes ;
+  ce qui n'a pas pu partir est spoolé (livraison *at-least-once*).
+"""
+from __future__ import annotations
+
+import atexit
+import fcntl
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+TABLE = "cost_history"
+DEFAULT_SPOOL_PATH = Path(".ecoarch") / "cost_history.spool.jsonl"
+
+
+class CostHistoryWriter:
+    """Writer par lots de ``cost_history`` avec spool local des échecs.
+
+    Args:
+        spool_path: Fichier JSON lines des enregistrements non envoyés.
+        batch_size: Taille maximale d'un insert.
+        max_attempts: Tentatives par lot avant spool.
+        backoff_seconds: Délai de base du backoff exponentiel.
+        flush_interval: Délai maximal avant l'envoi d'un lot incomplet.
+        exit_timeout: Attente maximale à la fermeture (``close``).
+        client_factory: Fournit le client Supabase (défaut : pool ``Config``).
+    """
+
+    def __init__(
+        self,
+        spool_path: str | Path | None = None,
+        batch_size: int = 50,
+        max_attempts: int = 4,
+        backoff_seconds: float = 0.5,
+        flush_interval: float = 1.0,
+        exit_timeout: float = 10.0,
+        client_factory: Callable[[], Any] | None = None,
+    ):
+        self.spool_path = Path(
+            spool_path or os.getenv("ECOARCH_HISTORY_SPOOL") or DEFAULT_SPOOL_PATH
+        )
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.flush_interval = flush_interval
+        self.exit_timeout = exit_timeout
+        self._client_factory = client_factory or Config.get_supabase_client
+
+        self._lock = threading.Lock()
+        self._spool_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._buffer: list[dict[str, Any]] = []
+        self._inflight: list[dict[str, Any]] | None = None
+        self._closed = False
+        self._worker: threading.Thread | None = None
+
+    # ── API publique ──────────────────────────────────────────────
+
+    def add(self, record: dict[str, Any]) -> None:
+        """Met un enregistrement en file (non bloquant)."""
+        with self._lock:
+            if self._closed:
+                # Trop tard pour le thread : directement sur disque
+                self._spool([record])
+                return
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.batch_size
+            self._ensure_worker()
+        if full:
+            self._wake.set()
+
+    def close(self, timeout: float | None = None) -> None:
+        """Vide le tampon (attente bornée) ; le reliquat est spoolé."""
+        with self._lock:
+            self._closed = True
+            worker = self._worker
+        self._wake.set()
+        if worker is not None:
+            worker.join(self.exit_timeout if timeout is None else timeout)
+
+        with self._lock:
+            pending = self._buffer + (self._inflight or [])
+            self._buffer, self._inflight = [], None
+        if pending:
+            logger.warning(
+                "cost_history: %d enregistrement(s) non envoyé(s) → spool %s",
+                len(pending), self.spool_path,
+            )
+            self._spool(pending)
+
+    def replay_spool(self) -> int:
+        """Rejoue le spool (synchrone). Retourne le nombre de lignes insérées.
+
+        Le rejeu se fait sous un ``flock`` exclusif non bloquant sur
+        ``<spool>.lock`` : un seul processus (ou thread) rejoue à la fois,
+        les autres rendent 0. Un ``.draining`` laissé par un rejeu
+        interrompu est repris par le prochain détenteur du verrou (le noyau
+        libère le ``flock`` d'un processus mort).
+        """
+        draining = self.spool_path.with_name(self.spool_path.name + ".draining")
+        with self._drain_lock() as acquired:
+            if not acquired:
+                return 0
+            if not draining.exists():
+                try:
+                    os.replace(self.spool_path, draining)
+                except FileNotFoundError:
+                    return 0
+            records = self._read_spool(draining)
+
+            sent = 0
+            for start in range(0, len(records), self.batch_size):
+                batch = records[start:start + self.batch_size]
+                if not self._insert_with_retry(batch):
+                    self._spool(records[start:])
+                    break
+                sent += len(batch)
+            draining.unlink(missing_ok=True)
+        if sent:
+            logger.info("cost_history: %d enregistrement(s) rejoué(s) depuis le spool", sent)
+        return sent
+
+    @contextmanager
+    def _drain_lock(self) -> Iterator[bool]:
+        """``flock`` exclusif non bloquant du rejeu ; True si obtenu."""
+        lock_path = self.spool_path.with_name(self.spool_path.name + ".lock")
+        try:
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError:
+            logger.warning("cost_history: verrou de rejeu impossible (%s)", lock_path, exc_info=True)
+            yield False
+            return
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    # ── Thread d'envoi ────────────────────────────────────────────
+
+    def _ensure_worker(self) -> None:
+        """Démarre le thread d'envoi (appelé sous ``_lock``)."""
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run, name="cost-history-writer", daemon=True
+            )
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            with self._lock:
+                batch = self._buffer[:self.batch_size]
+                del self._buffer[:self.batch_size]
+                self._inflight = batch or None
+                closed = self._closed
+                remaining = bool(self._buffer)
+
+            if batch:
+                ok = self._insert_with_retry(batch)
+                with self._lock:
+                    # close() a pu reprendre le lot pendant l'envoi
+                    owned = self._inflight is batch
+                    self._inflight = None
+                if not ok and owned:
+                    self._spool(batch)
+                elif ok and self.spool_path.exists():
+                    self.replay_spool()
+            if closed and not batch:
+                return
+            if remaining or closed:
+                self._wake.set()
+
+    def _insert_with_retry(self, batch: list[dict[str, Any]]) -> bool:
+        client = self._client_factory()
+        if client is None:
+            return False
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                client.table(TABLE).insert(batch).execute()
+                return True
+            except Exception as exc:  # noqa: BLE001 — toute erreur du client (réseau, PostgREST) est retentée
+                if attempt == self.max_attempts:
+                    logger.warning(
+                        "cost_history: insert de %d ligne(s) en échec après %d tentatives – %s",
+                        len(batch), attempt, exc,
+                    )
+                    return False
+                delay = self.backoff_seconds * (2 ** (attempt - 1))
+                time.sleep(delay * random.uniform(0.5, 1.5))
+        return False
+
+    # ── Spool (JSON lines append-only) ────────────────────────────
+
+    def _spool(self, records: list[dict[str, Any]]) -> None:
+        payload = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        with self._spool_lock:
+            try:
+                self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.spool_path, "a", encoding="utf-8") as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError:
+                logger.exception(
+                    "cost_history: spool impossible (%s), %d ligne(s) perdue(s)",
+                    self.spool_path, len(records),
+                )
+
+    @staticmethod
+    def _read_spool(path: Path) -> list[dict[str, Any]]:
+        records: list[dict[str, Any]] = []
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Dernière ligne tronquée par un arrêt brutal
+                    logger.warning("cost_history: ligne %d du spool illisible, ignorée", line_no)
+        return records
+
+
+# ── Instance partagée du processus ────────────────────────────────
+
+_writer: CostHistoryWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def get_cost_history_writer() -> CostHistoryWriter | None:
+    """Writer partagé (fermé à la sortie), ou None si Supabase n'est pas configuré."""
+    global _writer
+    if Config.get_supabase_client() is None:
+        return None
+    with _writer_lock:
+        if _writer is None:
+            _writer = CostHistoryWriter()
+            atexit.register(_writer.close)
+        return _writer
+
+
+__all__ = ["CostHistoryWriter", "get_cost_history_writer"]
@@ -0,0 +1,87 @@
+"""Idempotence et exclusion mutuelle des déploiements.
+
+Un double clic ou un rejeu de ``start_deployment`` / ``start_destruction``
+ne doit ni relancer un pipeline GitLab identique ni lancer deux
+``terraform apply`` concurrents sur le même state :
+
+- ``request_fingerprint`` identifie une demande par (deployment_id, action,
+  panier canonique) ; la file de déclenchement (``DeployQueue.enqueue``)
+  retourne le job existant pour une empreinte déjà vue dans la fenêtre
+  ``DEDUP_WINDOW_S`` ;
+- ``deployment_lock`` est un verrou exclusif par deployment_id (``flock``
+  sur un fichier, donc partagé entre threads et processus) pour les
+  exécutions Terraform locales. Côté GitLab, le job ``terraform_deploy``
+  est sérialisé par ``resource_group``.
+"""
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import os
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+DEFAULT_LOCK_DIR = Path(".ecoarch") / "locks"
+DEDUP_WINDOW_S = 600.0
+
+_SAFE_NAME_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class DeploymentBusyError(RuntimeError):
+    """Levée quand une opération Terraform est déjà en cours sur ce déploiement."""
+
+    def __init__(self, deployment_id: str):
+        self.deployment_id = deployment_id
+        super().__init__(f"Opération déjà en cours pour le déploiement {deployment_id}")
+
+
+def request_fingerprint(deployment_id: str, action: str, resources: list[dict[str, Any]]) -> str:
+    """Empreinte SHA-256 d'une demande (clés triées, ordre du panier conservé).
+
+    L'ordre des ressources est significatif : il fixe les index ``count``
+    côté Terraform.
+    """
+    canonical = json.dumps(
+        {"deployment_id": deployment_id, "action": action, "resources": resources},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@contextmanager
+def deployment_lock(deployment_id: str, lock_dir: str | Path | None = None) -> Iterator[None]:
+    """Verrou exclusif non bloquant sur un déploiement.
+
+    Raises:
+        DeploymentBusyError: si le verrou est déjà détenu (ce processus ou un autre).
+    """
+    directory = Path(lock_dir or os.getenv("ECOARCH_LOCK_DIR") or DEFAULT_LOCK_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{_SAFE_NAME_RE.sub('_', deployment_id)}.lock"
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise DeploymentBusyError(deployment_id) from None
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+__all__ = [
+    "DEDUP_WINDOW_S",
+    "DeploymentBusyError",
+    "deployment_lock",
+    "request_fingerprint",
+]
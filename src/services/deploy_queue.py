@@ -0,0 +1,612 @@
+"""File durable des déclenchements de pipeline GitLab (SQLite, WAL).
+
+``State.start_deployment`` n'appelle plus l'API Trigger en direct : la
+demande est écrite dans une file SQLite locale puis envoyée par un worker
+d'arrière-plan, ce qui évite de perdre des déploiements lors d'une rafale
+(limites de débit GitLab) ou d'un redémarrage :
+
+- la file survit au processus (journal WAL) ; un job ``running`` dont le
+  bail (``updated_at`` + ``lease_s``) a expiré est remis en file, et
+  seulement lui : un worker qui démarre dans un autre processus ne
+  reprend pas un job en cours d'envoi ;
+- le débit est limité par projet GitLab avec un *token bucket* stocké dans
+  la même base : plusieurs workers/processus partagent le même plafond ;
+- les échecs transitoires (429, 5xx, réseau avant envoi) sont rejoués
+  avec backoff exponentiel, les autres marquent le job ``failed`` ;
+- un envoi ambigu (timeout de lecture, connexion coupée, bail expiré)
+  marque le job ``maybe_sent`` : avant de relancer, le worker cherche un
+  pipeline portant sa clé ``ECOARCH_IDEMPOTENCY_KEY`` et, si la recherche
+  est impossible, marque le job ``failed`` plutôt que de risquer un
+  second ``terraform apply`` ;
+- chaque job porte une clé d'idempotence unique : une demande rejouée avec
+  la même clé retourne le job existant au lieu d'en créer un second ;
+- une demande identique (même empreinte ``request_hash``, voir
+  ``deploy_guard``) dans la fenêtre de déduplication retourne le job en
+  cours ou déjà envoyé, et deux jobs d'un même déploiement ne sont jamais
+  envoyés en parallèle.
+
+L'UI suit l'avancement via ``DeployQueue.get`` / ``DeployQueue.position``.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from src.config import Config
+from src.deployer import (
+    PipelineLookupError,
+    PipelineResult,
+    find_triggered_pipeline,
+    trigger_deployment,
+)
+from src.services.audit_service import AuditService
+from src.services.deploy_guard import DEDUP_WINDOW_S
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_PATH = Path(".ecoarch") / "deploy_queue.sqlite3"
+
+# Plafond par défaut : 20 triggers/min par projet, rafale de 5
+_DEFAULT_RATE_PER_MIN = 20.0
+_DEFAULT_BURST = 5.0
+_CLAIM_SCAN_LIMIT = 50
+# Bail d'un job ``running`` : au-delà, son worker est considéré comme mort
+_RUNNING_LEASE_S = 300.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS deploy_jobs (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    project_id      TEXT NOT NULL,
+    deployment_id   TEXT NOT NULL,
+    action          TEXT NOT NULL,
+    resources       TEXT NOT NULL,
+    audit_id        INTEGER,
+    status          TEXT NOT NULL DEFAULT 'queued',
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    pipeline_id     INTEGER,
+    pipeline_url    TEXT,
+    error           TEXT,
+    created_at      REAL NOT NULL,
+    updated_at      REAL NOT NULL,
+    request_hash    TEXT,
+    maybe_sent      INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS deploy_jobs_due ON deploy_jobs (status, next_attempt_at, id);
+CREATE TABLE IF NOT EXISTS rate_buckets (
+    project_id TEXT PRIMARY KEY,
+    tokens     REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+QUEUED, RUNNING, SENT, FAILED = "queued", "running", "sent", "failed"
+
+
+@dataclass
+class DeployJob:
+    """Demande de déclenchement de pipeline en file."""
+
+    id: int
+    idempotency_key: str
+    project_id: str
+    deployment_id: str
+    action: str
+    resources: list[dict[str, Any]]
+    audit_id: int | None
+    status: str
+    attempts: int
+    next_attempt_at: float
+    pipeline_id: int | None = None
+    pipeline_url: str | None = None
+    error: str | None = None
+    created_at: float = 0.0
+    # Un envoi précédent a pu créer le pipeline (vérifier avant de relancer)
+    maybe_sent: bool = False
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SENT, FAILED)
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> DeployJob:
+        return cls(
+            id=row["id"],
+            idempotency_key=row["idempotency_key"],
+            project_id=row["project_id"],
+            deployment_id=row["deployment_id"],
+            action=row["action"],
+            resources=json.loads(row["resources"]),
+            audit_id=row["audit_id"],
+            status=row["status"],
+            attempts=row["attempts"],
+            next_attempt_at=row["next_attempt_at"],
+            pipeline_id=row["pipeline_id"],
+            pipeline_url=row["pipeline_url"],
+            error=row["error"],
+            created_at=row["created_at"],
+            maybe_sent=bool(row["maybe_sent"]),
+        )
+
+
+@dataclass
+class TokenBucket:
+    """Token bucket : ``rate`` jetons/s, au plus ``capacity`` en réserve."""
+
+    rate: float
+    capacity: float
+    tokens: float
+    updated_at: float
+
+    def refill(self, now: float) -> None:
+        elapsed = max(now - self.updated_at, 0.0)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def try_take(self, now: float) -> bool:
+        self.refill(now)
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def wait_time(self, now: float) -> float:
+        """Secondes avant le prochain jeton disponible."""
+        self.refill(now)
+        return 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+
+
+class DeployQueue:
+    """File SQLite des déclenchements, avec limitation de débit par projet.
+
+    Args:
+        path: Base SQLite (créée au besoin).
+        rate_per_min: Déclenchements autorisés par minute et par projet.
+        burst: Rafale maximale (capacité du bucket).
+        lease_s: Bail d'un job ``running`` avant sa remise en file.
+        clock: Horloge (secondes, epoch), injectable pour les tests.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        rate_per_min: float = _DEFAULT_RATE_PER_MIN,
+        burst: float = _DEFAULT_BURST,
+        lease_s: float = _RUNNING_LEASE_S,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path or os.getenv("ECOARCH_DEPLOY_QUEUE") or DEFAULT_QUEUE_PATH)
+        self.rate = rate_per_min / 60.0
+        self.burst = burst
+        self.lease_s = lease_s
+        self._clock = clock
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(deploy_jobs)")}
+        if "request_hash" not in columns:  # base créée avant la déduplication
+            conn.execute("ALTER TABLE deploy_jobs ADD COLUMN request_hash TEXT")
+        if "maybe_sent" not in columns:
+            conn.execute("ALTER TABLE deploy_jobs ADD COLUMN maybe_sent INTEGER NOT NULL DEFAULT 0")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS deploy_jobs_request ON deploy_jobs (request_hash, created_at)"
+        )
+
+    # ── Connexion (une par thread) ────────────────────────────────
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Transaction ``BEGIN IMMEDIATE`` (verrou d'écriture dès le début)."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # ── Producteur ────────────────────────────────────────────────
+
+    def enqueue(
+        self,
+        deployment_id: str,
+        action: str,
+        resources: list[dict[str, Any]],
+        project_id: str = "",
+        audit_id: int | None = None,
+        idempotency_key: str | None = None,
+        request_hash: str | None = None,
+        dedup_window: float = DEDUP_WINDOW_S,
+    ) -> DeployJob:
+        """Ajoute une demande.
+
+        Retourne le job existant si la clé d'idempotence est connue, ou si
+        une demande de même ``request_hash`` non échouée date de moins de
+        ``dedup_window`` secondes.
+        """
+        key = idempotency_key or uuid.uuid4().hex
+        now = self._clock()
+        with self._transaction() as conn:
+            if request_hash:
+                row = self._find_recent(conn, request_hash, now - dedup_window)
+                if row is not None:
+                    return DeployJob.from_row(row)
+            conn.execute(
+                """INSERT OR IGNORE INTO deploy_jobs
+                   (idempotency_key, project_id, deployment_id, action, resources,
+                    audit_id, next_attempt_at, created_at, updated_at, request_hash)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    key, str(project_id or Config.GITLAB_PROJECT_ID), deployment_id, action,
+                    json.dumps(resources, separators=(",", ":")), audit_id, now, now, now,
+                    request_hash,
+                ),
+            )
+            row = conn.execute(
+                "SELECT * FROM deploy_jobs WHERE idempotency_key = ?", (key,)
+            ).fetchone()
+        return DeployJob.from_row(row)
+
+    @staticmethod
+    def _find_recent(conn: sqlite3.Connection, request_hash: str, since: float) -> sqlite3.Row | None:
+        return conn.execute(
+            """SELECT * FROM deploy_jobs
+               WHERE request_hash = ? AND created_at >= ? AND status != ?
+               ORDER BY id DESC LIMIT 1""",
+            (request_hash, since, FAILED),
+        ).fetchone()
+
+    def find_recent(self, request_hash: str, dedup_window: float = DEDUP_WINDOW_S) -> DeployJob | None:
+        """Job non échoué de même empreinte créé dans la fenêtre, s'il existe."""
+        row = self._find_recent(self._connect(), request_hash, self._clock() - dedup_window)
+        return DeployJob.from_row(row) if row else None
+
+    def get(self, job_id: int) -> DeployJob | None:
+        row = self._connect().execute(
+            "SELECT * FROM deploy_jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return DeployJob.from_row(row) if row else None
+
+    def position(self, job_id: int) -> int:
+        """Rang du job dans la file (1 = prochain envoi, 0 = déjà traité)."""
+        conn = self._connect()
+        row = conn.execute("SELECT status FROM deploy_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None or row["status"] != QUEUED:
+            return 0
+        (ahead,) = conn.execute(
+            "SELECT COUNT(*) FROM deploy_jobs WHERE status IN (?, ?) AND id < ?",
+            (QUEUED, RUNNING, job_id),
+        ).fetchone()
+        return ahead + 1
+
+    def pending_count(self) -> int:
+        (count,) = self._connect().execute(
+            "SELECT COUNT(*) FROM deploy_jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+        ).fetchone()
+        return count
+
+    # ── Consommateur ──────────────────────────────────────────────
+
+    def _load_bucket(self, conn: sqlite3.Connection, project_id: str, now: float) -> TokenBucket:
+        row = conn.execute(
+            "SELECT tokens, updated_at FROM rate_buckets WHERE project_id = ?", (project_id,)
+        ).fetchone()
+        if row is None:
+            return TokenBucket(self.rate, self.burst, self.burst, now)
+        return TokenBucket(self.rate, self.burst, row["tokens"], row["updated_at"])
+
+    def claim(self) -> tuple[DeployJob | None, float]:
+        """Réserve le plus ancien job dû dont le projet a un jeton disponible.
+
+        Un job dont le déploiement a déjà un envoi en cours (autre worker)
+        attend que celui-ci se termine.
+
+        Returns:
+            (job passé ``running`` ou None, secondes avant qu'un job devienne
+            éligible : prochain jeton ou prochaine tentative).
+        """
+        now = self._clock()
+        wait = float("inf")
+        with self._transaction() as conn:
+            self._requeue_expired(conn, now)
+            rows = conn.execute(
+                """SELECT * FROM deploy_jobs WHERE status = ? AND next_attempt_at <= ?
+                   ORDER BY id LIMIT ?""",
+                (QUEUED, now, _CLAIM_SCAN_LIMIT),
+            ).fetchall()
+            throttled: set[str] = set()
+            busy = {
+                r["deployment_id"]
+                for r in conn.execute(
+                    "SELECT DISTINCT deployment_id FROM deploy_jobs WHERE status = ?", (RUNNING,)
+                )
+            }
+            for row in rows:
+                project_id = row["project_id"]
+                if project_id in throttled or row["deployment_id"] in busy:
+                    continue
+                bucket = self._load_bucket(conn, project_id, now)
+                if not bucket.try_take(now):
+                    # Les autres projets ne sont pas bloqués par celui-ci
+                    throttled.add(project_id)
+                    wait = min(wait, bucket.wait_time(now))
+                    continue
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_buckets (project_id, tokens, updated_at) VALUES (?, ?, ?)",
+                    (project_id, bucket.tokens, bucket.updated_at),
+                )
+                conn.execute(
+                    "UPDATE deploy_jobs SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (RUNNING, now, row["id"]),
+                )
+                job = DeployJob.from_row(row)
+                job.status, job.attempts = RUNNING, job.attempts + 1
+                return job, 0.0
+            (next_due,) = conn.execute(
+                "SELECT MIN(next_attempt_at) FROM deploy_jobs WHERE status = ? AND next_attempt_at > ?",
+                (QUEUED, now),
+            ).fetchone()
+        if next_due is not None:
+            wait = min(wait, next_due - now)
+        return None, wait
+
+    def complete(self, job_id: int, pipeline_id: int | None, pipeline_url: str) -> None:
+        self._finish(job_id, SENT, pipeline_id=pipeline_id, pipeline_url=pipeline_url, error=None)
+
+    def fail(self, job_id: int, error: str) -> None:
+        self._finish(job_id, FAILED, error=error)
+
+    def retry(self, job_id: int, error: str, delay: float, maybe_sent: bool = False) -> None:
+        """Remet le job en file après ``delay`` secondes.
+
+        ``maybe_sent`` reste acquis jusqu'à la fin du job : un envoi
+        ambigu impose la recherche du pipeline avant chaque relance.
+        """
+        now = self._clock()
+        with self._transaction() as conn:
+            conn.execute(
+                """UPDATE deploy_jobs SET status = ?, error = ?, next_attempt_at = ?, updated_at = ?,
+                          maybe_sent = MAX(maybe_sent, ?)
+                   WHERE id = ?""",
+                (QUEUED, error, now + delay, now, int(maybe_sent), job_id),
+            )
+
+    def _finish(self, job_id: int, status: str, **fields: Any) -> None:
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._transaction() as conn:
+            conn.execute(
+                f"UPDATE deploy_jobs SET status = ?, {assignments}, updated_at = ? WHERE id = ?",
+                (status, *fields.values(), self._clock(), job_id),
+            )
+
+    def recover(self) -> int:
+        """Remet en file les jobs ``running`` dont le bail a expiré (worker mort)."""
+        with self._transaction() as conn:
+            return self._requeue_expired(conn, self._clock())
+
+    def _requeue_expired(self, conn: sqlite3.Connection, now: float) -> int:
+        """Remet en file les jobs ``running`` au bail expiré, marqués ``maybe_sent``.
+
+        Le worker interrompu a pu déclencher le pipeline avant de mourir.
+        """
+        cursor = conn.execute(
+            """UPDATE deploy_jobs SET status = ?, maybe_sent = 1
+               WHERE status = ? AND updated_at <= ?""",
+            (QUEUED, RUNNING, now - self.lease_s),
+        )
+        if cursor.rowcount:
+            logger.warning("%d déclenchement(s) interrompu(s) remis en file", cursor.rowcount)
+        return cursor.rowcount
+
+
+# ── Worker ────────────────────────────────────────────────────────
+
+
+class DeployWorker:
+    """Thread qui vide la file : trigger GitLab, retries, mise à jour de l'audit.
+
+    Args:
+        queue: File à consommer.
+        trigger: Fonction de déclenchement (``trigger_deployment``).
+        find_pipeline: Recherche d'un pipeline déjà déclenché par clé
+            d'idempotence (``find_triggered_pipeline``).
+        max_attempts: Tentatives par job avant échec définitif.
+        backoff_seconds: Délai de base du backoff exponentiel.
+        max_backoff: Plafond du délai entre deux tentatives.
+        idle_interval: Attente maximale quand la file est vide.
+    """
+
+    def __init__(
+        self,
+        queue: DeployQueue,
+        trigger: Callable[..., PipelineResult] = trigger_deployment,
+        find_pipeline: Callable[[str, float], PipelineResult | None] = find_triggered_pipeline,
+        max_attempts: int = 5,
+        backoff_seconds: float = 2.0,
+        max_backoff: float = 60.0,
+        idle_interval: float = 5.0,
+    ):
+        self.queue = queue
+        self.trigger = trigger
+        self.find_pipeline = find_pipeline
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff = max_backoff
+        self.idle_interval = idle_interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self.queue.recover()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="ecoarch-deploy-queue", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def wake(self) -> None:
+        """Signale un nouveau job (évite d'attendre ``idle_interval``)."""
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                wait = self.run_once()
+            except Exception:
+                logger.warning("Erreur du worker de déploiement", exc_info=True)
+                wait = self.idle_interval
+            if wait > 0:
+                self._wake.wait(min(wait, self.idle_interval))
+                self._wake.clear()
+
+    def run_once(self) -> float:
+        """Traite au plus un job ; retourne l'attente conseillée (0 = continuer)."""
+        job, wait = self.queue.claim()
+        if job is None:
+            return wait
+        self._process(job)
+        return 0.0
+
+    def _process(self, job: DeployJob) -> None:
+        if job.maybe_sent:
+            try:
+                found = self.find_pipeline(job.idempotency_key, job.created_at)
+            except PipelineLookupError as exc:
+                self._fail(job, f"{job.error or 'envoi ambigu'} ; pipeline peut-être créé, "
+                                f"vérification impossible : {exc}")
+                return
+            if found is not None:
+                self._complete(job, found)
+                return
+
+        try:
+            result = self.trigger(
+                resources=job.resources,
+                deployment_id=job.deployment_id,
+                action=job.action,
+                idempotency_key=job.idempotency_key,
+            )
+        except Exception as exc:  # noqa: BLE001 — état inconnu : traité comme un envoi ambigu
+            result = PipelineResult(success=False, error=str(exc), retryable=True, maybe_sent=True)
+
+        if result.success:
+            self._complete(job, result)
+            return
+
+        error = result.error or "échec inconnu"
+        if result.retryable and job.attempts < self.max_attempts:
+            delay = min(self.backoff_seconds * 2 ** (job.attempts - 1), self.max_backoff)
+            logger.warning(
+                "Trigger %s (tentative %d/%d) : %s – nouvel essai dans %.0fs",
+                job.deployment_id, job.attempts, self.max_attempts, error, delay,
+            )
+            self.queue.retry(job.id, error, delay, maybe_sent=result.maybe_sent)
+            return
+        self._fail(job, error)
+
+    def _complete(self, job: DeployJob, result: PipelineResult) -> None:
+        url = result.pipeline_url or ""
+        self.queue.complete(job.id, result.pipeline_id, url)
+        AuditService.update_log(job.audit_id, "PIPELINE_SENT", url)
+
+    def _fail(self, job: DeployJob, error: str) -> None:
+        logger.error("Trigger %s abandonné : %s", job.deployment_id, error)
+        self.queue.fail(job.id, error)
+        AuditService.update_log(job.audit_id, "ERROR")
+
+
+# ── File partagée du processus ────────────────────────────────────
+
+_queue: DeployQueue | None = None
+_worker: DeployWorker | None = None
+_queue_lock = threading.Lock()
+
+
+def get_deploy_queue() -> DeployQueue | None:
+    """File partagée (worker démarré), ou None si la base est inutilisable."""
+    global _queue, _worker
+    with _queue_lock:
+        if _queue is None:
+            try:
+                _queue = DeployQueue(
+                    rate_per_min=float(os.getenv("ECOARCH_TRIGGER_RATE_PER_MIN", _DEFAULT_RATE_PER_MIN)),
+                    burst=float(os.getenv("ECOARCH_TRIGGER_BURST", _DEFAULT_BURST)),
+                )
+            except (OSError, sqlite3.Error, ValueError):
+                logger.warning("File de déploiement indisponible", exc_info=True)
+                return None
+            _worker = DeployWorker(_queue)
+            _worker.start()
+            atexit.register(_worker.stop)
+        return _queue
+
+
+def submit_deployment(
+    deployment_id: str,
+    action: str,
+    resources: list[dict[str, Any]],
+    audit_id: int | None = None,
+    idempotency_key: str | None = None,
+    request_hash: str | None = None,
+) -> DeployJob | None:
+    """Met un déclenchement en file et réveille le worker (None si file indisponible).
+
+    Avec ``request_hash``, une demande identique récente retourne le job existant.
+    """
+    queue = get_deploy_queue()
+    if queue is None:
+        return None
+    job = queue.enqueue(
+        deployment_id, action, resources, audit_id=audit_id,
+        idempotency_key=idempotency_key, request_hash=request_hash,
+    )
+    if _worker is not None:
+        _worker.wake()
+    return job
+
+
+def find_recent_deployment(request_hash: str) -> DeployJob | None:
+    """Job récent de même empreinte dans la file partagée (None sinon)."""
+    queue = get_deploy_queue()
+    return queue.find_recent(request_hash) if queue is not None else None
+
+
+__all__ = [
+    "DeployJob",
+    "DeployQueue",
+    "DeployWorker",
+    "TokenBucket",
+    "find_recent_deployment",
+    "get_deploy_queue",
+    "submit_deployment",
+]
@@ -0,0 +1,208 @@
+"""Lecture incrémentale des traces de jobs GitLab (console de déploiement).
+
+Une fois le pipeline déclenché, ``TraceStreamer`` découvre ses jobs puis lit
+la trace de chacun par requêtes ``Range: bytes=<offset>-`` : seuls les
+octets nouveaux transitent à chaque tour, jamais la trace complète.
+
+- GitLab répond ``206`` (octets demandés), ``416`` (rien de nouveau) ou
+  ``200`` s'il ignore l'en-tête (trace complète, découpée localement) ;
+- les lignes incomplètes restent en tampon jusqu'au prochain ``\\n`` ;
+- les séquences ANSI et marqueurs ``section_start/section_end`` sont
+  retirés pour l'affichage ;
+- ``poll()`` (client GitLab asynchrone, traces lues en parallèle) renvoie
+  toutes les lignes nouvelles d'un tour : l'appelant les ajoute à la
+  console en un seul lot.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from src.config import Config
+from src.gitlab_client import get_async_client
+
+logger = logging.getLogger(__name__)
+
+_API_TIMEOUT = 10  # secondes
+_JOBS_PER_PAGE = 100
+# Statuts sans trace à lire (pas encore démarré / jamais exécuté)
+_IDLE_JOB_STATUSES = frozenset({"created", "pending", "waiting_for_resource", "preparing", "scheduled"})
+_FINAL_JOB_STATUSES = frozenset({"success", "failed", "canceled", "skipped", "manual"})
+
+_ANSI_RE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+_SECTION_RE = re.compile(r"section_(?:start|end):\d+:[A-Za-z0-9_.\[\]-]*(?:\r|$)")
+
+
+def _api_base() -> str | None:
+    if not Config.GITLAB_API_TOKEN or not Config.GITLAB_PROJECT_ID:
+        return None
+    return f"https://gitlab.com/api/v4/projects/{Config.GITLAB_PROJECT_ID}"
+
+
+def _jobs_result(pipeline_id: int, resp: Any) -> list[dict[str, Any]] | None:
+    if resp.status_code != 200:
+        logger.warning("GitLab API %s (jobs pipeline %s): %s", resp.status_code, pipeline_id, resp.text[:200])
+        return None
+    return resp.json()
+
+
+def _trace_result(job_id: int, offset: int, resp: Any) -> bytes | None:
+    if resp.status_code == 206:
+        return resp.content
+    if resp.status_code == 416:  # offset == taille actuelle
+        return b""
+    if resp.status_code == 200:  # Range ignoré : trace complète
+        return resp.content[offset:]
+    logger.warning("GitLab API %s (trace job %s)", resp.status_code, job_id)
+    return None
+
+
+async def fetch_pipeline_jobs_async(pipeline_id: int) -> list[dict[str, Any]] | None:
+    """Jobs du pipeline (id, name, stage, status) ; None si l'API est indisponible."""
+    if _api_base() is None:
+        return None
+    try:
+        resp = await get_async_client().pipeline_jobs(pipeline_id, per_page=_JOBS_PER_PAGE)
+    except Exception as exc:  # noqa: BLE001 — console best-effort : tout échec réseau/HTTP vaut None
+        logger.warning("Erreur liste des jobs du pipeline %s: %s", pipeline_id, exc)
+        return None
+    return _jobs_result(pipeline_id, resp)
+
+
+async def fetch_trace_chunk_async(job_id: int, offset: int) -> bytes | None:
+    """Octets de la trace du job à partir de ``offset`` ; None en cas d'erreur."""
+    if _api_base() is None:
+        return None
+    try:
+        resp = await get_async_client().job_trace(job_id, offset)
+    except Exception as exc:  # noqa: BLE001 — console best-effort : tout échec réseau/HTTP vaut None
+        logger.warning("Erreur lecture trace du job %s: %s", job_id, exc)
+        return None
+    return _trace_result(job_id, offset, resp)
+
+
+def clean_trace_line(line: str) -> str:
+    """Retire couleurs ANSI, marqueurs de section et réécritures ``\\r``."""
+    line = _SECTION_RE.sub("", line)
+    line = _ANSI_RE.sub("", line)
+    if "\r" in line:
+        line = line.rstrip("\r").rsplit("\r", 1)[-1]
+    return line.rstrip()
+
+
+@dataclass
+class JobCursor:
+    """Position de lecture d'un job."""
+
+    job_id: int
+    name: str
+    status: str = "created"
+    offset: int = 0
+    pending: bytes = b""
+    started: bool = False
+    done: bool = False
+
+
+class TraceStreamer:
+    """Suit les traces de tous les jobs d'un pipeline (tâches background Reflex).
+
+    Args:
+        pipeline_id: Pipeline GitLab à suivre.
+        fetch_jobs: ``async pipeline_id -> jobs | None`` (API GitLab par défaut).
+        fetch_chunk: ``async (job_id, offset) -> bytes | None`` (API GitLab par défaut).
+    """
+
+    def __init__(
+        self,
+        pipeline_id: int,
+        fetch_jobs: Callable[[int], Awaitable[list[dict[str, Any]] | None]] = fetch_pipeline_jobs_async,
+        fetch_chunk: Callable[[int, int], Awaitable[bytes | None]] = fetch_trace_chunk_async,
+    ):
+        self.pipeline_id = pipeline_id
+        self._fetch_jobs = fetch_jobs
+        self._fetch_chunk = fetch_chunk
+        self._cursors: dict[int, JobCursor] = {}
+
+    @property
+    def finished(self) -> bool:
+        """Tous les jobs connus sont terminés et leurs traces lues."""
+        return bool(self._cursors) and all(c.done for c in self._cursors.values())
+
+    @property
+    def bytes_read(self) -> int:
+        return sum(c.offset for c in self._cursors.values())
+
+    def _update_jobs(self, jobs: list[dict[str, Any]] | None) -> None:
+        if not jobs:
+            return
+        # L'API liste les jobs du plus récent au plus ancien
+        for job in sorted(jobs, key=lambda j: j.get("id", 0)):
+            job_id = job.get("id")
+            if job_id is None:
+                continue
+            cursor = self._cursors.get(job_id)
+            if cursor is None:
+                cursor = self._cursors[job_id] = JobCursor(job_id, str(job.get("name", job_id)))
+            cursor.status = str(job.get("status", cursor.status))
+
+    def _readable(self) -> list[JobCursor]:
+        """Jobs dont la trace peut avoir avancé."""
+        readable = []
+        for cursor in self._cursors.values():
+            if cursor.done or cursor.status in _IDLE_JOB_STATUSES:
+                continue
+            if cursor.status in ("skipped", "manual") and not cursor.offset:
+                cursor.done = True
+                continue
+            readable.append(cursor)
+        return readable
+
+    @staticmethod
+    def _consume(cursor: JobCursor, chunk: bytes | None) -> list[str]:
+        final = cursor.status in _FINAL_JOB_STATUSES
+        if chunk is None:
+            cursor.done = final  # trace illisible d'un job terminé : on abandonne
+            return []
+        cursor.offset += len(chunk)
+        data = cursor.pending + chunk
+        *complete, cursor.pending = data.split(b"\n")
+        if final and not chunk:
+            # Trace entièrement lue : on vide le tampon
+            if cursor.pending:
+                complete.append(cursor.pending)
+                cursor.pending = b""
+            cursor.done = True
+
+        lines = []
+        for raw in complete:
+            line = clean_trace_line(raw.decode("utf-8", errors="replace"))
+            if line:
+                lines.append(line)
+        if lines and not cursor.started:
+            cursor.started = True
+            lines.insert(0, f"── job {cursor.name} ──")
+        return lines
+
+    async def poll(self) -> list[str]:
+        """Lit en parallèle les octets nouveaux de chaque job actif ; renvoie les lignes complètes."""
+        if not self.finished:
+            self._update_jobs(await self._fetch_jobs(self.pipeline_id))
+        cursors = self._readable()
+        chunks = await asyncio.gather(*(self._fetch_chunk(c.job_id, c.offset) for c in cursors))
+        lines: list[str] = []
+        for cursor, chunk in zip(cursors, chunks):
+            lines.extend(self._consume(cursor, chunk))
+        return lines
+
+
+__all__ = [
+    "JobCursor",
+    "TraceStreamer",
+    "clean_trace_line",
+    "fetch_pipeline_jobs_async",
+    "fetch_trace_chunk_async",
+]
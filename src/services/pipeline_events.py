@@ -0,0 +1,207 @@
+"""Événements de pipeline GitLab reçus par webhook.
+
+Remplace le polling comme source principale des statuts de pipeline :
+GitLab appelle ``POST /hooks/gitlab/pipeline`` (en-tête ``X-Gitlab-Token``)
+à chaque changement d'état ; l'événement est
+
+1. vérifié (secret partagé, comparaison à temps constant) ;
+2. reporté dans le cache de statuts de ``src.deployer`` (les sessions et
+   le polling de réconciliation n'interrogent plus l'API pour ce pipeline) ;
+3. reporté sur les logs d'audit encore en cours (Supabase) ;
+4. diffusé aux sessions Reflex abonnées au ``PipelineEventHub`` du processus.
+
+Le hub est local au processus : avec plusieurs workers, seules les sessions
+du worker qui a reçu le webhook sont notifiées immédiatement, les autres le
+sont au prochain passage du polling de réconciliation.
+
+Émetteur de test (webhook factice) :
+    python -m src.services.pipeline_events 12345 success \\
+        --url http://localhost:8000/hooks/gitlab/pipeline --token "$GITLAB_WEBHOOK_SECRET"
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hmac
+import logging
+import sys
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from src import http_client
+from src.deployer import map_gitlab_status, remember_pipeline_status
+from src.services.audit_service import AuditService
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_PATH = "/hooks/gitlab/pipeline"
+TOKEN_HEADER = "X-Gitlab-Token"
+MAX_PAYLOAD_BYTES = 2 * 1024 * 1024
+_SUBSCRIBER_QUEUE_SIZE = 100
+
+
+@dataclass(frozen=True)
+class PipelineEvent:
+    """Changement d'état d'un pipeline, au format EcoArch."""
+
+    pipeline_id: int
+    status: str
+    gitlab_status: str
+    ref: str = ""
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def verify_token(received: str | None, expected: str | None) -> bool:
+    """Vérifie le secret du webhook (refusé si aucun secret n'est configuré)."""
+    if not expected or not received:
+        return False
+    return hmac.compare_digest(received.encode("utf-8"), expected.encode("utf-8"))
+
+
+def parse_pipeline_event(payload: Any) -> PipelineEvent | None:
+    """Extrait l'événement d'un payload « Pipeline Hook » (None sinon)."""
+    if not isinstance(payload, dict) or payload.get("object_kind") != "pipeline":
+        return None
+    attributes = payload.get("object_attributes")
+    if not isinstance(attributes, dict):
+        return None
+    try:
+        pipeline_id = int(attributes["id"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    gitlab_status = str(attributes.get("status") or "")
+    status = map_gitlab_status(gitlab_status)
+    if status is None:
+        return None
+    return PipelineEvent(pipeline_id, status, gitlab_status, str(attributes.get("ref") or ""))
+
+
+# ── Diffusion aux sessions ────────────────────────────────────────
+
+
+class PipelineEventHub:
+    """Diffusion in-process des événements aux sessions abonnées.
+
+    Chaque abonné reçoit une ``asyncio.Queue`` liée à sa boucle ;
+    ``publish`` peut être appelé depuis n'importe quel thread. Un abonné
+    trop lent perd ses événements les plus anciens plutôt que de bloquer
+    l'émetteur.
+    """
+
+    def __init__(self, queue_size: int = _SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+
+    def subscribe(self) -> asyncio.Queue:
+        """Nouvel abonnement (à appeler depuis la boucle de l'abonné)."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._subscribers[queue] = loop
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event: PipelineEvent) -> int:
+        """Envoie l'événement à tous les abonnés ; retourne leur nombre."""
+        with self._lock:
+            targets = list(self._subscribers.items())
+        delivered = 0
+        for queue, loop in targets:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+                delivered += 1
+            except RuntimeError:
+                # Boucle fermée : session terminée sans désabonnement
+                self.unsubscribe(queue)
+        return delivered
+
+
+def _offer(queue: asyncio.Queue, event: PipelineEvent) -> None:
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+hub = PipelineEventHub()
+
+
+def handle_pipeline_event(payload: Any) -> PipelineEvent | None:
+    """Traite un payload webhook déjà authentifié.
+
+    Returns:
+        L'événement appliqué, ou None si le payload n'est pas un
+        événement de pipeline exploitable.
+    """
+    event = parse_pipeline_event(payload)
+    if event is None:
+        return None
+    remember_pipeline_status(event.pipeline_id, event.status)
+    updated = AuditService.apply_pipeline_status(event.pipeline_id, event.status)
+    sessions = hub.publish(event)
+    logger.info(
+        "Webhook pipeline %s → %s (%d log(s) d'audit, %d session(s))",
+        event.pipeline_id, event.status, updated, sessions,
+    )
+    return event
+
+
+# ── Émetteur factice (tests locaux) ───────────────────────────────
+
+
+def build_payload(pipeline_id: int, status: str, ref: str = "main") -> dict[str, Any]:
+    """Payload minimal au format « Pipeline Hook » de GitLab."""
+    return {
+        "object_kind": "pipeline",
+        "object_attributes": {"id": pipeline_id, "status": status, "ref": ref},
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """CLI : envoie un faux événement de pipeline au webhook local."""
+    cli = argparse.ArgumentParser(description="Émetteur de webhook pipeline GitLab factice")
+    cli.add_argument("pipeline_id", type=int)
+    cli.add_argument("status", help="Statut GitLab (running, success, failed, canceled…)")
+    cli.add_argument("--url", default=f"http://localhost:8000{WEBHOOK_PATH}")
+    cli.add_argument("--token", default="", help="Secret du webhook (GITLAB_WEBHOOK_SECRET)")
+    cli.add_argument("--ref", default="main")
+    args = cli.parse_args(argv)
+
+    resp = http_client.post(
+        args.url,
+        json=build_payload(args.pipeline_id, args.status, args.ref),
+        headers={TOKEN_HEADER: args.token, "X-Gitlab-Event": "Pipeline Hook"},
+        timeout=10,
+    )
+    logger.info("HTTP %s %s", resp.status_code, resp.text[:200])
+    return 0 if resp.status_code < 300 else 1
+
+
+__all__ = [
+    "MAX_PAYLOAD_BYTES",
+    "TOKEN_HEADER",
+    "WEBHOOK_PATH",
+    "PipelineEvent",
+    "PipelineEventHub",
+    "build_payload",
+    "handle_pipeline_event",
+    "hub",
+    "parse_pipeline_event",
+    "verify_token",
+]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
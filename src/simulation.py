@@ -84,6 +84,49 @@ def _fuzzy_lookup(table: dict[str, float], key: str, default: float) -> tuple[fl
     return default, key
 
 
+def fallback_cost_components(res: dict[str, Any]) -> list[dict[str, Any]]:
+    """Composants de coût fallback d'une ressource normalisée (panier EcoArch).
+
+    Chaque composant suit le format ``costComponents`` d'Infracost
+    (name, unit, monthlyQuantity, price, monthlyCost), valeurs numériques.
+    """
+    rt = res.get("type", "compute")
+
+    if rt == "compute":
+        machine = res.get("machine_type", "e2-medium")
+        vm_cost, matched = _fuzzy_lookup(_FALLBACK_COMPUTE, machine, 29.38)
+        disk = int(res.get("disk_size", 50))
+        disk_type = res.get("disk_type", "pd-standard")
+        disk_rate = _FALLBACK_DISK_PER_GB.get(disk_type, _FALLBACK_DISK_DEFAULT_RATE)
+        return [
+            _component(f"Instance usage ({matched})", "months", 1, vm_cost),
+            _component(f"Storage ({disk_type})", "GB", disk, disk_rate),
+        ]
+    if rt == "sql":
+        tier = res.get("db_tier", "db-f1-micro")
+        cost, matched = _fuzzy_lookup(_FALLBACK_SQL, tier, 7.67)
+        return [_component(f"SQL instance ({matched})", "months", 1, cost)]
+    if rt == "storage":
+        cls = res.get("storage_class", "STANDARD")
+        cost, matched = _fuzzy_lookup(_FALLBACK_STORAGE, cls, 2.60)
+        return [_component(f"Storage ({matched})", "months", 1, cost)]
+    if rt == "load_balancer":
+        return [_component("Forwarding rules", "months", 1, _FALLBACK_LB)]
+
+    logger.warning("Type de ressource inconnu '%s' – forfait 1.00 $", rt)
+    return [_component("Forfait", "months", 1, 1.0)]
+
+
+def _component(name: str, unit: str, quantity: float, price: float) -> dict[str, Any]:
+    return {
+        "name": name,
+        "unit": unit,
+        "monthlyQuantity": quantity,
+        "price": price,
+        "monthlyCost": quantity * price,
+    }
+
+
 def fallback_estimate(resources: list[dict[str, Any]]) -> SimulationResult:
     """Estimation hors-ligne basée sur le pricing public GCP.
 
@@ -117,28 +160,8 @@ def fallback_estimate(resources: list[dict[str, Any]]) -> SimulationResult:
                     logger.error("Impossible de convertir l'item: %s", conv_err)
                     res = {"type": "unknown", "display_name": str(item)}
 
-        rt = res.get("type", "compute")
-        display = res.get("display_name", rt)
-        cost = 0.0
-
-        if rt == "compute":
-            machine = res.get("machine_type", "e2-medium")
-            vm_cost, matched = _fuzzy_lookup(_FALLBACK_COMPUTE, machine, 29.38)
-            disk = int(res.get("disk_size", 50))
-            disk_type = res.get("disk_type", "pd-standard")
-            disk_rate = _FALLBACK_DISK_PER_GB.get(disk_type, _FALLBACK_DISK_DEFAULT_RATE)
-            cost = vm_cost + disk * disk_rate
-        elif rt == "sql":
-            tier = res.get("db_tier", "db-f1-micro")
-            cost, matched = _fuzzy_lookup(_FALLBACK_SQL, tier, 7.67)
-        elif rt == "storage":
-            cls = res.get("storage_class", "STANDARD")
-            cost, matched = _fuzzy_lookup(_FALLBACK_STORAGE, cls, 2.60)
-        elif rt == "load_balancer":
-            cost = _FALLBACK_LB
-        else:
-            cost = 1.0
-            logger.warning("Type de ressource inconnu '%s' – forfait 1.00 $", rt)
+        display = res.get("display_name", res.get("type", "compute"))
+        cost = sum(c["monthlyCost"] for c in fallback_cost_components(res))
 
         logger.info("Prix trouvé pour %s : %.2f $", display, cost)
         total += cost
@@ -236,6 +259,7 @@ class InfracostSimulator:
         }
 
         compute_resources = []
+        startup_scripts: dict[str, str] = {}  # un script par stack, pas par VM
         sql_resources = []
         storage_resources = []
         lb_count = 0
@@ -243,7 +267,9 @@ class InfracostSimulator:
         for idx, res in enumerate(validated_resources):
             rt = res["type"]
             if rt == "compute":
-                startup_script = GCPConfig.get_startup_script(res["software_stack"])
+                stack_id = res["software_stack"]
+                if stack_id not in startup_scripts:
+                    startup_scripts[stack_id] = GCPConfig.get_startup_script(stack_id)
                 machine = res["machine_type"]
                 # GreenOps: E2 shared-core = haute efficacité énergétique
                 is_green = machine.startswith("e2-")
@@ -253,8 +279,7 @@ class InfracostSimulator:
                     "machine_type": machine,
                     "disk_size": res["disk_size"],
                     "disk_type": res.get("disk_type", GCPConfig.DEFAULT_DISK_TYPE),
-                    "software_stack": res["software_stack"],
-                    "startup_script": startup_script,
+                    "software_stack": stack_id,
                     "zone": f"{Config.DEFAULT_REGION}-a",
                     "carbon_awareness": "high" if is_green else "standard",
                 })
@@ -276,6 +301,7 @@ class InfracostSimulator:
                 lb_count += 1
 
         tfvars["compute_instances"] = compute_resources
+        tfvars["startup_scripts"] = {k: v for k, v in startup_scripts.items() if v}
         tfvars["sql_instances"] = sql_resources
         tfvars["storage_buckets"] = storage_resources
         tfvars["lb_count"] = lb_count
@@ -339,14 +365,18 @@ variable "compute_instances" {
     machine_type      = string
     disk_size         = number
     disk_type         = string   # GreenOps: pd-standard (default) | pd-balanced | pd-ssd
-    software_stack    = string
-    startup_script    = string
+    software_stack    = string   # clé de var.startup_scripts
     zone              = string
     carbon_awareness  = string   # high (E2 shared-core) | standard (dedicated)
   }))
   default = []
 }
 
+variable "startup_scripts" {
+  type    = map(string)   # software_stack → script (dédupliqué)
+  default = {}
+}
+
 variable "sql_instances" {
   type = list(object({
     name       = string
@@ -386,9 +416,9 @@ resource "google_compute_instance" "vm" {
   network_interface { network = "default" }
 
   dynamic "metadata" {
-    for_each = var.compute_instances[count.index].startup_script != "" ? [1] : []
+    for_each = contains(keys(var.startup_scripts), var.compute_instances[count.index].software_stack) ? [1] : []
     content {
-      startup-script = var.compute_instances[count.index].startup_script
+      startup-script = var.startup_scripts[var.compute_instances[count.index].software_stack]
     }
   }
 
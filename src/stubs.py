@@ -5,6 +5,8 @@ Utilisés automatiquement quand les modules src.* ne sont pas disponibles
 
 Ce module centralise les fallbacks pour respecter le principe DRY.
 """
+from collections.abc import Iterator
+from contextlib import contextmanager
 from typing import Any
 
 
@@ -37,6 +39,7 @@ class ConfigStub:
     AUTH_SECRET_KEY: str = ""
     AUTH_ENABLED: bool = False
     GITLAB_TRIGGER_TOKEN: str = ""
+    GITLAB_WEBHOOK_SECRET: str = ""
 
     @classmethod
     def get_supabase_client(cls):
@@ -97,6 +100,26 @@ class AuditServiceStub:
         """Retourne False en mode stub."""
         return False
 
+    @staticmethod
+    async def sync_pipeline_statuses_async(*args: Any, **kwargs: Any) -> bool:
+        """Retourne False en mode stub."""
+        return False
+
+    @staticmethod
+    def apply_pipeline_status(*args: Any, **kwargs: Any) -> int:
+        """Aucune ligne mise à jour en mode stub."""
+        return 0
+
+
+class DeploymentBusyErrorStub(RuntimeError):
+    """Stub pour src.services.deploy_guard.DeploymentBusyError."""
+
+
+@contextmanager
+def deployment_lock_stub(deployment_id: str) -> Iterator[None]:
+    """Stub pour src.services.deploy_guard.deployment_lock (aucun verrou)."""
+    yield
+
 
 class InputSanitizerStub:
     """Stub pour src.security.InputSanitizer."""
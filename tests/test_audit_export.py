@@ -0,0 +1,212 @@
+"""Tests de l'export en flux des logs d'audit (src/services/audit_export.py)."""
+import csv
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from src.services.audit_export import (
+    DOWNLOAD_PATH,
+    EXPORT_TTL_S,
+    AuditExportError,
+    available_formats,
+    claim_export,
+    export_audit_logs,
+    export_format,
+    new_export_path,
+    purge_exports,
+)
+from src.services.audit_service import AuditService
+
+
+class FakeQuery:
+    def __init__(self, sb):
+        self.sb = sb
+        self.calls: list[tuple] = []
+        self.count = None
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            self.calls.append((name, args))
+            self.count = kwargs.get("count", self.count)
+            return self
+        return method
+
+    def execute(self):
+        result = type("Result", (), {})()
+        if self.count:
+            result.data, result.count = [], 3
+            return result
+        self.sb.queries.append(self.calls)
+        result.data = self.sb.pages.pop(0) if self.sb.pages else []
+        return result
+
+
+class FakeSupabase:
+    def __init__(self, pages=None):
+        self.pages = list(pages or [])
+        self.queries: list[list[tuple]] = []
+
+    def table(self, name):
+        assert name == "audit_logs"
+        return FakeQuery(self)
+
+
+def _rows(*ids):
+    return [{"id": i, "created_at": "2026-09-01T10:00:00", "user": "alice", "action": "DEPLOY",
+             "resources_summary": "vm, sql", "total_cost": 1.5, "status": "SUCCESS", "pipeline_url": ""}
+            for i in ids]
+
+
+class TestIterLogPages:
+    """Pagination keyset sur id."""
+
+    def test_pages_follow_last_id_until_empty_page(self):
+        sb = FakeSupabase([_rows(1, 2), _rows(3)])
+        with patch("src.services.audit_service.Config") as config:
+            config.get_supabase_client.return_value = sb
+            pages = list(AuditService.iter_log_pages(page_size=2))
+        assert [len(p) for p in pages] == [2, 1]
+        filters = [dict(q)["gt"] for q in sb.queries]
+        assert filters == [("id", 0), ("id", 2), ("id", 3)]
+        assert dict(sb.queries[0])["order"] == ("id",)
+
+    def test_page_capped_by_server_is_not_the_end(self):
+        # max-rows PostgREST à 2 : pages plus courtes que page_size
+        sb = FakeSupabase([_rows(1, 2), _rows(3, 4), _rows(5)])
+        with patch("src.services.audit_service.Config") as config:
+            config.get_supabase_client.return_value = sb
+            pages = list(AuditService.iter_log_pages(page_size=5000))
+        assert sum(len(p) for p in pages) == 5
+
+    def test_without_supabase(self):
+        with patch("src.services.audit_service.Config") as config:
+            config.get_supabase_client.return_value = None
+            assert list(AuditService.iter_log_pages()) == []
+
+
+class TestExport:
+    """Écriture incrémentale, progression, fichiers partiels."""
+
+    def test_csv_written_page_by_page_with_progress(self, tmp_path):
+        seen = []
+        out = tmp_path / "audit.csv"
+        result = export_audit_logs(out, pages=iter([_rows(1, 2), _rows(3)]), total=3, progress=seen.append)
+
+        with out.open(newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert [r["id"] for r in rows] == ["1", "2", "3"]
+        assert rows[0]["resources_summary"] == "vm, sql"
+        assert (result.rows, result.pages, result.format) == (3, 2, "csv")
+        assert [(p.rows, p.last_id) for p in seen] == [(2, 2), (3, 3)]
+        assert seen[-1].percent == 100.0
+        assert not (tmp_path / "audit.csv.part").exists()
+
+    def test_failure_leaves_no_file(self, tmp_path):
+        def pages():
+            yield _rows(1)
+            raise RuntimeError("Supabase indisponible")
+
+        out = tmp_path / "audit.csv"
+        with pytest.raises(RuntimeError):
+            export_audit_logs(out, pages=pages())
+        assert list(tmp_path.iterdir()) == []
+
+    def test_reads_supabase_by_default(self, tmp_path):
+        sb = FakeSupabase([_rows(1, 2)])
+        with patch("src.services.audit_service.Config") as config, \
+                patch("src.services.audit_export.Config", config):
+            config.get_supabase_client.return_value = sb
+            seen = []
+            result = export_audit_logs(tmp_path / "audit.csv", page_size=5, progress=seen.append)
+        assert result.rows == 2
+        assert seen[0].total == 3
+
+    def test_without_supabase_is_an_error(self, tmp_path):
+        with patch("src.services.audit_export.Config") as config:
+            config.get_supabase_client.return_value = None
+            with pytest.raises(AuditExportError, match="Supabase"):
+                export_audit_logs(tmp_path / "audit.csv")
+        assert list(tmp_path.iterdir()) == []
+
+    def test_format_from_extension(self):
+        assert export_format("a.parquet") == "parquet"
+        assert export_format("a", "CSV") == "csv"
+        with pytest.raises(AuditExportError):
+            export_format("a.xlsx")
+
+    def test_parquet_offered_only_with_pyarrow(self):
+        with patch("src.services.audit_export.importlib.util.find_spec", return_value=None):
+            assert available_formats() == ("csv",)
+        with patch("src.services.audit_export.importlib.util.find_spec", return_value=object()):
+            assert available_formats() == ("csv", "parquet")
+
+    def test_parquet_requires_pyarrow(self, tmp_path):
+        with (
+            patch.dict(sys.modules, {"pyarrow": None, "pyarrow.parquet": None}),
+            pytest.raises(AuditExportError, match="pyarrow"),
+        ):
+            export_audit_logs(tmp_path / "audit.parquet", pages=iter([_rows(1)]))
+
+    def test_parquet_roundtrip(self, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        out = tmp_path / "audit.parquet"
+        export_audit_logs(out, pages=iter([_rows(1, 2), _rows(3)]))
+        table = pq.read_table(out)
+        assert table.column("id").to_pylist() == [1, 2, 3]
+        assert pq.ParquetFile(out).num_row_groups == 2
+
+
+class TestExportDownload:
+    """Exports privés, remis une seule fois puis supprimés."""
+
+    @pytest.fixture(autouse=True)
+    def _export_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("ECOARCH_EXPORT_DIR", str(tmp_path / "exports"))
+
+    def _export(self, fmt="csv"):
+        token, path = new_export_path(fmt)
+        export_audit_logs(path, fmt, pages=iter([_rows(1)]))
+        return token, path
+
+    def test_export_is_claimed_once(self):
+        token, path = self._export()
+        claimed, fmt = claim_export(token)
+        assert fmt == "csv" and claimed.read_text().startswith("id,")
+        assert not path.exists()
+        assert claim_export(token) is None
+
+    def test_invalid_or_unknown_token(self):
+        assert claim_export("../../etc/passwd") is None
+        assert claim_export("0" * 64) is None
+
+    def test_expired_export_is_purged(self):
+        token, path = self._export()
+        old = path.stat().st_mtime - EXPORT_TTL_S - 1
+        os.utime(path, (old, old))
+        assert claim_export(token) is None
+        assert not path.exists()
+
+    def test_new_export_purges_stale_files(self):
+        _, stale = self._export()
+        old = stale.stat().st_mtime - EXPORT_TTL_S - 1
+        os.utime(stale, (old, old))
+        _, fresh = self._export()
+        assert not stale.exists() and fresh.exists()
+        assert purge_exports() == 0
+
+    def test_endpoint_sends_then_deletes(self):
+        from starlette.testclient import TestClient
+
+        from frontend.frontend import webhooks
+
+        token, path = self._export()
+        client = TestClient(webhooks.webhook_api)
+        resp = client.get(DOWNLOAD_PATH.format(token=token))
+        assert resp.status_code == 200
+        assert resp.text.startswith("id,")
+        assert "audit_logs.csv" in resp.headers["content-disposition"]
+        assert resp.headers["cache-control"] == "no-store"
+        assert list(path.parent.iterdir()) == []
+        assert client.get(DOWNLOAD_PATH.format(token=token)).status_code == 404
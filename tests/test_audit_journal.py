@@ -0,0 +1,251 @@
+"""Tests du journal write-behind des audits (src/services/audit_journal.py)."""
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from src.services.audit_journal import AuditFlusher, AuditJournal
+from src.services.audit_service import AuditService
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeQuery:
+    """Builder PostgREST minimal : insert numérote les lignes, update les enregistre."""
+
+    def __init__(self, sb):
+        self.sb = sb
+        self.calls: list[tuple] = []
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            self.calls.append((name, args))
+            return self
+        return method
+
+    def execute(self):
+        self.sb.queries.append(self.calls)
+        if self.sb.down:
+            raise RuntimeError("Supabase indisponible")
+        result = type("Result", (), {})()
+        result.data = []
+        name, args = self.calls[0]
+        if name == "insert":
+            rows = args[0] if isinstance(args[0], list) else [args[0]]
+            if any(row.get("user") in self.sb.rejected_users for row in rows):
+                raise RuntimeError("violates check constraint")
+            for row in rows:
+                self.sb.next_id += 1
+                result.data.append({"id": self.sb.next_id, **row})
+        return result
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.down = False
+        self.rejected_users: set[str] = set()
+        self.next_id = 100
+        self.queries: list[list[tuple]] = []
+
+    def table(self, name):
+        assert name == "audit_logs"
+        return FakeQuery(self)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def journal(tmp_path, clock):
+    return AuditJournal(tmp_path / "audit.sqlite3", clock=clock)
+
+
+@pytest.fixture
+def sb():
+    return FakeSupabase()
+
+
+def _log(user="alice"):
+    return {"user": user, "action": "DEPLOY", "resources_summary": "vm", "total_cost": 1.0, "status": "PENDING"}
+
+
+class TestJournalWrites:
+    """Écritures locales, sans appel réseau."""
+
+    def test_create_returns_negative_local_id(self, journal):
+        first, second = journal.create(_log()), journal.create(_log())
+        assert first == -1 and second == -2
+        assert journal.resolve(first) is None
+        assert journal.pending_count() == 2
+
+    def test_wal_mode_and_survives_restart(self, journal, tmp_path, clock):
+        journal.create(_log())
+        conn = sqlite3.connect(journal.path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert AuditJournal(journal.path, clock=clock).pending_count() == 1
+
+    def test_update_unknown_local_id(self, journal):
+        assert journal.update(-42, "SUCCESS") is False
+
+
+class TestFlush:
+    """Envoi groupé et correspondance des ids."""
+
+    def test_one_insert_for_the_batch_and_ids_mapped(self, journal, sb):
+        ids = [journal.create(_log(user)) for user in ("a", "b", "c")]
+        assert journal.flush(sb) == 3
+        assert len(sb.queries) == 1
+        assert [journal.resolve(i) for i in ids] == [101, 102, 103]
+        assert journal.pending_count() == 0
+        assert journal.flush(sb) == 0
+
+    def test_update_before_flush_is_merged_into_insert(self, journal, sb):
+        local = journal.create(_log())
+        journal.update(local, "PIPELINE_SENT", "https://gitlab/p/7")
+        journal.flush(sb)
+        (insert,) = sb.queries
+        row = insert[0][1][0][0]
+        assert row["status"] == "PIPELINE_SENT" and row["pipeline_url"] == "https://gitlab/p/7"
+
+    def test_updates_grouped_by_status(self, journal, sb):
+        ids = [journal.create(_log()) for _ in range(3)]
+        journal.flush(sb)
+        sb.queries.clear()
+        journal.update(ids[0], "SUCCESS")
+        journal.update(ids[1], "SUCCESS")
+        journal.update(ids[2], "ERROR")
+        assert journal.flush(sb) == 3
+        updates = {q[0][1][0]["status"]: q[1][1][1] for q in sb.queries}
+        assert updates == {"SUCCESS": [101, 102], "ERROR": [103]}
+
+    def test_update_of_remote_id_is_journaled(self, journal, sb):
+        assert journal.update(55, "SUCCESS") is True
+        journal.flush(sb)
+        (query,) = sb.queries
+        assert query[0] == ("update", ({"status": "SUCCESS"},)) and query[1] == ("in_", ("id", [55]))
+
+    def test_change_during_flush_stays_pending(self, journal, sb):
+        local = journal.create(_log())
+        entries = journal._claim(inserts=True, limit=10)
+        journal.update(local, "ERROR")  # arrive pendant l'envoi
+        journal._flush_inserts(sb, entries)
+        assert journal.pending_count() == 1
+        journal.flush(sb)
+        assert sb.queries[-1][0] == ("update", ({"status": "ERROR"},))
+
+    def test_failure_is_retried_with_backoff(self, journal, sb, clock):
+        local = journal.create(_log())
+        sb.down = True
+        assert journal.flush(sb) == 0
+        assert journal.next_due_in() == pytest.approx(2.0)
+        sb.down = False
+        assert journal.flush(sb) == 0  # pas encore dû
+        clock.now += 2.0
+        assert journal.flush(sb) == 1
+        assert journal.resolve(local) == 101
+
+    def test_rejected_row_does_not_block_its_batch(self, journal, sb):
+        ids = [journal.create(_log(user)) for user in ("a", "b", "c")]
+        sb.rejected_users = {"b"}
+        assert journal.flush(sb) == 2
+        assert len(sb.queries) == 4  # lot refusé puis une insertion par ligne
+        assert [journal.resolve(i) for i in ids] == [101, None, 102]
+        assert journal.pending_count() == 1
+        assert journal.next_due_in() == pytest.approx(2.0)
+
+    def test_purge_keeps_recent_mappings(self, journal, sb, clock):
+        local = journal.create(_log())
+        journal.flush(sb)
+        assert journal.purge() == 0
+        clock.now += 8 * 24 * 3600
+        assert journal.purge() == 1
+        assert journal.resolve(local) is None
+
+
+class TestSharedJournal:
+    """Plusieurs processus sur le même fichier journal."""
+
+    def test_claimed_rows_are_sent_once(self, journal, sb, clock):
+        other = AuditJournal(journal.path, clock=clock)
+        journal.create(_log())
+        claimed = journal._claim(inserts=True, limit=10)
+        assert len(claimed) == 1
+        assert other.flush(sb) == 0  # réservé par l'autre flush
+        assert journal._flush_inserts(sb, claimed) == 1
+        assert other.flush(sb) == 0
+        assert len(sb.queries) == 1
+
+    def test_expired_claim_is_taken_over(self, journal, sb, clock):
+        other = AuditJournal(journal.path, clock=clock)
+        local = journal.create(_log())
+        journal._claim(inserts=True, limit=10)  # processus arrêté pendant l'envoi
+        assert other.next_due_in() == pytest.approx(journal.claim_ttl)
+        clock.now += journal.claim_ttl
+        assert other.flush(sb) == 1
+        assert other.resolve(local) == 101
+
+    def test_journal_without_claim_columns_is_migrated(self, tmp_path, clock):
+        path = tmp_path / "old.sqlite3"
+        conn = sqlite3.connect(path)
+        conn.execute(
+            """CREATE TABLE audit_journal (
+                local_id INTEGER PRIMARY KEY AUTOINCREMENT, remote_id INTEGER, payload TEXT,
+                status TEXT, pipeline_url TEXT, version INTEGER NOT NULL DEFAULT 1,
+                synced_version INTEGER NOT NULL DEFAULT 0, attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0, error TEXT,
+                created_at REAL NOT NULL, updated_at REAL NOT NULL)"""
+        )
+        conn.commit()
+        conn.close()
+        journal = AuditJournal(path, clock=clock)
+        journal.create(_log())
+        assert len(journal._claim(inserts=True, limit=10)) == 1
+
+
+class TestFlusher:
+    """Thread de flush."""
+
+    def test_run_once_without_supabase_waits(self, journal):
+        flusher = AuditFlusher(journal, client=lambda: None, idle_interval=3.0)
+        journal.create(_log())
+        assert flusher.run_once() == 3.0
+        assert journal.pending_count() == 1
+
+    def test_run_once_flushes(self, journal, sb):
+        flusher = AuditFlusher(journal, client=lambda: sb)
+        journal.create(_log())
+        assert flusher.run_once() == 0.0
+        assert flusher.run_once() == flusher.idle_interval
+
+
+class TestAuditServiceWriteBehind:
+    """create_log / update_log passent par le journal."""
+
+    @pytest.fixture(autouse=True)
+    def _config(self, sb):
+        with patch("src.services.audit_service.Config") as config:
+            config.get_supabase_client.return_value = sb
+            yield
+
+    def test_create_log_does_not_call_supabase(self, sb):
+        with patch("src.services.audit_service.journal_create", return_value=-7) as create:
+            assert AuditService.create_log("alice", "DEPLOY", "d1", "vm", 1.0) == -7
+        assert create.call_args.args[0]["status"] == "PENDING"
+        assert sb.queries == []
+
+    def test_create_log_falls_back_to_direct_insert(self, sb):
+        with patch("src.services.audit_service.journal_create", return_value=None):
+            assert AuditService.create_log("alice", "DEPLOY", "d1", "vm", 1.0) == 101
+
+    def test_update_log_of_unknown_local_id_is_dropped(self, sb):
+        with patch("src.services.audit_service.journal_update", return_value=False):
+            AuditService.update_log(-3, "SUCCESS")
+        assert sb.queries == []
@@ -0,0 +1,132 @@
+"""Tests du polling d'audit partagé (src/services/audit_poller.py)."""
+import asyncio
+
+import pytest
+
+from src.services.audit_poller import AuditPoller
+
+
+class FakeBackend:
+    """Compte les rafraîchissements et sert des lignes programmées."""
+
+    def __init__(self):
+        self.calls = 0
+        self.rows = [{"id": 1, "status": "PENDING"}]
+        self.status_changed = False
+        self.gate: asyncio.Event | None = None
+
+    async def refresh(self, rows):
+        self.calls += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        return self.status_changed, [dict(r) for r in self.rows]
+
+
+@pytest.fixture
+def backend():
+    return FakeBackend()
+
+
+def _poller(backend, **kwargs):
+    kwargs.setdefault("webhook_enabled", lambda: False)
+    return AuditPoller(refresh=backend.refresh, **kwargs)
+
+
+class TestAuditPoller:
+    """Une boucle par processus, quel que soit le nombre de sessions."""
+
+    def test_many_subscribers_share_one_refresh(self, backend):
+        poller = _poller(backend)
+
+        async def scenario():
+            queues = [poller.subscribe() for _ in range(100)]
+            snapshots = [await asyncio.wait_for(q.get(), 1) for q in queues]
+            for q in queues:
+                poller.unsubscribe(q)
+            return snapshots
+
+        snapshots = asyncio.run(scenario())
+        assert backend.calls == 1
+        assert {s.version for s in snapshots} == {1}
+        assert snapshots[0].rows == backend.rows
+
+    def test_late_subscriber_gets_current_snapshot(self, backend):
+        poller = _poller(backend)
+
+        async def scenario():
+            first = poller.subscribe()
+            await first.get()
+            late = poller.subscribe()
+            snapshot = late.get_nowait()
+            poller.unsubscribe(first)
+            poller.unsubscribe(late)
+            return snapshot
+
+        assert asyncio.run(scenario()).version == 1
+        assert backend.calls == 1
+
+    def test_concurrent_refreshes_are_coalesced(self, backend):
+        poller = _poller(backend)
+
+        async def scenario():
+            backend.gate = asyncio.Event()
+            tasks = [asyncio.ensure_future(poller.refresh()) for _ in range(5)]
+            await asyncio.sleep(0)
+            backend.gate.set()
+            return await asyncio.gather(*tasks)
+
+        results = asyncio.run(scenario())
+        assert backend.calls == 1
+        assert len({id(r) for r in results}) == 1
+
+    def test_unchanged_rows_are_not_republished(self, backend):
+        poller = _poller(backend)
+
+        async def scenario():
+            queue = poller.subscribe()
+            await queue.get()
+            await poller.refresh()
+            unchanged = queue.empty()
+            backend.rows = [{"id": 1, "status": "SUCCESS"}]
+            await poller.refresh()
+            changed = queue.get_nowait()
+            poller.unsubscribe(queue)
+            return unchanged, changed
+
+        unchanged, changed = asyncio.run(scenario())
+        assert unchanged
+        assert changed.version == 2 and changed.rows[0]["status"] == "SUCCESS"
+
+    def test_backoff_and_reconcile_floor(self, backend):
+        webhook = {"on": False}
+        poller = _poller(backend, min_interval=10, max_interval=40, webhook_enabled=lambda: webhook["on"])
+
+        async def polls(n):
+            for _ in range(n):
+                await poller.refresh()
+
+        asyncio.run(polls(3))
+        assert poller.interval_s == 20
+        asyncio.run(polls(6))
+        assert poller.interval_s == 40
+
+        webhook["on"] = True
+        assert poller.interval_s == 300
+
+        backend.status_changed = True
+        asyncio.run(polls(1))
+        webhook["on"] = False
+        assert poller.interval_s == 10
+
+    def test_failed_refresh_keeps_snapshot(self, backend):
+        poller = _poller(backend)
+
+        async def boom(rows):
+            raise RuntimeError("supabase down")
+
+        async def scenario():
+            await poller.refresh()
+            poller._refresh = boom
+            return await poller.refresh()
+
+        assert asyncio.run(scenario()).version == 1
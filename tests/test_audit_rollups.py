@@ -0,0 +1,179 @@
+"""Tests des agrégats FinOps des logs d'audit (src/services/audit_rollups.py)."""
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from src.services import audit_rollups as module
+from src.services.audit_rollups import AuditRollups, dashboard_summary
+from src.services.audit_service import AuditCursor
+
+
+def _row(row_id, day="2026-09-01", user="alice", action="DEPLOY", status="PENDING", cost=10.0, updated=None):
+    return {
+        "id": row_id, "created_at": f"{day}T10:00:00+00:00", "user": user, "action": action,
+        "status": status, "total_cost": cost, "updated_at": updated or f"{day}T10:00:{row_id:02d}+00:00",
+    }
+
+
+class FakeChanges:
+    """``fetch_changed_logs`` factice : sert des lots, enregistre les curseurs."""
+
+    def __init__(self, *batches):
+        self.batches = list(batches)
+        self.cursors: list[AuditCursor] = []
+        self.columns = None
+
+    def __call__(self, cursor, page_size, max_pages, columns):
+        self.cursors.append(cursor)
+        self.columns = columns
+        return self.batches.pop(0) if self.batches else []
+
+
+@pytest.fixture
+def rollups(tmp_path):
+    return AuditRollups(tmp_path / "rollups.sqlite3", fetch_changes=FakeChanges())
+
+
+class TestApply:
+    """Mise à jour incrémentale des agrégats."""
+
+    def test_sums_by_dimension(self, rollups):
+        rollups.apply([_row(1), _row(2, cost=5.5), _row(3, user="bob", action="DESTROY")])
+        by_user = rollups.summary(("user",))
+        assert by_user == [
+            {"user": "alice", "count": 2, "cost": 15.5},
+            {"user": "bob", "count": 1, "cost": 10.0},
+        ]
+        assert rollups.summary(()) == [{"count": 3, "cost": 25.5}]
+
+    def test_status_change_moves_the_row(self, rollups):
+        rollups.apply([_row(1), _row(2)])
+        rollups.apply([_row(1, status="SUCCESS", updated="2026-09-01T11:00:00+00:00")])
+        by_status = {r["status"]: r["count"] for r in rollups.summary(("status",))}
+        assert by_status == {"PENDING": 1, "SUCCESS": 1}
+
+    def test_unchanged_row_is_not_counted_twice(self, rollups):
+        rollups.apply([_row(1)])
+        assert rollups.apply([_row(1)]) == 0
+        assert rollups.summary(()) == [{"count": 1, "cost": 10.0}]
+
+    def test_empty_buckets_are_removed(self, rollups):
+        rollups.apply([_row(1)])
+        rollups.apply([_row(1, status="SUCCESS")])
+        conn = rollups._connect()
+        assert conn.execute("SELECT COUNT(*) FROM audit_rollups").fetchone()[0] == 1
+
+    def test_day_filter(self, rollups):
+        rollups.apply([_row(1, day="2026-08-31"), _row(2, day="2026-09-01"), _row(3, day="2026-09-02")])
+        assert rollups.summary((), since="2026-09-01", until="2026-09-01") == [{"count": 1, "cost": 10.0}]
+
+    def test_unknown_dimension(self, rollups):
+        with pytest.raises(ValueError):
+            rollups.summary(("resources_summary",))
+
+
+class TestRefresh:
+    """Lecture des seules lignes modifiées depuis le curseur."""
+
+    def test_cursor_is_persisted_and_reused(self, tmp_path):
+        changes = FakeChanges([_row(1), _row(2)])
+        path = tmp_path / "rollups.sqlite3"
+        assert AuditRollups(path, fetch_changes=changes).refresh() == 2
+        assert changes.cursors == [AuditCursor()]
+        assert "resources_summary" not in changes.columns
+
+        again = FakeChanges([])
+        assert AuditRollups(path, fetch_changes=again).refresh() == 0
+        assert again.cursors == [AuditCursor("2026-09-01T10:00:02+00:00", 2)]
+
+    def test_full_batches_are_followed(self, rollups):
+        with patch.object(module, "_PAGE_SIZE", 1), patch.object(module, "_MAX_PAGES", 1):
+            rollups._fetch_changes = FakeChanges([_row(1)], [_row(2)], [])
+            assert rollups.refresh() == 2
+        assert len(rollups._fetch_changes.cursors) == 3
+
+    def test_full_batch_of_reread_rows_stops(self, rollups):
+        rollups.apply([_row(1), _row(2)])
+        with patch.object(module, "_PAGE_SIZE", 2), patch.object(module, "_MAX_PAGES", 1):
+            rollups._fetch_changes = FakeChanges([_row(1), _row(2)], [_row(3)])
+            assert rollups.refresh() == 0
+        assert len(rollups._fetch_changes.cursors) == 1
+
+    def test_unreadable_supabase(self, rollups):
+        rollups._fetch_changes = lambda *args, **kwargs: None
+        assert rollups.refresh() is None
+
+
+class FakeIds:
+    """``iter_log_pages`` factice : pages d'ids, erreur optionnelle après elles."""
+
+    def __init__(self, *pages, error=None):
+        self.pages = pages
+        self.error = error
+
+    def __call__(self, page_size, columns):
+        assert columns == ("id",)
+        for page in self.pages:
+            yield [{"id": row_id} for row_id in page]
+        if self.error:
+            raise self.error
+
+
+class TestReconcile:
+    """Retrait des logs supprimés d'audit_logs."""
+
+    def test_deleted_rows_leave_the_totals(self, rollups):
+        rollups.apply([_row(1), _row(2, user="bob"), _row(3), _row(4)])
+        rollups._iter_pages = FakeIds([1, 3], [4])
+        assert rollups.reconcile() == 1
+        assert rollups.summary(("user",)) == [{"user": "alice", "count": 3, "cost": 30.0}]
+
+    def test_ids_past_the_last_page_are_kept(self, rollups):
+        rollups.apply([_row(1), _row(9)])
+        rollups._iter_pages = FakeIds([1])
+        assert rollups.reconcile() == 0
+        assert rollups.summary(())[0]["count"] == 2
+
+    def test_no_page_removes_nothing(self, rollups):
+        rollups.apply([_row(1)])
+        rollups._iter_pages = FakeIds()
+        assert rollups.reconcile() == 0
+        assert rollups.summary(())[0]["count"] == 1
+
+    def test_unreadable_supabase(self, rollups):
+        rollups.apply([_row(1), _row(2), _row(5)])
+        rollups._iter_pages = FakeIds([2], error=RuntimeError("down"))
+        assert rollups.reconcile() is None
+        assert rollups.summary(())[0]["count"] == 2  # page lue avant l'erreur appliquée
+
+    def test_refresh_reconciles_periodically(self, tmp_path):
+        now = [0.0]
+        rollups = AuditRollups(
+            tmp_path / "rollups.sqlite3", fetch_changes=FakeChanges([_row(1), _row(2)]),
+            iter_pages=FakeIds([2]), reconcile_interval=60.0, clock=lambda: now[0],
+        )
+        rollups.refresh()
+        assert rollups.summary(())[0]["count"] == 2
+        now[0] = 60.0
+        rollups.refresh()
+        assert rollups.summary(())[0]["count"] == 1
+
+
+class TestDashboardSummary:
+    """Synthèse servie au tableau de bord."""
+
+    def test_last_days_window(self, rollups):
+        rollups._fetch_changes = FakeChanges(
+            [_row(1, day="2026-08-01"), _row(2, day="2026-09-20"), _row(3, day="2026-09-30", user="bob")]
+        )
+        with patch.object(module, "get_audit_rollups", return_value=rollups):
+            summary = dashboard_summary(days=30, today=date(2026, 9, 30))
+        assert summary["since"] == "2026-09-01"
+        assert summary["count"] == 2 and summary["cost"] == 20.0
+        assert [r["user"] for r in summary["by_user"]] == ["alice", "bob"]
+        assert summary["by_action"] == [{"action": "DEPLOY", "count": 2, "cost": 20.0}]
+
+    def test_unavailable(self):
+        with patch.object(module, "get_audit_rollups", return_value=None):
+            assert dashboard_summary() is None
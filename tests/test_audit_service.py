@@ -0,0 +1,202 @@
+"""Tests de la lecture des logs d'audit (src/services/audit_service.py)."""
+from unittest.mock import patch
+
+import pytest
+
+from src.services.audit_service import (
+    AUDIT_COLUMNS,
+    AuditCursor,
+    AuditLogView,
+    AuditService,
+)
+
+PIPELINE_URL = "https://gitlab.com/x/-/pipelines/{}"
+
+
+class FakeQuery:
+    """Builder PostgREST minimal : enregistre les appels, sert des pages."""
+
+    def __init__(self, table):
+        self.table = table
+        self.calls: list[tuple] = []
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            self.calls.append((name, args))
+            return self
+        return method
+
+    def execute(self):
+        self.table.queries.append(self.calls)
+        if self.table.error:
+            raise self.table.error
+        if self.table.fail_when and self.table.fail_when(dict(self.calls)):
+            raise RuntimeError("PostgREST error")
+        result = type("Result", (), {})()
+        result.data = self.table.pages.pop(0) if self.table.pages else []
+        return result
+
+
+class FakeSupabase:
+    def __init__(self, pages=None, error=None):
+        self.pages = list(pages or [])
+        self.error = error
+        self.fail_when = None
+        self.queries: list[list[tuple]] = []
+
+    def table(self, name):
+        assert name == "audit_logs"
+        return FakeQuery(self)
+
+
+def _row(row_id, created, updated=None, status="PENDING"):
+    return {"id": row_id, "created_at": created, "updated_at": updated or created, "status": status}
+
+
+@pytest.fixture
+def supabase():
+    sb = FakeSupabase()
+    with patch("src.services.audit_service.Config") as config:
+        config.get_supabase_client.return_value = sb
+        yield sb
+
+
+class TestFetchChangedLogs:
+    """Pagination keyset sur (updated_at, id)."""
+
+    def test_first_page_rereads_the_overlap_window(self, supabase):
+        supabase.pages = [[_row(8, "2026-03-01T10:00:00+00:00")]]
+        rows = AuditService.fetch_changed_logs(AuditCursor("2026-03-01T09:00:00+00:00", 7))
+
+        assert [r["id"] for r in rows] == [8]
+        calls = dict(supabase.queries[0])
+        assert calls["select"][0] == ",".join((*AUDIT_COLUMNS, "updated_at"))
+        assert calls["gt"] == ("updated_at", "2026-03-01T08:59:30+00:00")
+        assert "or_" not in calls
+        assert [c[1] for c in supabase.queries[0] if c[0] == "order"] == [("updated_at",), ("id",)]
+
+    def test_late_commit_under_the_cursor_is_read(self, supabase):
+        # id 9 validé après le poll précédent mais daté avant son curseur
+        late = _row(9, "2026-03-01T08:59:50+00:00")
+        supabase.pages = [[late, _row(7, "2026-03-01T09:00:00+00:00")]]
+        rows = AuditService.fetch_changed_logs(AuditCursor("2026-03-01T09:00:00+00:00", 7))
+        assert [r["id"] for r in rows] == [9, 7]
+
+    def test_follows_pages_from_last_key(self, supabase):
+        supabase.pages = [[_row(1, "t1"), _row(2, "t2")], [_row(3, "t3")]]
+        rows = AuditService.fetch_changed_logs(AuditCursor("t0", 0), page_size=2)
+
+        assert [r["id"] for r in rows] == [1, 2, 3]
+        assert dict(supabase.queries[0])["or_"][0] == 'updated_at.gt."t0",and(updated_at.eq."t0",id.gt.0)'
+        assert dict(supabase.queries[1])["or_"][0] == 'updated_at.gt."t2",and(updated_at.eq."t2",id.gt.2)'
+
+    def test_row_read_twice_keeps_latest_version(self, supabase):
+        supabase.pages = [
+            [_row(1, "2026-03-01T10:00:00+00:00"), _row(2, "2026-03-01T10:00:01+00:00")],
+            [_row(1, "2026-03-01T10:00:00+00:00", "2026-03-01T10:00:02+00:00", status="SUCCESS")],
+        ]
+        rows = AuditService.fetch_changed_logs(AuditCursor("2026-03-01T09:59:59+00:00", 0), page_size=2)
+        assert [(r["id"], r["status"]) for r in rows] == [(2, "PENDING"), (1, "SUCCESS")]
+
+    def test_error_returns_none(self, supabase):
+        supabase.error = RuntimeError("column audit_logs.updated_at does not exist")
+        assert AuditService.fetch_changed_logs(AuditCursor("t0", 0)) is None
+
+    def test_recent_logs_are_projected(self, supabase):
+        AuditService.fetch_recent_logs(limit=5)
+        assert dict(supabase.queries[0])["select"][0] == ",".join(AUDIT_COLUMNS)
+
+
+class TestAuditLogView:
+    """Vue indexée mise à jour par delta."""
+
+    def test_quiet_poll_is_one_empty_query_and_same_list(self, supabase):
+        supabase.pages = [[_row(2, "2026-03-02"), _row(1, "2026-03-01")]]
+        view = AuditLogView(limit=2)
+        first = view.refresh()
+
+        assert view.refresh() is first
+        assert len(supabase.queries) == 2
+        assert view.cursor == AuditCursor("2026-03-02", 2)
+
+    def test_changes_are_merged_by_id(self, supabase):
+        supabase.pages = [
+            [_row(2, "2026-03-02"), _row(1, "2026-03-01")],
+            [_row(1, "2026-03-01", "2026-03-03", status="SUCCESS"), _row(3, "2026-03-03")],
+        ]
+        view = AuditLogView(limit=2)
+        view.refresh()
+        rows = view.refresh()
+
+        assert [r["id"] for r in rows] == [3, 2]  # le plus ancien sort de la fenêtre
+        assert view.cursor == AuditCursor("2026-03-03", 3)
+
+    def test_status_change_in_window_is_visible(self, supabase):
+        supabase.pages = [
+            [_row(2, "2026-03-02"), _row(1, "2026-03-01")],
+            [_row(2, "2026-03-02", "2026-03-04", status="FAILED")],
+        ]
+        view = AuditLogView(limit=2)
+        first = view.refresh()
+        rows = view.refresh()
+
+        assert rows is not first
+        assert rows[0]["status"] == "FAILED"
+
+    def test_falls_back_to_full_reload_without_updated_at(self, supabase):
+        supabase.pages = [[{"id": 1, "created_at": "2026-03-01"}], [{"id": 1, "created_at": "2026-03-01"}]]
+        view = AuditLogView(limit=2)
+        view.refresh()
+        view.refresh()
+
+        assert not view.incremental
+        assert all("or_" not in dict(q) for q in supabase.queries)
+        assert dict(supabase.queries[1])["select"][0] == ",".join(AUDIT_COLUMNS)
+
+
+class TestBatchedStatusWrites:
+    """sync_pipeline_statuses : une écriture par statut cible, repli ligne par ligne."""
+
+    def _logs(self, n):
+        return [{"id": i, "status": "RUNNING", "pipeline_url": PIPELINE_URL.format(100 + i)} for i in range(n)]
+
+    @patch("src.services.audit_service.fetch_pipeline_statuses")
+    def test_one_request_per_target_status(self, mock_fetch, supabase):
+        logs = self._logs(6)
+        mock_fetch.return_value = {100 + i: ("SUCCESS" if i % 2 else "FAILED") for i in range(6)}
+
+        assert AuditService.sync_pipeline_statuses(logs) is True
+
+        writes = [dict(q) for q in supabase.queries]
+        assert [(w["update"][0], w["in_"]) for w in writes] == [
+            ({"status": "FAILED"}, ("id", [0, 2, 4])),
+            ({"status": "SUCCESS"}, ("id", [1, 3, 5])),
+        ]
+        assert [row["status"] for row in logs] == ["FAILED", "SUCCESS"] * 3
+
+    @patch("src.services.audit_service.fetch_pipeline_statuses")
+    def test_failed_batch_falls_back_per_row(self, mock_fetch, supabase):
+        logs = self._logs(3)
+        mock_fetch.return_value = {100: "SUCCESS", 101: "SUCCESS", 102: "SUCCESS"}
+        supabase.fail_when = lambda calls: "in_" in calls or calls.get("eq") == ("id", 1)
+
+        assert AuditService.sync_pipeline_statuses(logs) is True
+
+        per_row = [dict(q)["eq"] for q in supabase.queries if "eq" in dict(q)]
+        assert per_row == [("id", 0), ("id", 1), ("id", 2)]
+        assert [row["status"] for row in logs] == ["SUCCESS", "RUNNING", "SUCCESS"]
+
+    @patch("src.services.audit_service.fetch_pipeline_statuses")
+    def test_nothing_written_reports_no_change(self, mock_fetch, supabase):
+        logs = self._logs(2)
+        mock_fetch.return_value = {100: "SUCCESS", 101: "FAILED"}
+        supabase.fail_when = lambda calls: True
+
+        assert AuditService.sync_pipeline_statuses(logs) is False
+        assert [row["status"] for row in logs] == ["RUNNING", "RUNNING"]
+
+    @patch("src.services.audit_service.fetch_pipeline_statuses")
+    def test_no_change_no_write(self, mock_fetch, supabase):
+        mock_fetch.return_value = {100: "RUNNING"}
+        assert AuditService.sync_pipeline_statuses(self._logs(1)) is False
+        assert supabase.queries == []
@@ -0,0 +1,88 @@
+"""Tests du scoring GreenOps en lot (src/batch_scoring.py).
+
+Vérifie l'équivalence stricte avec les fonctions scalaires de
+RecommendationEngine sur des paniers variés et aléatoires.
+"""
+import random
+
+import pytest
+
+from src.batch_scoring import flatten_carts, score_carts
+from src.recommendation import INSTANCE_KWH_MONTH, RecommendationEngine
+
+_MACHINES = list(INSTANCE_KWH_MONTH) + ["custom-unknown", "E2-Micro ", "n2-highmem-8"]
+_REGIONS = ["us-central1", "europe-west9", "europe-central2", "asia-east1"]
+
+
+def _random_resource(rng: random.Random) -> dict:
+    kind = rng.choice(["compute", "compute", "sql", "storage", "load_balancer"])
+    if kind == "compute":
+        res = {"type": "compute", "machine_type": rng.choice(_MACHINES)}
+        if rng.random() < 0.8:
+            res["disk_size"] = rng.choice([0, 10, 20, 50, 137, 500, 2000])
+        if rng.random() < 0.5:
+            res["disk_type"] = rng.choice(["pd-standard", "pd-balanced", "pd-ssd"])
+        return res
+    if kind == "storage":
+        return {"type": "storage", "storage_class": rng.choice(["STANDARD", "MULTI_REGIONAL"])}
+    return {"type": kind}
+
+
+class TestEquivalence:
+    """Les résultats batch == résultats scalaires, panier par panier."""
+
+    def test_random_carts_match_scalar(self):
+        rng = random.Random(42)
+        carts = [
+            [_random_resource(rng) for _ in range(rng.randint(0, 25))]
+            for _ in range(400)
+        ]
+        envs = [rng.choice(["dev", "prod"]) for _ in carts]
+        regions = [rng.choice(_REGIONS) for _ in carts]
+
+        scores = score_carts(carts, environments=envs, regions=regions)
+
+        assert len(scores) == len(carts)
+        for i, cart in enumerate(carts):
+            assert scores.sobriety[i] == RecommendationEngine.calculate_sobriety_score(
+                cart, environment=envs[i], region=regions[i]
+            )
+            assert scores.emissions_kg[i] == RecommendationEngine.calculate_total_emissions(
+                cart, region=regions[i]
+            )
+
+    def test_empty_cart_is_a_and_zero(self):
+        scores = score_carts([[], [{"type": "sql"}]])
+        assert list(scores.sobriety) == ["A", "A"]
+        assert list(scores.emissions_kg) == [0.0, 0.0]
+
+    def test_no_carts(self):
+        scores = score_carts([])
+        assert len(scores) == 0
+
+    def test_scalar_region_broadcast(self):
+        carts = [[{"type": "compute", "machine_type": "c2-standard-4", "disk_size": 50}]] * 3
+        scores = score_carts(carts, environments="prod", regions="europe-central2")
+        expected = RecommendationEngine.calculate_sobriety_score(
+            carts[0], environment="prod", region="europe-central2"
+        )
+        assert list(scores.sobriety) == [expected] * 3
+
+
+class TestFlatten:
+    """Structure CSR du lot aplati."""
+
+    def test_offsets(self):
+        batch = flatten_carts([[{"type": "compute"}], [], [{"type": "sql"}, {"type": "storage"}]])
+        assert batch.offsets.tolist() == [0, 1, 1, 3]
+        assert batch.n_carts == 3
+        assert batch.cart_index.tolist() == [0, 2, 2]
+
+    def test_reuse_flattened_batch(self):
+        batch = flatten_carts([[{"type": "compute", "machine_type": "e2-micro", "disk_size": 20}]])
+        scores = score_carts(batch, regions="europe-west9")
+        assert scores.sobriety[0] == "A"
+
+    def test_mismatched_lengths_raise(self):
+        with pytest.raises(ValueError):
+            score_carts([[], []], environments=["dev"])
@@ -0,0 +1,78 @@
+"""Tests du budget gate multi-rapports (src/budget_gate.py)."""
+import json
+
+import pytest
+
+from src.budget_gate import expand_reports, gate_reports, main
+
+
+def _write_report(path, cost):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "currency": "EUR",
+        "totalMonthlyCost": str(cost),
+        "projects": [{"name": path.stem, "breakdown": {"resources": [
+            {"name": "google_compute_instance.vm", "resourceType": "google_compute_instance",
+             "monthlyCost": str(cost)},
+        ]}}],
+    }))
+    return str(path)
+
+
+@pytest.fixture
+def reports(tmp_path, monkeypatch):
+    monkeypatch.setenv("ECOARCH_BUDGET_LIMIT", "100")
+    monkeypatch.delenv("ECOARCH_BUDGET_POLICY", raising=False)
+    monkeypatch.delenv("ECOARCH_BASELINE_REPORT", raising=False)
+    return [
+        _write_report(tmp_path / "svc" / "api.json", 40),
+        _write_report(tmp_path / "svc" / "web.json", 150),
+        _write_report(tmp_path / "svc" / "nested" / "jobs.json", 10),
+    ]
+
+
+class TestGateReports:
+    """Évaluation et agrégation des verdicts."""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_summary(self, reports, workers):
+        summary = gate_reports(reports, workers=workers)
+        assert not summary["passed"]
+        assert summary["counts"] == {"passed": 2, "failed": 1, "error": 0}
+        assert summary["total_cost"] == 200.0
+        assert [e["report"] for e in summary["reports"]] == reports
+        assert summary["reports"][1]["status"] == "failed"
+        assert "Budget exceeded" in summary["reports"][1]["error"]
+
+    def test_unreadable_report_is_an_error(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("ECOARCH_BUDGET_POLICY", str(tmp_path / "missing-policy.json"))
+        path = _write_report(tmp_path / "a.json", 1)
+        summary = gate_reports([path])
+        assert summary["counts"]["error"] == 1
+        assert not summary["passed"]
+
+    def test_expand_reports(self, reports, tmp_path):
+        pattern = str(tmp_path / "svc" / "**" / "*.json")
+        assert expand_reports([pattern, pattern]) == sorted(reports)
+
+
+class TestCli:
+    """Codes de sortie et fichier de résultat."""
+
+    def test_failed_batch_writes_result(self, reports, tmp_path):
+        output = tmp_path / "gate.json"
+        code = main(["--reports", str(tmp_path / "svc" / "**" / "*.json"),
+                     "--workers", "2", "--output", str(output)])
+        assert code == 1
+        assert json.loads(output.read_text())["counts"]["failed"] == 1
+
+    def test_passing_batch(self, reports, tmp_path):
+        assert main(["--reports", reports[0], reports[2]]) == 0
+
+    def test_no_match(self, tmp_path):
+        assert main(["--reports", str(tmp_path / "nothing-*.json")]) == 1
+
+    def test_single_report_mode(self, reports, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        _write_report(tmp_path / "infracost-report.json", 150)
+        assert main([]) == 1
@@ -0,0 +1,161 @@
+"""Tests de la politique de budgets multiples (src/budget_policy.py)."""
+import json
+import time
+
+import pytest
+
+from src.budget_gate import (
+    BudgetExceededError,
+    PolicyViolationError,
+    _gate_report,
+    check_budget,
+)
+from src.budget_policy import BudgetPolicy
+
+
+def _res(name, rtype, cost, delta=0.0, tags=None):
+    res = {"name": name, "resourceType": rtype, "monthlyCost": str(cost),
+           "diffMonthlyCost": str(delta)}
+    if tags is not None:
+        res["tags"] = tags
+    return res
+
+
+_REPORT = {
+    "currency": "EUR",
+    "totalMonthlyCost": "160.0",
+    "diffTotalMonthlyCost": "45.0",
+    "projects": [
+        {"name": "infra/web", "breakdown": {"resources": [
+            _res("google_compute_instance.web", "google_compute_instance", 60, 30, {"team": "front"}),
+            _res("google_storage_bucket.assets", "google_storage_bucket", 10, 0, {"team": "front"}),
+        ]}},
+        {"name": "infra/data", "breakdown": {"resources": [
+            _res("google_sql_database_instance.db", "google_sql_database_instance", 90, 15,
+                 {"team": "data"}),
+        ]}},
+    ],
+}
+
+
+@pytest.fixture
+def report_path(tmp_path):
+    path = tmp_path / "report.json"
+    path.write_text(json.dumps(_REPORT))
+    return str(path)
+
+
+def _policy(*rules):
+    return BudgetPolicy.from_dict({"rules": list(rules)})
+
+
+class TestCompilation:
+    """Validation du fichier de politique."""
+
+    @pytest.mark.parametrize("rule", [
+        {"id": "x", "scope": "region", "max_monthly_cost": 1},
+        {"id": "x", "scope": "project", "max_monthly_cost": 1},
+        {"id": "x", "scope": "label", "match": "team", "max_monthly_cost": 1},
+        {"id": "x", "scope": "total"},
+    ])
+    def test_invalid_rules(self, rule):
+        with pytest.raises(ValueError):
+            _policy(rule)
+
+    def test_duplicate_ids(self):
+        with pytest.raises(ValueError):
+            _policy({"id": "a", "max_delta": 1}, {"id": "a", "max_delta": 2})
+
+
+class TestEvaluation:
+    """Verdicts par règle."""
+
+    def test_dimensions(self, report_path):
+        from src.parser import EcoArchParser
+
+        verdicts = _policy(
+            {"id": "total", "scope": "total", "max_monthly_cost": 200, "max_delta": 40},
+            {"id": "web", "scope": "project", "match": "infra/web", "max_monthly_cost": 100},
+            {"id": "sql", "scope": "resource_type", "match": "google_sql_database_instance",
+             "max_monthly_cost": 80},
+            {"id": "front", "scope": "label", "match": "team=front", "max_delta": 25},
+            {"id": "ghost", "scope": "project", "match": "infra/none", "max_monthly_cost": 0},
+        ).evaluate(EcoArchParser(report_path))
+        by_id = {v.rule_id: v for v in verdicts}
+
+        assert by_id["total"].monthly_cost == 160.0
+        assert by_id["total"].delta_exceeded and not by_id["total"].cost_exceeded
+        assert by_id["web"].passed and by_id["web"].resources == 2
+        assert by_id["sql"].cost_exceeded
+        assert by_id["front"].delta == 30.0 and not by_id["front"].passed
+        assert by_id["ghost"].passed and by_id["ghost"].resources == 0
+        assert "variation +30.00 > 25.00 EUR" in by_id["front"].describe("EUR")
+
+    def test_streaming_parser(self, report_path):
+        from src.parser import EcoArchParser
+
+        policy = _policy({"id": "t", "scope": "total", "max_monthly_cost": 100})
+        [verdict] = policy.evaluate(EcoArchParser(report_path, streaming=True))
+        assert verdict.monthly_cost == 160.0
+        assert not verdict.passed
+
+    def test_thousands_of_rules_single_pass(self):
+        rules = [
+            {"id": f"p{i}", "scope": "project", "match": f"proj-{i}", "max_monthly_cost": 5}
+            for i in range(5000)
+        ]
+        rows = [
+            {"name": f"r{i}", "type": "t", "project": f"proj-{i % 5000}",
+             "monthly_cost": 1.0, "delta": 0.0}
+            for i in range(50_000)
+        ]
+        policy = _policy(*rules)
+        start = time.perf_counter()
+        verdicts = policy.evaluate(iter(rows))
+        assert time.perf_counter() - start < 2.0
+        assert sum(not v.passed for v in verdicts) == 5000
+        assert verdicts[0].monthly_cost == 10.0
+
+
+class TestBudgetGate:
+    """Intégration dans check_budget."""
+
+    def test_violation_raises_budget_error(self, report_path, tmp_path, monkeypatch):
+        policy = tmp_path / "policy.json"
+        policy.write_text(json.dumps({"rules": [
+            {"id": "mr-delta", "scope": "total", "max_delta": 10},
+        ]}))
+        monkeypatch.setenv("ECOARCH_BUDGET_LIMIT", "1000")
+        monkeypatch.setenv("ECOARCH_BUDGET_POLICY", str(policy))
+        with pytest.raises(BudgetExceededError) as exc:
+            check_budget(report_path)
+        assert isinstance(exc.value, PolicyViolationError)
+        assert [v.rule_id for v in exc.value.violations] == ["mr-delta"]
+        assert exc.value.cost == 45.0 and exc.value.budget == 10.0
+
+    def test_passing_policy_reports_rules(self, report_path, tmp_path, monkeypatch):
+        policy = tmp_path / "policy.json"
+        policy.write_text(json.dumps({"rules": [{"id": "g", "max_monthly_cost": 500}]}))
+        monkeypatch.setenv("ECOARCH_BUDGET_LIMIT", "1000")
+        monkeypatch.setenv("ECOARCH_BUDGET_POLICY", str(policy))
+        result = check_budget(report_path)
+        assert result["passed"]
+        assert result["rules"][0]["rule_id"] == "g"
+
+    def test_global_and_rule_failures_keep_every_verdict(self, report_path, tmp_path, monkeypatch):
+        policy = tmp_path / "policy.json"
+        policy.write_text(json.dumps({"rules": [
+            {"id": "mr-delta", "scope": "total", "max_delta": 10},
+            {"id": "data", "scope": "project", "match": "infra/data", "max_monthly_cost": 500},
+        ]}))
+        monkeypatch.setenv("ECOARCH_BUDGET_LIMIT", "100")
+        monkeypatch.setenv("ECOARCH_BUDGET_POLICY", str(policy))
+        with pytest.raises(BudgetExceededError) as exc:
+            check_budget(report_path)
+        assert not isinstance(exc.value, PolicyViolationError)
+        assert exc.value.cost == 160.0 and exc.value.budget == 100.0
+        assert [(v.rule_id, v.passed) for v in exc.value.verdicts] == [("mr-delta", False), ("data", True)]
+
+        entry = _gate_report(report_path)
+        assert entry["status"] == "failed"
+        assert [r["rule_id"] for r in entry["rules"]] == ["mr-delta", "data"]
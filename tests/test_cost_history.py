@@ -0,0 +1,161 @@
+"""Tests du writer cost_history (src/services/cost_history.py)."""
+import json
+import threading
+from unittest.mock import patch
+
+from src.parser import EcoArchParser
+from src.services.cost_history import CostHistoryWriter
+
+
+class _FakeClient:
+    """Client Supabase minimal : table().insert().execute()."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.batches: list[list[dict]] = []
+        self._lock = threading.Lock()
+
+    def table(self, name):
+        assert name == "cost_history"
+        return self
+
+    def insert(self, rows):
+        self._pending = list(rows)
+        return self
+
+    def execute(self):
+        with self._lock:
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("supabase down")
+            self.batches.append(self._pending)
+
+    @property
+    def rows(self):
+        return [r for batch in self.batches for r in batch]
+
+
+def _writer(tmp_path, client, **kwargs):
+    kwargs.setdefault("backoff_seconds", 0.0)
+    kwargs.setdefault("flush_interval", 0.01)
+    return CostHistoryWriter(
+        spool_path=tmp_path / "spool.jsonl", client_factory=lambda: client, **kwargs
+    )
+
+
+class TestBatching:
+    """Insertion par lots en arrière-plan."""
+
+    def test_records_are_batched(self, tmp_path):
+        client = _FakeClient()
+        writer = _writer(tmp_path, client, batch_size=3, flush_interval=60)
+        for i in range(7):
+            writer.add({"i": i})
+        writer.close()
+        assert [r["i"] for r in client.rows] == list(range(7))
+        assert max(len(b) for b in client.batches) == 3
+        assert not (tmp_path / "spool.jsonl").exists()
+
+    def test_transient_failure_is_retried(self, tmp_path):
+        client = _FakeClient(failures=2)
+        writer = _writer(tmp_path, client, max_attempts=3)
+        writer.add({"i": 1})
+        writer.close()
+        assert client.rows == [{"i": 1}]
+
+
+class TestSpool:
+    """Spool local des lots en échec et rejeu."""
+
+    def test_failed_batch_is_spooled_then_replayed(self, tmp_path):
+        down = _FakeClient(failures=100)
+        writer = _writer(tmp_path, down, max_attempts=2)
+        writer.add({"i": 1})
+        writer.add({"i": 2})
+        writer.close()
+        spool = tmp_path / "spool.jsonl"
+        assert [json.loads(line)["i"] for line in spool.read_text().splitlines()] == [1, 2]
+
+        # Nouveau job : Supabase revenu, le spool part avec le prochain lot
+        up = _FakeClient()
+        writer = _writer(tmp_path, up)
+        writer.add({"i": 3})
+        writer.close()
+        assert sorted(r["i"] for r in up.rows) == [1, 2, 3]
+        assert not spool.exists()
+
+    def test_replay_skips_truncated_line(self, tmp_path):
+        spool = tmp_path / "spool.jsonl"
+        spool.write_text('{"i": 1}\n{"i": 2}\n{"i": ')
+        client = _FakeClient()
+        assert _writer(tmp_path, client).replay_spool() == 2
+        assert client.rows == [{"i": 1}, {"i": 2}]
+
+    def test_replay_failure_keeps_records(self, tmp_path):
+        spool = tmp_path / "spool.jsonl"
+        spool.write_text('{"i": 1}\n')
+        assert _writer(tmp_path, _FakeClient(failures=100), max_attempts=1).replay_spool() == 0
+        assert json.loads(spool.read_text()) == {"i": 1}
+
+    def test_concurrent_replay_is_skipped(self, tmp_path):
+        spool = tmp_path / "spool.jsonl"
+        spool.write_text('{"i": 1}\n')
+        holder, other = _FakeClient(), _FakeClient()
+        writer = _writer(tmp_path, holder)
+        with writer._drain_lock() as acquired:
+            assert acquired
+            assert _writer(tmp_path, other).replay_spool() == 0
+        assert other.rows == [] and spool.exists()
+        assert writer.replay_spool() == 1
+
+    def test_interrupted_drain_is_resumed_once(self, tmp_path):
+        (tmp_path / "spool.jsonl.draining").write_text('{"i": 1}\n')
+        (tmp_path / "spool.jsonl").write_text('{"i": 2}\n')
+        client = _FakeClient()
+        writer = _writer(tmp_path, client)
+        assert writer.replay_spool() == 1
+        assert writer.replay_spool() == 1
+        assert client.rows == [{"i": 1}, {"i": 2}]
+
+    def test_close_timeout_spools_pending(self, tmp_path):
+        release = threading.Event()
+
+        class _SlowClient(_FakeClient):
+            def execute(self):
+                release.wait(5)
+                raise ConnectionError("timeout")
+
+        writer = _writer(tmp_path, _SlowClient(), max_attempts=1)
+        writer.add({"i": 1})
+        writer._wake.set()
+        writer.close(timeout=0.1)
+        release.set()
+        writer._worker.join(5)
+        # Le lot en vol n'est spoolé qu'une fois (par close)
+        assert (tmp_path / "spool.jsonl").read_text().splitlines() == ['{"i": 1}']
+
+    def test_add_after_close_goes_to_spool(self, tmp_path):
+        writer = _writer(tmp_path, _FakeClient())
+        writer.close()
+        writer.add({"i": 9})
+        assert json.loads((tmp_path / "spool.jsonl").read_text()) == {"i": 9}
+
+
+class TestParserIntegration:
+    """save_to_supabase délègue au writer partagé."""
+
+    def test_save_enqueues_record(self, tmp_path):
+        report = tmp_path / "report.json"
+        report.write_text(json.dumps({"totalMonthlyCost": "42", "currency": "EUR", "projects": []}))
+        client = _FakeClient()
+        writer = _writer(tmp_path, client)
+        with patch("src.services.cost_history.get_cost_history_writer", return_value=writer):
+            EcoArchParser(str(report)).save_to_supabase()
+        writer.close()
+        assert client.rows[0]["total_monthly_cost"] == 42.0
+        assert client.rows[0]["status"] == "PASSED"
+
+    def test_save_without_supabase_is_noop(self, tmp_path):
+        with patch("src.services.cost_history.Config") as mock_config:
+            mock_config.get_supabase_client.return_value = None
+            EcoArchParser(str(tmp_path / "absent.json")).save_to_supabase()
@@ -0,0 +1,55 @@
+"""Tests de l'idempotence et des verrous de déploiement (src/services/deploy_guard.py)."""
+import pytest
+
+from src.services.deploy_guard import (
+    DeploymentBusyError,
+    deployment_lock,
+    request_fingerprint,
+)
+
+CART = [{"type": "compute", "machine_type": "e2-medium"}, {"type": "storage", "storage_gb": 50}]
+
+
+class TestRequestFingerprint:
+    """Empreinte canonique d'une demande."""
+
+    def test_stable_across_key_order(self):
+        reordered = [{"machine_type": "e2-medium", "type": "compute"}, {"storage_gb": 50, "type": "storage"}]
+        assert request_fingerprint("d1", "apply", CART) == request_fingerprint("d1", "apply", reordered)
+
+    @pytest.mark.parametrize("other", [
+        ("d2", "apply", CART),
+        ("d1", "destroy", CART),
+        ("d1", "apply", list(reversed(CART))),
+        ("d1", "apply", CART[:1]),
+    ])
+    def test_distinct_requests(self, other):
+        assert request_fingerprint("d1", "apply", CART) != request_fingerprint(*other)
+
+
+class TestDeploymentLock:
+    """Exclusion mutuelle par deployment_id."""
+
+    def test_second_holder_is_refused(self, tmp_path):
+        with (
+            deployment_lock("d1", tmp_path),
+            pytest.raises(DeploymentBusyError) as exc,
+            deployment_lock("d1", tmp_path),
+        ):
+            pass
+        assert exc.value.deployment_id == "d1"
+
+    def test_other_deployment_is_independent(self, tmp_path):
+        with deployment_lock("d1", tmp_path), deployment_lock("d2", tmp_path):
+            pass
+
+    def test_released_after_exit_and_on_error(self, tmp_path):
+        with pytest.raises(ValueError), deployment_lock("d1", tmp_path):
+            raise ValueError("boom")
+        with deployment_lock("d1", tmp_path):
+            pass
+
+    def test_unsafe_id_stays_in_lock_dir(self, tmp_path):
+        with deployment_lock("../../etc/x", tmp_path):
+            pass
+        assert [p.parent for p in tmp_path.rglob("*.lock")] == [tmp_path]
@@ -0,0 +1,320 @@
+"""Tests de la file durable de déclenchement (src/services/deploy_queue.py)."""
+import sqlite3
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.deployer import PipelineLookupError, PipelineResult
+from src.services.deploy_queue import _SCHEMA, DeployQueue, DeployWorker, TokenBucket
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return DeployQueue(tmp_path / "queue.sqlite3", rate_per_min=60, burst=2, clock=clock)
+
+
+@pytest.fixture(autouse=True)
+def _no_audit():
+    with patch("src.services.deploy_queue.AuditService") as audit:
+        yield audit
+
+
+def _enqueue(queue, deployment_id="d1", project_id="p1", **kwargs):
+    return queue.enqueue(deployment_id, "apply", [{"type": "compute"}], project_id=project_id, **kwargs)
+
+
+class TestTokenBucket:
+    """Remplissage et consommation des jetons."""
+
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate=1.0, capacity=2, tokens=2, updated_at=0.0)
+        assert bucket.try_take(0.0) and bucket.try_take(0.0)
+        assert not bucket.try_take(0.0)
+        assert bucket.wait_time(0.5) == pytest.approx(0.5)
+        assert bucket.try_take(1.0)
+
+    def test_capacity_is_capped(self):
+        bucket = TokenBucket(rate=1.0, capacity=2, tokens=0, updated_at=0.0)
+        bucket.refill(100.0)
+        assert bucket.tokens == 2
+
+
+class TestDeployQueue:
+    """Persistance, idempotence, ordre et limitation de débit."""
+
+    def test_wal_mode(self, queue):
+        conn = sqlite3.connect(queue.path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_same_idempotency_key_returns_existing_job(self, queue):
+        first = _enqueue(queue, idempotency_key="k1")
+        second = _enqueue(queue, deployment_id="other", idempotency_key="k1")
+        assert second.id == first.id
+        assert second.deployment_id == "d1"
+        assert queue.pending_count() == 1
+
+    def test_jobs_survive_reopen(self, queue, tmp_path, clock):
+        job = _enqueue(queue)
+        reopened = DeployQueue(queue.path, clock=clock)
+        assert reopened.get(job.id).resources == [{"type": "compute"}]
+
+    def test_positions_follow_fifo_order(self, queue):
+        jobs = [_enqueue(queue, deployment_id=f"d{i}") for i in range(3)]
+        assert [queue.position(j.id) for j in jobs] == [1, 2, 3]
+
+        claimed, _ = queue.claim()
+        assert claimed.id == jobs[0].id
+        assert queue.position(jobs[0].id) == 0
+        assert queue.position(jobs[1].id) == 2  # le job en cours reste devant
+
+    def test_rate_limit_per_project(self, queue, clock):
+        for i in range(3):
+            _enqueue(queue, deployment_id=f"a{i}", project_id="A")
+        _enqueue(queue, deployment_id="b0", project_id="B")
+
+        claimed = [queue.claim()[0].deployment_id for _ in range(3)]
+        assert claimed == ["a0", "a1", "b0"]  # A épuisé (rafale 2), B passe
+
+        job, wait = queue.claim()
+        assert job is None
+        assert wait == pytest.approx(1.0)  # 60/min → un jeton par seconde
+
+        clock.now += 1.0
+        assert queue.claim()[0].deployment_id == "a2"
+
+    def test_bucket_is_shared_between_instances(self, queue, clock):
+        other = DeployQueue(queue.path, rate_per_min=60, burst=2, clock=clock)
+        for i in range(3):
+            _enqueue(queue, deployment_id=f"a{i}")
+        assert queue.claim()[0] is not None
+        assert other.claim()[0] is not None
+        assert queue.claim()[0] is None
+
+    def test_retry_delays_job(self, queue, clock):
+        job = _enqueue(queue)
+        queue.claim()
+        queue.retry(job.id, "HTTP 429", delay=30)
+
+        assert queue.claim() == (None, pytest.approx(30))
+        clock.now += 30
+        again, _ = queue.claim()
+        assert again.id == job.id and again.attempts == 2
+
+    def test_recover_requeues_only_expired_leases(self, queue, clock):
+        job = _enqueue(queue)
+        queue.claim()
+        # Un worker qui démarre ailleurs ne reprend pas un envoi en cours
+        assert queue.recover() == 0
+        assert queue.get(job.id).status == "running"
+
+        clock.now += queue.lease_s
+        assert queue.recover() == 1
+        recovered = queue.get(job.id)
+        assert recovered.status == "queued" and recovered.maybe_sent
+
+    def test_claim_reclaims_expired_lease(self, tmp_path, clock):
+        queue = DeployQueue(tmp_path / "q.sqlite3", lease_s=60, clock=clock)
+        job = _enqueue(queue)
+        queue.claim()
+        assert queue.claim()[0] is None
+        clock.now += 60
+        again, _ = queue.claim()
+        assert again.id == job.id and again.maybe_sent
+
+    def test_concurrent_claims_never_share_a_job(self, tmp_path):
+        queue = DeployQueue(tmp_path / "q.sqlite3", rate_per_min=6000, burst=1000)
+        for i in range(40):
+            _enqueue(queue, deployment_id=f"d{i}")
+        claimed: list[int] = []
+        lock = threading.Lock()
+
+        def drain():
+            while True:
+                job, _ = queue.claim()
+                if job is None:
+                    return
+                with lock:
+                    claimed.append(job.id)
+
+        threads = [threading.Thread(target=drain) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sorted(claimed) == sorted(set(claimed))
+        assert len(claimed) == 40
+
+
+class TestDeployWorker:
+    """Traitement des jobs : succès, retries, abandon."""
+
+    def test_success_marks_sent_and_updates_audit(self, queue, _no_audit):
+        trigger = MagicMock(return_value=PipelineResult(True, 7, "https://gitlab/p/7"))
+        job = _enqueue(queue, audit_id=3, idempotency_key="k")
+
+        DeployWorker(queue, trigger=trigger).run_once()
+
+        done = queue.get(job.id)
+        assert (done.status, done.pipeline_id) == ("sent", 7)
+        assert trigger.call_args.kwargs["idempotency_key"] == "k"
+        _no_audit.update_log.assert_called_once_with(3, "PIPELINE_SENT", "https://gitlab/p/7")
+
+    def test_retryable_failure_is_retried_with_backoff(self, queue, clock):
+        trigger = MagicMock(side_effect=[
+            PipelineResult(False, error="GitLab API 429", retryable=True),
+            PipelineResult(True, 8, "u"),
+        ])
+        worker = DeployWorker(queue, trigger=trigger, backoff_seconds=2)
+        job = _enqueue(queue)
+
+        worker.run_once()
+        assert queue.get(job.id).status == "queued"
+        assert worker.run_once() == pytest.approx(2)
+
+        clock.now += 2
+        worker.run_once()
+        assert queue.get(job.id).status == "sent"
+
+    def test_permanent_failure_fails_job(self, queue, _no_audit):
+        trigger = MagicMock(return_value=PipelineResult(False, error="GitLab API 400"))
+        job = _enqueue(queue, audit_id=4)
+
+        DeployWorker(queue, trigger=trigger).run_once()
+
+        assert queue.get(job.id).status == "failed"
+        _no_audit.update_log.assert_called_once_with(4, "ERROR")
+
+    def test_gives_up_after_max_attempts(self, queue, clock):
+        trigger = MagicMock(return_value=PipelineResult(False, error="503", retryable=True))
+        worker = DeployWorker(queue, trigger=trigger, max_attempts=2, backoff_seconds=1)
+        job = _enqueue(queue)
+
+        worker.run_once()
+        clock.now += 10
+        worker.run_once()
+
+        assert queue.get(job.id).status == "failed"
+        assert trigger.call_count == 2
+
+    def test_trigger_exception_is_retryable(self, queue):
+        trigger = MagicMock(side_effect=RuntimeError("boom"))
+        job = _enqueue(queue)
+
+        DeployWorker(queue, trigger=trigger).run_once()
+
+        assert queue.get(job.id).status == "queued"
+        assert queue.get(job.id).error == "boom"
+
+    def test_ambiguous_failure_looks_up_before_triggering_again(self, queue, clock, _no_audit):
+        trigger = MagicMock(return_value=PipelineResult(False, error="Timeout", retryable=True, maybe_sent=True))
+        find = MagicMock(return_value=PipelineResult(True, 12, "https://gitlab/p/12"))
+        worker = DeployWorker(queue, trigger=trigger, find_pipeline=find, backoff_seconds=1)
+        job = _enqueue(queue, audit_id=5, idempotency_key="k")
+
+        worker.run_once()
+        assert queue.get(job.id).maybe_sent
+        find.assert_not_called()
+
+        clock.now += 1
+        worker.run_once()
+        assert trigger.call_count == 1
+        find.assert_called_once_with("k", job.created_at)
+        done = queue.get(job.id)
+        assert (done.status, done.pipeline_id) == ("sent", 12)
+        _no_audit.update_log.assert_called_once_with(5, "PIPELINE_SENT", "https://gitlab/p/12")
+
+    def test_ambiguous_failure_retriggers_when_no_pipeline_exists(self, queue, clock):
+        trigger = MagicMock(side_effect=[
+            PipelineResult(False, error="Timeout", retryable=True, maybe_sent=True),
+            PipelineResult(True, 13, "u"),
+        ])
+        worker = DeployWorker(queue, trigger=trigger, find_pipeline=MagicMock(return_value=None),
+                              backoff_seconds=1)
+        job = _enqueue(queue)
+        worker.run_once()
+        clock.now += 1
+        worker.run_once()
+        assert trigger.call_count == 2 and queue.get(job.id).status == "sent"
+
+    def test_ambiguous_failure_without_lookup_fails_job(self, queue, clock, _no_audit):
+        trigger = MagicMock(return_value=PipelineResult(False, error="Timeout", retryable=True, maybe_sent=True))
+        find = MagicMock(side_effect=PipelineLookupError("GITLAB_API_TOKEN non configuré"))
+        worker = DeployWorker(queue, trigger=trigger, find_pipeline=find, backoff_seconds=1)
+        job = _enqueue(queue, audit_id=6)
+        worker.run_once()
+        clock.now += 1
+        worker.run_once()
+
+        failed = queue.get(job.id)
+        assert failed.status == "failed" and "peut-être créé" in failed.error
+        assert trigger.call_count == 1
+        _no_audit.update_log.assert_called_once_with(6, "ERROR")
+
+    def test_thread_drains_queue(self, queue):
+        sent = threading.Event()
+        trigger = MagicMock(side_effect=lambda **kw: sent.set() or PipelineResult(True, 1, "u"))
+        worker = DeployWorker(queue, trigger=trigger, idle_interval=0.05)
+        worker.start()
+        try:
+            _enqueue(queue)
+            worker.wake()
+            assert sent.wait(2)
+        finally:
+            worker.stop()
+
+
+class TestDeduplication:
+    """Demandes identiques (double clic, rejeu) et déploiements occupés."""
+
+    def test_same_request_within_window_returns_existing_job(self, queue, clock):
+        first = _enqueue(queue, request_hash="h1")
+        clock.now += 60
+        second = _enqueue(queue, request_hash="h1")
+        assert second.id == first.id
+        assert queue.find_recent("h1", 600).id == first.id
+
+    def test_same_request_after_window_creates_new_job(self, queue, clock):
+        first = _enqueue(queue, request_hash="h1", dedup_window=600)
+        clock.now += 601
+        assert _enqueue(queue, request_hash="h1", dedup_window=600).id != first.id
+
+    def test_failed_job_is_not_reused(self, queue):
+        first = _enqueue(queue, request_hash="h1")
+        queue.claim()
+        queue.fail(first.id, "GitLab API 400")
+        assert _enqueue(queue, request_hash="h1").id != first.id
+
+    def test_old_database_is_migrated(self, tmp_path, clock):
+        path = tmp_path / "old.sqlite3"
+        conn = sqlite3.connect(path)
+        conn.executescript(_SCHEMA.replace(",\n    request_hash    TEXT", ""))
+        conn.commit()
+        conn.close()
+
+        queue = DeployQueue(path, clock=clock)
+        assert _enqueue(queue, request_hash="h1").id == _enqueue(queue, request_hash="h1").id
+
+    def test_claim_skips_deployment_already_running(self, queue, clock):
+        first = _enqueue(queue, deployment_id="d1")
+        _enqueue(queue, deployment_id="d1", request_hash="other-cart")
+        third = _enqueue(queue, deployment_id="d2")
+
+        assert queue.claim()[0].id == first.id
+        assert queue.claim()[0].id == third.id  # d1 occupé : d2 passe devant
+        queue.complete(first.id, 1, "u")
+        clock.now += 1.0
+        assert queue.claim()[0].deployment_id == "d1"
@@ -4,20 +4,41 @@ Couvre :
 - trigger_deployment : succès, erreurs API, token manquant, timeout, connexion
 - trigger_destruction : raccourci avec action=destroy
 - PipelineResult : dataclass de résultat
+- fetch_pipeline_statuses : statuts en lot + cache TTL
 """
+import asyncio
+import base64
+import gzip
 import json
 
 import pytest
+import requests
 from unittest.mock import patch, MagicMock
+from urllib3.exceptions import MaxRetryError, NewConnectionError
 
+from src import deployer
 from src.deployer import (
+    PipelineStatusCache,
+    fetch_pipeline_statuses,
     trigger_deployment,
     trigger_destruction,
+    PipelineLookupError,
     PipelineResult,
     check_pipeline_status,
+    find_triggered_pipeline,
     extract_pipeline_id,
-    _enrich_resources_for_terraform,
+    _ARCHITECTURE_INLINE_MAX_CHARS,
+    _architecture_variables,
+    _encode_architecture,
 )
+from src.services.audit_service import AuditService
+
+
+@pytest.fixture(autouse=True)
+def _clear_status_cache():
+    deployer._status_cache.clear()
+    yield
+    deployer._status_cache.clear()
 
 
 # ══════════════════════════════════════════════════════════════════
@@ -57,7 +78,7 @@ class TestTriggerDeployment:
         {"type": "compute", "machine_type": "e2-medium", "display_name": "VM e2-medium"},
     ]
 
-    @patch("src.deployer.requests.post")
+    @patch("src.deployer.http_client.post")
     @patch("src.deployer.Config")
     def test_success_returns_pipeline_url(self, MockConfig, mock_post):
         """Un appel réussi (201) retourne l'URL du pipeline."""
@@ -86,13 +107,14 @@ class TestTriggerDeployment:
         payload = call_args[1]["data"]
         assert payload["token"] == "glptt-test-token"
         assert payload["ref"] == "main"
-        # Le panier est enrichi avec startup_script pour les compute
+        # Les compute référencent leur stack, les scripts sont à part
         arch = json.loads(payload["variables[TF_VAR_architecture_json]"])
-        assert arch[0]["type"] == "compute"
-        assert arch[0]["machine_type"] == "e2-medium"
-        assert "startup_script" in arch[0]
+        assert arch["resources"][0]["type"] == "compute"
+        assert arch["resources"][0]["machine_type"] == "e2-medium"
+        assert "startup_script" not in arch["resources"][0]
+        assert "scripts" in arch
 
-    @patch("src.deployer.requests.post")
+    @patch("src.deployer.http_client.post")
     @patch("src.deployer.Config")
     def test_api_error_returns_failure(self, MockConfig, mock_post):
         """Un code HTTP != 201 retourne un échec."""
@@ -110,6 +132,20 @@ class TestTriggerDeployment:
 
         assert result.success is False
         assert "403" in result.error
+        assert result.retryable is False
+
+    @patch("src.deployer.http_client.post")
+    @patch("src.deployer.Config")
+    def test_rate_limited_is_retryable(self, MockConfig, mock_post):
+        """429 (limite de débit GitLab) → échec rejouable par la file."""
+        MockConfig.GITLAB_TRIGGER_TOKEN = "glptt-test"
+        MockConfig.GITLAB_PROJECT_ID = "77811562"
+        mock_post.return_value = MagicMock(status_code=429, text="Too Many Requests")
+
+        result = trigger_deployment(self.RESOURCES, "deploy-002", idempotency_key="k-1")
+
+        assert result.retryable is True
+        assert mock_post.call_args[1]["data"]["variables[ECOARCH_IDEMPOTENCY_KEY]"] == "k-1"
 
     @patch("src.deployer.Config")
     def test_missing_token_returns_error(self, MockConfig):
@@ -133,7 +169,7 @@ class TestTriggerDeployment:
         assert result.success is False
         assert "GITLAB_PROJECT_ID" in result.error
 
-    @patch("src.deployer.requests.post")
+    @patch("src.deployer.http_client.post")
     @patch("src.deployer.Config")
     def test_timeout_returns_failure(self, MockConfig, mock_post):
         """Timeout réseau → échec gracieux."""
@@ -151,7 +187,7 @@ class TestTriggerDeployment:
         assert result.success is False
         assert "Timeout" in result.error
 
-    @patch("src.deployer.requests.post")
+    @patch("src.deployer.http_client.post")
     @patch("src.deployer.Config")
     def test_connection_error_returns_failure(self, MockConfig, mock_post):
         """Erreur de connexion → échec gracieux."""
@@ -162,14 +198,33 @@ class TestTriggerDeployment:
         MockConfig.GITLAB_REF = "main"
         MockConfig.GITLAB_PROJECT_URL = "https://gitlab.com/hichops/ecoarch"
 
-        mock_post.side_effect = real_requests.ConnectionError("DNS failure")
+        refused = NewConnectionError(None, "Failed to establish a new connection: Connection refused")
+        mock_post.side_effect = real_requests.ConnectionError(MaxRetryError(None, "/trigger", refused))
 
         result = trigger_deployment(self.RESOURCES, "deploy-006")
 
         assert result.success is False
         assert "Connexion impossible" in result.error
+        assert result.retryable and not result.maybe_sent
+
+    @pytest.mark.parametrize("exc, maybe_sent", [
+        (requests.ConnectTimeout("connect timed out"), False),
+        (requests.ReadTimeout("read timed out"), True),
+        (requests.ConnectionError("Connection reset by peer"), True),
+    ])
+    @patch("src.deployer.http_client.post")
+    @patch("src.deployer.Config")
+    def test_ambiguous_failures_are_flagged(self, MockConfig, mock_post, exc, maybe_sent):
+        """Seuls les échecs avant envoi sont rejouables sans vérification."""
+        MockConfig.GITLAB_TRIGGER_TOKEN = "glptt-test"
+        MockConfig.GITLAB_PROJECT_ID = "77811562"
+        mock_post.side_effect = exc
 
-    @patch("src.deployer.requests.post")
+        result = trigger_deployment(self.RESOURCES, "deploy-010")
+
+        assert result.retryable and result.maybe_sent is maybe_sent
+
+    @patch("src.deployer.http_client.post")
     @patch("src.deployer.Config")
     def test_payload_contains_architecture_json(self, MockConfig, mock_post):
         """Le payload doit contenir le panier sérialisé en JSON."""
@@ -191,12 +246,12 @@ class TestTriggerDeployment:
 
         payload = mock_post.call_args[1]["data"]
         arch_json = payload["variables[TF_VAR_architecture_json]"]
-        parsed = json.loads(arch_json)
+        parsed = json.loads(arch_json)["resources"]
         assert len(parsed) == 2
         assert parsed[0]["type"] == "compute"
         assert parsed[1]["type"] == "sql"
 
-    @patch("src.deployer.requests.post")
+    @patch("src.deployer.http_client.post")
     @patch("src.deployer.Config")
     def test_action_variable_sent(self, MockConfig, mock_post):
         """La variable ECOARCH_ACTION doit être transmise."""
@@ -215,7 +270,7 @@ class TestTriggerDeployment:
         payload = mock_post.call_args[1]["data"]
         assert payload["variables[ECOARCH_ACTION]"] == "destroy"
 
-    @patch("src.deployer.requests.post")
+    @patch("src.deployer.http_client.post")
     @patch("src.deployer.Config")
     def test_fallback_url_when_web_url_missing(self, MockConfig, mock_post):
         """Si web_url absent de la réponse, construit l'URL manuellement."""
@@ -243,7 +298,7 @@ class TestTriggerDeployment:
 class TestTriggerDestruction:
     """Tests du raccourci de destruction."""
 
-    @patch("src.deployer.requests.post")
+    @patch("src.deployer.http_client.post")
     @patch("src.deployer.Config")
     def test_destruction_sends_destroy_action(self, MockConfig, mock_post):
         """trigger_destruction envoie action='destroy'."""
@@ -267,64 +322,151 @@ class TestTriggerDestruction:
         assert payload["variables[ECOARCH_ACTION]"] == "destroy"
 
 
+class TestFindTriggeredPipeline:
+    """Recherche d'un pipeline par clé d'idempotence après un envoi ambigu."""
+
+    @pytest.fixture
+    def gitlab(self):
+        with patch("src.deployer.http_client.get") as get, patch("src.deployer.Config") as config:
+            config.GITLAB_API_TOKEN = "glpat-xxx"
+            config.GITLAB_PROJECT_ID = "77811562"
+            yield get
+
+    @staticmethod
+    def _resp(payload, status=200):
+        resp = MagicMock(status_code=status)
+        resp.json.return_value = payload
+        return resp
+
+    def test_pipeline_with_key_is_found(self, gitlab):
+        def get(url, **kwargs):
+            if url.endswith("/pipelines"):
+                assert kwargs["params"]["source"] == "trigger"
+                return self._resp([{"id": 9, "web_url": "u9"}, {"id": 8, "web_url": "u8"}])
+            key = "k" if url.endswith("/8/variables") else "other"
+            return self._resp([{"key": "ECOARCH_IDEMPOTENCY_KEY", "value": key}])
+
+        gitlab.side_effect = get
+        found = find_triggered_pipeline("k", 1_700_000_000.0)
+        assert (found.success, found.pipeline_id, found.pipeline_url) == (True, 8, "u8")
+
+    def test_absent_pipeline_returns_none(self, gitlab):
+        gitlab.return_value = self._resp([])
+        assert find_triggered_pipeline("k", 1_700_000_000.0) is None
+
+    def test_lookup_failure_raises(self, gitlab):
+        gitlab.return_value = self._resp({}, status=403)
+        with pytest.raises(PipelineLookupError):
+            find_triggered_pipeline("k", 1_700_000_000.0)
+
+    @patch("src.deployer.Config")
+    def test_without_api_token_raises(self, MockConfig):
+        MockConfig.GITLAB_API_TOKEN = ""
+        with pytest.raises(PipelineLookupError):
+            find_triggered_pipeline("k", 0.0)
+
+
 # ══════════════════════════════════════════════════════════════════
-#  Tests : _enrich_resources_for_terraform
+#  Tests : _encode_architecture (scripts dédupliqués)
 # ══════════════════════════════════════════════════════════════════
 
-class TestEnrichResources:
-    """Vérifie l'enrichissement des ressources compute avec startup_script."""
+class TestEncodeArchitecture:
+    """Vérifie l'encodage compact du panier (un script par stack)."""
 
-    def test_compute_gets_startup_script(self):
-        """Les ressources compute reçoivent le script de leur stack."""
+    def test_compute_references_stack_script(self):
+        """Les compute référencent leur stack ; le script est dans ``scripts``."""
         resources = [{"type": "compute", "machine_type": "e2-micro", "software_stack": "docker"}]
-        enriched = _enrich_resources_for_terraform(resources)
-        assert len(enriched) == 1
-        assert "startup_script" in enriched[0]
-        assert "docker" in enriched[0]["startup_script"].lower()
+        arch = _encode_architecture(resources)
+        assert arch["resources"][0]["software_stack"] == "docker"
+        assert "startup_script" not in arch["resources"][0]
+        assert "docker" in arch["scripts"]["docker"].lower()
 
-    def test_compute_none_stack_empty_script(self):
-        """software_stack='none' → script vide."""
+    def test_compute_none_stack_has_no_script(self):
+        """software_stack='none' → aucun script transmis."""
         resources = [{"type": "compute", "machine_type": "e2-micro", "software_stack": "none"}]
-        enriched = _enrich_resources_for_terraform(resources)
-        assert enriched[0]["startup_script"] == ""
+        assert _encode_architecture(resources)["scripts"] == {}
 
-    def test_compute_missing_stack_empty_script(self):
-        """Pas de software_stack → script vide (fallback 'none')."""
+    def test_compute_missing_stack_defaults_to_none(self):
+        """Pas de software_stack → référence 'none' (VM vide)."""
         resources = [{"type": "compute", "machine_type": "e2-micro"}]
-        enriched = _enrich_resources_for_terraform(resources)
-        assert enriched[0]["startup_script"] == ""
+        arch = _encode_architecture(resources)
+        assert arch["resources"][0]["software_stack"] == "none"
+        assert arch["scripts"] == {}
 
-    def test_sql_not_enriched(self):
-        """Les ressources SQL ne sont pas modifiées."""
-        resources = [{"type": "sql", "db_tier": "db-f1-micro"}]
-        enriched = _enrich_resources_for_terraform(resources)
-        assert "startup_script" not in enriched[0]
-
-    def test_storage_not_enriched(self):
-        """Les ressources storage ne sont pas modifiées."""
-        resources = [{"type": "storage", "storage_class": "STANDARD"}]
-        enriched = _enrich_resources_for_terraform(resources)
-        assert "startup_script" not in enriched[0]
+    def test_sql_and_storage_untouched(self):
+        """Les ressources SQL et storage ne sont pas modifiées."""
+        resources = [
+            {"type": "sql", "db_tier": "db-f1-micro"},
+            {"type": "storage", "storage_class": "STANDARD"},
+        ]
+        arch = _encode_architecture(resources)
+        assert arch["resources"] == resources
+        assert arch["scripts"] == {}
 
     def test_original_not_mutated(self):
-        """L'enrichissement ne mute pas la liste originale."""
-        original = [{"type": "compute", "machine_type": "e2-micro", "software_stack": "docker"}]
-        _enrich_resources_for_terraform(original)
-        assert "startup_script" not in original[0]
-
-    def test_mixed_resources(self):
-        """Seules les compute sont enrichies dans un panier mixte."""
+        """L'encodage ne mute pas la liste originale."""
+        original = [{"type": "compute", "machine_type": "e2-micro"}]
+        _encode_architecture(original)
+        assert "software_stack" not in original[0]
+
+    def test_payload_grows_with_stacks_not_vms(self):
+        """20 VM Docker → un seul exemplaire du script."""
+        one = [{"type": "compute", "machine_type": "e2-micro", "software_stack": "docker"}]
+        many = one * 20
+        script = _encode_architecture(one)["scripts"]["docker"]
+        payload = json.dumps(_encode_architecture(many))
+        assert payload.count(json.dumps(script)) == 1
+        assert len(payload) < len(json.dumps(_encode_architecture(one))) + 20 * 100
+
+    def test_mixed_stacks(self):
+        """Un script par stack distincte d'un panier mixte."""
         resources = [
-            {"type": "compute", "machine_type": "e2-micro", "software_stack": "web-nginx"},
+            {"type": "compute", "software_stack": "web-nginx"},
+            {"type": "compute", "software_stack": "docker"},
+            {"type": "compute", "software_stack": "web-nginx"},
             {"type": "sql", "db_tier": "db-f1-micro"},
-            {"type": "storage", "storage_class": "STANDARD"},
         ]
-        enriched = _enrich_resources_for_terraform(resources)
-        assert len(enriched) == 3
-        assert "startup_script" in enriched[0]
-        assert "nginx" in enriched[0]["startup_script"].lower()
-        assert "startup_script" not in enriched[1]
-        assert "startup_script" not in enriched[2]
+        arch = _encode_architecture(resources)
+        assert sorted(arch["scripts"]) == ["docker", "web-nginx"]
+        assert len(arch["resources"]) == 4
+
+
+def _decode_architecture(value: str) -> dict:
+    """Décodage fait par le job terraform_deploy (base64 -d | gunzip) puis infra/main.tf."""
+    text = value.strip()
+    if not text.startswith(("{", "[")):
+        text = gzip.decompress(base64.b64decode(text)).decode("utf-8")
+    decoded = json.loads(text)
+    if isinstance(decoded, list):  # ancien format : liste à scripts inline
+        return {"scripts": {}, "resources": decoded}
+    return decoded
+
+
+class TestArchitectureVariables:
+    """Variable de trigger : JSON brut ou compressé au-delà du seuil."""
+
+    def test_small_cart_sent_inline(self):
+        variables = _architecture_variables([{"type": "compute", "software_stack": "docker"}])
+        assert list(variables) == ["variables[TF_VAR_architecture_json]"]
+
+    def test_large_cart_is_compressed_and_round_trips(self):
+        resources = [
+            {"type": "storage", "storage_class": "STANDARD", "name": f"bucket-{i}"}
+            for i in range(400)
+        ]
+        variables = _architecture_variables(resources)
+
+        assert list(variables) == ["variables[ECOARCH_ARCHITECTURE_GZ]"]
+        packed = variables["variables[ECOARCH_ARCHITECTURE_GZ]"]
+        assert len(packed) < _ARCHITECTURE_INLINE_MAX_CHARS
+        assert _decode_architecture(packed)["resources"] == resources
+
+    def test_legacy_list_format_is_decoded(self):
+        legacy = json.dumps([{"type": "compute", "startup_script": "echo hi"}])
+        assert _decode_architecture(legacy) == {
+            "scripts": {},
+            "resources": [{"type": "compute", "startup_script": "echo hi"}],
+        }
 
 
 # ══════════════════════════════════════════════════════════════════
@@ -359,7 +501,7 @@ class TestExtractPipelineId:
 class TestCheckPipelineStatus:
     """Tests du polling de statut de pipeline GitLab."""
 
-    @patch("src.deployer.requests.get")
+    @patch("src.deployer.http_client.get")
     @patch("src.deployer.Config")
     def test_success_status(self, MockConfig, mock_get):
         MockConfig.GITLAB_API_TOKEN = "glpat-xxx"
@@ -372,7 +514,7 @@ class TestCheckPipelineStatus:
 
         assert check_pipeline_status(123) == "SUCCESS"
 
-    @patch("src.deployer.requests.get")
+    @patch("src.deployer.http_client.get")
     @patch("src.deployer.Config")
     def test_failed_status(self, MockConfig, mock_get):
         MockConfig.GITLAB_API_TOKEN = "glpat-xxx"
@@ -385,7 +527,7 @@ class TestCheckPipelineStatus:
 
         assert check_pipeline_status(456) == "FAILED"
 
-    @patch("src.deployer.requests.get")
+    @patch("src.deployer.http_client.get")
     @patch("src.deployer.Config")
     def test_running_status(self, MockConfig, mock_get):
         MockConfig.GITLAB_API_TOKEN = "glpat-xxx"
@@ -405,7 +547,7 @@ class TestCheckPipelineStatus:
 
         assert check_pipeline_status(123) is None
 
-    @patch("src.deployer.requests.get")
+    @patch("src.deployer.http_client.get")
     @patch("src.deployer.Config")
     def test_api_error_returns_none(self, MockConfig, mock_get):
         MockConfig.GITLAB_API_TOKEN = "glpat-xxx"
@@ -417,3 +559,208 @@ class TestCheckPipelineStatus:
         mock_get.return_value = mock_resp
 
         assert check_pipeline_status(999) is None
+
+
+# ══════════════════════════════════════════════════════════════════
+#  Tests : fetch_pipeline_statuses / cache TTL
+# ══════════════════════════════════════════════════════════════════
+
+def _pipelines_page(pipelines, next_page=""):
+    resp = MagicMock()
+    resp.status_code = 200
+    resp.json.return_value = pipelines
+    resp.headers = {"X-Next-Page": next_page}
+    return resp
+
+
+class TestPipelineStatusCache:
+    """Expiration du cache selon le type de statut."""
+
+    def test_running_expires_before_final(self):
+        now = [0.0]
+        cache = PipelineStatusCache(running_ttl=10, final_ttl=100, clock=lambda: now[0])
+        cache.put(1, "RUNNING")
+        cache.put(2, "SUCCESS")
+        now[0] = 11
+        assert cache.get(1) is None
+        assert cache.get(2) == "SUCCESS"
+
+    def test_negative_entry(self):
+        cache = PipelineStatusCache()
+        cache.put(3, None)
+        assert cache.get(3) == ""
+
+    def test_negative_entry_outlives_running(self):
+        now = [0.0]
+        cache = PipelineStatusCache(running_ttl=10, unknown_ttl=600, clock=lambda: now[0])
+        cache.put(3, None)
+        now[0] = 300
+        assert cache.get(3) == ""
+        now[0] = 601
+        assert cache.get(3) is None
+
+    def test_lookups_rotate(self):
+        now = [0.0]
+        cache = PipelineStatusCache(clock=lambda: now[0])
+        assert cache.least_recently_tried({5, 1, 3}, 2) == [1, 3]
+        now[0] = 1
+        assert cache.least_recently_tried({5, 1, 3, 9}, 2) == [5, 9]
+        now[0] = 2
+        assert cache.least_recently_tried({5, 1, 3, 9}, 2) == [1, 3]
+
+
+class TestFetchPipelineStatuses:
+    """Résolution en lot via la liste des pipelines du projet."""
+
+    @pytest.fixture
+    def gitlab(self):
+        with patch("src.deployer.http_client.get") as get, patch("src.deployer.Config") as config:
+            config.GITLAB_API_TOKEN = "glpat-xxx"
+            config.GITLAB_PROJECT_ID = "77811562"
+            yield get
+
+    def test_resolves_all_ids_from_paginated_list(self, gitlab):
+        gitlab.side_effect = [
+            _pipelines_page([{"id": 1, "status": "success"}, {"id": 9, "status": "running"}], "2"),
+            _pipelines_page([{"id": 2, "status": "failed"}, {"id": 3, "status": "pending"}]),
+        ]
+
+        statuses = fetch_pipeline_statuses([1, 2, 3], updated_after="2026-01-01T00:00:00+00:00")
+
+        assert statuses == {1: "SUCCESS", 2: "FAILED", 3: "RUNNING"}
+        assert gitlab.call_count == 2
+        params = gitlab.call_args_list[1].kwargs["params"]
+        assert params["page"] == 2
+        assert params["updated_after"] == "2026-01-01T00:00:00+00:00"
+        assert params["order_by"] == "updated_at"
+
+    def test_stops_paging_once_all_ids_found(self, gitlab):
+        gitlab.return_value = _pipelines_page([{"id": 1, "status": "success"}], "2")
+
+        assert fetch_pipeline_statuses([1]) == {1: "SUCCESS"}
+        assert gitlab.call_count == 1
+
+    def test_cache_serves_second_call(self, gitlab):
+        gitlab.return_value = _pipelines_page([{"id": 1, "status": "success"}, {"id": 2, "status": "running"}])
+        fetch_pipeline_statuses([1, 2])
+        gitlab.reset_mock()
+
+        assert fetch_pipeline_statuses([1, 2]) == {1: "SUCCESS", 2: "RUNNING"}
+        assert check_pipeline_status(2) == "RUNNING"
+        gitlab.assert_not_called()
+
+    def test_missing_id_falls_back_to_single_lookup_once(self, gitlab):
+        not_found = MagicMock(status_code=404, text="Not found")
+        gitlab.side_effect = [_pipelines_page([]), not_found]
+
+        assert fetch_pipeline_statuses([42]) == {}
+        assert gitlab.call_count == 2
+        assert gitlab.call_args_list[1].args[0].endswith("/pipelines/42")
+
+        # Entrée négative : pas de nouvel appel tant qu'elle est valide
+        assert fetch_pipeline_statuses([42]) == {}
+        assert gitlab.call_count == 2
+
+    def test_direct_lookups_are_capped_per_call(self, gitlab):
+        def get(url, **kwargs):
+            if url.endswith("/pipelines"):
+                return _pipelines_page([])
+            resp = MagicMock(status_code=200)
+            resp.json.return_value = {"status": "success"}
+            return resp
+
+        gitlab.side_effect = get
+        ids = list(range(1, 13))
+        with patch("src.deployer._MAX_DIRECT_LOOKUPS", 5):
+            first = fetch_pipeline_statuses(ids)
+            assert sorted(first) == [1, 2, 3, 4, 5]
+            # Les suivants au prochain passage ; les premiers viennent du cache
+            second = fetch_pipeline_statuses(ids)
+        assert sorted(second) == list(range(1, 11))
+        direct = [c.args[0] for c in gitlab.call_args_list if not c.args[0].endswith("/pipelines")]
+        assert len(direct) == 10
+
+    def test_unresolvable_pipelines_do_not_starve_newer_ones(self, gitlab):
+        def get(url, **kwargs):
+            if url.endswith("/pipelines"):
+                return _pipelines_page([])
+            pid = int(url.rsplit("/", 1)[1])
+            if pid < 100:
+                return MagicMock(status_code=404, text="Not found")
+            resp = MagicMock(status_code=200)
+            resp.json.return_value = {"status": "success"}
+            return resp
+
+        gitlab.side_effect = get
+        with patch("src.deployer._MAX_DIRECT_LOOKUPS", 2):
+            assert fetch_pipeline_statuses([1, 2]) == {}
+            # 1 et 2 restent introuvables : le pipeline récent passe quand même
+            assert fetch_pipeline_statuses([1, 2, 150]) == {150: "SUCCESS"}
+
+    @patch("src.deployer.Config")
+    def test_no_token_returns_empty(self, MockConfig):
+        MockConfig.GITLAB_API_TOKEN = ""
+        MockConfig.GITLAB_PROJECT_ID = "77811562"
+        assert fetch_pipeline_statuses([1]) == {}
+
+
+class TestSyncPipelineStatuses:
+    """AuditService.sync_pipeline_statuses : un appel en lot pour tous les logs."""
+
+    @patch("src.services.audit_service.fetch_pipeline_statuses")
+    @patch("src.services.audit_service.Config")
+    def test_single_bulk_call_and_updates(self, MockConfig, mock_fetch):
+        sb = MagicMock()
+        MockConfig.get_supabase_client.return_value = sb
+        mock_fetch.return_value = {10: "SUCCESS", 11: "RUNNING"}
+        logs = [
+            {"id": 1, "status": "PENDING", "pipeline_url": "https://gitlab.com/x/-/pipelines/10",
+             "created_at": "2026-03-01T12:00:00+00:00"},
+            {"id": 2, "status": "PIPELINE_SENT", "pipeline_url": "https://gitlab.com/x/-/pipelines/11",
+             "created_at": "2026-03-01T11:00:00+00:00"},
+            {"id": 3, "status": "SUCCESS", "pipeline_url": "https://gitlab.com/x/-/pipelines/12",
+             "created_at": "2026-01-01T00:00:00+00:00"},
+        ]
+
+        assert AuditService.sync_pipeline_statuses(logs) is True
+
+        mock_fetch.assert_called_once()
+        ids, = mock_fetch.call_args.args
+        assert ids == {10, 11}
+        assert mock_fetch.call_args.kwargs["updated_after"] == "2026-03-01T10:50:00+00:00"
+        assert [row["status"] for row in logs] == ["SUCCESS", "RUNNING", "SUCCESS"]
+        updates = [c.args[0] for c in sb.table.return_value.update.call_args_list]
+        assert updates == [{"status": "SUCCESS"}, {"status": "RUNNING"}]
+
+    @patch("src.services.audit_service.fetch_pipeline_statuses")
+    @patch("src.services.audit_service.Config")
+    def test_nothing_tracked_makes_no_call(self, MockConfig, mock_fetch):
+        MockConfig.get_supabase_client.return_value = MagicMock()
+        assert AuditService.sync_pipeline_statuses([{"id": 1, "status": "SUCCESS"}]) is False
+        mock_fetch.assert_not_called()
+
+    @patch("src.services.audit_service.fetch_pipeline_statuses")
+    @patch("src.services.audit_service.Config")
+    def test_running_rows_are_still_tracked(self, MockConfig, mock_fetch):
+        MockConfig.get_supabase_client.return_value = MagicMock()
+        mock_fetch.return_value = {10: "SUCCESS"}
+        logs = [{"id": 1, "status": "RUNNING", "pipeline_url": "https://gitlab.com/x/-/pipelines/10"}]
+
+        assert AuditService.sync_pipeline_statuses(logs) is True
+        assert logs[0]["status"] == "SUCCESS"
+
+    @patch("src.services.audit_service.fetch_pipeline_statuses_async")
+    @patch("src.services.audit_service.Config")
+    def test_async_variant_uses_async_fetch(self, MockConfig, mock_fetch):
+        sb = MagicMock()
+        MockConfig.get_supabase_client.return_value = sb
+
+        async def fetch(ids, updated_after=None):
+            return {10: "FAILED"}
+
+        mock_fetch.side_effect = fetch
+        logs = [{"id": 1, "status": "RUNNING", "pipeline_url": "https://gitlab.com/x/-/pipelines/10"}]
+
+        assert asyncio.run(AuditService.sync_pipeline_statuses_async(logs)) is True
+        assert logs[0]["status"] == "FAILED"
+        sb.table.return_value.update.assert_called_once_with({"status": "FAILED"})
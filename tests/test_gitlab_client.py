@@ -0,0 +1,138 @@
+"""Tests du client GitLab asynchrone (src/gitlab_client.py)."""
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from src import deployer, http_client
+from src.gitlab_client import AsyncGitLabClient, get_async_client
+
+API = "https://gitlab.test/api/v4"
+
+
+@pytest.fixture(autouse=True)
+def _config():
+    with patch("src.gitlab_client.Config") as config, patch("src.deployer.Config", config):
+        config.GITLAB_API_TOKEN = "glpat"
+        config.GITLAB_TRIGGER_TOKEN = "glptt"
+        config.GITLAB_PROJECT_ID = "1"
+        config.GITLAB_REF = "main"
+        config.GITLAB_PROJECT_URL = "https://gitlab.test/p"
+        yield config
+
+
+@pytest.fixture(autouse=True)
+def _clear_status_cache():
+    deployer._status_cache.clear()
+    yield
+    deployer._status_cache.clear()
+
+
+def _client(handler, sleeps=None, **kwargs):
+    async def sleep(delay):
+        if sleeps is not None:
+            sleeps.append(delay)
+
+    return AsyncGitLabClient(
+        base_url=API, transport=httpx.MockTransport(handler), sleep=sleep, backoff=0.1, **kwargs
+    )
+
+
+def _run(coro_fn):
+    """Exécute ``coro_fn()`` dans une boucle neuve (le client y est créé)."""
+    return asyncio.run(coro_fn())
+
+
+class TestAsyncGitLabClient:
+    """Retries, en-têtes et pool partagé."""
+
+    def test_get_retries_then_succeeds(self):
+        responses = iter([httpx.Response(503), httpx.Response(429, headers={"Retry-After": "2"}),
+                          httpx.Response(200, json={"status": "success"})])
+        sleeps: list[float] = []
+
+        async def scenario():
+            client = _client(lambda request: next(responses), sleeps)
+            resp = await client.get_pipeline(5)
+            await client.aclose()
+            return resp
+
+        assert _run(scenario).json() == {"status": "success"}
+        assert len(sleeps) == 2 and sleeps[1] == 2.0
+
+    def test_post_not_replayed_on_ambiguous_status(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(502)
+
+        async def scenario():
+            return await _client(handler).request("POST", f"{API}/projects/1/trigger/pipeline", data={"token": "t"})
+
+        assert _run(scenario).status_code == 502
+        assert len(calls) == 1
+
+    def test_cancelled_probe_is_released(self):
+        breaker = http_client.get_client().breaker("gitlab.test")
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        breaker._opened_at -= breaker.reset_timeout
+
+        def handler(request):
+            raise asyncio.CancelledError
+
+        async def scenario():
+            return await _client(handler).get_pipeline(5)
+
+        try:
+            with pytest.raises(asyncio.CancelledError):
+                _run(scenario)
+            breaker.before_call("gitlab.test")  # pas de CircuitOpenError
+        finally:
+            breaker.record_success()
+
+    def test_trace_uses_range_and_token(self):
+        seen = {}
+
+        def handler(request):
+            seen.update(url=str(request.url), range=request.headers["Range"],
+                        token=request.headers["PRIVATE-TOKEN"])
+            return httpx.Response(206, content=b"new")
+
+        async def scenario():
+            return await _client(handler).job_trace(9, 128)
+
+        assert _run(scenario).content == b"new"
+        assert seen == {"url": f"{API}/projects/1/jobs/9/trace", "range": "bytes=128-", "token": "glpat"}
+
+    def test_one_shared_client_per_event_loop(self):
+        async def twice():
+            return get_async_client(), get_async_client()
+
+        first, second = asyncio.run(twice())
+        other, _ = asyncio.run(twice())
+        assert first is second
+        assert other is not first
+
+
+class TestDeployerAsync:
+    """Fonctions asynchrones de src/deployer.py."""
+
+    def _with_client(self, handler):
+        return patch("src.deployer.get_async_client", side_effect=lambda: _client(handler))
+
+    def test_fetch_statuses_async_lists_then_checks_rest(self):
+        def handler(request):
+            if request.url.path.endswith("/pipelines"):
+                return httpx.Response(200, json=[{"id": 1, "status": "success"}, {"id": 9, "status": "running"}])
+            pid = int(request.url.path.rsplit("/", 1)[-1])
+            return httpx.Response(200, json={"status": "failed" if pid == 2 else "weird"})
+
+        with self._with_client(handler):
+            statuses = asyncio.run(deployer.fetch_pipeline_statuses_async([1, 2, 3]))
+
+        assert statuses == {1: "SUCCESS", 2: "FAILED"}
+        assert deployer._status_cache.get(9) == "RUNNING"
+        assert deployer._status_cache.get(3) == ""  # entrée négative
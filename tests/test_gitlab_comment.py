@@ -0,0 +1,139 @@
+"""Tests de l'upsert du commentaire de MR (src/gitlab_comment.py)."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src import gitlab_comment
+from src.gitlab_comment import NOTE_MARKER, _report_hash, _upsert_note
+
+NOTES_URL = "https://gitlab.com/api/v4/projects/1/merge_requests/7/notes"
+HEADERS = {"PRIVATE-TOKEN": "t"}
+
+
+def _response(status, json_data=None, headers=None):
+    response = MagicMock()
+    response.status_code = status
+    response.json.return_value = json_data
+    response.headers = headers or {}
+    response.text = ""
+    return response
+
+
+def _note(note_id, report):
+    return {"id": note_id, "system": False, "body": gitlab_comment._render_note(report, _report_hash(report))}
+
+
+@pytest.fixture(autouse=True)
+def note_cache(tmp_path, monkeypatch):
+    path = tmp_path / "mr_note.json"
+    monkeypatch.setattr(gitlab_comment, "NOTE_CACHE_PATH", path)
+    return path
+
+
+@pytest.fixture
+def http():
+    with patch("src.gitlab_comment.http_client.get") as get, \
+         patch("src.gitlab_comment.http_client.post") as post, \
+         patch("src.gitlab_comment.http_client.put") as put:
+        yield get, post, put
+
+
+class TestUpsert:
+    """Création, mise à jour et court-circuit de la note."""
+
+    def test_first_run_posts_note(self, http):
+        get, post, put = http
+        get.return_value = _response(200, [], {"ETag": 'W/"a"'})
+        post.return_value = _response(201, {"id": 42})
+
+        _upsert_note(NOTES_URL, HEADERS, "report v1", "1!7")
+
+        assert post.call_args.kwargs["json"]["body"].startswith(NOTE_MARKER)
+        put.assert_not_called()
+        assert gitlab_comment._load_note_cache("1!7")["note_id"] == 42
+
+    def test_cached_unchanged_report_makes_no_call(self, http):
+        get, post, put = http
+        post.return_value = _response(201, {"id": 42})
+        get.return_value = _response(200, [])
+        _upsert_note(NOTES_URL, HEADERS, "report v1", "1!7")
+        get.reset_mock()
+        post.reset_mock()
+
+        _upsert_note(NOTES_URL, HEADERS, "report v1", "1!7")
+
+        get.assert_not_called()
+        post.assert_not_called()
+        put.assert_not_called()
+
+    def test_cached_changed_report_puts_once(self, http):
+        get, post, put = http
+        get.return_value = _response(200, [])
+        post.return_value = _response(201, {"id": 42})
+        _upsert_note(NOTES_URL, HEADERS, "report v1", "1!7")
+        get.reset_mock()
+        post.reset_mock()
+        put.return_value = _response(200, {"id": 42})
+
+        _upsert_note(NOTES_URL, HEADERS, "report v2", "1!7")
+
+        assert put.call_args.args[0] == f"{NOTES_URL}/42"
+        get.assert_not_called()
+        post.assert_not_called()
+
+    def test_existing_note_found_on_second_page(self, http):
+        get, post, put = http
+        others = [{"id": i, "system": False, "body": "LGTM"} for i in range(100)]
+        get.side_effect = [
+            _response(200, others, {"X-Next-Page": "2"}),
+            _response(200, [_note(7, "old report")], {"X-Next-Page": ""}),
+        ]
+        put.return_value = _response(200, {"id": 7})
+
+        _upsert_note(NOTES_URL, HEADERS, "new report", "1!7")
+
+        assert get.call_args_list[1].kwargs["params"]["page"] == 2
+        assert put.call_args.args[0] == f"{NOTES_URL}/7"
+        post.assert_not_called()
+
+    def test_existing_note_with_same_hash_is_left_alone(self, http):
+        get, post, put = http
+        get.return_value = _response(200, [_note(7, "same")])
+
+        _upsert_note(NOTES_URL, HEADERS, "same", "1!7")
+
+        post.assert_not_called()
+        put.assert_not_called()
+        assert gitlab_comment._load_note_cache("1!7")["note_id"] == 7
+
+    def test_deleted_note_is_recreated(self, http):
+        _, post, put = http
+        gitlab_comment._save_note_cache("1!7", {"note_id": 5, "hash": "x"})
+        put.return_value = _response(404)
+        post.return_value = _response(201, {"id": 6})
+
+        _upsert_note(NOTES_URL, HEADERS, "report", "1!7")
+
+        assert gitlab_comment._load_note_cache("1!7")["note_id"] == 6
+
+    def test_etag_is_sent_and_304_short_circuits_lookup(self, http):
+        get, post, _ = http
+        gitlab_comment._save_note_cache("1!7", {"note_id": None, "hash": None, "etag": 'W/"a"'})
+        get.return_value = _response(304)
+        post.return_value = _response(201, {"id": 9})
+
+        _upsert_note(NOTES_URL, HEADERS, "report", "1!7")
+
+        assert get.call_count == 1
+        assert get.call_args.kwargs["headers"]["If-None-Match"] == 'W/"a"'
+        post.assert_called_once()
+
+    def test_corrupt_cache_is_ignored(self, http, note_cache):
+        get, post, _ = http
+        note_cache.write_text("{not json")
+        get.return_value = _response(200, [])
+        post.return_value = _response(201, {"id": 1})
+
+        _upsert_note(NOTES_URL, HEADERS, "report", "1!7")
+
+        assert gitlab_comment._load_note_cache("1!7")["note_id"] == 1
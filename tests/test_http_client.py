@@ -0,0 +1,148 @@
+"""Tests du transport HTTP partagé (src/http_client.py)."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from src.http_client import CircuitBreaker, CircuitOpenError, HttpClient
+
+URL = "https://gitlab.com/api/v4/projects/1/pipelines/2"
+
+
+def _response(status, headers=None):
+    response = MagicMock(spec=requests.Response)
+    response.status_code = status
+    response.headers = headers or {}
+    return response
+
+
+@pytest.fixture
+def sleeps():
+    return []
+
+
+@pytest.fixture
+def client(sleeps):
+    client = HttpClient(max_retries=3, backoff=0.1, failure_threshold=3, sleep=sleeps.append)
+    client.session.request = MagicMock()
+    return client
+
+
+class TestRetry:
+    """Nouvelles tentatives et Retry-After."""
+
+    def test_retries_5xx_then_succeeds(self, client, sleeps):
+        client.session.request.side_effect = [_response(502), _response(503), _response(200)]
+        assert client.get(URL).status_code == 200
+        assert client.session.request.call_count == 3
+        assert len(sleeps) == 2 and all(0 < s <= 0.2 for s in sleeps)
+
+    def test_honors_retry_after(self, client, sleeps):
+        client.session.request.side_effect = [_response(429, {"Retry-After": "4"}), _response(200)]
+        client.get(URL)
+        assert sleeps == [4.0]
+
+    def test_retry_after_is_capped(self, client, sleeps):
+        client.session.request.side_effect = [_response(429, {"Retry-After": "3600"}), _response(200)]
+        client.get(URL)
+        assert sleeps == [client.max_backoff]
+
+    def test_gives_up_after_max_retries(self, client):
+        client.failure_threshold = 10
+        client.session.request.return_value = _response(500)
+        assert client.get(URL).status_code == 500
+        assert client.session.request.call_count == 4
+
+    def test_post_not_replayed_on_ambiguous_status(self, client):
+        client.session.request.return_value = _response(502)
+        assert client.post(URL, data={}).status_code == 502
+        assert client.session.request.call_count == 1
+
+    def test_post_replayed_on_429(self, client):
+        client.session.request.side_effect = [_response(429), _response(201)]
+        assert client.post(URL, data={}).status_code == 201
+
+    def test_post_not_replayed_after_read_timeout(self, client):
+        client.session.request.side_effect = requests.ReadTimeout("slow")
+        with pytest.raises(requests.Timeout):
+            client.post(URL, data={})
+        assert client.session.request.call_count == 1
+
+    def test_client_errors_are_returned(self, client):
+        client.session.request.return_value = _response(404)
+        assert client.get(URL).status_code == 404
+        assert client.session.request.call_count == 1
+
+
+class TestCircuitBreaker:
+    """Échec rapide quand GitLab est indisponible."""
+
+    def test_opens_after_threshold_and_fails_fast(self, client):
+        client.max_retries = 0
+        client.session.request.side_effect = requests.ConnectionError("down")
+        for _ in range(3):
+            with pytest.raises(requests.ConnectionError):
+                client.get(URL)
+        client.session.request.reset_mock()
+
+        with pytest.raises(CircuitOpenError):
+            client.get(URL)
+        client.session.request.assert_not_called()
+        # Autre hôte : circuit indépendant
+        client.session.request.side_effect = None
+        client.session.request.return_value = _response(200)
+        assert client.get("https://other.example/x").status_code == 200
+
+    def test_half_open_probe(self):
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=lambda: now[0])
+        breaker.record_failure()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call("h")
+
+        now[0] = 31.0
+        breaker.before_call("h")          # appel d'essai autorisé
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call("h")      # un seul à la fois
+        breaker.record_success()
+        assert not breaker.is_open
+        breaker.before_call("h")
+
+    def test_failed_probe_reopens(self):
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=lambda: now[0])
+        breaker.record_failure()
+        now[0] = 31.0
+        breaker.before_call("h")
+        breaker.record_failure()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call("h")
+
+    def test_unexpected_error_releases_probe(self, client):
+        client.max_retries = 0
+        client.session.request.side_effect = requests.ConnectionError("down")
+        for _ in range(3):
+            with pytest.raises(requests.ConnectionError):
+                client.get(URL)
+        breaker = client.breaker("gitlab.com")
+        breaker._opened_at -= breaker.reset_timeout
+
+        client.session.request.side_effect = requests.TooManyRedirects("boucle")
+        with pytest.raises(requests.TooManyRedirects):
+            client.get(URL)
+        # Le circuit reste ouvert mais un nouvel essai est possible
+        client.session.request.side_effect = None
+        client.session.request.return_value = _response(200)
+        assert client.get(URL).status_code == 200
+        assert not breaker.is_open
+
+    def test_open_circuit_maps_to_pipeline_error(self):
+        from src.deployer import trigger_deployment
+
+        with patch("src.deployer.http_client.post", side_effect=CircuitOpenError("gitlab.com", 12)), \
+             patch("src.deployer.Config") as cfg:
+            cfg.GITLAB_TRIGGER_TOKEN = "t"
+            cfg.GITLAB_PROJECT_ID = "1"
+            result = trigger_deployment([], "dep-1")
+        assert not result.success
+        assert "Circuit ouvert" in result.error
@@ -0,0 +1,140 @@
+"""Tests de la lecture incrémentale des traces GitLab (src/services/job_traces.py)."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.services.job_traces import (
+    TraceStreamer,
+    clean_trace_line,
+    fetch_trace_chunk_async,
+)
+
+
+class FakeGitLab:
+    """Jobs et traces d'un pipeline, servis par plage d'octets."""
+
+    def __init__(self):
+        self.jobs: dict[int, dict] = {}
+        self.traces: dict[int, bytes] = {}
+        self.requests: list[tuple[int, int]] = []
+
+    def add_job(self, job_id, name, status="running", trace=b""):
+        self.jobs[job_id] = {"id": job_id, "name": name, "status": status}
+        self.traces[job_id] = trace
+
+    async def fetch_jobs(self, pipeline_id):
+        return sorted(self.jobs.values(), key=lambda j: -j["id"])  # ordre de l'API
+
+    async def fetch_chunk(self, job_id, offset):
+        self.requests.append((job_id, offset))
+        return self.traces[job_id][offset:]
+
+
+@pytest.fixture
+def gitlab():
+    return FakeGitLab()
+
+
+@pytest.fixture
+def streamer(gitlab):
+    return TraceStreamer(42, fetch_jobs=gitlab.fetch_jobs, fetch_chunk=gitlab.fetch_chunk)
+
+
+class TestCleanTraceLine:
+    """Nettoyage des lignes brutes du runner."""
+
+    def test_strips_ansi_and_sections(self):
+        raw = "section_start:1700000000:step_script\r\x1b[0K\x1b[32;1m$ terraform apply\x1b[0;m"
+        assert clean_trace_line(raw) == "$ terraform apply"
+
+    def test_carriage_return_keeps_last_rewrite(self):
+        assert clean_trace_line("10%\r50%\r100%\r") == "100%"
+
+
+def poll(streamer):
+    return asyncio.run(streamer.poll())
+
+
+class TestTraceStreamer:
+    """Offsets, tampon de ligne et fin de pipeline."""
+
+    def test_only_new_bytes_are_requested(self, gitlab, streamer):
+        gitlab.add_job(1, "terraform_deploy", trace=b"Init\nPlan: 2 to add\n")
+        assert poll(streamer) == ["── job terraform_deploy ──", "Init", "Plan: 2 to add"]
+
+        gitlab.traces[1] += b"Apply complete!\n"
+        assert poll(streamer) == ["Apply complete!"]
+        assert gitlab.requests == [(1, 0), (1, 20)]
+        assert streamer.bytes_read == len(gitlab.traces[1])
+
+    def test_partial_line_waits_for_newline(self, gitlab, streamer):
+        gitlab.add_job(1, "deploy", trace=b"Creat")
+        assert poll(streamer) == []
+        gitlab.traces[1] += "ing… é\n".encode()
+        assert poll(streamer) == ["── job deploy ──", "Creating… é"]
+
+    def test_finished_after_final_jobs_are_drained(self, gitlab, streamer):
+        gitlab.add_job(1, "validate", status="success", trace=b"ok\nlast line")
+        gitlab.add_job(2, "deploy", status="pending")
+
+        assert poll(streamer) == ["── job validate ──", "ok"]
+        assert not streamer.finished
+
+        gitlab.jobs[2]["status"] = "canceled"
+        assert poll(streamer) == ["last line"]
+        assert streamer.finished
+        requests = len(gitlab.requests)
+        assert poll(streamer) == []
+        assert len(gitlab.requests) == requests
+
+    def test_pending_and_skipped_jobs_are_not_read(self, gitlab, streamer):
+        gitlab.add_job(1, "plan", status="pending")
+        gitlab.add_job(2, "manual_destroy", status="manual")
+        poll(streamer)
+        assert gitlab.requests == []
+
+    def test_active_jobs_are_read_each_round(self, gitlab, streamer):
+        gitlab.add_job(1, "plan", trace=b"a\n")
+        gitlab.add_job(2, "lint", trace=b"b\n")
+
+        assert poll(streamer) == ["── job plan ──", "a", "── job lint ──", "b"]
+        gitlab.traces[2] += b"c\n"
+        assert poll(streamer) == ["c"]
+        assert (2, 2) in gitlab.requests
+
+    def test_unreadable_trace_of_finished_job_is_abandoned(self, gitlab, streamer):
+        gitlab.add_job(1, "deploy", status="failed")
+        streamer._fetch_chunk = AsyncMock(return_value=None)
+        poll(streamer)
+        assert streamer.finished
+
+
+class TestFetchTraceChunk:
+    """Interprétation des réponses GitLab (l'en-tête Range est testé avec le client)."""
+
+    @pytest.fixture(autouse=True)
+    def _config(self):
+        with patch("src.services.job_traces.Config") as config:
+            config.GITLAB_API_TOKEN = "glpat"
+            config.GITLAB_PROJECT_ID = "1"
+            yield
+
+    @pytest.mark.parametrize("status, content, expected", [
+        (206, b"new", b"new"),
+        (200, b"0123new", b"new"),
+        (416, b"", b""),
+        (500, b"err", None),
+    ])
+    def test_responses(self, status, content, expected):
+        client = MagicMock()
+        client.job_trace = AsyncMock(return_value=MagicMock(status_code=status, content=content))
+        with patch("src.services.job_traces.get_async_client", return_value=client):
+            assert asyncio.run(fetch_trace_chunk_async(9, 4)) == expected
+        client.job_trace.assert_awaited_once_with(9, 4)
+
+    def test_network_error_returns_none(self):
+        client = MagicMock()
+        client.job_trace = AsyncMock(side_effect=OSError("reset"))
+        with patch("src.services.job_traces.get_async_client", return_value=client):
+            assert asyncio.run(fetch_trace_chunk_async(9, 4)) is None
@@ -0,0 +1,60 @@
+"""Tests du tokenizer JSON incrémental (src/json_stream.py)."""
+import io
+import json
+
+import pytest
+
+from src.json_stream import JsonStreamError, JsonTokenizer
+
+_DOC = {
+    "a": 'quote \\" and \\\\ backslash',
+    "big": [{"k": i, "s": "x" * i} for i in range(40)],
+    "unicode": "éèà – 🌍",
+    "n": 12345678901234,
+    "f": -1.5e-3,
+    "t": True,
+    "null": None,
+    "empty": {},
+    "empty_list": [],
+}
+
+
+def _tok(doc, chunk_size=3):
+    raw = json.dumps(doc, ensure_ascii=False).encode("utf-8")
+    return JsonTokenizer(io.BytesIO(raw), chunk_size=chunk_size), raw
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 17, 4096])
+def test_read_every_value(chunk_size):
+    """Chaque valeur décodée est identique à json.loads, quel que soit le découpage."""
+    tok, _ = _tok(_DOC, chunk_size)
+    decoded = {key: tok.read_value() for key in tok.iter_object()}
+    assert decoded == _DOC
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 4096])
+def test_skip_value_and_spans(chunk_size):
+    """skip_value saute les sous-arbres ; last_span pointe sur les octets sources."""
+    tok, raw = _tok(_DOC, chunk_size)
+    spans = {}
+    for key in tok.iter_object():
+        tok.skip_value()
+        spans[key] = tok.last_span
+    for key, (start, end) in spans.items():
+        assert json.loads(raw[start:end]) == _DOC[key]
+
+
+def test_nested_iteration():
+    tok, _ = _tok({"rows": [[1, 2], [], [3]]})
+    out = []
+    for _ in tok.iter_object():
+        for _ in tok.iter_array():
+            out.append([tok.read_value() for _ in tok.iter_array()])
+    assert out == [[1, 2], [], [3]]
+
+
+def test_truncated_stream_raises():
+    tok = JsonTokenizer(io.BytesIO(b'{"a": [1, 2'), chunk_size=2)
+    with pytest.raises(JsonStreamError):
+        for _ in tok.iter_object():
+            tok.skip_value()
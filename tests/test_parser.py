@@ -44,4 +44,124 @@ def test_safe_float():
     assert EcoArchParser._safe_float(None) == 0.0
     assert EcoArchParser._safe_float("42.5") == 42.5
     assert EcoArchParser._safe_float("invalid") == 0.0
-    assert EcoArchParser._safe_float(100) == 100.0
\ No newline at end of file
+    assert EcoArchParser._safe_float(100) == 100.0
+
+# ── Mode streaming ────────────────────────────────────────────────
+
+def _monorepo_report(n_projects: int = 3, n_resources: int = 50) -> dict:
+    """Rapport Infracost multi-projets réaliste (clés totals après projects)."""
+    projects = []
+    for p in range(n_projects):
+        projects.append({
+            "name": f"svc-{p}",
+            "metadata": {"path": f"services/svc-{p}", "tags": ["é", "ü"]},
+            "pastBreakdown": {"resources": [{"name": "old", "monthlyCost": "1"}]},
+            "breakdown": {
+                "resources": [
+                    {
+                        "name": f"google_compute_instance.vm[{i}]",
+                        "resourceType": "google_compute_instance",
+                        "monthlyCost": str(10 + i),
+                        "diffMonthlyCost": None if i % 7 else "1.5",
+                        "costComponents": [{"name": "Instance usage", "price": "0.01"}],
+                        "subresources": [],
+                    }
+                    for i in range(n_resources)
+                ],
+                "totalMonthlyCost": "42",
+            },
+        })
+    return {
+        "version": "0.2",
+        "currency": "EUR",
+        "projects": projects,
+        "totalMonthlyCost": "1234.5",
+        "pastTotalMonthlyCost": "1000",
+        "diffTotalMonthlyCost": "234.5",
+        "summary": {"totalDetectedResources": n_projects * n_resources},
+    }
+
+
+@pytest.fixture
+def monorepo_json(tmp_path):
+    path = tmp_path / "monorepo.json"
+    path.write_text(json.dumps(_monorepo_report(), indent=2, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+def test_streaming_matches_classic_mode(monorepo_json):
+    """Le mode streaming produit exactement les mêmes ressources et métriques."""
+    classic = EcoArchParser(monorepo_json)
+    stream = EcoArchParser(monorepo_json, streaming=True)
+
+    assert list(stream.iter_resources()) == classic.resources
+    assert stream.extract_metrics() == classic.extract_metrics()
+    assert stream.extract_metrics()["currency"] == "EUR"
+
+
+def test_streaming_small_chunks(monorepo_json, monkeypatch):
+    """Des blocs de lecture minuscules ne changent pas le résultat."""
+    import src.json_stream as js
+
+    monkeypatch.setattr(js, "_DEFAULT_CHUNK_SIZE", 7)
+    classic = EcoArchParser(monorepo_json)
+    stream = EcoArchParser(monorepo_json, streaming=True)
+    assert list(stream.iter_resources()) == classic.resources
+
+
+def test_streaming_metrics_without_iteration(monorepo_json):
+    """extract_metrics() déclenche seul la passe streaming."""
+    metrics = EcoArchParser(monorepo_json, streaming=True).extract_metrics()
+    assert metrics["total_monthly_cost"] == 1234.5
+    assert metrics["diff_monthly_cost"] == 234.5
+
+
+def test_streaming_iter_projects(monorepo_json):
+    parser = EcoArchParser(monorepo_json, streaming=True)
+    counts = {name: sum(1 for _ in res) for name, res in parser.iter_projects()}
+    assert counts == {"svc-0": 50, "svc-1": 50, "svc-2": 50}
+
+
+def test_streaming_file_not_found():
+    parser = EcoArchParser("nonexistent.json", streaming=True)
+    assert list(parser.iter_resources()) == []
+    assert parser.extract_metrics()["total_monthly_cost"] == 0.0
+
+
+def test_streaming_malformed_json(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text('{"projects": [{"name": "a", "breakdown": {"resources": [{"name": "x"}, ')
+    parser = EcoArchParser(str(path), streaming=True)
+    assert [r["name"] for r in parser.iter_resources()] == ["x"]
+    assert parser.extract_metrics()["total_monthly_cost"] == 0.0
+
+
+def test_streaming_null_sections(tmp_path):
+    path = tmp_path / "nulls.json"
+    path.write_text(json.dumps({"projects": [{"name": "a", "breakdown": None}], "totalMonthlyCost": "3"}))
+    parser = EcoArchParser(str(path), streaming=True)
+    assert list(parser.iter_resources()) == []
+    assert parser.extract_metrics()["total_monthly_cost"] == 3.0
+
+
+def test_unnamed_project_same_name_in_both_modes(tmp_path):
+    path = tmp_path / "unnamed.json"
+    path.write_text(json.dumps({"projects": [
+        {"breakdown": {"resources": [{"name": "a", "monthlyCost": "1"}]}},
+        {"name": "", "breakdown": {"resources": [{"name": "b", "monthlyCost": "2"}]}},
+    ]}))
+    classic = EcoArchParser(str(path))
+    stream = EcoArchParser(str(path), streaming=True)
+    assert [r["project"] for r in classic.resources] == ["project-0", "project-1"]
+    assert list(stream.iter_resources()) == classic.resources
+
+
+def test_null_resource_name_same_in_both_modes(tmp_path):
+    path = tmp_path / "null_name.json"
+    path.write_text(json.dumps({"projects": [{"name": "p", "breakdown": {"resources": [
+        {"name": None, "resourceType": None, "monthlyCost": "1"},
+    ]}}]}))
+    classic = EcoArchParser(str(path))
+    stream = EcoArchParser(str(path), streaming=True)
+    assert [(r["name"], r["type"]) for r in classic.resources] == [("Unnamed", "Unknown")]
+    assert list(stream.iter_resources()) == classic.resources
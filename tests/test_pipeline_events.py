@@ -0,0 +1,208 @@
+"""Tests du webhook de pipeline GitLab (src/services/pipeline_events.py)."""
+import asyncio
+import json
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from starlette.testclient import TestClient
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src import deployer
+from src.services import pipeline_events
+from src.services.pipeline_events import (
+    PipelineEvent,
+    PipelineEventHub,
+    build_payload,
+    handle_pipeline_event,
+    parse_pipeline_event,
+    verify_token,
+)
+
+SECRET = "s3cret"
+
+
+@pytest.fixture(autouse=True)
+def _clear_status_cache():
+    deployer._status_cache.clear()
+    yield
+    deployer._status_cache.clear()
+
+
+class TestVerifyToken:
+    """Comparaison du secret partagé."""
+
+    def test_matching_token(self):
+        assert verify_token(SECRET, SECRET)
+
+    def test_wrong_token(self):
+        assert not verify_token("nope", SECRET)
+
+    def test_refused_without_configured_secret(self):
+        assert not verify_token("", "")
+        assert not verify_token("anything", "")
+
+
+class TestParsePipelineEvent:
+    """Extraction des événements « Pipeline Hook »."""
+
+    def test_pipeline_event(self):
+        event = parse_pipeline_event(build_payload(12, "success", "feature"))
+        assert event == PipelineEvent(12, "SUCCESS", "success", "feature")
+
+    def test_running_statuses_are_grouped(self):
+        assert parse_pipeline_event(build_payload(12, "pending")).status == "RUNNING"
+
+    @pytest.mark.parametrize("payload", [
+        {"object_kind": "push"},
+        {"object_kind": "pipeline"},
+        {"object_kind": "pipeline", "object_attributes": {"id": "x", "status": "success"}},
+        build_payload(12, "weird-status"),
+        ["not", "a", "dict"],
+    ])
+    def test_ignored_payloads(self, payload):
+        assert parse_pipeline_event(payload) is None
+
+
+class TestPipelineEventHub:
+    """Diffusion aux abonnés depuis un autre thread."""
+
+    def test_publish_from_other_thread(self):
+        hub = PipelineEventHub()
+        event = PipelineEvent(1, "SUCCESS", "success")
+
+        async def scenario():
+            queue = hub.subscribe()
+            thread = threading.Thread(target=hub.publish, args=(event,))
+            thread.start()
+            received = await asyncio.wait_for(queue.get(), timeout=2)
+            thread.join()
+            hub.unsubscribe(queue)
+            return received
+
+        assert asyncio.run(scenario()) == event
+        assert hub.subscriber_count == 0
+
+    def test_slow_subscriber_drops_oldest(self):
+        hub = PipelineEventHub(queue_size=2)
+
+        async def scenario():
+            queue = hub.subscribe()
+            for i in range(3):
+                hub.publish(PipelineEvent(i, "RUNNING", "running"))
+            await asyncio.sleep(0)
+            return [queue.get_nowait().pipeline_id for _ in range(queue.qsize())]
+
+        assert asyncio.run(scenario()) == [1, 2]
+
+    def test_closed_loop_is_unsubscribed(self):
+        hub = PipelineEventHub()
+
+        async def subscribe():
+            hub.subscribe()
+
+        asyncio.run(subscribe())
+        assert hub.publish(PipelineEvent(1, "SUCCESS", "success")) == 0
+        assert hub.subscriber_count == 0
+
+
+class TestHandlePipelineEvent:
+    """Application d'un événement : cache, audit, sessions."""
+
+    @patch("src.services.pipeline_events.hub")
+    @patch("src.services.pipeline_events.AuditService.apply_pipeline_status", return_value=1)
+    def test_updates_cache_audit_and_sessions(self, mock_apply, mock_hub):
+        event = handle_pipeline_event(build_payload(77, "failed"))
+
+        assert event.status == "FAILED"
+        assert deployer._status_cache.get(77) == "FAILED"
+        mock_apply.assert_called_once_with(77, "FAILED")
+        mock_hub.publish.assert_called_once_with(event)
+
+    @patch("src.services.pipeline_events.AuditService.apply_pipeline_status")
+    def test_irrelevant_payload_is_ignored(self, mock_apply):
+        assert handle_pipeline_event({"object_kind": "push"}) is None
+        mock_apply.assert_not_called()
+
+    @patch("src.services.audit_service.Config")
+    def test_audit_update_only_touches_tracked_rows(self, MockConfig):
+        from src.services.audit_service import AuditService
+
+        sb = MagicMock()
+        MockConfig.get_supabase_client.return_value = sb
+        query = sb.table.return_value.update.return_value.like.return_value.in_.return_value
+        query.execute.return_value.data = [{"id": 1}]
+
+        assert AuditService.apply_pipeline_status(77, "SUCCESS") == 1
+        sb.table.return_value.update.return_value.like.assert_called_once_with(
+            "pipeline_url", "%/pipelines/77"
+        )
+        statuses = sb.table.return_value.update.return_value.like.return_value.in_.call_args.args[1]
+        assert "SUCCESS" not in statuses and "RUNNING" in statuses
+
+
+class TestWebhookEndpoint:
+    """Endpoint Starlette monté dans l'app Reflex."""
+
+    @pytest.fixture
+    def client(self):
+        from frontend.frontend import webhooks
+
+        with patch.object(webhooks.Config, "GITLAB_WEBHOOK_SECRET", SECRET):
+            yield TestClient(webhooks.webhook_api)
+
+    def _post(self, client, body, token=SECRET):
+        return client.post(
+            pipeline_events.WEBHOOK_PATH,
+            content=body if isinstance(body, bytes) else json.dumps(body),
+            headers={pipeline_events.TOKEN_HEADER: token},
+        )
+
+    @patch("src.services.pipeline_events.AuditService.apply_pipeline_status", return_value=0)
+    def test_valid_event_is_accepted(self, _apply, client):
+        resp = self._post(client, build_payload(5, "success"))
+
+        assert resp.status_code == 202
+        assert resp.json()["status"] == "SUCCESS"
+        assert deployer._status_cache.get(5) == "SUCCESS"
+
+    def test_bad_token_is_rejected(self, client):
+        assert self._post(client, build_payload(5, "success"), token="bad").status_code == 401
+        assert deployer._status_cache.get(5) is None
+
+    def test_unconfigured_secret_rejects_everything(self):
+        from frontend.frontend import webhooks
+
+        with patch.object(webhooks.Config, "GITLAB_WEBHOOK_SECRET", ""):
+            resp = self._post(TestClient(webhooks.webhook_api), build_payload(5, "success"), token="")
+        assert resp.status_code == 401
+
+    def test_invalid_json(self, client):
+        assert self._post(client, b"{not json").status_code == 400
+
+    def test_oversized_payload(self, client):
+        body = b" " * (pipeline_events.MAX_PAYLOAD_BYTES + 1)
+        assert self._post(client, body).status_code == 413
+
+    def test_other_event_kind_is_ignored(self, client):
+        resp = self._post(client, {"object_kind": "push"})
+        assert resp.status_code == 200
+        assert resp.json() == {"accepted": False}
+
+
+class TestFakeSender:
+    """CLI d'envoi d'un webhook factice."""
+
+    @patch("src.services.pipeline_events.http_client.post")
+    def test_posts_gitlab_shaped_payload(self, mock_post):
+        mock_post.return_value = MagicMock(status_code=202, text="")
+
+        assert pipeline_events.main(["9", "success", "--token", SECRET]) == 0
+
+        kwargs = mock_post.call_args.kwargs
+        assert kwargs["json"] == build_payload(9, "success")
+        assert kwargs["headers"][pipeline_events.TOKEN_HEADER] == SECRET
@@ -0,0 +1,88 @@
+"""Tests du pricing direct depuis plan.json (src/plan_pricing.py)."""
+import json
+
+import pytest
+
+from src.parser import EcoArchParser
+from src.plan_pricing import main, price_plan
+from src.simulation import fallback_estimate
+
+
+def _change(address, rtype, before, after, mode="managed"):
+    return {"address": address, "mode": mode, "type": rtype,
+            "change": {"actions": ["update"], "before": before, "after": after}}
+
+
+_VM = {
+    "machine_type": "e2-standard-2",
+    "boot_disk": [{"initialize_params": [{"size": 50, "type": "pd-ssd"}]}],
+    "labels": {"team": "web"},
+}
+
+_PLAN = {
+    "format_version": "1.2",
+    "planned_values": {"root_module": {"resources": [{"huge": "x" * 1000}]}},
+    "resource_changes": [
+        _change("google_compute_instance.vm[0]", "google_compute_instance", None, _VM),
+        _change("google_sql_database_instance.db[0]", "google_sql_database_instance",
+                {"settings": [{"tier": "db-f1-micro"}]}, {"settings": [{"tier": "db-g1-small"}]}),
+        _change("google_storage_bucket.old", "google_storage_bucket",
+                {"storage_class": "NEARLINE"}, None),
+        _change("google_compute_global_address.lb[0]", "google_compute_global_address", None, {}),
+        _change("data.google_compute_instance.ref", "google_compute_instance", None, _VM, mode="data"),
+    ],
+}
+
+
+@pytest.fixture
+def plan_path(tmp_path):
+    path = tmp_path / "plan.json"
+    path.write_text(json.dumps(_PLAN))
+    return path
+
+
+class TestPricePlan:
+    """Valorisation des resource_changes."""
+
+    def test_matches_fallback_engine(self, plan_path):
+        report = price_plan(plan_path)
+        resources = {r["name"]: r for r in report["projects"][0]["breakdown"]["resources"]}
+
+        expected_vm = fallback_estimate([
+            {"type": "compute", "machine_type": "e2-standard-2", "disk_size": 50, "disk_type": "pd-ssd"}
+        ]).monthly_cost
+        assert float(resources["google_compute_instance.vm[0]"]["monthlyCost"]) == pytest.approx(expected_vm)
+        assert resources["google_compute_instance.vm[0]"]["tags"] == {"team": "web"}
+        assert float(resources["google_sql_database_instance.db[0]"]["diffMonthlyCost"]) == pytest.approx(25.55 - 7.67)
+        assert "google_storage_bucket.old" not in resources
+        assert report["projects"][0]["metadata"]["skipped"] == 2
+        assert float(report["pastTotalMonthlyCost"]) == pytest.approx(7.67 + 1.30)
+
+    def test_report_is_parser_compatible(self, plan_path, tmp_path):
+        out = tmp_path / "plan-report.json"
+        assert main([str(plan_path), "-o", str(out), "--project", "infra"]) == 0
+
+        parser = EcoArchParser(str(out))
+        metrics = parser.extract_metrics()
+        assert metrics["total_monthly_cost"] == pytest.approx(sum(r["monthly_cost"] for r in parser.resources))
+        assert metrics["diff_monthly_cost"] == pytest.approx(
+            float(json.loads(out.read_text())["diffTotalMonthlyCost"])
+        )
+        assert {r["project"] for r in parser.resources} == {"infra"}
+        lines = parser.explain("google_compute_instance.vm[0]")
+        assert [line.name for line in lines] == ["Instance usage (e2-standard-2)", "Storage (pd-ssd)"]
+
+    def test_missing_boot_disk_uses_default_size(self, tmp_path):
+        path = tmp_path / "plan.json"
+        path.write_text(json.dumps({"resource_changes": [
+            _change("google_compute_instance.a", "google_compute_instance", None,
+                    {"machine_type": "e2-micro"}),
+        ]}))
+        [res] = price_plan(path)["projects"][0]["breakdown"]["resources"]
+        assert float(res["monthlyCost"]) == pytest.approx(7.12 + 10 * 0.04)
+
+    def test_malformed_plan(self, tmp_path):
+        path = tmp_path / "plan.json"
+        path.write_text('{"resource_changes": [{"type": ')
+        assert main([str(path), "-o", str(tmp_path / "out.json")]) == 1
+        assert main([str(tmp_path / "absent.json"), "-o", str(tmp_path / "out.json")]) == 1
@@ -0,0 +1,95 @@
+"""Tests du moteur de diff entre rapports (src/report_diff.py)."""
+import json
+
+import pytest
+
+from src.parser import EcoArchParser
+from src.report_diff import ReportDiff, iter_resource_changes, main, top_changes
+
+
+def _row(name, cost, project="p", rtype="google_compute_instance"):
+    return {"name": name, "type": rtype, "project": project, "monthly_cost": cost, "delta": 0.0}
+
+
+BASELINE = [_row("vm[0]", 30.0), _row("vm[1]", 30.0), _row("db", 100.0), _row("bucket", 2.6)]
+CURRENT = [_row("vm[0]", 30.0), _row("vm[1]", 60.0), _row("bucket", 2.6), _row("lb", 18.26)]
+
+
+class TestIterChanges:
+
+    def test_added_removed_changed(self):
+        changes = {c.address: c for c in iter_resource_changes(CURRENT, BASELINE)}
+        assert set(changes) == {"vm[1]", "db", "lb"}
+        assert changes["vm[1]"].kind == "changed"
+        assert changes["vm[1]"].delta == 30.0
+        assert changes["db"].kind == "removed"
+        assert changes["db"].delta == -100.0
+        assert changes["lb"].kind == "added"
+
+    def test_tolerance_ignores_rounding_noise(self):
+        changes = list(iter_resource_changes([_row("a", 1.001)], [_row("a", 1.0)]))
+        assert changes == []
+
+    def test_project_qualifies_address(self):
+        changes = list(iter_resource_changes([_row("a", 1.0, project="x")], [_row("a", 1.0, project="y")]))
+        assert sorted(c.kind for c in changes) == ["added", "removed"]
+        assert list(iter_resource_changes(
+            [_row("a", 1.0, project="x")], [_row("a", 1.0, project="y")], by_project=False
+        )) == []
+
+    def test_duplicate_baseline_addresses_are_summed(self):
+        changes = list(iter_resource_changes([_row("a", 2.0)], [_row("a", 1.0), _row("a", 1.0)]))
+        assert changes == []
+
+    def test_duplicate_addresses_are_summed_on_both_sides(self):
+        baseline = [_row("a", 1.0), _row("a", 1.0)]
+        assert list(iter_resource_changes([_row("a", 1.0), _row("a", 1.0)], baseline)) == []
+        (change,) = iter_resource_changes([_row("a", 1.0), _row("a", 3.0)], baseline)
+        assert (change.kind, change.baseline_cost, change.current_cost) == ("changed", 2.0, 4.0)
+
+    def test_is_lazy_generator(self):
+        gen = iter_resource_changes(iter(CURRENT), iter(BASELINE))
+        assert next(gen).address == "vm[1]"
+
+
+class TestReportDiff:
+
+    def test_sorted_by_impact(self):
+        diff = ReportDiff.compute(CURRENT, BASELINE)
+        assert [c.address for c in diff.changes] == ["db", "vm[1]", "lb"]
+        assert diff.net_delta == pytest.approx(-51.74)
+
+    def test_top_changes(self):
+        top = top_changes(iter_resource_changes(CURRENT, BASELINE), 1)
+        assert [c.address for c in top] == ["db"]
+
+    def test_markdown(self):
+        md = ReportDiff.compute(CURRENT, BASELINE).to_markdown("EUR", limit=2)
+        assert "1 ajoutée(s), 1 supprimée(s), 1 modifiée(s)" in md
+        assert "`db`" in md and "`lb`" not in md
+        assert "1 autre(s)" in md
+
+    def test_markdown_empty(self):
+        assert "Aucune ressource" in ReportDiff.compute(BASELINE, BASELINE).to_markdown()
+
+
+def _write_report(path, rows):
+    path.write_text(json.dumps({"projects": [{"name": "p", "breakdown": {"resources": [
+        {"name": r["name"], "resourceType": r["type"], "monthlyCost": str(r["monthly_cost"])}
+        for r in rows
+    ]}}]}))
+    return str(path)
+
+
+def test_parsers_as_sources(tmp_path):
+    current = EcoArchParser(_write_report(tmp_path / "c.json", CURRENT), streaming=True)
+    baseline = EcoArchParser(_write_report(tmp_path / "b.json", BASELINE))
+    diff = ReportDiff.compute(current, baseline.table)
+    assert len(diff.changes) == 3
+
+
+def test_cli_outputs_json_lines(tmp_path, capsys):
+    code = main([_write_report(tmp_path / "c.json", CURRENT), _write_report(tmp_path / "b.json", BASELINE)])
+    assert code == 0
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert {line["kind"] for line in lines} == {"added", "removed", "changed"}
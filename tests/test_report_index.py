@@ -0,0 +1,191 @@
+"""Tests de l'index hiérarchique des coûts (src/report_index.py)."""
+import inspect
+import json
+import sys
+
+import pytest
+
+from src.parser import EcoArchParser
+from src.report_index import ReportIndex, explain_resource
+
+
+def _component(name, qty, price, unit="hours"):
+    return {
+        "name": name,
+        "unit": unit,
+        "monthlyQuantity": str(qty),
+        "price": str(price),
+        "monthlyCost": str(round(qty * price, 4)),
+    }
+
+
+_REPORT = {
+    "currency": "EUR",
+    "totalMonthlyCost": "120.0",
+    "projects": [
+        {
+            "name": "infra/app",
+            "breakdown": {
+                "resources": [
+                    {
+                        "name": "google_compute_instance.web",
+                        "resourceType": "google_compute_instance",
+                        "monthlyCost": "80.0",
+                        "costComponents": [_component("Instance usage (é2-medium)", 730, 0.1)],
+                        "subresources": [
+                            {
+                                "name": "boot_disk",
+                                "monthlyCost": "7.0",
+                                "costComponents": [_component("Storage (pd-ssd)", 40, 0.17, "GB")],
+                                "subresources": [
+                                    {
+                                        "name": "snapshot",
+                                        "costComponents": [_component("Snapshots", 10, 0.026, "GB")],
+                                    }
+                                ],
+                            }
+                        ],
+                    },
+                    {
+                        "name": "google_storage_bucket.assets",
+                        "resourceType": "google_storage_bucket",
+                        "monthlyCost": "2.0",
+                        "costComponents": None,
+                        "subresources": None,
+                    },
+                ]
+            },
+        },
+        {
+            "name": "infra/data",
+            "breakdown": {
+                "resources": [
+                    {
+                        "name": "google_compute_instance.web",
+                        "resourceType": "google_compute_instance",
+                        "monthlyCost": "38.0",
+                        "costComponents": [_component("Instance usage", 730, 0.052)],
+                    }
+                ]
+            },
+        },
+    ],
+}
+
+
+@pytest.fixture
+def report_path(tmp_path):
+    path = tmp_path / "report.json"
+    path.write_text(json.dumps(_REPORT, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+class TestIndex:
+    """Construction de l'index et décodage paresseux."""
+
+    def test_indexes_all_resources(self, report_path):
+        index = ReportIndex(report_path)
+        assert len(index) == 3
+        assert not any(node.is_materialized for node in index.resources)
+
+    def test_node_span_decodes_to_original(self, report_path):
+        index = ReportIndex(report_path)
+        start, end = index.resources[0].span
+        raw = report_path.read_bytes()[start:end]
+        assert json.loads(raw) == _REPORT["projects"][0]["breakdown"]["resources"][0]
+
+    def test_children_are_lazy(self, report_path):
+        node = ReportIndex(report_path).find("google_compute_instance.web", "infra/app")
+        assert [c.kind for c in node.children] == ["subresource", "cost_component"]
+        assert "costComponents" not in node.attrs
+        assert not any(c.is_materialized for c in node.children)
+
+    def test_find_by_project(self, report_path):
+        index = ReportIndex(report_path)
+        assert index.find("google_compute_instance.web", "infra/data").monthly_cost == 38.0
+        # Sans projet : première occurrence
+        assert index.find("google_compute_instance.web").monthly_cost == 80.0
+        assert index.find("missing") is None
+
+    def test_walk_depths(self, report_path):
+        node = ReportIndex(report_path).find("google_compute_instance.web", "infra/app")
+        walked = [(depth, n.kind) for depth, n in node.walk()]
+        assert walked == [
+            (0, "resource"),
+            (1, "subresource"),
+            (2, "subresource"),
+            (3, "cost_component"),
+            (2, "cost_component"),
+            (1, "cost_component"),
+        ]
+        assert len(list(node.walk(max_depth=1))) == 3
+
+    def test_missing_and_malformed_files(self, tmp_path):
+        assert len(ReportIndex(tmp_path / "absent.json")) == 0
+        broken = tmp_path / "broken.json"
+        broken.write_text('{"projects": [{"breakdown": {"resources": [{"name": ')
+        assert len(ReportIndex(broken)) == 0
+
+
+class TestExplain:
+    """Explication des coûts d'une ressource."""
+
+    def test_components_sorted_with_paths(self, report_path):
+        lines = ReportIndex(report_path).explain("google_compute_instance.web", "infra/app")
+        assert [line.name for line in lines] == [
+            "Instance usage (é2-medium)", "Storage (pd-ssd)", "Snapshots",
+        ]
+        assert lines[0].path == ("google_compute_instance.web",)
+        assert lines[2].path == ("google_compute_instance.web", "boot_disk", "snapshot")
+        assert lines[1].monthly_quantity == 40.0
+        assert lines[1].unit == "GB"
+
+    def test_null_children(self, report_path):
+        assert ReportIndex(report_path).explain("google_storage_bucket.assets") == []
+
+    def test_decoded_resource_matches_index(self, report_path):
+        resource = _REPORT["projects"][0]["breakdown"]["resources"][0]
+        expected = ReportIndex(report_path).explain("google_compute_instance.web", "infra/app")
+        assert explain_resource(resource) == expected
+
+    def test_deep_nesting_is_iterative(self, tmp_path):
+        # Construit à la main : json.dumps est lui-même récursif
+        depth = 400
+        leaf = json.dumps({"name": "leaf", "costComponents": [_component("deep", 1, 1.0)]})
+        opening = "".join(f'{{"name": "level{i}", "subresources": [' for i in range(depth))
+        resource = opening + leaf + "]}" * depth
+        path = tmp_path / "deep.json"
+        path.write_text('{"projects": [{"breakdown": {"resources": [' + resource + "]}}]}")
+
+        # Pile d'appels bornée bien en dessous de la profondeur de l'arbre
+        previous = sys.getrecursionlimit()
+        sys.setrecursionlimit(len(inspect.stack()) + 100)
+        try:
+            lines = ReportIndex(path).explain("level0")
+        finally:
+            sys.setrecursionlimit(previous)
+        assert len(lines) == 1
+        assert len(lines[0].path) == depth + 1
+
+
+class TestParserIntegration:
+    """Accès via EcoArchParser et rapport Markdown."""
+
+    @pytest.mark.parametrize("streaming", [False, True])
+    def test_explain_from_parser(self, report_path, streaming):
+        parser = EcoArchParser(str(report_path), streaming=streaming)
+        assert parser.index is parser.index
+        assert len(parser.explain("google_compute_instance.web", "infra/data")) == 1
+
+    def test_markdown_breakdown(self, report_path):
+        parser = EcoArchParser(str(report_path))
+        assert "Pourquoi ces coûts ?" not in parser.generate_markdown_report()
+        report = parser.generate_markdown_report(breakdown=True)
+        assert "<details><summary>Pourquoi ces coûts ?</summary>" in report
+        assert "Storage (pd-ssd) : 40 GB × 0.17 = 6.80 EUR" in report
+
+    def test_classic_mode_explains_without_index(self, report_path):
+        parser = EcoArchParser(str(report_path))
+        parser.generate_markdown_report(breakdown=True)
+        assert parser._index is None
+        assert len(parser.explain("google_compute_instance.web", "infra/data")) == 1
@@ -0,0 +1,101 @@
+"""Tests du snapshot binaire des rapports (src/report_snapshot.py)."""
+import json
+
+import pytest
+
+from src.parser import EcoArchParser
+from src.report_snapshot import (
+    load_report,
+    read_snapshot,
+    report_fingerprint,
+    snapshot_path,
+    write_snapshot,
+)
+
+
+def _report(cost_web=60.0):
+    return {
+        "currency": "EUR",
+        "totalMonthlyCost": str(cost_web + 90),
+        "diffTotalMonthlyCost": "12.5",
+        "projects": [
+            {"name": "infra/web", "breakdown": {"resources": [
+                {"name": "google_compute_instance.wéb[0]", "resourceType": "google_compute_instance",
+                 "monthlyCost": str(cost_web), "diffMonthlyCost": "12.5", "tags": {"team": "front"},
+                 "costComponents": [{"name": "Instance usage", "unit": "hours", "monthlyQuantity": "730",
+                                     "price": "0.1", "monthlyCost": str(cost_web)}]},
+            ]}},
+            {"name": "infra/data", "breakdown": {"resources": [
+                {"name": "google_sql_database_instance.db", "resourceType": "google_sql_database_instance",
+                 "monthlyCost": "90"},
+            ]}},
+        ],
+    }
+
+
+@pytest.fixture
+def report_path(tmp_path):
+    path = tmp_path / "infracost-report.json"
+    path.write_text(json.dumps(_report()))
+    return path
+
+
+class TestSnapshot:
+    """Écriture, relecture et invalidation du sidecar."""
+
+    def test_roundtrip_matches_json_parse(self, report_path):
+        first = load_report(report_path)
+        assert snapshot_path(report_path).exists()
+
+        cached = load_report(report_path)
+        assert cached.resources == first.resources
+        assert cached.extract_metrics() == first.extract_metrics()
+        assert cached.generate_markdown_report() == first.generate_markdown_report()
+        assert cached.generate_markdown_report(breakdown=True) == first.generate_markdown_report(breakdown=True)
+        assert cached.table.group_by("project") == first.table.group_by("project")
+
+    def test_snapshot_is_used(self, report_path, monkeypatch):
+        load_report(report_path)
+        monkeypatch.setattr("src.parser.EcoArchParser._load_data", lambda self: pytest.fail("reparse"))
+        assert load_report(report_path).extract_metrics()["total_monthly_cost"] == 150.0
+
+    def test_breakdown_without_reindexing(self, report_path, monkeypatch):
+        load_report(report_path)
+        monkeypatch.setattr("src.parser.ReportIndex", lambda path: pytest.fail("reindex"))
+        report = load_report(report_path).generate_markdown_report(breakdown=True)
+        assert "Instance usage : 730 hours × 0.1 = 60.00 EUR" in report
+
+    def test_failed_write_leaves_no_temp_file(self, report_path, monkeypatch):
+        parser = EcoArchParser(str(report_path))
+        sidecar = snapshot_path(report_path)
+
+        def fail(src, dst):
+            raise OSError("disque plein")
+
+        monkeypatch.setattr("src.report_snapshot.os.replace", fail)
+        with pytest.raises(OSError):
+            write_snapshot(parser, report_fingerprint(report_path), sidecar)
+        assert list(report_path.parent.iterdir()) == [report_path]
+
+    def test_changed_report_invalidates(self, report_path):
+        load_report(report_path)
+        report_path.write_text(json.dumps(_report(cost_web=70.0)))
+        assert load_report(report_path).extract_metrics()["total_monthly_cost"] == 160.0
+        assert read_snapshot(snapshot_path(report_path), report_fingerprint(report_path)) is not None
+
+    @pytest.mark.parametrize("garbage", [b"", b"ECOSNAP\x01short", b"not a snapshot at all"])
+    def test_corrupt_sidecar_is_rebuilt(self, report_path, garbage):
+        snapshot_path(report_path).write_bytes(garbage)
+        assert len(load_report(report_path).resources) == 2
+        assert read_snapshot(snapshot_path(report_path), report_fingerprint(report_path)) is not None
+
+    def test_truncated_sidecar_is_rejected(self, report_path):
+        load_report(report_path)
+        sidecar = snapshot_path(report_path)
+        sidecar.write_bytes(sidecar.read_bytes()[:-4])
+        assert read_snapshot(sidecar, report_fingerprint(report_path)) is None
+
+    def test_missing_report(self, tmp_path):
+        parser = load_report(tmp_path / "absent.json")
+        assert parser.resources == []
+        assert not snapshot_path(tmp_path / "absent.json").exists()
@@ -0,0 +1,146 @@
+"""Tests de la table colonnaire des ressources (src/resource_table.py)."""
+import json
+
+import pytest
+
+from src.parser import EcoArchParser
+from src.resource_table import ResourceRows, ResourceTable, name_prefix
+
+ROWS = [
+    {"name": "module.web.google_compute_instance.vm[0]", "type": "google_compute_instance",
+     "project": "web", "monthly_cost": 30.0, "delta": 30.0},
+    {"name": "module.web.google_compute_instance.vm[1]", "type": "google_compute_instance",
+     "project": "web", "monthly_cost": 30.0, "delta": 0.0},
+    {"name": "module.db.google_sql_database_instance.db", "type": "google_sql_database_instance",
+     "project": "data", "monthly_cost": 100.0, "delta": -20.0},
+    {"name": "google_storage_bucket.assets", "type": "google_storage_bucket",
+     "project": "data", "monthly_cost": 2.6, "delta": 0.0},
+]
+
+
+@pytest.fixture
+def table():
+    return ResourceTable.from_rows(ROWS)
+
+
+class TestConstruction:
+
+    def test_roundtrip_rows(self, table):
+        assert list(table.iter_rows()) == ROWS
+        assert len(table) == 4
+
+    def test_categories_are_shared(self, table):
+        assert table.types.count("google_compute_instance") == 1
+        assert table.type_codes.tolist() == [0, 0, 1, 2]
+
+    def test_empty(self):
+        empty = ResourceTable.from_rows([])
+        assert len(empty) == 0
+        assert empty.group_by("type") == []
+        assert len(empty.top(3)) == 0
+
+
+class TestAggregations:
+
+    def test_group_by_type_sorted_by_cost(self, table):
+        groups = table.group_by("type")
+        assert [g.key for g in groups] == [
+            "google_sql_database_instance", "google_compute_instance", "google_storage_bucket",
+        ]
+        assert groups[1].count == 2
+        assert groups[1].monthly_cost == 60.0
+        assert groups[1].delta == 30.0
+
+    def test_group_by_project(self, table):
+        groups = {g.key: g for g in table.group_by("project")}
+        assert groups["data"].monthly_cost == pytest.approx(102.6)
+        assert groups["web"].count == 2
+
+    def test_group_by_name_prefix_depth(self, table):
+        groups = {g.key: g.count for g in table.group_by("name_prefix", depth=2)}
+        assert groups == {"module.web": 2, "module.db": 1, "google_storage_bucket.assets": 1}
+
+    def test_top_n(self, table):
+        top = table.top(2)
+        assert [r["monthly_cost"] for r in top.iter_rows()] == [100.0, 30.0]
+
+    def test_top_by_abs_delta(self, table):
+        top = table.top(2, by="abs_delta")
+        assert [r["delta"] for r in top.iter_rows()] == [30.0, -20.0]
+
+    def test_totals(self, table):
+        assert table.total_monthly_cost == pytest.approx(162.6)
+        assert table.total_delta == pytest.approx(10.0)
+
+
+class TestFilters:
+
+    def test_filter_by_type_and_project(self, table):
+        sub = table.filter(resource_type="google_compute_instance", project="web")
+        assert len(sub) == 2
+
+    def test_filter_unknown_value(self, table):
+        assert len(table.filter(project="nope")) == 0
+
+    def test_filter_prefix_cost_changed(self, table):
+        assert len(table.filter(name_prefix="module.", min_cost=50)) == 1
+        assert len(table.filter(changed_only=True)) == 2
+
+
+class TestResourceRows:
+    """Vue paresseuse « liste de dicts »."""
+
+    def test_rows_with_labels(self, table):
+        rows = ResourceRows(table, {2: {"team": "data"}})
+        assert len(rows) == 4
+        assert rows[2] == {**ROWS[2], "labels": {"team": "data"}}
+        assert rows[-1]["labels"] == {}
+        assert rows == [{**row, "labels": {2: {"team": "data"}}.get(i, {})} for i, row in enumerate(ROWS)]
+        assert [r["name"] for r in rows[1:3]] == [ROWS[1]["name"], ROWS[2]["name"]]
+        with pytest.raises(IndexError):
+            rows[4]
+
+    def test_rows_are_copies(self, table):
+        rows = ResourceRows(table, {0: {"team": "web"}})
+        rows[0]["labels"]["team"] = "changed"
+        assert rows[0]["labels"] == {"team": "web"}
+
+
+def test_name_prefix_strips_indexes():
+    assert name_prefix('google_compute_instance.vm["a.b"]', depth=2) == "google_compute_instance.vm"
+
+
+def test_parser_table_and_markdown(tmp_path):
+    """Le parser expose la table et l'utilise pour le rapport Markdown."""
+    report = {
+        "currency": "USD",
+        "totalMonthlyCost": "60",
+        "projects": [{"name": "p", "breakdown": {"resources": [
+            {"name": "a", "resourceType": "google_compute_instance", "monthlyCost": "40"},
+            {"name": "b", "resourceType": "google_storage_bucket", "monthlyCost": "20"},
+        ]}}],
+    }
+    path = tmp_path / "r.json"
+    path.write_text(json.dumps(report))
+
+    for streaming in (False, True):
+        parser = EcoArchParser(str(path), streaming=streaming)
+        assert parser.table.total_monthly_cost == 60.0
+        md = parser.generate_markdown_report()
+        assert "`google_compute_instance` | 1 | 40.00 USD" in md
+
+
+def test_classic_parser_keeps_only_the_table(tmp_path):
+    """Mode classique : ``resources`` est une vue sur la table, labels à part."""
+    report = {"projects": [{"name": "p", "breakdown": {"resources": [
+        {"name": "a", "resourceType": "t", "monthlyCost": "1", "tags": {"env": "prod"}},
+        {"name": "b", "resourceType": "t", "monthlyCost": "2"},
+    ]}}]}
+    path = tmp_path / "r.json"
+    path.write_text(json.dumps(report))
+
+    parser = EcoArchParser(str(path))
+    assert isinstance(parser.resources, ResourceRows)
+    assert parser.labels == {0: {"env": "prod"}}
+    assert [r["labels"] for r in parser.iter_resources()] == [{"env": "prod"}, {}]
+    assert parser.table.names == ["a", "b"]
@@ -167,6 +167,18 @@ class TestTerraformCodeGeneration:
         # Le deployment_id apparaît dans le tfvars
         assert "test-deploy" in code
 
+    def test_startup_scripts_deduplicated_by_stack(self, tmp_path):
+        """5 VM Docker → un seul script dans startup_scripts, référencé par stack."""
+        simulator = InfracostSimulator()
+        resources = [{"type": "compute", "machine_type": "e2-micro", "software_stack": "docker"}] * 5
+        simulator._generate_terraform_files(resources, "dedup", include_backend=False, tmpdir=str(tmp_path))
+
+        tfvars = json.loads((tmp_path / "terraform.tfvars.json").read_text())
+        assert list(tfvars["startup_scripts"]) == ["docker"]
+        assert all("startup_script" not in vm for vm in tfvars["compute_instances"])
+        assert {vm["software_stack"] for vm in tfvars["compute_instances"]} == {"docker"}
+        assert "var.startup_scripts" in (tmp_path / "main.tf").read_text()
+
     def test_empty_resources_returns_valid_terraform(self):
         """Une liste vide doit renvoyer un bloc Terraform valide avec counts à 0."""
         simulator = InfracostSimulator()
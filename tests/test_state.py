@@ -85,7 +85,9 @@ def _make_state(**overrides):
     s._create_audit_log = lambda action, target_id, cost=None: None
     s._update_audit_log = lambda audit_id, status: None
     s._append_log = _get_fn(_St._append_log).__get__(s) if hasattr(_St._append_log, 'fn') else lambda line: s.logs.append(line)
-    s.load_audit_logs = lambda: None
+    s._enqueue_pipeline = lambda *args, **kwargs: _St._enqueue_pipeline(s, *args, **kwargs)
+    s._request_hash = lambda *args: _St._request_hash(s, *args)
+    s._attach_existing_job = lambda *args: _St._attach_existing_job(s, *args)
     # Auth: _require_auth vérifie is_authenticated et current_user
     s._require_auth = lambda: bool(s.is_authenticated and s.current_user)
 
@@ -205,6 +207,7 @@ class TestCostGuardrails:
         )
 
         with patch("frontend.frontend.state.trigger_deployment") as mock_trigger, \
+             patch("frontend.frontend.state.submit_deployment", return_value=None), \
              patch("frontend.frontend.state.Config") as mock_config:
 
             # Configure GitLab trigger mock
@@ -227,6 +230,84 @@ class TestCostGuardrails:
 
         assert s.deploy_status in ("queued", "pipeline_sent", "running", "success", "error")
 
+    def test_deployment_goes_through_queue(self):
+        """Trigger configuré → demande mise en file, pas d'appel GitLab direct."""
+        from frontend.frontend.state import State
+
+        s = _make_state(cost=10.0, resource_list=[{"type": "compute", "display_name": "VM"}])
+
+        with patch("frontend.frontend.state.trigger_deployment") as mock_trigger, \
+             patch("frontend.frontend.state.submit_deployment") as mock_submit, \
+             patch("frontend.frontend.state.find_recent_deployment", return_value=None), \
+             patch("frontend.frontend.state.Config") as mock_config:
+            mock_config.GITLAB_TRIGGER_TOKEN = "glptt-test"
+            mock_config.DEFAULT_BUDGET_LIMIT = 50.0
+            mock_submit.return_value = MagicMock(id=12)
+
+            events = list(_get_fn(State.start_deployment)(s))
+
+        mock_trigger.assert_not_called()
+        assert mock_submit.call_args.args[:2] == ("test1234", "apply")
+        assert mock_submit.call_args.kwargs["request_hash"]
+        assert s.deploy_job_id == 12
+        assert s.deploy_status == "queued"
+        assert State.watch_deploy_job in events
+
+    def test_repeated_click_follows_existing_job(self):
+        """Même panier déjà en file → on suit le job existant, sans nouvel audit."""
+        from frontend.frontend.state import State
+
+        s = _make_state(cost=10.0, resource_list=[{"type": "compute", "display_name": "VM"}])
+
+        with patch("frontend.frontend.state.submit_deployment") as mock_submit, \
+             patch("frontend.frontend.state.AuditService") as mock_audit, \
+             patch("frontend.frontend.state.find_recent_deployment") as mock_find, \
+             patch("frontend.frontend.state.Config") as mock_config:
+            mock_config.GITLAB_TRIGGER_TOKEN = "glptt-test"
+            mock_config.DEFAULT_BUDGET_LIMIT = 50.0
+            mock_find.return_value = MagicMock(id=7, attempts=1)
+
+            events = list(_get_fn(State.start_deployment)(s))
+
+        mock_submit.assert_not_called()
+        mock_audit.create_log.assert_not_called()
+        assert s.deploy_job_id == 7
+        assert "♻️" in s.logs[-1]
+        assert State.watch_deploy_job in events
+
+    def test_second_click_while_deploying_is_ignored(self):
+        """Déploiement déjà en cours → aucun effet."""
+        from frontend.frontend.state import State
+
+        s = _make_state(cost=10.0, resource_list=[{"type": "compute"}], is_deploying=True, logs=["x"])
+        assert list(_get_fn(State.start_deployment)(s) or []) == []
+        assert s.logs == ["x"]
+
+    def test_trace_lines_are_appended_in_one_bounded_batch(self):
+        """Lot de lignes de trace → une seule affectation, taille bornée."""
+        from frontend.frontend.state import _LOG_MAX_LINES, State
+
+        s = _make_state(logs=["--- DEPLOY ---"])
+        State._append_logs(s, [f"line {i}" for i in range(_LOG_MAX_LINES + 5)])
+        assert len(s.logs) == _LOG_MAX_LINES
+        assert s.logs[-1] == f"line {_LOG_MAX_LINES + 4}"
+
+    def test_queued_job_progress_is_reported(self):
+        """Position en file puis pipeline envoyé → console mise à jour."""
+        from frontend.frontend.state import State
+
+        s = _make_state(deploy_job_id=12, deploy_queue_position=0, _deploy_job_attempts=0, is_deploying=True)
+        queued = MagicMock(status="queued", attempts=0, error=None, action="apply")
+        assert State._apply_deploy_job(s, queued, 3) is False
+        assert s.deploy_queue_position == 3
+        assert s.logs[-1] == "⏳ Position dans la file : 3"
+
+        sent = MagicMock(status="sent", pipeline_id=99, pipeline_url="https://gitlab/p/99", action="apply")
+        assert State._apply_deploy_job(s, sent, 0) is True
+        assert s.deploy_status == "pipeline_sent"
+        assert s.pipeline_url == "https://gitlab/p/99"
+        assert s.deploy_job_id is None and s.is_deploying is False
+
     def test_empty_cart_blocks_deployment(self):
         """Panier vide → toast d'erreur, pas de déploiement."""
         from frontend.frontend.state import State
@@ -422,6 +503,84 @@ class TestAuditFormatting:
         assert formatted["formatted_cost"] == "$0.00"
 
 
+    def test_webhook_event_updates_tracked_rows_only(self):
+        """Événement webhook → seuls les logs en cours du pipeline changent."""
+        from frontend.frontend.state import State
+
+        rows = [
+            {"id": 1, "status": "PIPELINE_SENT", "pipeline_url": "https://gitlab.com/x/-/pipelines/7"},
+            {"id": 2, "status": "SUCCESS", "pipeline_url": "https://gitlab.com/x/-/pipelines/7"},
+            {"id": 3, "status": "RUNNING", "pipeline_url": "https://gitlab.com/x/-/pipelines/8"},
+        ]
+        s = _make_state(audit_logs=rows)
+
+        assert State._apply_pipeline_event(s, 7, "FAILED") is True
+        assert [r["status"] for r in s.audit_logs] == ["FAILED", "SUCCESS", "RUNNING"]
+        assert State._apply_pipeline_event(s, 7, "FAILED") is False
+
+    def test_shared_audit_snapshot_applied_once(self):
+        """Instantané du poller partagé → formaté une fois par version."""
+        from frontend.frontend.state import State
+        from src.services.audit_poller import AuditSnapshot
+
+        s = _make_state(audit_poll_interval_s=10, _audit_snapshot_version=0)
+        s._format_audit_row = State._format_audit_row
+        rows = [{"id": 1, "created_at": "2026-03-01T12:00:00", "total_cost": 3.5}]
+
+        State._apply_audit_snapshot(s, AuditSnapshot(rows, version=4, interval_s=20))
+        assert s.audit_logs[0]["formatted_cost"] == "$3.50"
+        assert s.audit_poll_interval_s == 20
+
+        s.audit_logs = ["local"]
+        State._apply_audit_snapshot(s, AuditSnapshot(rows, version=4, interval_s=20))
+        assert s.audit_logs == ["local"]
+
+    def test_unchanged_audit_rows_keep_their_formatting(self):
+        """Nouvelle version → seules les lignes modifiées sont reformatées."""
+        from frontend.frontend.state import State
+        from src.services.audit_poller import AuditSnapshot
+
+        s = _make_state(audit_poll_interval_s=10, _audit_snapshot_version=0)
+        s._format_audit_row = State._format_audit_row
+        one = {"id": 1, "created_at": "2026-03-01T12:00:00", "total_cost": 1.0, "status": "SUCCESS"}
+        two = {"id": 2, "created_at": "2026-03-02T12:00:00", "total_cost": 2.0, "status": "PENDING"}
+        State._apply_audit_snapshot(s, AuditSnapshot([two, one], version=1))
+        kept = s.audit_logs[1]
+
+        State._apply_audit_snapshot(s, AuditSnapshot([{**two, "status": "SUCCESS"}, one], version=2))
+        assert s.audit_logs[1] is kept
+        assert s.audit_logs[0]["status"] == "SUCCESS"
+
+    def test_rollup_summary_is_formatted(self):
+        """Synthèse FinOps → totaux et lignes {label, count, formatted_cost}."""
+        from frontend.frontend.state import State
+
+        s = _make_state()
+        s._format_rollup_rows = State._format_rollup_rows
+        State._apply_rollup_summary(s, {
+            "count": 3,
+            "cost": 42.5,
+            "by_user": [{"user": "Alice", "count": 2, "cost": 40.0}, {"user": "", "count": 1, "cost": 2.5}],
+            "by_action": [{"action": "DEPLOY", "count": 3, "cost": 42.5}],
+            "by_status": [],
+        })
+
+        assert s.rollup_total_cost == "$42.50"
+        assert s.rollup_total_count == 3
+        assert s.rollup_by_user == [
+            {"label": "Alice", "count": 2, "formatted_cost": "$40.00"},
+            {"label": "–", "count": 1, "formatted_cost": "$2.50"},
+        ]
+        assert s.rollup_by_status == []
+
+    def test_export_progress_label(self):
+        """Avancement de l'export : lignes écrites, pourcentage si le total est connu."""
+        from frontend.frontend.state import State
+
+        assert State._export_progress_label({"rows": 1500, "percent": 37.5}) == "Export en cours… 1500 ligne(s) (38 %)"
+        assert State._export_progress_label({"rows": 10, "percent": None}) == "Export en cours… 10 ligne(s)"
+
+
 # ============================================================
 # E. login / logout – Supabase profiles validation
 # ============================================================